@@ -1,5 +1,23 @@
-
+import importlib
 from .constants import *
-from .utils import *
-from . import metric
-from .ToolValidator import *
+
+# The modules below are imported on first use (e.g., ATtILA2.metric or ATtILA2.ToolValidator) rather than with the
+# package, so that opening a tool dialog does not import the modules that run the metrics, and running a metric does 
+# not import the tool validators
+_lazySubmodules = ["metric", "utils", "ToolValidator", "errors", "setupAndRestore", "datetimeutil"]
+
+# packages whose public names were imported into this package with "from ... import *"
+_starImportedPackages = ["utils", "ToolValidator"]
+
+
+def __getattr__(name):
+    if name in _lazySubmodules:
+        return importlib.import_module(f"{__name__}.{name}")
+    if not name.startswith("_"):
+        for packageName in _starImportedPackages:
+            package = importlib.import_module(f"{__name__}.{packageName}")
+            try:
+                return getattr(package, name)
+            except AttributeError:
+                pass
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
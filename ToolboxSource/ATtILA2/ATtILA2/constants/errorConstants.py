@@ -177,4 +177,14 @@ For example:
 If a log file is not necessary, removing the LOGFILE option from the 'Select_options' parameter will allow 
 the tool to run to completion.
 
-'''
\ No newline at end of file
+'''
+
+
+pyarrowMissingError = '''
+
+Writing Parquet or Arrow output tables requires the pyarrow package, which was not found.
+
+Install pyarrow in the ArcGIS Pro Python environment, or set globalConstants.columnarFileFormat to None to write only
+the geodatabase table.
+
+'''
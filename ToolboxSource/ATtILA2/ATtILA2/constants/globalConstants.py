@@ -31,6 +31,91 @@ dummyFieldName = "_dummy"
 scratchGDBFilename = "attilaScratchWorkspace.gdb"
 allGridValuesTools = ["lccc", "lcd"]
 
+# Backend used by utils.tabarea.TabulateAreaTable to build the zone by class area table. "ARCPY" runs the Spatial Analyst
+# TabulateArea tool; "NUMPY" rasterizes the reporting units once and counts land cover cells with NumPy, block by block.
+arcpyBackendName = "ARCPY"
+numpyBackendName = "NUMPY"
+tabulateAreaBackend = arcpyBackendName
+numpyBlockSize = 4096
+
+# Number of table rows read at a time by the bulk arcpy.da cursor functions of utils.cursors
+cursorBlockSize = 100000
+
+# Backend used by utils.calculate.getPatchNumbers. "ARCPY" runs TabulateArea once per reporting unit; "NUMPY" summarizes
+# the patch raster for all reporting units in one pass.
+patchMetricsBackend = arcpyBackendName
+
+# Backend used by utils.vector.tabulateMDCP. "ARCPY" runs Clip and GenerateNearTable once per reporting unit; "NUMPY"
+# finds the closest patches of all reporting units with one KD-tree over patch edge cells (requires scipy).
+mdcpBackend = arcpyBackendName
+
+# Largest number of polygon envelopes, and of candidate pairs, held at a time by utils.polygons.findOverlaps, which then
+# sorts the envelopes in temporary files and reads geometries a chunk of pairs at a time. Set it to bound the memory used
+# on very large feature classes. None holds all envelopes and candidate geometries at once.
+overlapIndexChunkSize = None
+
+# Largest number of iterated greedy recoloring passes used by utils.polygons.findNonOverlapGroups to reduce the number
+# of groups of non overlapping polygons
+overlapRecolorPasses = 10
+
+# Backend used for focal sums by the Neighborhood Proportions and Population Land Cover Views tools. "ARCPY" runs
+# FocalStatistics; "NUMPY" reads the grid in blocks of numpyBlockSize rows and columns and sums rectangular windows with
+# integral images (every class from one read of the land cover grid) and circular neighborhoods one row at a time or,
+# for large radii, with FFT convolution.
+focalBackend = arcpyBackendName
+
+# Backend used by utils.raster.getEdgeCoreGrid. "ARCPY" runs Reclassify, SetNull, EucDistance, and Con; "NUMPY" reads
+# the land cover grid in blocks of numpyBlockSize rows and columns and classifies edge and core cells with an exact
+# distance transform of each block.
+edgeCoreBackend = arcpyBackendName
+
+# File that keeps the circular neighborhood cell counts calculated by utils.raster.getCircleCellCount between runs. None
+# keeps the file in the system temporary folder.
+circleCellCountMemoFile = None
+
+# Number of worker processes used by the Pedestrian Access and Availability tool to calculate park rasters. 1 processes
+# the parks one after another in the tool's own process; 0 or None uses every core but one.
+parkWorkerCount = 1
+
+# Number of worker processes used to run independent steps of a batch (see utils.batch.runBatch), such as the
+# EnviroAtlas processes of scripts/CommScriptProcessing.py. 1 runs the steps one after another.
+batchWorkerCount = 1
+
+# Largest number of rasters summed by one MosaicToNewRaster call in utils.raster.mosaicSumRasters
+mosaicBatchSize = 500
+
+# How the Pedestrian Access and Availability tool combines park rasters. "ARCPY" saves a raster for each park and sums
+# them with MosaicToNewRaster; "NUMPY" adds each park's values to a memory-mapped running sum grid as soon as the park is
+# calculated, so no park rasters are saved.
+parkMosaicBackend = arcpyBackendName
+
+# Largest number of rows and columns written at a time when a running sum grid is saved (see utils.raster.saveSumGrid)
+sumGridTileSize = 8192
+
+# Folder that keeps the object ID rasters of reporting units made by utils.raster.getZoneRaster, so that tools run
+# against the same reporting units and alignment rasterize them only once. None uses the scratch folder environment.
+# Cached rasters are kept until deleted with utils.raster.clearZoneRasterCache.
+zoneRasterCacheFolder = None
+
+# JSON lines file that receives a timing event for every metric calculation step and logged ArcPy call (see utils.trace).
+# None records no trace.
+traceFile = None
+
+# Writer of the output tables of Land Cover Proportions and the tools built on it, the Land Cover Coefficient Calculator
+# and Land Cover Diversity. "ARCPY" creates the table with one AddField per field and fills it with an insert cursor;
+# "COLUMNAR" keeps the columns in memory and writes them at once (see utils.columnar).
+columnarBackendName = "COLUMNAR"
+outputTableBackend = arcpyBackendName
+
+# File written by the "COLUMNAR" output table writer next to the output table: "PARQUET", "ARROW" (Arrow IPC), or None
+# for no file. Parquet and Arrow files require pyarrow.
+parquetFormatName = "PARQUET"
+arrowFormatName = "ARROW"
+columnarFileFormat = parquetFormatName
+
+# If True, the "COLUMNAR" output table writer also creates the requested geodatabase table, with one NumPyArrayToTable
+columnarExportToGeodatabase = True
+
 # These are the extensions Esri recognizes as rasters. They may not all be acceptable when saving a calculated grid. Tools
 # such as Intersection Density can only save its output with ".img", or ".tif" extensions when saving to a folder. An 
 # extension in this case, however, is not required and may be omitted. No extensions are permitted inside a geodatabase.
@@ -5,6 +5,8 @@
     .. _generator: http://docs.python.org/tutorial/classes.html#generators
 
 '''
+import sys
+import time
 from datetime import datetime
 
 def dateRange(startDate, endDate):
@@ -206,3 +208,73 @@ class DateTimer:
         return str(delta).split(".")[0]
 
 
+def getPeakMemory():
+    """ Returns the peak resident memory (RSS) of the current process in bytes, or None if it cannot be read """
+
+    try:
+        if sys.platform == 'win32':
+            import ctypes
+            from ctypes import wintypes
+
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                            ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                            ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            getProcessMemoryInfo = ctypes.windll.psapi.GetProcessMemoryInfo
+            getProcessMemoryInfo.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESS_MEMORY_COUNTERS), wintypes.DWORD]
+            if getProcessMemoryInfo(ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+                return int(counters.PeakWorkingSetSize)
+            return None
+
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        return int(peak) if sys.platform == 'darwin' else int(peak) * 1024
+    except Exception:
+        return None
+
+
+class ResourceTimer(DateTimer):
+    ''' DateTimer that also measures the wall time, processor time and peak memory of the timed work
+
+        Wall and processor times come from high resolution clocks rather than the date and time, so short steps are
+        timed accurately. By default nothing is reported.
+
+        Example:
+
+            timer = ResourceTimer()
+            timer.start()
+            ...
+            timer.stop()
+            timer.wallSeconds, timer.cpuSeconds, timer.peakMemory
+
+    '''
+
+    def __init__(self, report=False):
+
+        DateTimer.__init__(self, report)
+        self.wallSeconds = None
+        self.cpuSeconds = None
+        self.peakMemory = None
+        self._wallStart = None
+        self._cpuStart = None
+
+    def start(self):
+
+        message = DateTimer.start(self)
+        self._wallStart = time.perf_counter()
+        self._cpuStart = time.process_time()
+        return message
+
+    def stop(self):
+
+        if self._wallStart is not None:
+            self.wallSeconds = time.perf_counter() - self._wallStart
+            self.cpuSeconds = time.process_time() - self._cpuStart
+        self.peakMemory = getPeakMemory()
+        return DateTimer.stop(self)
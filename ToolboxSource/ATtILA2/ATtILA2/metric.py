@@ -17,9 +17,12 @@ from .utils import files
 from .utils import vector
 from .utils import environment
 from .utils import parameters
+from .utils import parallel
 from .utils import raster
+from .utils import tabarea
 from .utils import conversion
 from .utils import log
+from .utils import trace
 from .utils import messages
 from .utils.messages import AddMsg
 from .datetimeutil import DateTimer
@@ -138,7 +141,8 @@ class metricCalc:
                                                                                   self.metricsBaseNameList,
                                                                                   self.optionalGroupsList,
                                                                                   self.metricConst, self.lccObj,
-                                                                                  self.outIdField, self.logFile)
+                                                                                  self.outIdField, self.logFile,
+                                                                                  allowColumnar=True)
     def _makeTabAreaTable(self):
         AddMsg(self.timer.now() + " Generating a zonal tabulate area table", 0, self.logFile)
         # Internal function to generate a zonal tabulate area table
@@ -170,37 +174,73 @@ class metricCalc:
             # write the metric class grid values to the log file
             log.logWriteClassValues(self.logFile, self.metricsBaseNameList, self.lccObj, self.metricConst)
     
+    def _runStep(self, step):
+        # Runs one step of the calculation, recording its timing if a trace is being kept (see utils.trace)
+        with trace.traceSpan(step.__name__, "metricCalc", [self.inReportingUnitFeature], [self.outTable],
+                             tool=self.metricConst.shortName):
+            step()
+
     # Function to run all the steps in the calculation process
     def run(self):
         # Replace LandCover Grid, if necessary
-        self._replaceLCGrid()
+        self._runStep(self._replaceLCGrid)
 
         # Replace Reporting Unit features, if necessary
-        self._replaceRUFeatures()
+        self._runStep(self._replaceRUFeatures)
 
         # Perform additional housekeeping
-        self._housekeeping()
+        self._runStep(self._housekeeping)
 
         # Make Output Tables
-        self._makeAttilaOutTable()
+        self._runStep(self._makeAttilaOutTable)
 
         # Generate Tabulation tables
-        self._makeTabAreaTable()
+        self._runStep(self._makeTabAreaTable)
 
         # Run final metric calculation
-        self._calculateMetrics()
+        self._runStep(self._calculateMetrics)
         
         # Record Output Table info to log file
-        self._summarizeOutTable()
+        self._runStep(self._summarizeOutTable)
                
         # Write Environment settings to the log file
-        self._logEnvironments()
+        self._runStep(self._logEnvironments)
         
         # ensure cleanup occurs.
         if self.tabAreaTable != None:
             del self.tabAreaTable
 
 
+def runMetricSuite(metricRunList):
+    """ Runs several metric tools in turn, tabulating each set of reporting units and land cover grid only once
+
+    **Description:**
+
+        Land Cover Proportions, Land Cover Diversity, the Land Cover Coefficient Calculator and the other tools built on
+        TabulateAreaTable all start from the same zone by class area table. Within a suite, the first tool to need a
+        table tabulates it and every later tool run against the same reporting units, zone ID field, land cover grid
+        and processing environments is handed the same area matrix (see tabarea.startSharedTabulations). Each tool
+        still writes its own output table and log file.
+
+    **Arguments:**
+
+        * *metricRunList* - list of (run function, list of arguments) tuples, e.g., 
+                            (metric.runLandCoverDiversity, [toolPath, inReportingUnitFeature, ...])
+
+    **Returns:**
+
+        * None
+
+    """
+
+    tabarea.startSharedTabulations()
+    try:
+        for runFunction, arguments in metricRunList:
+            runFunction(*arguments)
+    finally:
+        tabarea.stopSharedTabulations()
+
+
 def runLandCoverProportionsORIGINAL(inReportingUnitFeature, reportingUnitIdField, inLandCoverGrid, _lccName, lccFilePath,
                             metricsToRun, outTable, processingCellSize, snapRaster, optionalFieldGroups):
     """ Interface for script executing Land Cover Proportion Metrics """
@@ -254,7 +294,8 @@ def runLandCoverProportions(toolPath, inReportingUnitFeature, reportingUnitIdFie
                                                                                         self.lccObj, 
                                                                                         self.outIdField, 
                                                                                         self.logFile,
-                                                                                        self.metricConst.additionalFields)
+                                                                                        self.metricConst.additionalFields,
+                                                                                        allowColumnar=True)
                 else:
                     self.newTable, self.metricsFieldnameDict = table.tableWriterByClass(self.outTable,
                                                                                         self.metricsBaseNameList,
@@ -262,7 +303,8 @@ def runLandCoverProportions(toolPath, inReportingUnitFeature, reportingUnitIdFie
                                                                                         self.metricConst, 
                                                                                         self.lccObj,
                                                                                         self.outIdField,
-                                                                                        self.logFile)     
+                                                                                        self.logFile,
+                                                                                        allowColumnar=True)     
         
             def _calculateMetrics(self):
                 # Initiate our flexible cleanuplist
@@ -516,8 +558,8 @@ def runFloodplainLandCoverProportions(toolPath, inReportingUnitFeature, reportin
                     AddMsg(f"{self.timer.now()} Tabulating the area of the floodplains within each reporting unit", 0, self.logFile)
                     fpTabAreaTable = files.nameIntermediateFile([self.metricConst.fpTabAreaName, "Dataset"], self.cleanupList)   
 
-                    log.logArcpy("arcpy.sa.TabulateArea",(self.inReportingUnitFeature, self.reportingUnitIdField, self.inFloodplainGeodataset, "VALUE", fpTabAreaTable, processingCellSize),logFile)            
-                    arcpy.sa.TabulateArea(self.inReportingUnitFeature, self.reportingUnitIdField, self.inFloodplainGeodataset, "VALUE", fpTabAreaTable, processingCellSize)
+                    with log.logArcpy("arcpy.sa.TabulateArea",(self.inReportingUnitFeature, self.reportingUnitIdField, self.inFloodplainGeodataset, "VALUE", fpTabAreaTable, processingCellSize),logFile):            
+                        arcpy.sa.TabulateArea(self.inReportingUnitFeature, self.reportingUnitIdField, self.inFloodplainGeodataset, "VALUE", fpTabAreaTable, processingCellSize)
             
                     # This technique allows the use of all non-zero values in a grid to designate floodplain areas instead of just '1'. 
                     self.excludedValueFields = ["VALUE_0"]
@@ -767,31 +809,41 @@ def runPatchMetrics(toolPath, inReportingUnitFeature, reportingUnitIdField, inLa
                 def _calculateMetrics(self):
                     AddMsg(f"{self.timer.now()} Calculating Patch Numbers by Reporting Unit for Class:{m}", 0, self.logFile)
                     
-                    per = '[PER UNIT]'
-                    AddMsg(f"{timer.now()} The following steps will be performed for each reporting unit:", 0, logFile)    
-                    AddMsg("\n---")
-                    AddMsg(f"{timer.now()} {per} 1) Create a feature layer of the single reporting unit.", 0, logFile)
-                    AddMsg(f"{timer.now()} {per} 2) Set the geoprocessing extent to just the extent of the selected reporting unit.", 0, logFile)
-                    AddMsg(f"{timer.now()} {per} 3) Copy the single reporting unit feature layer to a new feature class.", 0, logFile)
-                    AddMsg(f"{timer.now()} {per} 4) Calculate the area of patches within reporting unit with TabulateArea:", 0, logFile)
-                    AddMsg(f"{timer.now()} {per}     4a) arcpy.sa.TabulateArea(newFeatureClass, reportingUnitIdField, inLandCoverGrid,'Value', tabareaTable, processingCellSize)", 0, logFile)
-                    AddMsg(f"{timer.now()} {per} 5) Loop through each row in the TabulateArea table (only one row in table) and calculate the patch metrics: ", 0, logFile)
-                    AddMsg(f"{timer.now()} {per}     5a) other area = value of 'Value_0' field ", 0, logFile)
-                    AddMsg(f"{timer.now()} {per}     5b) excluded area = value of 'Value__9999' field", 0, logFile)
-                    AddMsg(f"{timer.now()} {per}     5c) create a list of all patch area values for the row (all fields except 'Value_0' and 'Value__9999'):", 0, logFile)
-                    AddMsg(f"{timer.now()} {per}       c1) numPatch = len(patchAreaList)", 0, logFile)
-                    AddMsg(f"{timer.now()} {per}       c2) patchArea = sum(patchAreaList)", 0, logFile)
-                    AddMsg(f"{timer.now()} {per}       c3) lrgPatch = max(patchAreaList)", 0, logFile)
-                    AddMsg(f"{timer.now()} {per}       c4) mdnpatch = numpy.median(patchAreaList)", 0, logFile)
-                    AddMsg(f"{timer.now()} {per}       c5) avePatch = patchArea/numPatch", 0, logFile)
-                    AddMsg(f"{timer.now()} {per}       c6) lrgProportion = (lrgPatch/patchArea) * 100", 0, logFile)
-                    AddMsg(f"{timer.now()} {per}       c7) patchDensity = numPatch/(patchArea + otherArea) in square kilometers", 0, logFile)    
-                    AddMsg(f"{timer.now()} {per} 6) Insert calculated values into Output table.", 0, logFile)
-                    AddMsg(f"{timer.now()} {per} 7) Delete reporting unit feature layer, reporting unit feature class, and TabulateArea table.", 0, logFile)
-                    AddMsg("---\n")
+                    if globalConstants.patchMetricsBackend == globalConstants.numpyBackendName:
+                        AddMsg(f"{timer.now()} The following steps will be performed for all reporting units at once:", 0, logFile)
+                        AddMsg("\n---")
+                        AddMsg(f"{timer.now()} 1) Convert the reporting units to a raster of object IDs aligned with the patch grid.", 0, logFile)
+                        AddMsg(f"{timer.now()} 2) Read the object ID and patch grids block by block and count the cells of each reporting unit/patch pair.", 0, logFile)
+                        AddMsg(f"{timer.now()} 3) Calculate the patch metrics of every reporting unit from the pair counts (patches are all values except 0 and -9999).", 0, logFile)
+                        AddMsg(f"{timer.now()} 4) Insert calculated values into Output table.", 0, logFile)
+                        AddMsg("---\n")
+                    else:
+                        per = '[PER UNIT]'
+                        AddMsg(f"{timer.now()} The following steps will be performed for each reporting unit:", 0, logFile)    
+                        AddMsg("\n---")
+                        AddMsg(f"{timer.now()} {per} 1) Create a feature layer of the single reporting unit.", 0, logFile)
+                        AddMsg(f"{timer.now()} {per} 2) Set the geoprocessing extent to just the extent of the selected reporting unit.", 0, logFile)
+                        AddMsg(f"{timer.now()} {per} 3) Copy the single reporting unit feature layer to a new feature class.", 0, logFile)
+                        AddMsg(f"{timer.now()} {per} 4) Calculate the area of patches within reporting unit with TabulateArea:", 0, logFile)
+                        AddMsg(f"{timer.now()} {per}     4a) arcpy.sa.TabulateArea(newFeatureClass, reportingUnitIdField, inLandCoverGrid,'Value', tabareaTable, processingCellSize)", 0, logFile)
+                        AddMsg(f"{timer.now()} {per} 5) Loop through each row in the TabulateArea table (only one row in table) and calculate the patch metrics: ", 0, logFile)
+                        AddMsg(f"{timer.now()} {per}     5a) other area = value of 'Value_0' field ", 0, logFile)
+                        AddMsg(f"{timer.now()} {per}     5b) excluded area = value of 'Value__9999' field", 0, logFile)
+                        AddMsg(f"{timer.now()} {per}     5c) create a list of all patch area values for the row (all fields except 'Value_0' and 'Value__9999'):", 0, logFile)
+                        AddMsg(f"{timer.now()} {per}       c1) numPatch = len(patchAreaList)", 0, logFile)
+                        AddMsg(f"{timer.now()} {per}       c2) patchArea = sum(patchAreaList)", 0, logFile)
+                        AddMsg(f"{timer.now()} {per}       c3) lrgPatch = max(patchAreaList)", 0, logFile)
+                        AddMsg(f"{timer.now()} {per}       c4) mdnpatch = numpy.median(patchAreaList)", 0, logFile)
+                        AddMsg(f"{timer.now()} {per}       c5) avePatch = patchArea/numPatch", 0, logFile)
+                        AddMsg(f"{timer.now()} {per}       c6) lrgProportion = (lrgPatch/patchArea) * 100", 0, logFile)
+                        AddMsg(f"{timer.now()} {per}       c7) patchDensity = numPatch/(patchArea + otherArea) in square kilometers", 0, logFile)    
+                        AddMsg(f"{timer.now()} {per} 6) Insert calculated values into Output table.", 0, logFile)
+                        AddMsg(f"{timer.now()} {per} 7) Delete reporting unit feature layer, reporting unit feature class, and TabulateArea table.", 0, logFile)
+                        AddMsg("---\n")
                     
-                    # calculate Patch metrics
-                    AddMsg(f"{timer.now()} Starting calculations per reporting unit...", 0, logFile)
+                        # calculate Patch metrics
+                        AddMsg(f"{timer.now()} Starting calculations per reporting unit...", 0, logFile)
+
                     self.pmResultsDict = calculate.getPatchNumbers(self.outIdField, self.newTable, self.reportingUnitIdField, self.metricsFieldnameDict,
                                                       self.zoneAreaDict, self.metricConst, m, self.inReportingUnitFeature, 
                                                       self.inLandCoverGrid, processingCellSize, conversionFactor)
@@ -998,13 +1050,13 @@ def runCoreAndEdgeMetrics(toolPath, inReportingUnitFeature, reportingUnitIdField
                             else:
                                 self._tableName = arcpy.CreateScratchName(self._tempTableName+m.upper()+inEdgeWidth+"_", "", self._datasetType)
 
-                            log.logArcpy('arcpy.gp.TabulateArea_sa', (self._inReportingUnitFeature, self._reportingUnitIdField, self._inLandCoverGrid, 
-                                  self._value, self._tableName), logFile)
-                            arcpy.gp.TabulateArea_sa(self._inReportingUnitFeature, self._reportingUnitIdField, self._inLandCoverGrid, self._value, self._tableName)
+                            log.arcpyLog(arcpy.gp.TabulateArea_sa, (self._inReportingUnitFeature, self._reportingUnitIdField, self._inLandCoverGrid, 
+                                  self._value, self._tableName), 'arcpy.gp.TabulateArea_sa', logFile)
                             
-                            self._tabAreaTableRows = arcpy.SearchCursor(self._tableName)        
-                            self._tabAreaValueFields = arcpy.ListFields(self._tableName, "", "DOUBLE")
+                            self._tabAreaValueFields = [aFld for aFld in arcpy.ListFields(self._tableName, "", "DOUBLE")
+                                                        if aFld.name.upper() != self._reportingUnitIdField.upper()]
                             self._tabAreaValues = [aFld.name for aFld in self._tabAreaValueFields]
+                            self._tabAreaTableRows = self._readTableRows()
                             self._tabAreaDict = dict(zip(self._tabAreaValues,[])) 
                              
                     self.lccObj = None
@@ -1143,8 +1195,8 @@ def runRiparianLandCoverProportions(toolPath, inReportingUnitFeature, reportingU
                     self.namePrefix = self.metricConst.shortName + "_Dissolve"+self.inBufferDistance.split()[0]
                     self.dissolveName = utils.files.nameIntermediateFile([self.namePrefix,"FeatureClass"], rlcpCalc.cleanupList)
                     AddMsg(f"Duplicate ID values found in reporting unit feature. Forming multipart features. Intermediate: {basename(self.dissolveName)}", self.logFile)
-                    log.logArcpy("arcpy.Dissolve_management", (self.inReportingUnitFeature, self.dissolveName, self.reportingUnitIdField,"","MULTI_PART"), logFile)
-                    self.inReportingUnitFeature = arcpy.Dissolve_management(self.inReportingUnitFeature, self.dissolveName, self.reportingUnitIdField,"","MULTI_PART")
+                    with log.logArcpy("arcpy.Dissolve_management", (self.inReportingUnitFeature, self.dissolveName, self.reportingUnitIdField,"","MULTI_PART"), logFile):
+                        self.inReportingUnitFeature = arcpy.Dissolve_management(self.inReportingUnitFeature, self.dissolveName, self.reportingUnitIdField,"","MULTI_PART")
                     
                 # Generate a default filename for the buffer feature class
                 self.bufferName = f"{self.metricConst.shortName}_Buffer{self.inBufferDistance.replace(' ','')}_"
@@ -1289,8 +1341,8 @@ def runSamplePointLandCoverProportions(toolPath, inReportingUnitFeature, reporti
                     self.namePrefix = f"{self.metricConst.shortName}_Dissolve{self.inBufferDistance.split()[0]}_"
                     self.dissolveName = utils.files.nameIntermediateFile([self.namePrefix,"FeatureClass"], splcpCalc.cleanupList)
                     AddMsg(f"{timer.now()} Duplicate ID values found in reporting unit feature. Forming multipart features: {basename(self.dissolveName)}", 0, self.logFile)
-                    log.logArcpy("arcpy.Dissolve_management", (self.inReportingUnitFeature, self.dissolveName, self.reportingUnitIdField,"","MULTI_PART"), logFile)
-                    self.inReportingUnitFeature = arcpy.Dissolve_management(self.inReportingUnitFeature, self.dissolveName, self.reportingUnitIdField,"","MULTI_PART")
+                    with log.logArcpy("arcpy.Dissolve_management", (self.inReportingUnitFeature, self.dissolveName, self.reportingUnitIdField,"","MULTI_PART"), logFile):
+                        self.inReportingUnitFeature = arcpy.Dissolve_management(self.inReportingUnitFeature, self.dissolveName, self.reportingUnitIdField,"","MULTI_PART")
                     
                 # Generate a default filename for the buffer feature class
                 self.bufferName = f"{self.metricConst.shortName}_Buffer{self.inBufferDistance.replace(' ','')}_"
@@ -1431,7 +1483,8 @@ def runLandCoverCoefficientCalculator(toolPath, inReportingUnitFeature, reportin
                                                                                                 self.metricsBaseNameList,
                                                                                                 self.optionalGroupsList,
                                                                                                 self.metricConst, self.lccObj,
-                                                                                                self.outIdField, self.logFile)
+                                                                                                self.outIdField, self.logFile,
+                                                                                                allowColumnar=True)
             def _calculateMetrics(self):
                 # process the tabulate area table and compute metric values. Use values to populate the ATtILA output table
                 calculate.landCoverCoefficientCalculator(self.lccObj.values, self.metricsBaseNameList,
@@ -1539,8 +1592,8 @@ def runRoadDensityCalculator(toolPath, inReportingUnitFeature, reportingUnitIdFi
         tempName = f"{metricConst.shortName}_{desc.baseName}_"
         tempReportingUnitFeature = files.nameIntermediateFile([tempName,"FeatureClass"],cleanupList)
         AddMsg(f"{timer.now()} Creating temporary copy of {desc.name}. Intermediate: {basename(tempReportingUnitFeature)}", 0, logFile)
-        log.logArcpy("arcpy.Dissolve_management",(inReportingUnitFeature, basename(tempReportingUnitFeature), reportingUnitIdField,"","MULTI_PART"),logFile)
-        inReportingUnitFeature = arcpy.Dissolve_management(inReportingUnitFeature, basename(tempReportingUnitFeature), reportingUnitIdField,"","MULTI_PART")
+        with log.logArcpy("arcpy.Dissolve_management",(inReportingUnitFeature, basename(tempReportingUnitFeature), reportingUnitIdField,"","MULTI_PART"),logFile):
+            inReportingUnitFeature = arcpy.Dissolve_management(inReportingUnitFeature, basename(tempReportingUnitFeature), reportingUnitIdField,"","MULTI_PART")
 
         # Get the field properties for the unitID, this will be frequently used
         # If the field is numeric, it creates a text version of the field.
@@ -1560,8 +1613,8 @@ def runRoadDensityCalculator(toolPath, inReportingUnitFeature, reportingUnitIdFi
             tempName = f"{metricConst.shortName}_{arcpy.Describe(inRoadFeature).baseName}_"
             tempLineFeature = files.nameIntermediateFile([tempName,"FeatureClass"],cleanupList)
             AddMsg(f"{timer.now()} Creating temporary copy of {desc.name}. Intermediate: {basename(tempLineFeature)}", 0, logFile)
-            log.logArcpy("arcpy.FeatureClassToFeatureClass_conversion",(inRoadFeature, env.workspace, basename(tempLineFeature)),logFile)
-            inRoadFeature = arcpy.FeatureClassToFeatureClass_conversion(inRoadFeature, env.workspace, basename(tempLineFeature))
+            with log.logArcpy("arcpy.FeatureClassToFeatureClass_conversion",(inRoadFeature, env.workspace, basename(tempLineFeature)),logFile):
+                inRoadFeature = arcpy.FeatureClassToFeatureClass_conversion(inRoadFeature, env.workspace, basename(tempLineFeature))
 
 
         # Calculate the density of the roads by reporting unit.
@@ -1578,8 +1631,8 @@ def runRoadDensityCalculator(toolPath, inReportingUnitFeature, reportingUnitIdFi
 
         # Build and populate final output table.
         AddMsg(f"{timer.now()} Compiling calculated values into output table", 0, logFile)
-        log.logArcpy("arcpy.TableToTable_conversion",(inReportingUnitFeature,os.path.dirname(outTable),basename(outTable)), logFile)
-        arcpy.TableToTable_conversion(inReportingUnitFeature,os.path.dirname(outTable),basename(outTable))
+        with log.logArcpy("arcpy.TableToTable_conversion",(inReportingUnitFeature,os.path.dirname(outTable),basename(outTable)), logFile):
+            arcpy.TableToTable_conversion(inReportingUnitFeature,os.path.dirname(outTable),basename(outTable))
         
         # Get a list of unique road class values
         if roadClassField:
@@ -1601,8 +1654,8 @@ def runRoadDensityCalculator(toolPath, inReportingUnitFeature, reportingUnitIdFi
                 tempName = f"{metricConst.shortName}_{desc.baseName}_"
                 tempLineFeature = files.nameIntermediateFile([tempName,"FeatureClass"],cleanupList)
                 AddMsg(f"{timer.now()} Creating temporary copy of {desc.name}. Intermediate: {basename(tempLineFeature)}", 0, logFile)
-                log.logArcpy("arcpy.FeatureClassToFeatureClass_conversion",(inStreamFeature, env.workspace, basename(tempLineFeature)), logFile)
-                inStreamFeature = arcpy.FeatureClassToFeatureClass_conversion(inStreamFeature, env.workspace, basename(tempLineFeature))
+                with log.logArcpy("arcpy.FeatureClassToFeatureClass_conversion",(inStreamFeature, env.workspace, basename(tempLineFeature)), logFile):
+                    inStreamFeature = arcpy.FeatureClassToFeatureClass_conversion(inStreamFeature, env.workspace, basename(tempLineFeature))
 
             
             AddMsg(f"{timer.now()} Calculating Stream and Road Crossings (STXRD)", 0, logFile)
@@ -1656,8 +1709,8 @@ def runRoadDensityCalculator(toolPath, inReportingUnitFeature, reportingUnitIdFi
                     tempName = f"{metricConst.shortName}_{desc.baseName}_"
                     tempLineFeature = files.nameIntermediateFile([tempName,"FeatureClass"],cleanupList)
                     AddMsg(f"{timer.now()} Creating temporary copy of {desc.name}. Intermediate: {basename(tempLineFeature)}", 0, logFile)
-                    log.logArcpy("arcpy.FeatureClassToFeatureClass_conversion",(inStreamFeature,env.workspace,os.path.basename(tempLineFeature)), logFile)
-                    inStreamFeature = arcpy.FeatureClassToFeatureClass_conversion(inStreamFeature, env.workspace, os.path.basename(tempLineFeature))
+                    with log.logArcpy("arcpy.FeatureClassToFeatureClass_conversion",(inStreamFeature,env.workspace,os.path.basename(tempLineFeature)), logFile):
+                        inStreamFeature = arcpy.FeatureClassToFeatureClass_conversion(inStreamFeature, env.workspace, os.path.basename(tempLineFeature))
                 
                 # Calculate the density of the streams by reporting unit.
                 # Get a unique name for the merged streams:
@@ -1791,8 +1844,8 @@ def runStreamDensityCalculator(toolPath, inReportingUnitFeature, reportingUnitId
         tempName = f"{metricConst.shortName}_{desc.baseName}_" 
         tempReportingUnitFeature = files.nameIntermediateFile([tempName,"FeatureClass"],cleanupList)
         AddMsg(f"{timer.now()} Creating temporary copy of {desc.name}. Intermediate: {basename(tempReportingUnitFeature)}", 0, logFile)
-        log.logArcpy("arcpy.Dissolve_management",(inReportingUnitFeature,os.path.basename(tempReportingUnitFeature),reportingUnitIdField,"","MULTI_PART"),logFile)
-        inReportingUnitFeature = arcpy.Dissolve_management(inReportingUnitFeature, os.path.basename(tempReportingUnitFeature), reportingUnitIdField,"","MULTI_PART")
+        with log.logArcpy("arcpy.Dissolve_management",(inReportingUnitFeature,os.path.basename(tempReportingUnitFeature),reportingUnitIdField,"","MULTI_PART"),logFile):
+            inReportingUnitFeature = arcpy.Dissolve_management(inReportingUnitFeature, os.path.basename(tempReportingUnitFeature), reportingUnitIdField,"","MULTI_PART")
 
         # Get the field properties for the unitID, this will be frequently used
         uIDField = settings.processUIDField(inReportingUnitFeature,reportingUnitIdField)
@@ -1819,8 +1872,8 @@ def runStreamDensityCalculator(toolPath, inReportingUnitFeature, reportingUnitId
             tempName = f"{metricConst.shortName}_{desc.baseName}_"
             tempLineFeature = files.nameIntermediateFile([tempName,"FeatureClass"],cleanupList)
             AddMsg(f"{timer.now()} Creating temporary copy of {desc.name}. Intermediate: {basename(tempLineFeature)}", 0, logFile)
-            log.logArcpy("arcpy.FeatureClassToFeatureClass_conversion",(inLineFeature, env.workspace, basename(tempLineFeature)),logFile)
-            inLineFeature = arcpy.FeatureClassToFeatureClass_conversion(inLineFeature, env.workspace, basename(tempLineFeature))
+            with log.logArcpy("arcpy.FeatureClassToFeatureClass_conversion",(inLineFeature, env.workspace, basename(tempLineFeature)),logFile):
+                inLineFeature = arcpy.FeatureClassToFeatureClass_conversion(inLineFeature, env.workspace, basename(tempLineFeature))
 
         # Calculate the density of the streams by reporting unit.
         # Get a unique name for the merged streams and prep for cleanup:
@@ -1834,8 +1887,8 @@ def runStreamDensityCalculator(toolPath, inReportingUnitFeature, reportingUnitId
 
         # Build and populate final output table.
         AddMsg(f"{timer.now()} Compiling calculated values into output table", 0, logFile)
-        log.logArcpy("arcpy.TableToTable_conversion",(inReportingUnitFeature,os.path.dirname(outTable),os.path.basename(outTable)),logFile)
-        arcpy.TableToTable_conversion(inReportingUnitFeature,os.path.dirname(outTable),os.path.basename(outTable))
+        with log.logArcpy("arcpy.TableToTable_conversion",(inReportingUnitFeature,os.path.dirname(outTable),os.path.basename(outTable)),logFile):
+            arcpy.TableToTable_conversion(inReportingUnitFeature,os.path.dirname(outTable),os.path.basename(outTable))
         # Get a list of unique road class values
         if strmOrderField:
             orderValues = fields.getUniqueValues(mergedInLines,strmOrderField)
@@ -1955,7 +2008,8 @@ def runLandCoverDiversity(toolPath, inReportingUnitFeature, reportingUnitIdField
                                                                                         self.optionalGroupsList,
                                                                                         self.metricConst,
                                                                                         self.outIdField,
-                                                                                        self.logFile)
+                                                                                        self.logFile,
+                                                                                        allowColumnar=True)
                 
             def _makeTabAreaTable(self):
                 AddMsg(f"{self.timer.now()} Generating a zonal tabulate area table", 0, self.logFile)
@@ -1977,26 +2031,29 @@ def runLandCoverDiversity(toolPath, inReportingUnitFeature, reportingUnitIdField
                     log.logWriteOutputTableInfo(self.newTable, self.logFile, self.metricConst)
                     AddMsg("Summary complete", 0)
                     
+            # Runs one step, recording its timing if a trace is being kept
+            _runStep = metricCalc._runStep
+
             # Function to run all the steps in the calculation process
             def run(self):
             
                 # Perform additional housekeeping
-                self._housekeeping()
+                self._runStep(self._housekeeping)
                 
                 # Make Output Tables
-                self._makeAttilaOutTable()
+                self._runStep(self._makeAttilaOutTable)
                 
                 # Generate Tabulation tables
-                self._makeTabAreaTable()
+                self._runStep(self._makeTabAreaTable)
                 
                 # Run final metric calculation
-                self._calculateMetrics()
+                self._runStep(self._calculateMetrics)
                 
                 # Summarize the ATtILA metric output table to log file
-                self._summarizeOutTable()
+                self._runStep(self._summarizeOutTable)
                 
                 # Write Environment settings to the log file
-                self._logEnvironments()
+                self._runStep(self._logEnvironments)
                 
 
         # retrieve the attribute constants associated with this metric
@@ -2086,18 +2143,18 @@ def runPopulationDensityCalculator(toolPath, inReportingUnitFeature, reportingUn
         tempName = f"{metricConst.shortName}_{desc.baseName}_"
         tempReportingUnitFeature = files.nameIntermediateFile([tempName,"FeatureClass"],cleanupList)
         AddMsg(f"{timer.now()} Creating temporary copy of {desc.name}. Intermediate: {basename(tempReportingUnitFeature)}", 0, logFile)
-        log.logArcpy("arcpy.Dissolve_management",(inReportingUnitFeature, basename(tempReportingUnitFeature), reportingUnitIdField,"","MULTI_PART"),logFile)
-        inReportingUnitFeature = arcpy.Dissolve_management(inReportingUnitFeature, basename(tempReportingUnitFeature), reportingUnitIdField,"","MULTI_PART")
+        with log.logArcpy("arcpy.Dissolve_management",(inReportingUnitFeature, basename(tempReportingUnitFeature), reportingUnitIdField,"","MULTI_PART"),logFile):
+            inReportingUnitFeature = arcpy.Dissolve_management(inReportingUnitFeature, basename(tempReportingUnitFeature), reportingUnitIdField,"","MULTI_PART")
 
         # Add and populate the area field (or just recalculate if it already exists
         ruAreaFld = metricConst.areaFieldname
-        log.logArcpy("arcpy.management.CalculateGeometryAttributes",(inReportingUnitFeature, [[ruAreaFld, "AREA"]],"", "SQUARE_KILOMETERS"), logFile)
-        arcpy.management.CalculateGeometryAttributes(inReportingUnitFeature, [[ruAreaFld, "AREA"]],"", "SQUARE_KILOMETERS")
+        with log.logArcpy("arcpy.management.CalculateGeometryAttributes",(inReportingUnitFeature, [[ruAreaFld, "AREA"]],"", "SQUARE_KILOMETERS"), logFile):
+            arcpy.management.CalculateGeometryAttributes(inReportingUnitFeature, [[ruAreaFld, "AREA"]],"", "SQUARE_KILOMETERS")
         
         # Build the final output table.
         AddMsg(f"{timer.now()} Creating output table: {basename(outTable)}", 0, logFile)
-        log.logArcpy("arcpy.conversion.ExportTable",(inReportingUnitFeature,outTable),logFile)
-        arcpy.conversion.ExportTable(inReportingUnitFeature,outTable)
+        with log.logArcpy("arcpy.conversion.ExportTable",(inReportingUnitFeature,outTable),logFile):
+            arcpy.conversion.ExportTable(inReportingUnitFeature,outTable)
         
         AddMsg(f"{timer.now()} Calculating population density", 0, logFile)
         # Create an index value to keep track of intermediate outputs and fieldnames.
@@ -2265,13 +2322,13 @@ def runPopulationInFloodplainMetrics(toolPath, inReportingUnitFeature, reporting
             
             # calculate the population for the reporting unit using zonal statistics as table
             AddMsg(f"{timer.now()} Calculating population within each reporting unit. Intermediate: {basename(popTable_RU)}", 0, logFile)
-            log.logArcpy("arcpy.sa.ZonalStatisticsAsTable",(inReportingUnitFeature,reportingUnitIdField,inCensusDataset,popTable_RU,"DATA","SUM"), logFile)
-            arcpy.sa.ZonalStatisticsAsTable(inReportingUnitFeature, reportingUnitIdField, inCensusDataset, popTable_RU, "DATA", "SUM")
+            with log.logArcpy("arcpy.sa.ZonalStatisticsAsTable",(inReportingUnitFeature,reportingUnitIdField,inCensusDataset,popTable_RU,"DATA","SUM"), logFile):
+                arcpy.sa.ZonalStatisticsAsTable(inReportingUnitFeature, reportingUnitIdField, inCensusDataset, popTable_RU, "DATA", "SUM")
             
             # Rename the population count field.
             outPopField = metricConst.populationCountFieldNames[index]
-            log.logArcpy("arcpy.AlterField_management", (popTable_RU, "SUM", outPopField, outPopField), logFile)
-            arcpy.AlterField_management(popTable_RU, "SUM", outPopField, outPopField)
+            with log.logArcpy("arcpy.AlterField_management", (popTable_RU, "SUM", outPopField, outPopField), logFile):
+                arcpy.AlterField_management(popTable_RU, "SUM", outPopField, outPopField)
             
             # Set variables for the floodplain population calculations
             index = 1
@@ -2284,8 +2341,8 @@ def runPopulationInFloodplainMetrics(toolPath, inReportingUnitFeature, reporting
                 AddMsg(f"{timer.now()} Setting floodplain areas to population values.", 0, logFile)
                 delimitedVALUE = arcpy.AddFieldDelimiters(inFloodplainDataset,"VALUE")
                 whereClause = delimitedVALUE+" = 0"
-                log.logArcpy("arcpy.sa.SetNull",(inFloodplainDataset, inCensusDataset, whereClause),logFile)
-                inCensusDataset = arcpy.sa.SetNull(inFloodplainDataset, inCensusDataset, whereClause)
+                with log.logArcpy("arcpy.sa.SetNull",(inFloodplainDataset, inCensusDataset, whereClause),logFile):
+                    inCensusDataset = arcpy.sa.SetNull(inFloodplainDataset, inCensusDataset, whereClause)
                 
                 if globalConstants.intermediateName in processed:
                     namePrefix = metricConst.floodplainPopName
@@ -2300,20 +2357,20 @@ def runPopulationInFloodplainMetrics(toolPath, inReportingUnitFeature, reporting
                 tempName = f"{metricConst.shortName}_{fileNameBase}_Identity_"
                 tempPolygonFeature = files.nameIntermediateFile([tempName,"FeatureClass"],cleanupList)
                 AddMsg(f"{timer.now()} Assigning reporting unit IDs to intersecting floodplain features. Intermediate: {basename(tempPolygonFeature)}", 0, logFile)
-                log.logArcpy("arcpy.Identity_analysis", (inFloodplainDataset, inReportingUnitFeature, tempPolygonFeature), logFile)
-                arcpy.Identity_analysis(inFloodplainDataset, inReportingUnitFeature, tempPolygonFeature)
+                with log.logArcpy("arcpy.Identity_analysis", (inFloodplainDataset, inReportingUnitFeature, tempPolygonFeature), logFile):
+                    arcpy.Identity_analysis(inFloodplainDataset, inReportingUnitFeature, tempPolygonFeature)
                 inReportingUnitFeature = tempPolygonFeature
             
             AddMsg(f"{timer.now()} Calculating population within floodplain areas for each reporting unit. Intermediate: {basename(popTable_FP)}", 0, logFile)
             # calculate the population for the reporting unit using zonal statistics as table
             # The snap raster, and cell size have been set to match the census raster
-            log.logArcpy("arcpy.sa.ZonalStatisticsAsTable",(inReportingUnitFeature,reportingUnitIdField,inCensusDataset,popTable_FP,"DATA","SUM"), logFile)
-            arcpy.sa.ZonalStatisticsAsTable(inReportingUnitFeature, reportingUnitIdField, inCensusDataset, popTable_FP, "DATA", "SUM")
+            with log.logArcpy("arcpy.sa.ZonalStatisticsAsTable",(inReportingUnitFeature,reportingUnitIdField,inCensusDataset,popTable_FP,"DATA","SUM"), logFile):
+                arcpy.sa.ZonalStatisticsAsTable(inReportingUnitFeature, reportingUnitIdField, inCensusDataset, popTable_FP, "DATA", "SUM")
             
             # Rename the population count field.
             outPopField = metricConst.populationCountFieldNames[index]
-            log.logArcpy("arcpy.AlterField_management",(popTable_FP, "SUM", outPopField, outPopField),logFile)
-            arcpy.AlterField_management(popTable_FP, "SUM", outPopField, outPopField)
+            with log.logArcpy("arcpy.AlterField_management",(popTable_FP, "SUM", outPopField, outPopField),logFile):
+                arcpy.AlterField_management(popTable_FP, "SUM", outPopField, outPopField)
 
         else: # census features are polygons
             
@@ -2325,16 +2382,16 @@ def runPopulationInFloodplainMetrics(toolPath, inReportingUnitFeature, reporting
             tempName = f"{metricConst.shortName}_{descCensus.baseName}_Work_"
             tempCensusFeature = files.nameIntermediateFile([tempName,"FeatureClass"],cleanupList)
             AddMsg(f"{timer.now()} Creating a working copy of {basename(inCensusDataset)}. Intermediate: {basename(tempCensusFeature)}", 0, logFile)
-            log.logArcpy("arcpy.FeatureClassToFeatureClass_conversion",(inCensusDataset,env.workspace,basename(tempCensusFeature),"",fieldMappings),logFile)
-            inCensusDataset = arcpy.FeatureClassToFeatureClass_conversion(inCensusDataset,env.workspace,basename(tempCensusFeature),"",fieldMappings)
+            with log.logArcpy("arcpy.FeatureClassToFeatureClass_conversion",(inCensusDataset,env.workspace,basename(tempCensusFeature),"",fieldMappings),logFile):
+                inCensusDataset = arcpy.FeatureClassToFeatureClass_conversion(inCensusDataset,env.workspace,basename(tempCensusFeature),"",fieldMappings)
             
             # Add a dummy field to the copied census feature class and calculate it to a value of 1.
             classField = "tmpClass"
-            log.logArcpy("arcpy.AddField_management",(inCensusDataset,classField,"SHORT"),logFile)
-            arcpy.AddField_management(inCensusDataset,classField,"SHORT")
+            with log.logArcpy("arcpy.AddField_management",(inCensusDataset,classField,"SHORT"),logFile):
+                arcpy.AddField_management(inCensusDataset,classField,"SHORT")
             
-            log.logArcpy("arcpy.CalculateField_management",(inCensusDataset,classField,1),logFile)
-            arcpy.CalculateField_management(inCensusDataset,classField,1)
+            with log.logArcpy("arcpy.CalculateField_management",(inCensusDataset,classField,1),logFile):
+                arcpy.CalculateField_management(inCensusDataset,classField,1)
             
             # Perform population count calculation for the reporting unit
             AddMsg(f"{timer.now()} Calculating population within reporting units. Intermediate: {basename(popTable_RU)}", 0, logFile)
@@ -2350,8 +2407,8 @@ def runPopulationInFloodplainMetrics(toolPath, inReportingUnitFeature, reporting
                 # Convert the Raster floodplain to Polygon
                 delimitedVALUE = arcpy.AddFieldDelimiters(inFloodplainDataset,"VALUE")
                 whereClause = f"{delimitedVALUE} = 0"
-                log.logArcpy("arcpy.sa.SetNull",(inFloodplainDataset, 1, whereClause),logFile)
-                nullGrid = arcpy.sa.SetNull(inFloodplainDataset, 1, whereClause)
+                with log.logArcpy("arcpy.sa.SetNull",(inFloodplainDataset, 1, whereClause),logFile):
+                    nullGrid = arcpy.sa.SetNull(inFloodplainDataset, 1, whereClause)
                 
                 tempName = f"{metricConst.shortName}_{descFldpln.baseName}_Poly_"
                 tempPolygonFeature = files.nameIntermediateFile([tempName,"FeatureClass"],cleanupList)
@@ -2360,13 +2417,13 @@ def runPopulationInFloodplainMetrics(toolPath, inReportingUnitFeature, reporting
                 # This may fail if a polgyon created is too large. Need a routine to more elegantly reduce the maxVertices in any one polygon
                 maxVertices = 250000
                 try:
-                    log.logArcpy("arcpy.RasterToPolygon_conversion",(nullGrid,tempPolygonFeature,"NO_SIMPLIFY","VALUE","",maxVertices),logFile)
-                    inFloodplainDataset = arcpy.RasterToPolygon_conversion(nullGrid,tempPolygonFeature,"NO_SIMPLIFY","VALUE","",maxVertices)
+                    with log.logArcpy("arcpy.RasterToPolygon_conversion",(nullGrid,tempPolygonFeature,"NO_SIMPLIFY","VALUE","",maxVertices),logFile):
+                        inFloodplainDataset = arcpy.RasterToPolygon_conversion(nullGrid,tempPolygonFeature,"NO_SIMPLIFY","VALUE","",maxVertices)
                 except:
                     AddMsg(f"{timer.now()} Converting raster to polygon with maximum vertices technique", 0, logFile)
                     maxVertices = maxVertices / 2
-                    log.logArcpy("arcpy.RasterToPolygon_conversion",(nullGrid,tempPolygonFeature,"NO_SIMPLIFY","VALUE","",maxVertices), logFile)
-                    inFloodplainDataset = arcpy.RasterToPolygon_conversion(nullGrid,tempPolygonFeature,"NO_SIMPLIFY","VALUE","",maxVertices)
+                    with log.logArcpy("arcpy.RasterToPolygon_conversion",(nullGrid,tempPolygonFeature,"NO_SIMPLIFY","VALUE","",maxVertices), logFile):
+                        inFloodplainDataset = arcpy.RasterToPolygon_conversion(nullGrid,tempPolygonFeature,"NO_SIMPLIFY","VALUE","",maxVertices)
                 
             else: # floodplain input is a polygon dataset
                 # Create a copy of the floodplain feature class that we can add new fields to for calculations.
@@ -2378,16 +2435,16 @@ def runPopulationInFloodplainMetrics(toolPath, inReportingUnitFeature, reporting
                 tempName = f"{metricConst.shortName}_{descFldpln.baseName}_Work_"
                 tempFldplnFeature = files.nameIntermediateFile([tempName,"FeatureClass"],cleanupList)
                 AddMsg(f"{timer.now()} Creating a working copy of {basename(inFloodplainDataset)}. Intermediate: {basename(tempFldplnFeature)}", 0, logFile)
-                log.logArcpy("arcpy.FeatureClassToFeatureClass_conversion",(inFloodplainDataset,env.workspace,basename(tempFldplnFeature),"",fieldMappings),logFile)
-                inFloodplainDataset = arcpy.FeatureClassToFeatureClass_conversion(inFloodplainDataset,env.workspace, basename(tempFldplnFeature),"", fieldMappings)
+                with log.logArcpy("arcpy.FeatureClassToFeatureClass_conversion",(inFloodplainDataset,env.workspace,basename(tempFldplnFeature),"",fieldMappings),logFile):
+                    inFloodplainDataset = arcpy.FeatureClassToFeatureClass_conversion(inFloodplainDataset,env.workspace, basename(tempFldplnFeature),"", fieldMappings)
                 
             # Add a field and calculate it to a value of 1. This field will use as the classField in Tabulate Intersection operation below
             classField = "tmpClass"
-            log.logArcpy("arcpy.AddField_management",(inFloodplainDataset,classField,"SHORT"),logFile)
-            arcpy.AddField_management(inFloodplainDataset,classField,"SHORT")
+            with log.logArcpy("arcpy.AddField_management",(inFloodplainDataset,classField,"SHORT"),logFile):
+                arcpy.AddField_management(inFloodplainDataset,classField,"SHORT")
             
-            log.logArcpy("arcpy.CalculateField_management",(inFloodplainDataset,classField,1),logFile)
-            arcpy.CalculateField_management(inFloodplainDataset,classField,1)
+            with log.logArcpy("arcpy.CalculateField_management",(inFloodplainDataset,classField,1),logFile):
+                arcpy.CalculateField_management(inFloodplainDataset,classField,1)
 
             # intersect the floodplain polygons with the reporting unit polygons
             fileNameBase = descFldpln.baseName
@@ -2396,8 +2453,8 @@ def runPopulationInFloodplainMetrics(toolPath, inReportingUnitFeature, reporting
             tempName = f"{metricConst.shortName}_{fileNameBase}_Identity_"
             tempPolygonFeature = files.nameIntermediateFile([tempName,"FeatureClass"],cleanupList)
             AddMsg(f"{timer.now()} Assigning reporting unit IDs to floodplain features. Intermediate: {basename(tempPolygonFeature)}", 0, logFile)
-            log.logArcpy("arcpy.Identity_analysis",(inFloodplainDataset, inReportingUnitFeature, tempPolygonFeature),logFile)
-            arcpy.Identity_analysis(inFloodplainDataset, inReportingUnitFeature, tempPolygonFeature)
+            with log.logArcpy("arcpy.Identity_analysis",(inFloodplainDataset, inReportingUnitFeature, tempPolygonFeature),logFile):
+                arcpy.Identity_analysis(inFloodplainDataset, inReportingUnitFeature, tempPolygonFeature)
     
             AddMsg(f"{timer.now()} Calculating population within floodplain areas for each reporting unit. Intermediate: {basename(popTable_FP)}", 0, logFile)
             # Perform population count calculation for second feature class area
@@ -2414,8 +2471,8 @@ def runPopulationInFloodplainMetrics(toolPath, inReportingUnitFeature, reporting
         fieldMappings.addTable(popTable_RU)
         [fieldMappings.removeFieldMap(fieldMappings.findFieldMapIndex(aFld.name)) for aFld in fieldMappings.fields if aFld.name not in keepFields]
 
-        log.logArcpy("arcpy.TableToTable_conversion",(popTable_RU,os.path.dirname(outTable), basename(outTable), "", fieldMappings), logFile)
-        arcpy.TableToTable_conversion(popTable_RU,os.path.dirname(outTable), basename(outTable), "", fieldMappings)
+        with log.logArcpy("arcpy.TableToTable_conversion",(popTable_RU,os.path.dirname(outTable), basename(outTable), "", fieldMappings), logFile):
+            arcpy.TableToTable_conversion(popTable_RU,os.path.dirname(outTable), basename(outTable), "", fieldMappings)
         
         # Compile a list of fields that will be transferred from the floodplain population table into the output table
         fromFields = [popCntFields[index]]
@@ -2599,7 +2656,8 @@ def runPopulationLandCoverViews(toolPath, inReportingUnitFeature, reportingUnitI
             # process the inLandCoverGrid for the selected class
             AddMsg(f"{timer.now()} Determining population with minimal views of Class:{m.upper()}.", 0, logFile) 
             viewGrid = raster.getPatchViewGrid(m, classValuesList, excludedValuesList, inLandCoverGrid, landCoverValues, 
-                                          viewRadius, conValues, minPatchSize, timer, saveIntermediates, metricConst, logFile)
+                                          viewRadius, conValues, minPatchSize, timer, saveIntermediates, metricConst, logFile,
+                                          cleanupList)
   
             
             if viewGrid.maximum == None:
@@ -2618,11 +2676,11 @@ def runPopulationLandCoverViews(toolPath, inReportingUnitFeature, reportingUnitI
                 # add a CATEGORY field for raster labels; make it large enough to hold your longest category label.
                 AddMsg(f"{timer.now()} Adding CATEGORY field for raster labels.", 0, logFile)
                 if not viewGrid.hasRAT:
-                    log.logArcpy("arcpy.BuildRasterAttributeTable_management",(viewGrid, "Overwrite"),logFile)
-                    arcpy.BuildRasterAttributeTable_management(viewGrid, "Overwrite")
+                    with log.logArcpy("arcpy.BuildRasterAttributeTable_management",(viewGrid, "Overwrite"),logFile):
+                        arcpy.BuildRasterAttributeTable_management(viewGrid, "Overwrite")
                 
-                log.logArcpy("arcpy.AddField_management",(viewGrid, "CATEGORY", "TEXT", "#", "#", "20"),logFile)
-                arcpy.AddField_management(viewGrid, "CATEGORY", "TEXT", "#", "#", "20")
+                with log.logArcpy("arcpy.AddField_management",(viewGrid, "CATEGORY", "TEXT", "#", "#", "20"),logFile):
+                    arcpy.AddField_management(viewGrid, "CATEGORY", "TEXT", "#", "#", "20")
                 
                 # The categoryDict should be in the format {integer1 : "category1 string", integer2: "category2 string", etc}
                 categoryDict = {1: "Potential View Area"}
@@ -2637,17 +2695,17 @@ def runPopulationLandCoverViews(toolPath, inReportingUnitFeature, reportingUnitI
             
             # Check if viewPolygon is the same projection as the census raster, if not project it
             if transformMethod != "":
-                log.logArcpy("arcpy.conversion.RasterToPolygon",(viewGrid,"tempPoly","NO_SIMPLIFY","Value","SINGLE_OUTER_PART",None),logFile)
-                tmpRasterPolygon = arcpy.conversion.RasterToPolygon(viewGrid,"tempPoly","NO_SIMPLIFY","Value","SINGLE_OUTER_PART",None)
+                with log.logArcpy("arcpy.conversion.RasterToPolygon",(viewGrid,"tempPoly","NO_SIMPLIFY","Value","SINGLE_OUTER_PART",None),logFile):
+                    tmpRasterPolygon = arcpy.conversion.RasterToPolygon(viewGrid,"tempPoly","NO_SIMPLIFY","Value","SINGLE_OUTER_PART",None)
                 
-                log.logArcpy("arcpy.Project_management",("tempPoly",viewPolygonFeature,spatialCensus,transformMethod),logFile)
-                arcpy.Project_management("tempPoly",viewPolygonFeature,spatialCensus,transformMethod)
+                with log.logArcpy("arcpy.Project_management",("tempPoly",viewPolygonFeature,spatialCensus,transformMethod),logFile):
+                    arcpy.Project_management("tempPoly",viewPolygonFeature,spatialCensus,transformMethod)
                 
-                log.logArcpy("arcpy.Delete_management",(tmpRasterPolygon,),logFile)
-                arcpy.Delete_management(tmpRasterPolygon)
+                with log.logArcpy("arcpy.Delete_management",(tmpRasterPolygon,),logFile):
+                    arcpy.Delete_management(tmpRasterPolygon)
             else:
-                log.logArcpy("arcpy.conversion.RasterToPolygon",(viewGrid,viewPolygonFeature,"NO_SIMPLIFY","Value","SINGLE_OUTER_PART",None),logFile)
-                arcpy.conversion.RasterToPolygon(viewGrid,viewPolygonFeature,"NO_SIMPLIFY","Value","SINGLE_OUTER_PART",None)
+                with log.logArcpy("arcpy.conversion.RasterToPolygon",(viewGrid,viewPolygonFeature,"NO_SIMPLIFY","Value","SINGLE_OUTER_PART",None),logFile):
+                    arcpy.conversion.RasterToPolygon(viewGrid,viewPolygonFeature,"NO_SIMPLIFY","Value","SINGLE_OUTER_PART",None)
             
             # Save the current environment settings, then set to match the census raster 
             tempEnvironment0 = env.snapRaster
@@ -2658,8 +2716,8 @@ def runPopulationLandCoverViews(toolPath, inReportingUnitFeature, reportingUnitI
             
             # Extract Census pixels which are in the view area
             AddMsg(f"{timer.now()} Extracting population pixels within the potential view area.", 0, logFile) 
-            log.logArcpy("arcpy.sa.ExtractByMask",(inCensusRaster, viewPolygonFeature), logFile)
-            viewPopGrid = arcpy.sa.ExtractByMask(inCensusRaster, viewPolygonFeature)
+            with log.logArcpy("arcpy.sa.ExtractByMask",(inCensusRaster, viewPolygonFeature), logFile):
+                viewPopGrid = arcpy.sa.ExtractByMask(inCensusRaster, viewPolygonFeature)
             
             # save the intermediate raster if save intermediates option has been chosen 
             if saveIntermediates:
@@ -2672,8 +2730,8 @@ def runPopulationLandCoverViews(toolPath, inReportingUnitFeature, reportingUnitI
             namePrefix = f"{metricConst.shortName}_{m.upper()}{metricConst.areaValueCountTableName}_"
             areaPopTable = files.nameIntermediateFile([namePrefix + "","Dataset"],cleanupList)
             AddMsg(f"{timer.now()} Calculating population within minimal-view areas for each reporting unit. Intermediate: {basename(areaPopTable)}", 0, logFile)
-            log.logArcpy("arcpy.sa.ZonalStatisticsAsTable",(inReportingUnitFeature,reportingUnitIdField,viewPopGrid,areaPopTable,"DATA","SUM"),logFile)
-            arcpy.sa.ZonalStatisticsAsTable(inReportingUnitFeature,reportingUnitIdField,viewPopGrid,areaPopTable,"DATA","SUM")
+            with log.logArcpy("arcpy.sa.ZonalStatisticsAsTable",(inReportingUnitFeature,reportingUnitIdField,viewPopGrid,areaPopTable,"DATA","SUM"),logFile):
+                arcpy.sa.ZonalStatisticsAsTable(inReportingUnitFeature,reportingUnitIdField,viewPopGrid,areaPopTable,"DATA","SUM")
             
             # reset the environments
             AddMsg("{0} Restoring snap raster geoprocessing environmental parameter to {1}".format(timer.now(), os.path.basename(tempEnvironment0)), 0, logFile)
@@ -2712,8 +2770,8 @@ def runPopulationLandCoverViews(toolPath, inReportingUnitFeature, reportingUnitI
            
             # delete temporary features
             if arcpy.Exists("tempPoly"):
-                log.logArcpy("arcpy.Delete_management",(tmpRasterPolygon,), logFile)
-                arcpy.Delete_management(tmpRasterPolygon)
+                with log.logArcpy("arcpy.Delete_management",(tmpRasterPolygon,), logFile):
+                    arcpy.Delete_management(tmpRasterPolygon)
                 
             AddMsg(f"{timer.now()} Calculation complete for Class:{m.upper()}", 0, logFile)
             
@@ -2787,16 +2845,16 @@ def runFacilityLandCoverViews(toolPath, inReportingUnitFeature, reportingUnitIdF
                     self.namePrefix = self.metricConst.shortName + "_FacDissolve"+self.inBufferDistance.split()[0]+"_"
                     self.dissolveName = utils.files.nameIntermediateFile([self.namePrefix,"FeatureClass"], flcvCalc.cleanupList)
                     AddMsg(f"{self.timer.now()} Duplicate ID values found in reporting unit feature. Forming multipart features. Intermediate: {basename(self.dissolveName)}", 0, self.logFile)
-                    log.logArcpy("arcpy.Dissolve_management",(self.inReportingUnitFeature,self.dissolveName,self.reportingUnitIdField,"","MULTI_PART"),logFile)
-                    self.inReportingUnitFeature = arcpy.Dissolve_management(self.inReportingUnitFeature, self.dissolveName,self.reportingUnitIdField,"","MULTI_PART")
+                    with log.logArcpy("arcpy.Dissolve_management",(self.inReportingUnitFeature,self.dissolveName,self.reportingUnitIdField,"","MULTI_PART"),logFile):
+                        self.inReportingUnitFeature = arcpy.Dissolve_management(self.inReportingUnitFeature, self.dissolveName,self.reportingUnitIdField,"","MULTI_PART")
 
                 # Make a temporary facility point layer so that a field of the same name as reportingUnitIdField could be deleted
                 # Get a unique name with full path for the output features - will default to current workspace:
                 self.namePrefix = self.metricConst.facilityCopyName+self.viewRadius.split()[0]+"_"
                 self.inPointFacilityName = utils.files.nameIntermediateFile([self.namePrefix,"FeatureClass"], flcvCalc.cleanupList)
                 AddMsg(f"{self.timer.now()} Creating a copy of the Facility feature. Intermediate: {basename(self.inPointFacilityName)}", 0, self.logFile)
-                log.logArcpy("arcpy.FeatureClassToFeatureClass_conversion",(self.inFacilityFeature,arcpy.env.workspace,basename(self.inPointFacilityName)),logFile)
-                self.inPointFacilityFeature = arcpy.FeatureClassToFeatureClass_conversion(self.inFacilityFeature,arcpy.env.workspace, basename(self.inPointFacilityName))
+                with log.logArcpy("arcpy.FeatureClassToFeatureClass_conversion",(self.inFacilityFeature,arcpy.env.workspace,basename(self.inPointFacilityName)),logFile):
+                    self.inPointFacilityFeature = arcpy.FeatureClassToFeatureClass_conversion(self.inFacilityFeature,arcpy.env.workspace, basename(self.inPointFacilityName))
 
                 # Delete all fields from the copied facilities feature
                 AddMsg(f"{self.timer.now()} Deleting unnecessary fields from {basename(self.inPointFacilityName)}", 0, self.logFile)
@@ -2812,16 +2870,16 @@ def runFacilityLandCoverViews(toolPath, inReportingUnitFeature, reportingUnitIdF
                 self.namePrefix = self.metricConst.facilityWithRUIDName+self.viewRadius.split()[0]+"_"
                 self.intersectResultName = utils.files.nameIntermediateFile([self.namePrefix,"FeatureClass"], flcvCalc.cleanupList)
                 AddMsg(f"{self.timer.now()} Assigning reporting unit ID to {basename(self.inPointFacilityName)}. Intermediate: {basename(self.intersectResultName)}", 0, self.logFile)
-                log.logArcpy("arcpy.Intersect_analysis",([self.inPointFacilityFeature,self.inReportingUnitFeature],self.intersectResultName,"NO_FID","","POINT"),logFile)
-                self.intersectResult = arcpy.Intersect_analysis([self.inPointFacilityFeature,self.inReportingUnitFeature],self.intersectResultName,"NO_FID","","POINT")
+                with log.logArcpy("arcpy.Intersect_analysis",([self.inPointFacilityFeature,self.inReportingUnitFeature],self.intersectResultName,"NO_FID","","POINT"),logFile):
+                    self.intersectResult = arcpy.Intersect_analysis([self.inPointFacilityFeature,self.inReportingUnitFeature],self.intersectResultName,"NO_FID","","POINT")
 
                 # Buffer the facility features with the reporting unit IDs to desired distance
                 # Get a unique name with full path for the output features - will default to current workspace:
                 self.namePrefix = self.metricConst.viewBufferName+self.viewRadius.split()[0]+"_"
                 self.bufferResultName = utils.files.nameIntermediateFile([self.namePrefix,"FeatureClass"], flcvCalc.cleanupList)
                 AddMsg(f"{self.timer.now()} Buffering {basename(self.intersectResultName)} to {viewRadius}. Intermediate: {basename(self.bufferResultName)}", 0, self.logFile)
-                log.logArcpy("arcpy.Buffer_analysis",(self.intersectResult,self.bufferResultName,viewRadius,"","","NONE","", "PLANAR"), logFile)
-                self.bufferResult = arcpy.Buffer_analysis(self.intersectResult,self.bufferResultName,viewRadius,"","","NONE","", "PLANAR")
+                with log.logArcpy("arcpy.Buffer_analysis",(self.intersectResult,self.bufferResultName,viewRadius,"","","NONE","", "PLANAR"), logFile):
+                    self.bufferResult = arcpy.Buffer_analysis(self.intersectResult,self.bufferResultName,viewRadius,"","","NONE","", "PLANAR")
 
                 self.inReportingUnitFeature = self.bufferResult
                 
@@ -2871,8 +2929,8 @@ def runFacilityLandCoverViews(toolPath, inReportingUnitFeature, reportingUnitIdF
                 
                 # Add an additional field for the facility counts within each reporting unit. Used AddFields so that the 
                 # field properties could be defined and retrieved from the metric constants. 
-                log.logArcpy("arcpy.management.AddFields",(self.newTable, self.metricConst.singleFields),logFile)
-                arcpy.management.AddFields(self.newTable, self.metricConst.singleFields)
+                with log.logArcpy("arcpy.management.AddFields",(self.newTable, self.metricConst.singleFields),logFile):
+                    arcpy.management.AddFields(self.newTable, self.metricConst.singleFields)
 
 
             def _makeTabAreaTable(self):
@@ -2959,6 +3017,8 @@ def runNeighborhoodProportions(toolPath, inLandCoverGrid, _lccName, lccFilePath,
     from arcpy import env
     from arcpy.sa import Reclassify,RegionGroup,RemapValue,RemapRange
 
+    cleanupList = [] # This is an empty list object that will contain tuples of the form (function, arguments) as needed for cleanup
+    focalGrids = {} # (class, neighborhood size): running sum grids of the NumPy focal backend
     try:
         # retrieve the attribute constants associated with this metric
         metricConst = metricConstants.npConstants()
@@ -3003,6 +3063,10 @@ def runNeighborhoodProportions(toolPath, inLandCoverGrid, _lccName, lccFilePath,
         
         # Determine if the user wants to save the intermediate products
         saveIntermediates = globalConstants.intermediateName in optionalGroupsList
+        if saveIntermediates:
+            cleanupList.append("KeepIntermediates")  # add this string as the first item in the cleanupList to prevent cleanups
+        else:
+            cleanupList.append((arcpy.AddMessage,("Cleaning up intermediate datasets",)))
         
         # determine the active map to add the output raster/features    
         try:
@@ -3047,18 +3111,18 @@ def runNeighborhoodProportions(toolPath, inLandCoverGrid, _lccName, lccFilePath,
                     reclassPairs = raster.getInOutOtherReclassPairs(landCoverValues, classValuesList, excludedValuesList, newValuesList)
             
                     AddMsg(f"{timer.now()} Reclassifying excluded values in land cover to 1. All other values = 0.", 0, logFile)
-                    log.logArcpy("arcpy.sa.Reclassify",(inLandCoverGrid,"VALUE", RemapValue(reclassPairs)),logFile)
-                    excludedBinary = arcpy.sa.Reclassify(inLandCoverGrid,"VALUE", RemapValue(reclassPairs))
+                    with log.logArcpy("arcpy.sa.Reclassify",(inLandCoverGrid,"VALUE", RemapValue(reclassPairs)),logFile):
+                        excludedBinary = arcpy.sa.Reclassify(inLandCoverGrid,"VALUE", RemapValue(reclassPairs))
 
                     AddMsg(f"{timer.now()} Calculating size of excluded area patches.", 0, logFile)
-                    log.logArcpy("arcpy.sa.RegionGroup",(excludedBinary,"EIGHT","WITHIN","ADD_LINK"), logFile)
-                    regionGrid = arcpy.sa.RegionGroup(excludedBinary,"EIGHT","WITHIN","ADD_LINK")
+                    with log.logArcpy("arcpy.sa.RegionGroup",(excludedBinary,"EIGHT","WITHIN","ADD_LINK"), logFile):
+                        regionGrid = arcpy.sa.RegionGroup(excludedBinary,"EIGHT","WITHIN","ADD_LINK")
                 
                     AddMsg(f"{timer.now()} Assigning {burnInValue} to excluded area patches >= {minPatchSize} cells in size.", 0, logFile)
                     delimitedCOUNT = arcpy.AddFieldDelimiters(regionGrid,"COUNT")
                     whereClause = delimitedCOUNT+" >= " + minPatchSize + " AND LINK = 1"
-                    log.logArcpy("arcpy.sa.Con", (regionGrid, int(burnInValue), 0, whereClause), logFile)
-                    burnInGrid = arcpy.sa.Con(regionGrid, int(burnInValue), 0, whereClause)
+                    with log.logArcpy("arcpy.sa.Con", (regionGrid, int(burnInValue), 0, whereClause), logFile):
+                        burnInGrid = arcpy.sa.Con(regionGrid, int(burnInValue), 0, whereClause)
                 else:
                     # create class (value = 0) / other (value = 0) / excluded grid (value = burnInValue) raster
                     # define the reclass values
@@ -3085,6 +3149,13 @@ def runNeighborhoodProportions(toolPath, inLandCoverGrid, _lccName, lccFilePath,
                     burnInGrid.save(scratchName)
                     AddMsg(f"{timer.now()} Save intermediate grid complete: {basename(scratchName)}")
 
+        if globalConstants.focalBackend == globalConstants.numpyBackendName:
+            # count the cells of every class in the neighborhood of each cell with one read of the land cover grid
+            AddMsg(f"{timer.now()} Calculating the proportion of each selected land cover class within {inNeighborhoodSize} x {inNeighborhoodSize} cell neighborhoods.", 0, logFile)
+            classValuesDict = dict((m, lccClassesDict[m].uniqueValueIds.intersection(landCoverValues)) for m in metricsBaseNameList)
+            focalGrids = raster.getFocalProportionGrids(inLandCoverGrid, classValuesDict, [int(inNeighborhoodSize)], 
+                                                        globalConstants.numpyBlockSize, saveIntermediates)
+
         # Run metric calculate for each metric in list
         for m in metricsBaseNameList:
             # get the grid codes for this specified metric
@@ -3094,29 +3165,35 @@ def runNeighborhoodProportions(toolPath, inLandCoverGrid, _lccName, lccFilePath,
             AddMsg(f"{timer.now()} Processing neighborhood proportions grid for {m.upper()}.", 0, logFile)
             
             maxCellCount = pow(int(inNeighborhoodSize), 2)
-                 
-            # create class (value = 1) / other (value = 0) / excluded grid (value = 0) raster
-            # define the reclass values
-            classValue = 1
-            excludedValue = 0
-            otherValue = 0
-            newValuesList = [classValue, excludedValue, otherValue]
-            
-            # generate a reclass list where each item in the list is a two item list: the original grid value, and the reclass value
-            reclassPairs = raster.getInOutOtherReclassPairs(landCoverValues, classValuesList, excludedValuesList, newValuesList)
+            
+            if focalGrids:
+                percentGrid, nbrCntSumGrid = focalGrids[(m, int(inNeighborhoodSize))]
+                scratchName = files.nameIntermediateFile([f"{metricConst.shortName}_{m.upper()}_Prop_", "RasterDataset"], cleanupList)
+                raster.saveSumGrid(percentGrid, scratchName, globalConstants.sumGridTileSize, cleanupList, logFile)
+                proximityGrid = Raster(scratchName)
+            else:
+                # create class (value = 1) / other (value = 0) / excluded grid (value = 0) raster
+                # define the reclass values
+                classValue = 1
+                excludedValue = 0
+                otherValue = 0
+                newValuesList = [classValue, excludedValue, otherValue]
+            
+                # generate a reclass list where each item in the list is a two item list: the original grid value, and the reclass value
+                reclassPairs = raster.getInOutOtherReclassPairs(landCoverValues, classValuesList, excludedValuesList, newValuesList)
               
-            AddMsg(f"{timer.now()} Reclassifying selected {m.upper()} land cover class to 1. All other values = 0.", 0, logFile)
-            log.logArcpy("arcpy.sa.Reclassify",(inLandCoverGrid,"VALUE", RemapValue(reclassPairs)), logFile)
-            reclassGrid = arcpy.sa.Reclassify(inLandCoverGrid,"VALUE", RemapValue(reclassPairs))
-            
-            AddMsg(f"{timer.now()} Performing focal SUM on reclassified raster using {inNeighborhoodSize} x {inNeighborhoodSize} cell neighborhood.", 0, logFile)
-            neighborhood = arcpy.sa.NbrRectangle(int(inNeighborhoodSize), int(inNeighborhoodSize), "CELL")
-            log.logArcpy("arcpy.sa.FocalStatistics", (f'reclassGrid == {classValue}', neighborhood, "SUM", "NODATA"), logFile)
-            nbrCntGrid = arcpy.sa.FocalStatistics(reclassGrid == classValue, neighborhood, "SUM", "NODATA")
+                AddMsg(f"{timer.now()} Reclassifying selected {m.upper()} land cover class to 1. All other values = 0.", 0, logFile)
+                with log.logArcpy("arcpy.sa.Reclassify",(inLandCoverGrid,"VALUE", RemapValue(reclassPairs)), logFile):
+                    reclassGrid = arcpy.sa.Reclassify(inLandCoverGrid,"VALUE", RemapValue(reclassPairs))
+            
+                AddMsg(f"{timer.now()} Performing focal SUM on reclassified raster using {inNeighborhoodSize} x {inNeighborhoodSize} cell neighborhood.", 0, logFile)
+                neighborhood = arcpy.sa.NbrRectangle(int(inNeighborhoodSize), int(inNeighborhoodSize), "CELL")
+                with log.logArcpy("arcpy.sa.FocalStatistics", (f'reclassGrid == {classValue}', neighborhood, "SUM", "NODATA"), logFile):
+                    nbrCntGrid = arcpy.sa.FocalStatistics(reclassGrid == classValue, neighborhood, "SUM", "NODATA")
                 
-            AddMsg(f"{timer.now()} Calculating the proportion of land cover class within {inNeighborhoodSize} x {inNeighborhoodSize} cell neighborhood.", 0, logFile)
-            log.logArcpy("arcpy.sa.RasterCalculator",("[nbrCntGrid]", ["x"], (f' (x / {maxCellCount}) * 100') ), logFile)
-            proximityGrid = arcpy.sa.RasterCalculator([nbrCntGrid], ["x"], (f' (x / {maxCellCount}) * 100') )
+                AddMsg(f"{timer.now()} Calculating the proportion of land cover class within {inNeighborhoodSize} x {inNeighborhoodSize} cell neighborhood.", 0, logFile)
+                with log.logArcpy("arcpy.sa.RasterCalculator",("[nbrCntGrid]", ["x"], (f' (x / {maxCellCount}) * 100') ), logFile):
+                    proximityGrid = arcpy.sa.RasterCalculator([nbrCntGrid], ["x"], (f' (x / {maxCellCount}) * 100') )
             
             # get output grid name
             namePrefix = f"{m.upper()}_{inNeighborhoodSize}{metricConst.proxRasterOutName}"
@@ -3128,8 +3205,8 @@ def runNeighborhoodProportions(toolPath, inLandCoverGrid, _lccName, lccFilePath,
                 AddMsg(f"{timer.now()} Burning excluded areas into proportions grid.", 0, logFile)
                 delimitedVALUE = arcpy.AddFieldDelimiters(burnInGrid,"VALUE")
                 whereClause = delimitedVALUE+" = 0"
-                log.logArcpy("arcpy.sa.Con",(burnInGrid, proximityGridName, burnInGrid, whereClause), logFile)
-                proximityGrid = arcpy.sa.Con(burnInGrid, proximityGrid, burnInGrid, whereClause)
+                with log.logArcpy("arcpy.sa.Con",(burnInGrid, proximityGridName, burnInGrid, whereClause), logFile):
+                    proximityGrid = arcpy.sa.Con(burnInGrid, proximityGrid, burnInGrid, whereClause)
         
         
             # Add output grid name to the list of features to add to the Contents pane
@@ -3155,7 +3232,10 @@ def runNeighborhoodProportions(toolPath, inLandCoverGrid, _lccName, lccFilePath,
                     arcpy.Delete_management(scratchName)
                 AddMsg(f"{timer.now()} Saving intermediate grid: {basename(scratchName)}.", 0, logFile)
                 try:
-                    nbrCntGrid.save(scratchName)
+                    if focalGrids:
+                        raster.saveSumGrid(nbrCntSumGrid, scratchName, globalConstants.sumGridTileSize, cleanupList, logFile)
+                    else:
+                        nbrCntGrid.save(scratchName)
                 except:
                     raise errors.attilaException(errorConstants.rasterOutputFormatError)
                 AddMsg(f"{timer.now()} Save intermediate grid complete: {basename(scratchName)}.", 0, logFile)
@@ -3227,6 +3307,18 @@ def runNeighborhoodProportions(toolPath, inLandCoverGrid, _lccName, lccFilePath,
     finally:
         setupAndRestore.standardRestore(logFile)
         env.overwriteOutput = tempEnvironment0
+        
+        for percentGrid, nbrCntSumGrid in focalGrids.values():
+            percentGrid.close()
+            if nbrCntSumGrid is not None:
+                nbrCntSumGrid.close()
+        
+        # only the NumPy focal backend adds intermediates to the cleanup list
+        if len(cleanupList) > 1 and not cleanupList[0] == "KeepIntermediates":
+            for (function,arguments) in cleanupList:
+                # Flexibly executes any functions added to cleanup array.
+                function(*arguments)
+            AddMsg("Clean up complete")
 
 
 def runIntersectionDensity(toolPath, inLineFeature, mergeLines, mergeField="#", mergeDistance='#', outputCS="#", cellSize="#", 
@@ -3305,8 +3397,8 @@ def runIntersectionDensity(toolPath, inLineFeature, mergeLines, mergeField="#",
             prjFeatureName = files.nameIntermediateFile([prjPrefix, "FeatureClass"], cleanupList)
             outCS = arcpy.SpatialReference(text=outputCS)
             AddMsg(f"{timer.now()} Projecting {inBaseName} to {outCS.name}. Intermediate: {basename(prjFeatureName)}", 0, logFile)
-            log.logArcpy("arcpy.Project_management", (inLineFeature, prjFeatureName, outCS), logFile)
-            inRoadFeature = arcpy.Project_management(inLineFeature, prjFeatureName, outCS)
+            with log.logArcpy("arcpy.Project_management", (inLineFeature, prjFeatureName, outCS), logFile):
+                inRoadFeature = arcpy.Project_management(inLineFeature, prjFeatureName, outCS)
             
             # No need to make a copy of the inLineFeature to add fields to. Can use the projected Feature instead
             makeCopy = False
@@ -3321,17 +3413,17 @@ def runIntersectionDensity(toolPath, inLineFeature, mergeLines, mergeField="#",
                     namePrefix = f"{metricConst.shortName}_{inBaseName}_"
                     copyFeatureName = files.nameIntermediateFile([namePrefix,"FeatureClass"],cleanupList)
                     AddMsg(f"{timer.now()} Copying {inBaseName} to {basename(copyFeatureName)}.", 0, logFile)
-                    log.logArcpy("arcpy.FeatureClassToFeatureClass_conversion",(inLineFeature,env.workspace,basename(copyFeatureName)),logFile)
-                    inRoadFeature = arcpy.FeatureClassToFeatureClass_conversion(inLineFeature,env.workspace,basename(copyFeatureName))
+                    with log.logArcpy("arcpy.FeatureClassToFeatureClass_conversion",(inLineFeature,env.workspace,basename(copyFeatureName)),logFile):
+                        inRoadFeature = arcpy.FeatureClassToFeatureClass_conversion(inLineFeature,env.workspace,basename(copyFeatureName))
 
                 # No merge field was supplied. Add a field to the copied inRoadFeature and populate it with a constant value
                 AddMsg(f"{timer.now()} Adding a dummy field to {arcpy.Describe(inRoadFeature).baseName} and assigning value 1 to all records.", 0, logFile)
                 mergeField = metricConst.dummyFieldName
-                log.logArcpy("arcpy.AddField_management", (inRoadFeature,mergeField,"SHORT"), logFile)
-                arcpy.AddField_management(inRoadFeature,mergeField,"SHORT")
+                with log.logArcpy("arcpy.AddField_management", (inRoadFeature,mergeField,"SHORT"), logFile):
+                    arcpy.AddField_management(inRoadFeature,mergeField,"SHORT")
                 
-                log.logArcpy("arcpy.CalculateField_management", (inRoadFeature,mergeField,1), logFile)
-                arcpy.CalculateField_management(inRoadFeature,mergeField,1)
+                with log.logArcpy("arcpy.CalculateField_management", (inRoadFeature,mergeField,1), logFile):
+                    arcpy.CalculateField_management(inRoadFeature,mergeField,1)
             
             # Ensure the road feature class is comprised of singleparts. Multipart features will cause MergeDividedRoads to fail.
             namePrefix = f"{metricConst.shortName}_{inBaseName}_{metricConst.singlepartRoadName}_"
@@ -3347,8 +3439,8 @@ def runIntersectionDensity(toolPath, inLineFeature, mergeLines, mergeField="#",
             AddMsg(f"{timer.now()} Merging divided road features. Intermediary output: {basename(mergedFeatureName)}", 0, logFile)
             
             # This is also the final reassignment of the inRoadFeature variable
-            log.logArcpy("arcpy.MergeDividedRoads_cartography",(singlepartFeatureName,mergeField,mergeDistance,mergedFeatureName),logFile)
-            inRoadFeature = arcpy.MergeDividedRoads_cartography(singlepartFeatureName,mergeField,mergeDistance,mergedFeatureName)
+            with log.logArcpy("arcpy.MergeDividedRoads_cartography",(singlepartFeatureName,mergeField,mergeDistance,mergedFeatureName),logFile):
+                inRoadFeature = arcpy.MergeDividedRoads_cartography(singlepartFeatureName,mergeField,mergeDistance,mergedFeatureName)
 
         # UNSPLIT LINES
         # We're only going to use two parameters for the arcpy.UnsplitLine_management tool. 
@@ -3359,20 +3451,20 @@ def runIntersectionDensity(toolPath, inLineFeature, mergeLines, mergeField="#",
         unsplitPrefix = f"{metricConst.shortName}_{inBaseName}_{metricConst.unsplitRoadName}_" 
         unsplitFeatureName = files.nameIntermediateFile([unsplitPrefix, "FeatureClass"], cleanupList)
         AddMsg(f"{timer.now()} Unsplitting {arcpy.Describe(inRoadFeature).baseName}. Intermediate: {basename(unsplitFeatureName)}", 0, logFile)
-        log.logArcpy("arcpy.UnsplitLine_management", (inRoadFeature, unsplitFeatureName), logFile)
-        arcpy.UnsplitLine_management(inRoadFeature, unsplitFeatureName)
+        with log.logArcpy("arcpy.UnsplitLine_management", (inRoadFeature, unsplitFeatureName), logFile):
+            arcpy.UnsplitLine_management(inRoadFeature, unsplitFeatureName)
         
         # INTERSECT LINES WITH THEMSELVES
         intersectPrefix = f"{metricConst.shortName}_{inBaseName}_{metricConst.roadIntersectName}_" 
         intersectFeatureName = files.nameIntermediateFile([intersectPrefix, "FeatureClass"], cleanupList) 
         AddMsg(f"{timer.now()} Finding intersections. Intermediate: {basename(intersectFeatureName)}.", 0, logFile)
-        log.logArcpy("arcpy.Intersect_analysis",([unsplitFeatureName,unsplitFeatureName],intersectFeatureName,"ONLY_FID",'',"POINT"),logFile)
-        arcpy.Intersect_analysis([unsplitFeatureName, unsplitFeatureName], intersectFeatureName, "ONLY_FID",'',"POINT")
+        with log.logArcpy("arcpy.Intersect_analysis",([unsplitFeatureName,unsplitFeatureName],intersectFeatureName,"ONLY_FID",'',"POINT"),logFile):
+            arcpy.Intersect_analysis([unsplitFeatureName, unsplitFeatureName], intersectFeatureName, "ONLY_FID",'',"POINT")
 
         # DELETE REDUNDANT INTERSECTION POINTS THAT OCCUR AT THE SAME LOCATION
         AddMsg(f"{timer.now()} Deleting identical intersections.", 0, logFile)
-        log.logArcpy("arcpy.DeleteIdentical_management", (intersectFeatureName, "Shape"), logFile)
-        arcpy.DeleteIdentical_management(intersectFeatureName, "Shape")
+        with log.logArcpy("arcpy.DeleteIdentical_management", (intersectFeatureName, "Shape"), logFile):
+            arcpy.DeleteIdentical_management(intersectFeatureName, "Shape")
 
         # Calculate a magnitude-per-unit area from the intersection features using a kernel function to fit a smoothly tapered surface to each point. 
         # The output cell size, search radius, and area units can be altered by the user
@@ -3546,8 +3638,8 @@ def runCreateWalkabilityCostRaster(toolPath, inWalkFeatures, inImpassableFeature
             
             # combine the Walkable and Impassable rasters. 
             AddMsg(f"{timer.now()} Stacking the Walkable raster on the Impassable raster for final output.", 0, logFile)
-            log.logArcpy('arcpy.sa.Con', (f'({walkRaster} == {baseNumber})', impassRaster, walkRaster), logFile)
-            costRaster = arcpy.sa.Con((walkRaster == baseNumber), impassRaster, walkRaster)
+            with log.logArcpy('arcpy.sa.Con', (f'({walkRaster} == {baseNumber})', impassRaster, walkRaster), logFile):
+                costRaster = arcpy.sa.Con((walkRaster == baseNumber), impassRaster, walkRaster)
             
             categoryDict = {walkNumber: "Walkable", baseNumber: "Base", impassNumber: "Impassable"}
         else:
@@ -3561,11 +3653,11 @@ def runCreateWalkabilityCostRaster(toolPath, inWalkFeatures, inImpassableFeature
         
         # add category labels to the raster
         AddMsg(f"{timer.now()} Finalizing {basename(outRaster)} by adding labels.", 0, logFile)
-        log.logArcpy('arcpy.BuildRasterAttributeTable_management', (costRaster, "Overwrite"), logFile)
-        arcpy.BuildRasterAttributeTable_management(costRaster, "Overwrite")
+        with log.logArcpy('arcpy.BuildRasterAttributeTable_management', (costRaster, "Overwrite"), logFile):
+            arcpy.BuildRasterAttributeTable_management(costRaster, "Overwrite")
         
-        log.logArcpy('arcpy.AddField_management', (costRaster, "CATEGORY", "TEXT", "#", "#", "10"), logFile)
-        arcpy.AddField_management(costRaster, "CATEGORY", "TEXT", "#", "#", "10")
+        with log.logArcpy('arcpy.AddField_management', (costRaster, "CATEGORY", "TEXT", "#", "#", "10"), logFile):
+            arcpy.AddField_management(costRaster, "CATEGORY", "TEXT", "#", "#", "10")
         
         raster.updateCategoryLabels(costRaster, categoryDict)
         
@@ -3596,16 +3688,11 @@ def runCreateWalkabilityCostRaster(toolPath, inWalkFeatures, inImpassableFeature
             AddMsg("Clean up complete")
 
 
-def proc_park(parkIDStr):
-    AddMsg(f"parkIDStr = {parkIDStr}")
-    
-    
 def runPedestrianAccessAndAvailability(toolPath, inParkFeature, dissolveParkYN='', inCostSurface='', inCensusDataset='', inPopField='', 
                                maxTravelDist='', expandAreaDist='', outRaster='', processingCellSize='', snapRaster='', optionalFieldGroups=''):
     """ Interface for script executing Pedestrian Access And Availability tool """
    
     from arcpy import env
-    # from multiprocessing import Process, Lock
 
     cleanupList = [] # This is an empty list object that will contain tuples of the form (function, arguments) as needed for cleanup
 
@@ -3695,11 +3782,11 @@ def runPedestrianAccessAndAvailability(toolPath, inParkFeature, dissolveParkYN='
         AddMsg(f"{timer.now()} Creating temporary copy of {desc.name}. Intermediate: {basename(tempParkFeature)}", 0, logFile)
         
         if dissolveParkYN == 'true':
-            log.logArcpy('arcpy.Dissolve_management', (inParkFeature, os.path.basename(tempParkFeature),"","","SINGLE_PART", "DISSOLVE_LINES"), logFile)
-            inParkFeature = arcpy.Dissolve_management(inParkFeature, os.path.basename(tempParkFeature),"","","SINGLE_PART", "DISSOLVE_LINES")
+            with log.logArcpy('arcpy.Dissolve_management', (inParkFeature, os.path.basename(tempParkFeature),"","","SINGLE_PART", "DISSOLVE_LINES"), logFile):
+                inParkFeature = arcpy.Dissolve_management(inParkFeature, os.path.basename(tempParkFeature),"","","SINGLE_PART", "DISSOLVE_LINES")
         else:
-            log.logArcpy('arcpy.FeatureClassToFeatureClass_conversion', (inParkFeature, env.workspace, basename(tempParkFeature)), logFile)
-            inParkFeature = arcpy.FeatureClassToFeatureClass_conversion(inParkFeature, env.workspace, basename(tempParkFeature))
+            with log.logArcpy('arcpy.FeatureClassToFeatureClass_conversion', (inParkFeature, env.workspace, basename(tempParkFeature)), logFile):
+                inParkFeature = arcpy.FeatureClassToFeatureClass_conversion(inParkFeature, env.workspace, basename(tempParkFeature))
         
         # use the OID for identifying Parks
         idFlds = [aFld for aFld in arcpy.ListFields(inParkFeature) if aFld.type == "OID"]
@@ -3711,17 +3798,17 @@ def runPedestrianAccessAndAvailability(toolPath, inParkFeature, dissolveParkYN='
         # Calculate the park area in square meters using the coordinate system set in the spatial analysis environment
         AddMsg(f"{timer.now()} Calculating park area in square meters", 0, logFile)
         calcAreaFld = 'CalcAreaM2'
-        log.logArcpy("arcpy.management.AddField", (inParkFeature, calcAreaFld, 'FLOAT'), logFile)
-        arcpy.management.AddField(inParkFeature, calcAreaFld, 'FLOAT')
+        with log.logArcpy("arcpy.management.AddField", (inParkFeature, calcAreaFld, 'FLOAT'), logFile):
+            arcpy.management.AddField(inParkFeature, calcAreaFld, 'FLOAT')
         
         exp = "!SHAPE.AREA@SQUAREMETERS!"
-        log.logArcpy("arcpy.CalculateField_management", (inParkFeature, calcAreaFld, exp, "PYTHON"), logFile)
-        arcpy.CalculateField_management(inParkFeature, calcAreaFld, exp, "PYTHON")
+        with log.logArcpy("arcpy.CalculateField_management", (inParkFeature, calcAreaFld, exp, "PYTHON"), logFile):
+            arcpy.CalculateField_management(inParkFeature, calcAreaFld, exp, "PYTHON")
         
         if globalConstants.intermediateName in optionalGroupsList:
             # Add additional fields for population with access counts and square meters of park accessible per person calculation.  
-            log.logArcpy("arcpy.management.AddFields", (inParkFeature, metricConst.parkCalculationFields), logFile)
-            arcpy.management.AddFields(inParkFeature, metricConst.parkCalculationFields)
+            with log.logArcpy("arcpy.management.AddFields", (inParkFeature, metricConst.parkCalculationFields), logFile):
+                arcpy.management.AddFields(inParkFeature, metricConst.parkCalculationFields)
         
         # Get a count of the number of reporting units to give an accurate progress estimate.
         n = len(parkList)
@@ -3764,48 +3851,57 @@ def runPedestrianAccessAndAvailability(toolPath, inParkFeature, dissolveParkYN='
         # create an Accessibility and Availability dictionary to capture the calculated values for each park
         aaaDict = {}
         
-        for parkID in parkList:
-            try:
-                # # # lock = Lock()
-                # # # p = Process(target=proc_park, args=(str(parkID)))
-                # # # p.start()
-                # # #
-                # # # p.join()
-                
-                distNumber = conversion.convertNumStringToNumber(maxTravelDist)
-                expandNumber = conversion.convertNumStringToNumber(expandAreaDist)
-                buffDist = distNumber * 1.05
-                
-                parkRaster, nullRaster, popNone, popZero, valuesList = raster.getParkRaster(metricConst,
-                                                                                inParkFeature,
-                                                                                oidFld,
-                                                                                str(parkID),
-                                                                                buffDist,
-                                                                                inCostSurface,
-                                                                                distNumber,
-                                                                                expandNumber,
-                                                                                calcAreaFld,
-                                                                                inCensusDataset,
-                                                                                inPopField,
-                                                                                nullRaster,
-                                                                                popNone,
-                                                                                popZero,
-                                                                                cleanupList)
+        distNumber = conversion.convertNumStringToNumber(maxTravelDist)
+        expandNumber = conversion.convertNumStringToNumber(expandAreaDist)
+        buffDist = distNumber * 1.05
+        
+        sumGrid = None
+        if globalConstants.parkMosaicBackend == globalConstants.numpyBackendName:
+            # add each park raster to a running sum instead of saving it for the mosaic
+            sumGrid = raster.createSumGrid()
+            AddMsg(f"{timer.now()} Accumulating park/population values in a {sumGrid.nRows} by {sumGrid.nCols} running sum grid.", 0, logFile)
+        
+        workerCount = parallel.getWorkerCount(globalConstants.parkWorkerCount)
+        if workerCount > 1:
+            # calculate the parks in a pool of worker processes, each with its own scratch workspace
+            mosaicRasters, nullRaster, popNone, popZero, aaaDict = raster.getParkRastersInParallel(metricConst, 
+                                                        inParkFeature, oidFld, parkList, buffDist, inCostSurface, 
+                                                        distNumber, expandNumber, calcAreaFld, inCensusDataset, 
+                                                        inPopField, workerCount, cleanupList, timer, logFile, sumGrid)
+        else:
+            for parkID in parkList:
+                try:
+                    parkRaster, nullRaster, popNone, popZero, valuesList = raster.getParkRaster(metricConst,
+                                                                                    inParkFeature,
+                                                                                    oidFld,
+                                                                                    str(parkID),
+                                                                                    buffDist,
+                                                                                    inCostSurface,
+                                                                                    distNumber,
+                                                                                    expandNumber,
+                                                                                    calcAreaFld,
+                                                                                    inCensusDataset,
+                                                                                    inPopField,
+                                                                                    nullRaster,
+                                                                                    popNone,
+                                                                                    popZero,
+                                                                                    cleanupList,
+                                                                                    accumulator=sumGrid)
                 
-                # add the park raster to the mosaic rasters list
-                if parkRaster == None:
-                    pass
-                else:
-                    mosaicRasters.append(parkRaster)
+                    # add the park raster to the mosaic rasters list
+                    if parkRaster == None:
+                        pass
+                    else:
+                        mosaicRasters.append(parkRaster)
                                              
-                if globalConstants.intermediateName in optionalGroupsList:
-                    # add the accessibility and access calculations to the dictionary for future use
-                    aaaDict[parkID] = valuesList
+                    if globalConstants.intermediateName in optionalGroupsList:
+                        # add the accessibility and access calculations to the dictionary for future use
+                        aaaDict[parkID] = valuesList
                 
-                loopProgress.update()
+                    loopProgress.update()
                 
-            except:
-                AddMsg(f"Failed while processing Park ID: {parkID}", 2)
+                except:
+                    AddMsg(f"Failed while processing Park ID: {parkID}", 2)
                 
         AddMsg(f"{timer.now()} Finished calculations for last park.", 0, logFile)
         
@@ -3834,12 +3930,20 @@ def runPedestrianAccessAndAvailability(toolPath, inParkFeature, dissolveParkYN='
         
         
         # mosaic the produced park/populations rasters
-        if len(mosaicRasters) == 0:
+        if sumGrid is not None:
+            if sumGrid.addCount == 0:
+                AddMsg(f"No individual park population access rasters were generated. Exiting...\n", 1, logFile)
+            else:
+                AddMsg(f"{timer.now()} Saving the sum of {sumGrid.addCount} calculated park/population rasters. Output: {basename(outRaster)}.", 0, logFile)
+                raster.saveSumGrid(sumGrid, outRaster, globalConstants.sumGridTileSize, cleanupList, logFile)
+            sumGrid.close()
+        elif len(mosaicRasters) == 0:
             AddMsg(f"No individual park population access rasters were generated. Exiting...\n", 1, logFile)
         else:
             AddMsg(f"{timer.now()} Merging {(len(mosaicRasters))} calculated park/population rasters. Output: {basename(outRaster)}.", 0, logFile)
             outWS = env.workspace
-            arcpy.management.MosaicToNewRaster(mosaicRasters, outWS, basename(outRaster), "#", "64_BIT", env.cellSize, 1, "SUM", "FIRST")   
+            raster.mosaicSumRasters(mosaicRasters, outWS, basename(outRaster), env.cellSize, globalConstants.mosaicBatchSize, 
+                                    cleanupList, logFile)
             
             AddMsg(f"{timer.now()} Deleting {len(mosaicRasters)} individual park rasters.", 0, logFile)
             [arcpy.Delete_management(p) for p in mosaicRasters]
@@ -3993,8 +4097,8 @@ def runProcessRoadsForEnvioAtlasAnalyses(toolPath, versionName, inStreetsgdb, ch
         # Begin process by making a feature layer from the Streets feature class
         AddMsg(f"{timer.now()} Creating feature layer from {inputStreets}.", 0, logFile)
         streetLayer = "streetLayer"
-        log.logArcpy('arcpy.MakeFeatureLayer_management', (inputStreets, streetLayer), logFile, True)
-        arcpy.MakeFeatureLayer_management(inputStreets, streetLayer)
+        with log.logArcpy('arcpy.MakeFeatureLayer_management', (inputStreets, streetLayer), logFile, True):
+            arcpy.MakeFeatureLayer_management(inputStreets, streetLayer)
 
         
         if chkWalkableYN == "true" or chkIntDensYN == "true":
@@ -4022,16 +4126,16 @@ def runProcessRoadsForEnvioAtlasAnalyses(toolPath, versionName, inStreetsgdb, ch
             #                                         "AR_PEDEST = 'N'")
             
                 
-            log.logArcpy('arcpy.SelectLayerByAttribute_management', (streetLayer, 'NEW_SELECTION', whereClause, "INVERT"), logFile)
-            arcpy.SelectLayerByAttribute_management(streetLayer, 'NEW_SELECTION', whereClause, "INVERT")
+            with log.logArcpy('arcpy.SelectLayerByAttribute_management', (streetLayer, 'NEW_SELECTION', whereClause, "INVERT"), logFile):
+                arcpy.SelectLayerByAttribute_management(streetLayer, 'NEW_SELECTION', whereClause, "INVERT")
             
             AddMsg(f"{timer.now()} {WlkMsg}", 0, logFile)
 
             if chkWalkableYN == "true":
                 walkableFCName = fnPrefix+metricConst.outNameRoadsWalkable+ext
                 AddMsg(f"{timer.now()} Saving selected features to: {walkableFCName}", 0, logFile)
-                log.logArcpy('arcpy.CopyFeatures_management', (streetLayer, walkableFCName), logFile)
-                walkableFC = arcpy.CopyFeatures_management(streetLayer, walkableFCName)
+                with log.logArcpy('arcpy.CopyFeatures_management', (streetLayer, walkableFCName), logFile):
+                    walkableFC = arcpy.CopyFeatures_management(streetLayer, walkableFCName)
                 
                 addToActiveMap.append(walkableFC)
                 
@@ -4045,19 +4149,19 @@ def runProcessRoadsForEnvioAtlasAnalyses(toolPath, versionName, inStreetsgdb, ch
                 AddMsg(f"{timer.now()} Continuing with the selected features for processing intersection density roads.", 0, logFile)
         
             AddMsg(f"{timer.now()} Removing from the selection features where {metricConst.speedCatDict[versionName]}.", 0, logFile)
-            log.logArcpy('arcpy.SelectLayerByAttribute_management', (streetLayer, 'REMOVE_FROM_SELECTION', metricConst.speedCatDict[versionName]), logFile)
-            arcpy.SelectLayerByAttribute_management(streetLayer, 'REMOVE_FROM_SELECTION', metricConst.speedCatDict[versionName])
+            with log.logArcpy('arcpy.SelectLayerByAttribute_management', (streetLayer, 'REMOVE_FROM_SELECTION', metricConst.speedCatDict[versionName]), logFile):
+                arcpy.SelectLayerByAttribute_management(streetLayer, 'REMOVE_FROM_SELECTION', metricConst.speedCatDict[versionName])
             
             if versionName == 'NAVTEQ 2011': #NAVTEQ 2011
                 AddMsg(f"{timer.now()} Assigning landUseA codes to road segments.", 0, logFile)
-                log.logArcpy('arcpy.Identity_analysis', (streetLayer, NAVTEQ_LandUseA, intersectFromLandUseA), logFile)
-                arcpy.Identity_analysis(streetLayer, NAVTEQ_LandUseA, intersectFromLandUseA)
+                with log.logArcpy('arcpy.Identity_analysis', (streetLayer, NAVTEQ_LandUseA, intersectFromLandUseA), logFile):
+                    arcpy.Identity_analysis(streetLayer, NAVTEQ_LandUseA, intersectFromLandUseA)
                 
                 intermediateList.append(intersectFromLandUseA)
 
                 AddMsg(f"{timer.now()} Assigning landUseB codes to road segments.", 0, logFile)           
-                log.logArcpy('arcpy.Identity_analysis', (intersectFromLandUseA, NAVTEQ_LandUseB, intersectFinal), logFile)
-                arcpy.Identity_analysis(intersectFromLandUseA, NAVTEQ_LandUseB, intersectFinal)
+                with log.logArcpy('arcpy.Identity_analysis', (intersectFromLandUseA, NAVTEQ_LandUseB, intersectFinal), logFile):
+                    arcpy.Identity_analysis(intersectFromLandUseA, NAVTEQ_LandUseB, intersectFinal)
                 
                 intermediateList.append(intersectFinal)
 
@@ -4078,14 +4182,14 @@ def runProcessRoadsForEnvioAtlasAnalyses(toolPath, versionName, inStreetsgdb, ch
                 
             elif versionName == 'NAVTEQ 2019':  #NAVTEQ 2019
                 AddMsg(f"{timer.now()} Assigning landArea codes to road segments.",0,logFile)
-                log.logArcpy('arcpy.Identity_analysis', (streetLayer, NAVTEQLandArea, intersectFromLandArea), logFile)
-                arcpy.Identity_analysis(streetLayer, NAVTEQLandArea, intersectFromLandArea)
+                with log.logArcpy('arcpy.Identity_analysis', (streetLayer, NAVTEQLandArea, intersectFromLandArea), logFile):
+                    arcpy.Identity_analysis(streetLayer, NAVTEQLandArea, intersectFromLandArea)
                 
                 intermediateList.append(intersectFromLandArea)
 
                 AddMsg(f"{timer.now()} Assigning FacilityArea codes to road segments.",0,logFile)           
-                log.logArcpy('arcpy.Identity_analysis', (intersectFromLandArea, NAVTEQFacilityArea, intersectFinal), logFile)
-                arcpy.Identity_analysis(intersectFromLandArea, NAVTEQFacilityArea, intersectFinal)
+                with log.logArcpy('arcpy.Identity_analysis', (intersectFromLandArea, NAVTEQFacilityArea, intersectFinal), logFile):
+                    arcpy.Identity_analysis(intersectFromLandArea, NAVTEQFacilityArea, intersectFinal)
                 
                 intermediateList.append(intersectFinal)
 
@@ -4106,8 +4210,8 @@ def runProcessRoadsForEnvioAtlasAnalyses(toolPath, versionName, inStreetsgdb, ch
             
             elif versionName == 'ESRI StreetMap': # ESRI StreetMaps
                 AddMsg(f"{timer.now()} Assigning MapLandArea codes to road segments.",0,logFile)
-                log.logArcpy('arcpy.Identity_analysis', (streetLayer, SMLandArea, intersectFinal), logFile)
-                arcpy.Identity_analysis(streetLayer, SMLandArea, intersectFinal)
+                with log.logArcpy('arcpy.Identity_analysis', (streetLayer, SMLandArea, intersectFinal), logFile):
+                    arcpy.Identity_analysis(streetLayer, SMLandArea, intersectFinal)
                 
                 intermediateList.append(intersectFinal)
 
@@ -4123,12 +4227,12 @@ def runProcessRoadsForEnvioAtlasAnalyses(toolPath, versionName, inStreetsgdb, ch
                     cursor.deleteRow()
             
             AddMsg(f"{timer.now()} Adding a MergeClass field.",0,logFile)
-            log.logArcpy('arcpy.AddField_management', (intersectFinal,mergeField,"SHORT"), logFile)
-            arcpy.AddField_management(intersectFinal,mergeField,"SHORT")
+            with log.logArcpy('arcpy.AddField_management', (intersectFinal,mergeField,"SHORT"), logFile):
+                arcpy.AddField_management(intersectFinal,mergeField,"SHORT")
         
             AddMsg(f"{timer.now()} Setting MergeClass to an initial value of 1.", 0, logFile)
-            log.logArcpy('arcpy.CalculateField_management', (intersectFinal,mergeField,1), logFile)
-            arcpy.CalculateField_management(intersectFinal,mergeField,1)
+            with log.logArcpy('arcpy.CalculateField_management', (intersectFinal,mergeField,1), logFile):
+                arcpy.CalculateField_management(intersectFinal,mergeField,1)
             
             dirTravelSQL = metricConst.dirTravelDict[versionName]
             dirTravelFld = dirTravelSQL.split(' = ')[0]
@@ -4140,14 +4244,14 @@ def runProcessRoadsForEnvioAtlasAnalyses(toolPath, versionName, inStreetsgdb, ch
         
             AddMsg(f"{timer.now()} Converting any multipart roads to singlepart.", 0, logFile)
             # Ensure the road feature class is comprised of singleparts. Multipart features will cause MergeDividedRoads to fail.
-            log.logArcpy('arcpy.MultipartToSinglepart_management', (intersectFinal, singlepartRoads), logFile)
-            arcpy.MultipartToSinglepart_management(intersectFinal, singlepartRoads)
+            with log.logArcpy('arcpy.MultipartToSinglepart_management', (intersectFinal, singlepartRoads), logFile):
+                arcpy.MultipartToSinglepart_management(intersectFinal, singlepartRoads)
             
             intermediateList.append(singlepartRoads)
             AddMsg(f"{timer.now()} Merging divided roads to {intDensityFCName} using the MergeClass field and a merge distance of '30 Meters'. Only roads with the same value in the mergeField and within the mergeDistance will be merged. Roads with a MergeClass value equal to zero are locked and will not be merged. All non-merged roads are retained.", 0, logFile)
             
-            log.logArcpy('arcpy.MergeDividedRoads_cartography', (singlepartRoads, mergeField, "30 Meters", intDensityFCName), logFile)
-            intDensityFC = arcpy.MergeDividedRoads_cartography(singlepartRoads, mergeField, "30 Meters", intDensityFCName)
+            with log.logArcpy('arcpy.MergeDividedRoads_cartography', (singlepartRoads, mergeField, "30 Meters", intDensityFCName), logFile):
+                intDensityFC = arcpy.MergeDividedRoads_cartography(singlepartRoads, mergeField, "30 Meters", intDensityFCName)
                                 
             AddMsg(f"{timer.now()} Finished processing {intDensityFCName}.", 0, logFile)
             addToActiveMap.append(intDensityFC)
@@ -4163,45 +4267,45 @@ def runProcessRoadsForEnvioAtlasAnalyses(toolPath, versionName, inStreetsgdb, ch
             if chkWalkableYN == "true" or chkIntDensYN == "true":
                 # this is probably unnecessary, but it makes sure everything is reset
                 AddMsg(f"{timer.now()} Clearing and resetting selections for {inputStreets}.")
-                log.logArcpy('arcpy.SelectLayerByAttribute_management', (streetLayer, 'CLEAR_SELECTION'), logFile)
-                arcpy.SelectLayerByAttribute_management(streetLayer, 'CLEAR_SELECTION')
+                with log.logArcpy('arcpy.SelectLayerByAttribute_management', (streetLayer, 'CLEAR_SELECTION'), logFile):
+                    arcpy.SelectLayerByAttribute_management(streetLayer, 'CLEAR_SELECTION')
 
             if versionName == 'NAVTEQ 2011':
                 AddMsg(f"{timer.now()} Selecting features where FUNC_CLASS = 1, 2, 3, or 4.",0,logFile)
-                log.logArcpy('arcpy.SelectLayerByAttribute_management', (streetLayer, 'NEW_SELECTION', "FUNC_CLASS IN ('1','2','3','4')"), logFile)
-                arcpy.SelectLayerByAttribute_management(streetLayer, 'NEW_SELECTION', "FUNC_CLASS IN ('1','2','3','4')")
+                with log.logArcpy('arcpy.SelectLayerByAttribute_management', (streetLayer, 'NEW_SELECTION', "FUNC_CLASS IN ('1','2','3','4')"), logFile):
+                    arcpy.SelectLayerByAttribute_management(streetLayer, 'NEW_SELECTION', "FUNC_CLASS IN ('1','2','3','4')")
                 
                 AddMsg(f"{timer.now()} Removing from the selection features where FERRY_TYPE <> H.",0,logFile)
-                log.logArcpy('arcpy.SelectLayerByAttribute_management', (streetLayer, 'REMOVE_FROM_SELECTION', "FERRY_TYPE <> 'H'"), logFile)
-                arcpy.SelectLayerByAttribute_management(streetLayer, 'REMOVE_FROM_SELECTION', "FERRY_TYPE <> 'H'")
+                with log.logArcpy('arcpy.SelectLayerByAttribute_management', (streetLayer, 'REMOVE_FROM_SELECTION', "FERRY_TYPE <> 'H'"), logFile):
+                    arcpy.SelectLayerByAttribute_management(streetLayer, 'REMOVE_FROM_SELECTION', "FERRY_TYPE <> 'H'")
                 
             elif versionName == 'NAVTEQ 2019': #NAVTEQ2019 #(pickup updating messages here) 
                 #try running the join first
                 AddMsg(f"{timer.now()} Adding {ToFromFields[0]} and {ToFromFields[1]} from {link}.", 0, logFile)
-                log.logArcpy('arcpy.management.AddJoin', (streetLayer, metricConst.Streets_linkfield, link, metricConst.Link_linkfield), logFile)
-                arcpy.management.AddJoin(streetLayer, metricConst.Streets_linkfield, link, metricConst.Link_linkfield)
+                with log.logArcpy('arcpy.management.AddJoin', (streetLayer, metricConst.Streets_linkfield, link, metricConst.Link_linkfield), logFile):
+                    arcpy.management.AddJoin(streetLayer, metricConst.Streets_linkfield, link, metricConst.Link_linkfield)
                 
                 AddMsg(f"{timer.now()} Selecting features where FuncClass = 1, 2, 3, or 4.", 0, logFile)
-                log.logArcpy('arcpy.SelectLayerByAttribute_management', (streetLayer, 'NEW_SELECTION', "FuncClass <= 4"), logFile)
-                arcpy.SelectLayerByAttribute_management(streetLayer, 'NEW_SELECTION', "FuncClass <= 4")
+                with log.logArcpy('arcpy.SelectLayerByAttribute_management', (streetLayer, 'NEW_SELECTION', "FuncClass <= 4"), logFile):
+                    arcpy.SelectLayerByAttribute_management(streetLayer, 'NEW_SELECTION', "FuncClass <= 4")
                 
                 AddMsg(f"{timer.now()} Removing from the selection features where FERRY_TYPE <> H.", 0, logFile)
-                log.logArcpy('arcpy.SelectLayerByAttribute_management', (streetLayer, 'REMOVE_FROM_SELECTION', "FerryType <> 'H'"), logFile)
-                arcpy.SelectLayerByAttribute_management(streetLayer, 'REMOVE_FROM_SELECTION', "FerryType <> 'H'")
+                with log.logArcpy('arcpy.SelectLayerByAttribute_management', (streetLayer, 'REMOVE_FROM_SELECTION', "FerryType <> 'H'"), logFile):
+                    arcpy.SelectLayerByAttribute_management(streetLayer, 'REMOVE_FROM_SELECTION', "FerryType <> 'H'")
             
             elif versionName == 'ESRI StreetMap': # ESRI StreetMaps
                 AddMsg(f"{timer.now()} Selecting features where FuncClass = 1, 2, 3, or 4.", 0, logFile)
-                log.logArcpy('arcpy.SelectLayerByAttribute_management', (streetLayer, 'NEW_SELECTION', "FuncClass <= 4"), logFile)
-                arcpy.SelectLayerByAttribute_management(streetLayer, 'NEW_SELECTION', "FuncClass <= 4")
+                with log.logArcpy('arcpy.SelectLayerByAttribute_management', (streetLayer, 'NEW_SELECTION', "FuncClass <= 4"), logFile):
+                    arcpy.SelectLayerByAttribute_management(streetLayer, 'NEW_SELECTION', "FuncClass <= 4")
                 
                 AddMsg(f"{timer.now()} Removing from the selection features where FERRY_TYPE <> H.", 0, logFile)
-                log.logArcpy('arcpy.SelectLayerByAttribute_management', (streetLayer, 'REMOVE_FROM_SELECTION', "FerryType <> 'H'"), logFile)
-                arcpy.SelectLayerByAttribute_management(streetLayer, 'REMOVE_FROM_SELECTION', "FerryType <> 'H'")
+                with log.logArcpy('arcpy.SelectLayerByAttribute_management', (streetLayer, 'REMOVE_FROM_SELECTION', "FerryType <> 'H'"), logFile):
+                    arcpy.SelectLayerByAttribute_management(streetLayer, 'REMOVE_FROM_SELECTION', "FerryType <> 'H'")
             
             # Write the selected features to a new feature class
             AddMsg(f"{timer.now()} Exporting remaining selected features to {iacFCName}", 0, logFile)
-            log.logArcpy('arcpy.conversion.ExportFeatures', (streetLayer, iacFCName), logFile)
-            iacFC = arcpy.conversion.ExportFeatures(streetLayer, iacFCName)    
+            with log.logArcpy('arcpy.conversion.ExportFeatures', (streetLayer, iacFCName), logFile):
+                iacFC = arcpy.conversion.ExportFeatures(streetLayer, iacFCName)    
                 
             # need to reset the ToFromFields in case the iacFC is a shapefile
             ToFromFields = metricConst.laneFieldDict[f"{versionName}{ext}"]
@@ -4211,18 +4315,18 @@ def runProcessRoadsForEnvioAtlasAnalyses(toolPath, versionName, inStreetsgdb, ch
                 calculate.replaceNullValues(iacFC, f, 0)
             
             AddMsg(f"{timer.now()} Adding field, LANES, to {iacFCName}. Calculating its value as {ToFromFields[0]} + {ToFromFields[1]}.", 0, logFile)
-            log.logArcpy('arcpy.AddField_management', (iacFC,lanesField,"SHORT"), logFile)
-            arcpy.AddField_management(iacFC,lanesField,"SHORT")
+            with log.logArcpy('arcpy.AddField_management', (iacFC,lanesField,"SHORT"), logFile):
+                arcpy.AddField_management(iacFC,lanesField,"SHORT")
             
             calcExpression = f"!{ToFromFields[0]}!+!{ToFromFields[1]}!"
-            log.logArcpy('arcpy.CalculateField_management', (iacFC,lanesField,calcExpression,"PYTHON",'#'), logFile)
-            arcpy.CalculateField_management(iacFC,lanesField,calcExpression,"PYTHON",'#')
+            with log.logArcpy('arcpy.CalculateField_management', (iacFC,lanesField,calcExpression,"PYTHON",'#'), logFile):
+                arcpy.CalculateField_management(iacFC,lanesField,calcExpression,"PYTHON",'#')
                 
             #inform the user the total number of features having LANES of value 0
             value0FCName = metricConst.value0_LANES+ext
             whereClause_0Lanes = f"{lanesField} = 0"
-            log.logArcpy('arcpy.Select_analysis', (iacFC, value0FCName, whereClause_0Lanes), logFile)
-            arcpy.Select_analysis(iacFC, value0FCName, whereClause_0Lanes)
+            with log.logArcpy('arcpy.Select_analysis', (iacFC, value0FCName, whereClause_0Lanes), logFile):
+                arcpy.Select_analysis(iacFC, value0FCName, whereClause_0Lanes)
             
             zeroCount = arcpy.GetCount_management(value0FCName).getOutput(0)
             if int(zeroCount) > 0:
@@ -4249,20 +4353,20 @@ def runProcessRoadsForEnvioAtlasAnalyses(toolPath, versionName, inStreetsgdb, ch
             if chkWalkableYN == "true" or chkIntDensYN == "true" or chkIACYN == "true":
             # this is probably unnecessary, but it makes sure everything is reset
                 AddMsg(f"{timer.now()} Clearing and resetting selections for {inputStreets}.")
-                log.logArcpy('arcpy.SelectLayerByAttribute_management', (streetLayer, 'CLEAR_SELECTION'), logFile)
-                arcpy.SelectLayerByAttribute_management(streetLayer, 'CLEAR_SELECTION')
+                with log.logArcpy('arcpy.SelectLayerByAttribute_management', (streetLayer, 'CLEAR_SELECTION'), logFile):
+                    arcpy.SelectLayerByAttribute_management(streetLayer, 'CLEAR_SELECTION')
 
             whereClause = metricConst.AllRdsSelectDict[versionName]
             AllRdsMsg = metricConst.AllRdsMsgDict[versionName]
 
                 
-            log.logArcpy('arcpy.SelectLayerByAttribute_management', (streetLayer, 'NEW_SELECTION', whereClause, "INVERT"), logFile)
-            arcpy.SelectLayerByAttribute_management(streetLayer, 'NEW_SELECTION', whereClause, "INVERT")
+            with log.logArcpy('arcpy.SelectLayerByAttribute_management', (streetLayer, 'NEW_SELECTION', whereClause, "INVERT"), logFile):
+                arcpy.SelectLayerByAttribute_management(streetLayer, 'NEW_SELECTION', whereClause, "INVERT")
             AddMsg(f"{timer.now()} {AllRdsMsg}", 0, logFile)
 
             AddMsg(f"{timer.now()} Saving selected features to: {AllRdsFCName}", 0, logFile)
-            log.logArcpy('arcpy.CopyFeatures_management', (streetLayer, AllRdsFCName), logFile)
-            AllRdsFC = arcpy.CopyFeatures_management(streetLayer, AllRdsFCName)
+            with log.logArcpy('arcpy.CopyFeatures_management', (streetLayer, AllRdsFCName), logFile):
+                AllRdsFC = arcpy.CopyFeatures_management(streetLayer, AllRdsFCName)
             addToActiveMap.append(AllRdsFC)
             
         if logFile:
@@ -4419,8 +4523,8 @@ def runPopulationWithinZoneMetrics(toolPath, inReportingUnitFeature, reportingUn
             tempBufferName = f"{metricConst.shortName}_{fileNameBase}_Buffer_"
             tempBufferFeature = files.nameIntermediateFile([tempBufferName,"FeatureClass"],cleanupList)
             AddMsg(f"{timer.now()} Adding {inBufferDistance} buffer to {descZone.baseName}. Intermediate: {basename(tempBufferFeature)}", 0, logFile)
-            log.logArcpy('arcpy.Buffer_analysis', (inZoneDataset, tempBufferFeature, inBufferDistance), logFile)
-            arcpy.Buffer_analysis(inZoneDataset, tempBufferFeature, inBufferDistance)
+            with log.logArcpy('arcpy.Buffer_analysis', (inZoneDataset, tempBufferFeature, inBufferDistance), logFile):
+                arcpy.Buffer_analysis(inZoneDataset, tempBufferFeature, inBufferDistance)
         
             inZoneDataset = tempBufferFeature
         
@@ -4448,13 +4552,13 @@ def runPopulationWithinZoneMetrics(toolPath, inReportingUnitFeature, reportingUn
         
             # calculate the population for the reporting unit using zonal statistics as table
             AddMsg(f"{timer.now()} Calculating population within each reporting unit. Intermediate: {basename(popTable_RU)}", 0, logFile)        
-            log.logArcpy('arcpy.sa.ZonalStatisticsAsTable', (inReportingUnitFeature, reportingUnitIdField, inCensusDataset, popTable_RU, "DATA", "SUM"), logFile)
-            arcpy.sa.ZonalStatisticsAsTable(inReportingUnitFeature, reportingUnitIdField, inCensusDataset, popTable_RU, "DATA", "SUM")
+            with log.logArcpy('arcpy.sa.ZonalStatisticsAsTable', (inReportingUnitFeature, reportingUnitIdField, inCensusDataset, popTable_RU, "DATA", "SUM"), logFile):
+                arcpy.sa.ZonalStatisticsAsTable(inReportingUnitFeature, reportingUnitIdField, inCensusDataset, popTable_RU, "DATA", "SUM")
         
             # Rename the population count field.
             outPopField = metricConst.populationCountFieldNames[index]
-            log.logArcpy('arcpy.AlterField_management', (popTable_RU, "SUM", outPopField, outPopField), logFile)
-            arcpy.AlterField_management(popTable_RU, "SUM", outPopField, outPopField)
+            with log.logArcpy('arcpy.AlterField_management', (popTable_RU, "SUM", outPopField, outPopField), logFile):
+                arcpy.AlterField_management(popTable_RU, "SUM", outPopField, outPopField)
         
             # Set variables for the zone population calculations
             index = 1
@@ -4468,8 +4572,8 @@ def runPopulationWithinZoneMetrics(toolPath, inReportingUnitFeature, reportingUn
                 AddMsg(f"{timer.now()} Setting 0 value cells in {descZone.basename} to NoData.", 0, logFile)
                 delimitedVALUE = arcpy.AddFieldDelimiters(inZoneDataset,"VALUE")
                 whereClause = f"{delimitedVALUE} = 0"
-                log.logArcpy('arcpy.sa.SetNull', (inZoneDataset, inZoneDataset, whereClause), logFile)
-                nullGrid = arcpy.sa.SetNull(inZoneDataset, inZoneDataset, whereClause)
+                with log.logArcpy('arcpy.sa.SetNull', (inZoneDataset, inZoneDataset, whereClause), logFile):
+                    nullGrid = arcpy.sa.SetNull(inZoneDataset, inZoneDataset, whereClause)
                 
                 tempName = f"{metricConst.shortName}_{descZone.baseName}_Poly_"
                 tempPolygonFeature = files.nameIntermediateFile([tempName,"FeatureClass"],cleanupList)
@@ -4478,13 +4582,13 @@ def runPopulationWithinZoneMetrics(toolPath, inReportingUnitFeature, reportingUn
                 maxVertices = 250000
                 AddMsg(f"{timer.now()} Converting non-zero cells in {descZone.basename} to a polygon feature. Intermediate: {basename(tempPolygonFeature)}", 0, logFile)
                 try:
-                    log.logArcpy('arcpy.RasterToPolygon_conversion', (nullGrid,tempPolygonFeature,"NO_SIMPLIFY","VALUE","",maxVertices), logFile)
-                    arcpy.RasterToPolygon_conversion(nullGrid,tempPolygonFeature,"NO_SIMPLIFY","VALUE","",maxVertices)
+                    with log.logArcpy('arcpy.RasterToPolygon_conversion', (nullGrid,tempPolygonFeature,"NO_SIMPLIFY","VALUE","",maxVertices), logFile):
+                        arcpy.RasterToPolygon_conversion(nullGrid,tempPolygonFeature,"NO_SIMPLIFY","VALUE","",maxVertices)
                 except:
                     AddMsg(f"{timer.now()} Converting non-zero cells in {descZone.basename} to a polygon feature with maximum vertices technique. Intermediate: {basename(tempPolygonFeature)}", 0, logFile)
                     maxVertices = maxVertices / 2
-                    log.logArcpy('arcpy.RasterToPolygon_conversion', (nullGrid,tempPolygonFeature,"NO_SIMPLIFY","VALUE","",maxVertices), logFile)
-                    arcpy.RasterToPolygon_conversion(nullGrid,tempPolygonFeature,"NO_SIMPLIFY","VALUE","",maxVertices)
+                    with log.logArcpy('arcpy.RasterToPolygon_conversion', (nullGrid,tempPolygonFeature,"NO_SIMPLIFY","VALUE","",maxVertices), logFile):
+                        arcpy.RasterToPolygon_conversion(nullGrid,tempPolygonFeature,"NO_SIMPLIFY","VALUE","",maxVertices)
                 
                 inZoneDataset = tempPolygonFeature
                 descZone = arcpy.Describe(inZoneDataset)
@@ -4497,8 +4601,8 @@ def runPopulationWithinZoneMetrics(toolPath, inReportingUnitFeature, reportingUn
                 AddMsg(f"{timer.now()} Setting non-zone areas to NULL. Replace zone areas with population values.", 0, logFile)
                 delimitedVALUE = arcpy.AddFieldDelimiters(inZoneDataset,"VALUE")
                 whereClause = delimitedVALUE+" = 0"
-                log.logArcpy('arcpy.sa.SetNull', (inZoneDataset, inCensusDataset, whereClause), logFile)
-                inCensusDataset = arcpy.sa.SetNull(inZoneDataset, inCensusDataset, whereClause)
+                with log.logArcpy('arcpy.sa.SetNull', (inZoneDataset, inCensusDataset, whereClause), logFile):
+                    inCensusDataset = arcpy.sa.SetNull(inZoneDataset, inCensusDataset, whereClause)
         
                 if globalConstants.intermediateName in processed:
                     scratchName = arcpy.CreateScratchName(metricConst.zonePopName, "", "RasterDataset")
@@ -4506,8 +4610,8 @@ def runPopulationWithinZoneMetrics(toolPath, inReportingUnitFeature, reportingUn
                     AddMsg(f"{timer.now()} Save intermediate grid complete: {basename(scratchName)}", 0, logFile)
                     
                 AddMsg(f"{timer.now()} Calculating population within zones for each reporting unit. Intermediate: {basename(popTable_ZN)}", 0, logFile)
-                log.logArcpy('arcpy.sa.ZonalStatisticsAsTable', (inReportingUnitFeature, reportingUnitIdField, inCensusDataset, popTable_ZN, "DATA", "SUM"), logFile)
-                arcpy.sa.ZonalStatisticsAsTable(inReportingUnitFeature, reportingUnitIdField, inCensusDataset, popTable_ZN, "DATA", "SUM")
+                with log.logArcpy('arcpy.sa.ZonalStatisticsAsTable', (inReportingUnitFeature, reportingUnitIdField, inCensusDataset, popTable_ZN, "DATA", "SUM"), logFile):
+                    arcpy.sa.ZonalStatisticsAsTable(inReportingUnitFeature, reportingUnitIdField, inCensusDataset, popTable_ZN, "DATA", "SUM")
         
             else: # zone feature is a polygon
                 # Replace the inZoneDataset with a dissolved copy
@@ -4516,13 +4620,13 @@ def runPopulationWithinZoneMetrics(toolPath, inReportingUnitFeature, reportingUn
                 
                 if  groupByZoneYN == "true": # then dissolve by zoneIdField
                     AddMsg(f"{timer.now()} Dissolving {basename(inZoneDataset)} by Zone ID field. Intermediate: {basename(tempDissolveFeature)}", 0, logFile)
-                    log.logArcpy("arcpy.management.Dissolve", (inZoneDataset, tempDissolveFeature, zoneIdField), logFile)
-                    arcpy.management.Dissolve(inZoneDataset, tempDissolveFeature, zoneIdField)
+                    with log.logArcpy("arcpy.management.Dissolve", (inZoneDataset, tempDissolveFeature, zoneIdField), logFile):
+                        arcpy.management.Dissolve(inZoneDataset, tempDissolveFeature, zoneIdField)
         
                 else: # dissolve all
                     AddMsg(f"{timer.now()} Dissolving all zone features. Intermediate: {basename(tempDissolveFeature)}", 0, logFile)
-                    log.logArcpy('arcpy.management.Dissolve', (inZoneDataset, tempDissolveFeature), logFile)
-                    arcpy.management.Dissolve(inZoneDataset, tempDissolveFeature)
+                    with log.logArcpy('arcpy.management.Dissolve', (inZoneDataset, tempDissolveFeature), logFile):
+                        arcpy.management.Dissolve(inZoneDataset, tempDissolveFeature)
         
                 inZoneDataset = tempDissolveFeature
                 
@@ -4530,8 +4634,8 @@ def runPopulationWithinZoneMetrics(toolPath, inReportingUnitFeature, reportingUn
                 tempName = f"{metricConst.shortName}_{fileNameBase}_Identity_"
                 tempPolygonFeature = files.nameIntermediateFile([tempName,"FeatureClass"],cleanupList)
                 AddMsg(f"{timer.now()} Assigning reporting unit IDs to intersecting zone features. Intermediate: {basename(tempPolygonFeature)}", 0, logFile)
-                log.logArcpy('arcpy.Identity_analysis', (inZoneDataset, inReportingUnitFeature, tempPolygonFeature), logFile)
-                arcpy.Identity_analysis(inZoneDataset, inReportingUnitFeature, tempPolygonFeature)
+                with log.logArcpy('arcpy.Identity_analysis', (inZoneDataset, inReportingUnitFeature, tempPolygonFeature), logFile):
+                    arcpy.Identity_analysis(inZoneDataset, inReportingUnitFeature, tempPolygonFeature)
         
                 inReportingUnitFeature = tempPolygonFeature
             
@@ -4543,8 +4647,8 @@ def runPopulationWithinZoneMetrics(toolPath, inReportingUnitFeature, reportingUn
                     tempDissolveName = f"{metricConst.shortName}_{fileNameBase}_IdentityDissolve_"
                     tempDissolveFeature = files.nameIntermediateFile([tempDissolveName,"FeatureClass"],cleanupList)
                     AddMsg(f"{timer.now()} Dissolving Identity features by Zone ID field and Reporting unit ID field. Intermediate: {basename(tempDissolveFeature)}", 0, logFile)
-                    log.logArcpy('arcpy.management.Dissolve', (inReportingUnitFeature, tempDissolveFeature, [zoneIdField, reportingUnitIdField]), logFile)
-                    arcpy.management.Dissolve(inReportingUnitFeature, tempDissolveFeature, [zoneIdField, reportingUnitIdField])
+                    with log.logArcpy('arcpy.management.Dissolve', (inReportingUnitFeature, tempDissolveFeature, [zoneIdField, reportingUnitIdField]), logFile):
+                        arcpy.management.Dissolve(inReportingUnitFeature, tempDissolveFeature, [zoneIdField, reportingUnitIdField])
             
                     inReportingUnitFeature = tempDissolveFeature
             
@@ -4558,31 +4662,31 @@ def runPopulationWithinZoneMetrics(toolPath, inReportingUnitFeature, reportingUn
                         if tempOID not in [f.name for f in arcpy.ListFields(inReportingUnitFeature)]:
                             tempSuccess = 1
                     calcExpression = f'int(!{currentOID}!)'
-                    log.logArcpy('arcpy.CalculateField_management', (inReportingUnitFeature, tempOID, calcExpression, "PYTHON3", "", 'TEXT'), logFile)  
-                    arcpy.CalculateField_management(inReportingUnitFeature, tempOID, calcExpression, "PYTHON3", "", 'TEXT')
+                    with log.logArcpy('arcpy.CalculateField_management', (inReportingUnitFeature, tempOID, calcExpression, "PYTHON3", "", 'TEXT'), logFile):  
+                        arcpy.CalculateField_management(inReportingUnitFeature, tempOID, calcExpression, "PYTHON3", "", 'TEXT')
             
                     AddMsg(f"{timer.now()} Using ZonalStatisticsAsTable for final population counts. Intermediate: {basename(popTable_ZN)}", 0, logFile)
-                    log.logArcpy('arcpy.sa.ZonalStatisticsAsTable', (inReportingUnitFeature, tempOID, inCensusDataset, popTable_ZN, "DATA", "SUM"), logFile)
-                    arcpy.sa.ZonalStatisticsAsTable(inReportingUnitFeature, tempOID, inCensusDataset, popTable_ZN, "DATA", "SUM")
+                    with log.logArcpy('arcpy.sa.ZonalStatisticsAsTable', (inReportingUnitFeature, tempOID, inCensusDataset, popTable_ZN, "DATA", "SUM"), logFile):
+                        arcpy.sa.ZonalStatisticsAsTable(inReportingUnitFeature, tempOID, inCensusDataset, popTable_ZN, "DATA", "SUM")
                     
                     AddMsg(f"{timer.now()} Attaching reporting unit ID field to {basename(popTable_ZN)}.", 0, logFile)
-                    log.logArcpy('arcpy.JoinField_management', (popTable_ZN, tempOID, inReportingUnitFeature, tempOID, [reportingUnitIdField, zoneIdField]), logFile)
-                    arcpy.JoinField_management(popTable_ZN, tempOID, inReportingUnitFeature, tempOID, [reportingUnitIdField, zoneIdField])
+                    with log.logArcpy('arcpy.JoinField_management', (popTable_ZN, tempOID, inReportingUnitFeature, tempOID, [reportingUnitIdField, zoneIdField]), logFile):
+                        arcpy.JoinField_management(popTable_ZN, tempOID, inReportingUnitFeature, tempOID, [reportingUnitIdField, zoneIdField])
                     
                     AddMsg(f"{timer.now()} Joining reporting unit population table ({basename(popTable_RU)}) to the zone population table ({basename(popTable_ZN)}).", 0, logFile)
-                    log.logArcpy('arcpy.JoinField_management', (popTable_ZN, reportingUnitIdField, popTable_RU, reportingUnitIdField, popCntFields[0]), logFile)
-                    arcpy.JoinField_management(popTable_ZN, reportingUnitIdField, popTable_RU, reportingUnitIdField, popCntFields[0])
+                    with log.logArcpy('arcpy.JoinField_management', (popTable_ZN, reportingUnitIdField, popTable_RU, reportingUnitIdField, popCntFields[0]), logFile):
+                        arcpy.JoinField_management(popTable_ZN, reportingUnitIdField, popTable_RU, reportingUnitIdField, popCntFields[0])
                     
                     popTable_RU = popTable_ZN
                 else:
                     AddMsg(f"{timer.now()} Using ZonalStatisticsAsTable for final population counts. Intermediate: {basename(popTable_ZN)}", 0, logFile)
-                    log.logArcpy('arcpy.sa.ZonalStatisticsAsTable', (inReportingUnitFeature, reportingUnitIdField, inCensusDataset, popTable_ZN, "DATA", "SUM"), logFile)
-                    arcpy.sa.ZonalStatisticsAsTable(inReportingUnitFeature, reportingUnitIdField, inCensusDataset, popTable_ZN, "DATA", "SUM")
+                    with log.logArcpy('arcpy.sa.ZonalStatisticsAsTable', (inReportingUnitFeature, reportingUnitIdField, inCensusDataset, popTable_ZN, "DATA", "SUM"), logFile):
+                        arcpy.sa.ZonalStatisticsAsTable(inReportingUnitFeature, reportingUnitIdField, inCensusDataset, popTable_ZN, "DATA", "SUM")
         
             # Rename the population count field.
             outPopField = metricConst.populationCountFieldNames[index]
-            log.logArcpy('arcpy.AlterField_management', (popTable_ZN, "SUM", outPopField, outPopField), logFile)
-            arcpy.AlterField_management(popTable_ZN, "SUM", outPopField, outPopField)
+            with log.logArcpy('arcpy.AlterField_management', (popTable_ZN, "SUM", outPopField, outPopField), logFile):
+                arcpy.AlterField_management(popTable_ZN, "SUM", outPopField, outPopField)
         
             ### End census features are raster ###
         
@@ -4596,16 +4700,16 @@ def runPopulationWithinZoneMetrics(toolPath, inReportingUnitFeature, reportingUn
             tempName = f"{metricConst.shortName}_{descCensus.baseName}_Work_"
             tempCensusFeature = files.nameIntermediateFile([tempName,"FeatureClass"],cleanupList)
             AddMsg(f"{timer.now()} Creating a working copy of {descCensus.baseName}. Intermediate: {basename(tempCensusFeature)}", 0, logFile)
-            log.logArcpy('arcpy.FeatureClassToFeatureClass_conversion',(inCensusDataset,env.workspace,basename(tempCensusFeature),"",fieldMappings),logFile)
-            inCensusDataset = arcpy.FeatureClassToFeatureClass_conversion(inCensusDataset,env.workspace,basename(tempCensusFeature),"",fieldMappings)
+            with log.logArcpy('arcpy.FeatureClassToFeatureClass_conversion',(inCensusDataset,env.workspace,basename(tempCensusFeature),"",fieldMappings),logFile):
+                inCensusDataset = arcpy.FeatureClassToFeatureClass_conversion(inCensusDataset,env.workspace,basename(tempCensusFeature),"",fieldMappings)
         
             # Add a dummy field to the copied census feature class and calculate it to a value of 1.
             classField = "tmpClass"
-            log.logArcpy('arcpy.AddField_management', (inCensusDataset,classField,"SHORT"), logFile)
-            arcpy.AddField_management(inCensusDataset,classField,"SHORT")
+            with log.logArcpy('arcpy.AddField_management', (inCensusDataset,classField,"SHORT"), logFile):
+                arcpy.AddField_management(inCensusDataset,classField,"SHORT")
             
-            log.logArcpy('arcpy.CalculateField_management', (inCensusDataset,classField,1), logFile)
-            arcpy.CalculateField_management(inCensusDataset,classField,1)
+            with log.logArcpy('arcpy.CalculateField_management', (inCensusDataset,classField,1), logFile):
+                arcpy.CalculateField_management(inCensusDataset,classField,1)
         
             # Perform population count calculation for the reporting unit
             AddMsg(f"{timer.now()} Calculating population within reporting units. Intermediate: {basename(popTable_RU)}", 0, logFile)
@@ -4624,8 +4728,8 @@ def runPopulationWithinZoneMetrics(toolPath, inReportingUnitFeature, reportingUn
                 AddMsg(f"{timer.now()} Setting 0 value cells in {descZone.basename} to NoData")
                 delimitedVALUE = arcpy.AddFieldDelimiters(inZoneDataset,"VALUE")
                 whereClause = f"{delimitedVALUE} = 0"
-                log.logArcpy('arcpy.sa.SetNull', (inZoneDataset, 1, whereClause), logFile)
-                nullGrid = arcpy.sa.SetNull(inZoneDataset, 1, whereClause)
+                with log.logArcpy('arcpy.sa.SetNull', (inZoneDataset, 1, whereClause), logFile):
+                    nullGrid = arcpy.sa.SetNull(inZoneDataset, 1, whereClause)
                   
                 tempName = f"{metricConst.shortName}_{descZone.baseName}_Poly_"
                 tempPolygonFeature = files.nameIntermediateFile([tempName,"FeatureClass"],cleanupList)
@@ -4634,13 +4738,13 @@ def runPopulationWithinZoneMetrics(toolPath, inReportingUnitFeature, reportingUn
                 maxVertices = 250000
                 AddMsg(f"{timer.now()} Converting non-zero cells in {descZone.basename} to a polygon feature. Intermediate: {basename(tempPolygonFeature)}", 0, logFile)
                 try:
-                    log.logArcpy('arcpy.RasterToPolygon_conversion', (nullGrid,tempPolygonFeature,"NO_SIMPLIFY","VALUE","",maxVertices), logFile)
-                    arcpy.RasterToPolygon_conversion(nullGrid,tempPolygonFeature,"NO_SIMPLIFY","VALUE","",maxVertices)
+                    with log.logArcpy('arcpy.RasterToPolygon_conversion', (nullGrid,tempPolygonFeature,"NO_SIMPLIFY","VALUE","",maxVertices), logFile):
+                        arcpy.RasterToPolygon_conversion(nullGrid,tempPolygonFeature,"NO_SIMPLIFY","VALUE","",maxVertices)
                 except:
                     AddMsg(f"{timer.now()} Converting non-zero cells in {descZone.basename} to a polygon feature with maximum vertices technique. Intermediate: {basename(tempPolygonFeature)}", 0, logFile)
                     maxVertices = maxVertices / 2
-                    log.logArcpy('arcpy.RasterToPolygon_conversion', (nullGrid,tempPolygonFeature,"NO_SIMPLIFY","VALUE","",maxVertices), logFile)
-                    arcpy.RasterToPolygon_conversion(nullGrid,tempPolygonFeature,"NO_SIMPLIFY","VALUE","",maxVertices)
+                    with log.logArcpy('arcpy.RasterToPolygon_conversion', (nullGrid,tempPolygonFeature,"NO_SIMPLIFY","VALUE","",maxVertices), logFile):
+                        arcpy.RasterToPolygon_conversion(nullGrid,tempPolygonFeature,"NO_SIMPLIFY","VALUE","",maxVertices)
                 
                 inZoneDataset = tempPolygonFeature
                 descZone = arcpy.Describe(inZoneDataset)
@@ -4652,16 +4756,16 @@ def runPopulationWithinZoneMetrics(toolPath, inReportingUnitFeature, reportingUn
                     tempDissolveName = f"{metricConst.shortName}_{fileNameBase}_Dissolve_"
                     tempDissolveFeature = files.nameIntermediateFile([tempDissolveName,"FeatureClass"],cleanupList)
                     AddMsg(f"{timer.now()} Dissolving {basename(inZoneDataset)} by Zone ID field. Intermediate: {basename(tempDissolveFeature)}", 0, logFile)
-                    log.logArcpy('arcpy.management.Dissolve', (inZoneDataset, tempDissolveFeature, zoneIdField), logFile)
-                    arcpy.management.Dissolve(inZoneDataset, tempDissolveFeature, zoneIdField)
+                    with log.logArcpy('arcpy.management.Dissolve', (inZoneDataset, tempDissolveFeature, zoneIdField), logFile):
+                        arcpy.management.Dissolve(inZoneDataset, tempDissolveFeature, zoneIdField)
         
                 ## Else dissolve all (i.e., ignore overlapping polygons)
                 else:
                     tempDissolveName = f"{metricConst.shortName}_{fileNameBase}_Dissolve_"
                     tempDissolveFeature = files.nameIntermediateFile([tempDissolveName,"FeatureClass"],cleanupList)
                     AddMsg(f"{timer.now()} Dissolving {basename(inZoneDataset)}. Intermediate: {basename(tempDissolveFeature)}", 0, logFile)
-                    log.logArcpy('arcpy.management.Dissolve', (inZoneDataset, tempDissolveFeature), logFile)
-                    arcpy.management.Dissolve(inZoneDataset, tempDissolveFeature)
+                    with log.logArcpy('arcpy.management.Dissolve', (inZoneDataset, tempDissolveFeature), logFile):
+                        arcpy.management.Dissolve(inZoneDataset, tempDissolveFeature)
                 
                 ## Set inZoneDataset as the dissolved zone features
                 inZoneDataset = tempDissolveFeature
@@ -4669,11 +4773,11 @@ def runPopulationWithinZoneMetrics(toolPath, inReportingUnitFeature, reportingUn
         
             # Add a field and calculate it to a value of 1. This field will use as the classField in Tabulate Intersection operation below
             classField = "tmpClass"
-            log.logArcpy('arcpy.AddField_management', (inZoneDataset,classField,"LONG"), logFile)
-            arcpy.AddField_management(inZoneDataset,classField,"LONG")
+            with log.logArcpy('arcpy.AddField_management', (inZoneDataset,classField,"LONG"), logFile):
+                arcpy.AddField_management(inZoneDataset,classField,"LONG")
             
-            log.logArcpy('arcpy.CalculateField_management', (inZoneDataset,classField,1), logFile)
-            arcpy.CalculateField_management(inZoneDataset,classField,1)
+            with log.logArcpy('arcpy.CalculateField_management', (inZoneDataset,classField,1), logFile):
+                arcpy.CalculateField_management(inZoneDataset,classField,1)
         
             # intersect the zone polygons with the reporting unit polygons
             fileNameBase = descZone.baseName
@@ -4683,8 +4787,8 @@ def runPopulationWithinZoneMetrics(toolPath, inReportingUnitFeature, reportingUn
             tempPolygonFeature = files.nameIntermediateFile([tempName,"FeatureClass"],cleanupList)
             AddMsg(f"{timer.now()} Assigning reporting unit IDs to {descZone.baseName}. Intermediate: {basename(tempPolygonFeature)}", 0, logFile)
         
-            log.logArcpy('arcpy.Identity_analysis', (inZoneDataset, inReportingUnitFeature, tempPolygonFeature), logFile)
-            arcpy.Identity_analysis(inZoneDataset, inReportingUnitFeature, tempPolygonFeature)
+            with log.logArcpy('arcpy.Identity_analysis', (inZoneDataset, inReportingUnitFeature, tempPolygonFeature), logFile):
+                arcpy.Identity_analysis(inZoneDataset, inReportingUnitFeature, tempPolygonFeature)
         
             ## 
             if  groupByZoneYN == "true":
@@ -4692,8 +4796,8 @@ def runPopulationWithinZoneMetrics(toolPath, inReportingUnitFeature, reportingUn
                 tempDissolveName = f"{metricConst.shortName}_{fileNameBase}_IdentityDissolve_"
                 tempDissolveFeature = files.nameIntermediateFile([tempDissolveName,"FeatureClass"],cleanupList)
                 AddMsg(f"{timer.now()} Dissolving {basename(tempPolygonFeature)} by Zone ID field and Reporting unit ID field. Intermediate: {basename(tempDissolveFeature)}", 0, logFile)
-                log.logArcpy('arcpy.management.Dissolve', (tempPolygonFeature, tempDissolveFeature, [zoneIdField, reportingUnitIdField]), logFile)
-                arcpy.management.Dissolve(tempPolygonFeature, tempDissolveFeature, [zoneIdField, reportingUnitIdField])
+                with log.logArcpy('arcpy.management.Dissolve', (tempPolygonFeature, tempDissolveFeature, [zoneIdField, reportingUnitIdField]), logFile):
+                    arcpy.management.Dissolve(tempPolygonFeature, tempDissolveFeature, [zoneIdField, reportingUnitIdField])
         
                 tempPolygonFeature = tempDissolveFeature
         
@@ -4707,18 +4811,18 @@ def runPopulationWithinZoneMetrics(toolPath, inReportingUnitFeature, reportingUn
                         tempSuccess = 1
                 AddMsg(f"{timer.now()} Creating unique OID field for {basename(tempPolygonFeature)}", 0, logFile)
                 calcExpression = f'int(!{currentOID}!)'
-                log.logArcpy('arcpy.CalculateField_management', (tempPolygonFeature, tempOID, calcExpression, "PYTHON3", "", 'TEXT'), logFile)
-                arcpy.CalculateField_management(tempPolygonFeature, tempOID, calcExpression, "PYTHON3", "", 'TEXT')
+                with log.logArcpy('arcpy.CalculateField_management', (tempPolygonFeature, tempOID, calcExpression, "PYTHON3", "", 'TEXT'), logFile):
+                    arcpy.CalculateField_management(tempPolygonFeature, tempOID, calcExpression, "PYTHON3", "", 'TEXT')
         
                 # Perform population count calculation for second feature class area
                 AddMsg(f"{timer.now()} Calculating population within zone areas for each reporting unit. Intermediate: {basename(popTable_ZN)}", 0, logFile)
                 calculate.getPolygonPopCount(tempPolygonFeature,tempOID,inCensusDataset,inPopField,classField,popTable_ZN,metricConst,index, logFile)
         
-                log.logArcpy('arcpy.JoinField_management', (popTable_ZN, tempOID, tempPolygonFeature, tempOID, [reportingUnitIdField, zoneIdField]), logFile)
-                arcpy.JoinField_management(popTable_ZN, tempOID, tempPolygonFeature, tempOID, [reportingUnitIdField, zoneIdField])
+                with log.logArcpy('arcpy.JoinField_management', (popTable_ZN, tempOID, tempPolygonFeature, tempOID, [reportingUnitIdField, zoneIdField]), logFile):
+                    arcpy.JoinField_management(popTable_ZN, tempOID, tempPolygonFeature, tempOID, [reportingUnitIdField, zoneIdField])
                 
-                log.logArcpy('arcpy.JoinField_management', (popTable_ZN, reportingUnitIdField, popTable_RU, reportingUnitIdField, popCntFields[0]), logFile)
-                arcpy.JoinField_management(popTable_ZN, reportingUnitIdField, popTable_RU, reportingUnitIdField, popCntFields[0])
+                with log.logArcpy('arcpy.JoinField_management', (popTable_ZN, reportingUnitIdField, popTable_RU, reportingUnitIdField, popCntFields[0]), logFile):
+                    arcpy.JoinField_management(popTable_ZN, reportingUnitIdField, popTable_RU, reportingUnitIdField, popCntFields[0])
                 
                 popTable_RU = popTable_ZN
         
@@ -4751,8 +4855,8 @@ def runPopulationWithinZoneMetrics(toolPath, inReportingUnitFeature, reportingUn
             keepFields.append(reportingUnitIdField)
             [fieldMappings.removeFieldMap(fieldMappings.findFieldMapIndex(aFld.name)) for aFld in fieldMappings.fields if aFld.name not in keepFields]
         
-            log.logArcpy('arcpy.TableToTable_conversion', (popTable_RU,os.path.dirname(outTable),basename(outTable),"",fieldMappings), logFile)
-            arcpy.TableToTable_conversion(popTable_RU,os.path.dirname(outTable),basename(outTable),"",fieldMappings)
+            with log.logArcpy('arcpy.TableToTable_conversion', (popTable_RU,os.path.dirname(outTable),basename(outTable),"",fieldMappings), logFile):
+                arcpy.TableToTable_conversion(popTable_RU,os.path.dirname(outTable),basename(outTable),"",fieldMappings)
             
             # Compile a list of fields that will be transferred from the zone population table into the output table
             fromFields = [popCntFields[index]]
@@ -4783,13 +4887,13 @@ def runPopulationWithinZoneMetrics(toolPath, inReportingUnitFeature, reportingUn
                     newFieldMap.addFieldMap(fieldMappings.getFieldMap(i))
         
         
-            log.logArcpy('arcpy.TableToTable_conversion', (popTable_RU,os.path.dirname(outTable),basename(outTable), "", newFieldMap), logFile)
-            arcpy.TableToTable_conversion(popTable_RU,os.path.dirname(outTable),basename(outTable), "", newFieldMap)
+            with log.logArcpy('arcpy.TableToTable_conversion', (popTable_RU,os.path.dirname(outTable),basename(outTable), "", newFieldMap), logFile):
+                arcpy.TableToTable_conversion(popTable_RU,os.path.dirname(outTable),basename(outTable), "", newFieldMap)
         
         
             ## rename count field to include buffer
-            log.logArcpy('arcpy.AlterField_management', (outTable, popCntFields[index], popCntFields[index] + suffix, popCntFields[index] + suffix ), logFile)
-            arcpy.AlterField_management(outTable, popCntFields[index], popCntFields[index] + suffix, popCntFields[index] + suffix )
+            with log.logArcpy('arcpy.AlterField_management', (outTable, popCntFields[index], popCntFields[index] + suffix, popCntFields[index] + suffix ), logFile):
+                arcpy.AlterField_management(outTable, popCntFields[index], popCntFields[index] + suffix, popCntFields[index] + suffix )
         
         
         
@@ -4896,23 +5000,23 @@ def runSelectZonalStatistics(toolPath, inReportingUnitFeature, reportingUnitIdFi
         if len(statsTypeList) == 1: 
         #If only one statistic type is selected process on just the one.
             if statsTypeList[0] == "MAX": 
-                log.logArcpy('arcpy.sa.ZonalStatisticsAsTable', (inReportingUnitFeature, reportingUnitIdField, inValueRaster, outTable, "DATA", 'MAXIMUM'), logFile)
-                arcpy.sa.ZonalStatisticsAsTable(inReportingUnitFeature, reportingUnitIdField, inValueRaster, outTable, "DATA", 'MAXIMUM')
+                with log.logArcpy('arcpy.sa.ZonalStatisticsAsTable', (inReportingUnitFeature, reportingUnitIdField, inValueRaster, outTable, "DATA", 'MAXIMUM'), logFile):
+                    arcpy.sa.ZonalStatisticsAsTable(inReportingUnitFeature, reportingUnitIdField, inValueRaster, outTable, "DATA", 'MAXIMUM')
             elif statsTypeList[0] == "MIN": 
-                log.logArcpy('arcpy.sa.ZonalStatisticsAsTable', (inReportingUnitFeature, reportingUnitIdField, inValueRaster, outTable, "DATA", 'MINIMUM'), logFile)
-                arcpy.sa.ZonalStatisticsAsTable(inReportingUnitFeature, reportingUnitIdField, inValueRaster, outTable, "DATA", 'MINIMUM')
+                with log.logArcpy('arcpy.sa.ZonalStatisticsAsTable', (inReportingUnitFeature, reportingUnitIdField, inValueRaster, outTable, "DATA", 'MINIMUM'), logFile):
+                    arcpy.sa.ZonalStatisticsAsTable(inReportingUnitFeature, reportingUnitIdField, inValueRaster, outTable, "DATA", 'MINIMUM')
             # zone more statement for the percentile
             else:
-                log.logArcpy('arcpy.sa.ZonalStatisticsAsTable', (inReportingUnitFeature, reportingUnitIdField, inValueRaster, outTable, "DATA", statsTypeList[0]), logFile)
-                arcpy.sa.ZonalStatisticsAsTable(inReportingUnitFeature, reportingUnitIdField, inValueRaster, outTable, "DATA", statsTypeList[0])
+                with log.logArcpy('arcpy.sa.ZonalStatisticsAsTable', (inReportingUnitFeature, reportingUnitIdField, inValueRaster, outTable, "DATA", statsTypeList[0]), logFile):
+                    arcpy.sa.ZonalStatisticsAsTable(inReportingUnitFeature, reportingUnitIdField, inValueRaster, outTable, "DATA", statsTypeList[0])
         else: 
-            log.logArcpy('arcpy.sa.ZonalStatisticsAsTable', (inReportingUnitFeature, reportingUnitIdField, inValueRaster, outTable, "DATA", "ALL"), logFile)
-            arcpy.sa.ZonalStatisticsAsTable(inReportingUnitFeature, reportingUnitIdField, inValueRaster, outTable, "DATA", "ALL")
+            with log.logArcpy('arcpy.sa.ZonalStatisticsAsTable', (inReportingUnitFeature, reportingUnitIdField, inValueRaster, outTable, "DATA", "ALL"), logFile):
+                arcpy.sa.ZonalStatisticsAsTable(inReportingUnitFeature, reportingUnitIdField, inValueRaster, outTable, "DATA", "ALL")
         
         # Add Quality Assurance Field "AREA_OVER"
         AddMsg(f"{timer.now()} Adding quality assurance field: 'AREA_OVER'", 0, logFile)
-        log.logArcpy('arcpy.AddField_management', (outTable, metricConst.qaName, globalConstants.defaultIntegerFieldType), logFile)
-        arcpy.AddField_management(outTable, metricConst.qaName, globalConstants.defaultIntegerFieldType)
+        with log.logArcpy('arcpy.AddField_management', (outTable, metricConst.qaName, globalConstants.defaultIntegerFieldType), logFile):
+            arcpy.AddField_management(outTable, metricConst.qaName, globalConstants.defaultIntegerFieldType)
         
         AddMsg(f"{timer.now()} Collecting polygon area values for each Reporting Unit", 0, logFile)
         outputSpatialRef = settings.getOutputSpatialReference(inValueRaster) # Get the raster spatial refernce
@@ -4938,16 +5042,16 @@ def runSelectZonalStatistics(toolPath, inReportingUnitFeature, reportingUnitIdFi
         if len(statsTypeList) > 1 and "ALL" not in statsTypeList: 
             AddMsg(f"{timer.now()} Trimming unnecessary fields", 0, logFile) 
             keepFields2 =  statsTypeList + originalFields[0:5] + [metricConst.qaName]   # Keep basic info fields and user defined statistics
-            log.logArcpy('arcpy.DeleteField_management', (outTable, keepFields2, "KEEP_FIELDS"), logFile)
-            arcpy.DeleteField_management(outTable, keepFields2, "KEEP_FIELDS")
+            with log.logArcpy('arcpy.DeleteField_management', (outTable, keepFields2, "KEEP_FIELDS"), logFile):
+                arcpy.DeleteField_management(outTable, keepFields2, "KEEP_FIELDS")
         
         AddMsg(f"{timer.now()} Updating field names", 0, logFile)
         oldFields = arcpy.ListFields(outTable)
         for field in oldFields: 
             if field.name in metricConst.statisticsFieldNames:
                 newFieldName = f"{fieldPrefix}_{field.name}" 
-                log.logArcpy('arcpy.management.AlterField', (outTable, field.name, newFieldName, newFieldName), logFile)
-                arcpy.management.AlterField(outTable, field.name, newFieldName, newFieldName)
+                with log.logArcpy('arcpy.management.AlterField', (outTable, field.name, newFieldName, newFieldName), logFile):
+                    arcpy.management.AlterField(outTable, field.name, newFieldName, newFieldName)
 
 
         if logFile:
@@ -5021,8 +5125,7 @@ def runNearRoadLandCoverProportions(toolPath, inRoadFeature, inLandCoverGrid, _l
         timer = DateTimer()
         AddMsg(timer.now() + " Setting up environment variables")
         metricsBaseNameList, optionalGroupsList = setupAndRestore.standardSetup(snapRaster,processingCellSize,outWorkspace,
-                                                                               [metricsToRun,optionalFieldGroups], logFile,
-                                                                               inRoadFeature)
+                                                                               [metricsToRun,optionalFieldGroups], logFile)
 
         # Process the Land Cover Classification XML
         lccObj = lcc.LandCoverClassification(lccFilePath)
@@ -5185,8 +5288,8 @@ def runNearRoadLandCoverProportions(toolPath, inRoadFeature, inLandCoverGrid, _l
         
         tempName = "%s_%s" % (metricConst.shortName, '_RoadBuffer')
         finalBuffFeature = files.nameIntermediateFile([tempName,"FeatureClass"],cleanupList)
-        log.logArcpy("arcpy.Dissolve_management",(mergeBuffFeature, finalBuffFeature),logFile)      
-        arcpy.Dissolve_management(mergeBuffFeature, finalBuffFeature)
+        with log.logArcpy("arcpy.Dissolve_management",(mergeBuffFeature, finalBuffFeature),logFile):      
+            arcpy.Dissolve_management(mergeBuffFeature, finalBuffFeature)
         
         
 
@@ -1,7 +1,11 @@
-from . import calculate
-from . import files
-from . import raster
-from . import settings
-from . import tabarea
-from . import table
-from . import vector
+import importlib
+
+# The utility modules below are imported on first use (e.g., ATtILA2.utils.calculate) rather than with the package, as
+# they import arcpy.sa and each other. Submodules not listed are imported as usual, with "from ATtILA2.utils import ..."
+_lazySubmodules = ["calculate", "files", "raster", "settings", "tabarea", "table", "vector"]
+
+
+def __getattr__(name):
+    if name in _lazySubmodules:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
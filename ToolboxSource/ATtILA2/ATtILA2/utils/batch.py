@@ -0,0 +1,250 @@
+""" Utilities for running a long chain of tool steps that can be resumed after a failure
+
+    Each completed step is recorded in a JSON manifest with a fingerprint of its inputs and arguments and the list of
+    outputs it made. When the batch is run again, a step is skipped if its fingerprint is unchanged and its outputs still
+    exist, so a batch that stopped partway resumes at the first step that did not complete. Steps whose dependencies are
+    all complete can run side by side in worker processes (see parallel.runTasks).
+
+"""
+import os
+import json
+import hashlib
+import tempfile
+import traceback
+import arcpy
+
+from . import parallel
+from .messages import AddMsg
+from ATtILA2.datetimeutil import DateTimer
+
+timer = DateTimer()
+
+
+class BatchStep(object):
+    """ One step of a batch: a function, its arguments, and the datasets it reads and writes
+
+    **Description:**
+
+        *function* must be defined at the top level of an importable module so that it can be sent to a worker
+        process. A step counts as complete only if it returns without an exception and every dataset in *outputs*
+        exists afterwards, since the metric tools report their errors as messages rather than raising them. Every
+        step must therefore name at least one output.
+
+    """
+
+    def __init__(self, name, function, arguments, inputs=(), outputs=(), dependsOn=()):
+        """ Constructor - Called when created
+
+            * name - unique name of the step, used as its key in the manifest
+            * function - the function run by the step
+            * arguments - list of arguments for *function*
+            * inputs - datasets and files read by the step, fingerprinted to decide whether it must run again
+            * outputs - datasets the step creates; at least one
+            * dependsOn - names of the steps that must complete before this one starts
+        """
+
+        self.name = name
+        self.function = function
+        self.arguments = list(arguments)
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.dependsOn = list(dependsOn)
+
+
+def getInputFingerprint(dataset):
+    """ Returns a JSON-friendly description of *dataset* that changes when the dataset is replaced
+
+    **Description:**
+
+        Files are described by their modification time and size. Other datasets, such as feature classes and rasters
+        in a geodatabase, are described by their type, extent and, for tables, their row count; the modification
+        times of the files inside a geodatabase change whenever any dataset in it is written, so they cannot tell
+        which dataset changed. Values that are not datasets are used as they are.
+
+    """
+
+    dataset = str(dataset)
+    if os.path.isfile(dataset):
+        fileStat = os.stat(dataset)
+        return [dataset, fileStat.st_mtime_ns, fileStat.st_size]
+
+    if not dataset or not arcpy.Exists(dataset):
+        return [dataset]
+
+    desc = arcpy.Describe(dataset)
+    extent = getattr(desc, "extent", None)
+    fingerprint = [str(desc.catalogPath), desc.dataType]
+    if extent:
+        fingerprint.extend([extent.XMin, extent.YMin, extent.XMax, extent.YMax])
+    try:
+        fingerprint.append(int(arcpy.GetCount_management(dataset).getOutput(0)))
+    except Exception:
+        pass
+
+    return fingerprint
+
+
+def getStepFingerprint(step, dependencyFingerprints):
+    """ Returns a hash of a step's name, arguments, input fingerprints and the fingerprints of the steps it depends on """
+
+    description = [step.name, [repr(argument) for argument in step.arguments],
+                   [getInputFingerprint(dataset) for dataset in step.inputs], dependencyFingerprints]
+
+    return hashlib.sha1(json.dumps(description, default=str).encode("utf-8")).hexdigest()
+
+
+class BatchManifest(object):
+    """ The record of completed batch steps, kept in a JSON file
+
+    **Description:**
+
+        The file is rewritten after every completed step, through a temporary file, so that a crash never leaves a
+        partial manifest behind.
+
+    """
+
+    def __init__(self, fileName):
+        """ Constructor - Called when created
+
+            * fileName - the JSON file. It is created if it does not exist
+        """
+
+        self.fileName = fileName
+        try:
+            with open(fileName) as manifestFile:
+                self.steps = dict(json.load(manifestFile))
+        except (OSError, ValueError, TypeError):
+            self.steps = {}
+
+
+    def isComplete(self, step, fingerprint):
+        """ Returns True if *step* completed with this *fingerprint* and all of its outputs still exist """
+
+        record = self.steps.get(step.name)
+        if not record or record.get("fingerprint") != fingerprint:
+            return False
+
+        return all(arcpy.Exists(output) for output in record.get("outputs", []))
+
+
+    def recordComplete(self, step, fingerprint):
+        """ Records *step* as complete and saves the manifest """
+
+        self.steps[step.name] = {"fingerprint": fingerprint, "outputs": [str(output) for output in step.outputs],
+                                 "completed": timer.now()}
+        self._save()
+
+
+    def _save(self):
+        folder = os.path.dirname(os.path.abspath(self.fileName))
+        fileHandle, tempName = tempfile.mkstemp(suffix=".json", dir=folder)
+        with os.fdopen(fileHandle, "w") as manifestFile:
+            json.dump(self.steps, manifestFile, indent=2)
+        os.replace(tempName, self.fileName)
+
+
+def _outputsExist(step):
+    return all(arcpy.Exists(output) for output in step.outputs)
+
+
+def _runStep(task):
+    function, arguments = task
+    try:
+        function(*arguments)
+    except Exception:
+        return traceback.format_exc()
+
+    return None
+
+
+def _getStepLevels(stepList):
+    """ Groups the steps into levels; the steps of a level depend only on steps of earlier levels """
+
+    stepNames = set(step.name for step in stepList)
+    placed = set()
+    remaining = list(stepList)
+    levels = []
+    while remaining:
+        level = [step for step in remaining if all(name in placed or name not in stepNames for name in step.dependsOn)]
+        if not level:
+            raise ValueError("Batch steps %s depend on each other" % [step.name for step in remaining])
+        levels.append(level)
+        placed.update(step.name for step in level)
+        remaining = [step for step in remaining if step.name not in placed]
+
+    return levels
+
+
+def runBatch(stepList, manifestFile, workerCount=1, initializer=None, initArgs=(), logFile=None):
+    """ Runs the steps of a batch that have not yet completed, recording each one in the manifest as it completes
+
+    **Description:**
+
+        Steps run in the order given, except that, with a *workerCount* above 1, steps whose dependencies are complete
+        run side by side in worker processes. A step whose fingerprint (see getStepFingerprint) and outputs match its
+        manifest record is skipped. When a step fails, the steps already running are allowed to finish and be
+        recorded, and an exception is raised; running the batch again resumes from the failed step. A ValueError is
+        raised before any step runs if a step names no outputs, as its completion could not be checked.
+
+    **Arguments:**
+
+        * *stepList* - list of BatchStep objects
+        * *manifestFile* - path of the JSON manifest
+        * *workerCount* - number of worker processes. 1 runs the steps one after another in the current process
+        * *initializer* - optional function run once in each worker (e.g., to set module globals the steps rely on)
+        * *initArgs* - arguments for *initializer*
+        * *logFile* - CatalogPath and name of the text log file. It can be None
+
+    **Returns:**
+
+        * list - names of the steps that were run, in the order they completed
+
+    """
+
+    noOutputSteps = [step.name for step in stepList if not step.outputs]
+    if noOutputSteps:
+        raise ValueError(f"Batch steps {noOutputSteps} name no outputs, so their completion cannot be checked")
+
+    manifest = BatchManifest(manifestFile)
+    fingerprints = {}
+    stepsRun = []
+
+    for level in _getStepLevels(stepList):
+        pendingSteps = []
+        for step in level:
+            fingerprint = getStepFingerprint(step, [fingerprints.get(name) for name in step.dependsOn])
+            fingerprints[step.name] = fingerprint
+            if manifest.isComplete(step, fingerprint):
+                AddMsg(f"{timer.now()} Skipping {step.name}; it completed with the same inputs.", 0, logFile)
+            else:
+                pendingSteps.append(step)
+
+        failedSteps = []
+
+        def recordResult(position, errorMessage):
+            step = pendingSteps[position]
+            if errorMessage is None and _outputsExist(step):
+                manifest.recordComplete(step, fingerprints[step.name])
+                stepsRun.append(step.name)
+            else:
+                AddMsg(f"Batch step {step.name} failed.\n{errorMessage or 'Its outputs were not created.'}", 2, logFile)
+                failedSteps.append(step.name)
+
+        if workerCount <= 1:
+            # one step at a time, stopping at the first failure
+            for position, step in enumerate(pendingSteps):
+                AddMsg(f"*** Start {step.name} ***", 0, logFile)
+                recordResult(position, _runStep((step.function, step.arguments)))
+                if failedSteps:
+                    break
+        else:
+            for step in pendingSteps:
+                AddMsg(f"*** Start {step.name} ***", 0, logFile)
+            parallel.runTasks(_runStep, [(step.function, step.arguments) for step in pendingSteps], workerCount,
+                              initializer, initArgs, onResult=recordResult)
+
+        if failedSteps:
+            raise RuntimeError(f"Batch steps {failedSteps} failed. Run the batch again to resume from them.")
+
+    return stepsRun
+
@@ -4,6 +4,7 @@
 from ATtILA2.constants import globalConstants
 
 import arcpy
+import numpy as np
 from ATtILA2.setupAndRestore import _tempEnvironment3
 from ATtILA2 import errors
 from ATtILA2.constants import errorConstants
@@ -11,6 +12,12 @@ from . import messages
 from . import files
 from . import vector
 from . import table
+from . import zonematrix
+from . import columnar
+from . import cursors
+from . import zonalhist
+from . import patches
+from . import raster
 from .messages import AddMsg
 from .log import logArcpy
 from os.path import basename
@@ -68,6 +75,10 @@ def landCoverProportions(lccClassesDict, metricsBaseNameList, optionalGroupsList
     **Description:**
 
         Creates *outTable* populated with land cover proportions metrics...
+        
+        The tabulate area table is processed as a single zone by grid value area matrix. Class membership from the
+        lcc file is applied as an indicator matrix, so every class percentage and area, the QA fields, and the per value
+        fields are computed for all reporting units at once (see zonematrix) before the output rows are inserted.
 
     **Arguments:**
 
@@ -102,149 +113,101 @@ def landCoverProportions(lccClassesDict, metricsBaseNameList, optionalGroupsList
 
     """
 
-    try:      
-        # create the cursor to add data to the output table
-        outTableRows = arcpy.InsertCursor(newTable)
-
+    # the whole tabulate area table as a zone by grid value area matrix
+    zoneIdList, classValues, areaMatrix = tabAreaTable.getAreaMatrix()
+    excludedValues = tabAreaTable._excludedValues
+
+    # effective, excluded, and total area of each zone
+    effectiveArea, excludedArea, totalArea = zonematrix.getZoneAreaSums(areaMatrix, classValues, excludedValues)
+
+    # compute every selected metric class percentage and area in one matrix product
+    classValueIdsList = [lccClassesDict[mBaseName].uniqueValueIds for mBaseName in metricsBaseNameList]
+    indicatorMatrix = zonematrix.getClassIndicatorMatrix(classValues, classValueIdsList, excludedValues)
+    metricPercents, metricAreas = zonematrix.getMetricPercentAreasAndSums(areaMatrix, indicatorMatrix, effectiveArea)
+
+    # assemble the output columns as (fieldname, column of values) pairs in the order they will be inserted
+    outColumns = [(outIdField.name, zoneIdList)]
+    for j, mBaseName in enumerate(metricsBaseNameList):
+        outColumns.append((metricsFieldnameDict[mBaseName][0], metricPercents[:, j]))
+
+        if globalConstants.metricAddName in optionalGroupsList:
+            areaSuffix = globalConstants.areaFieldParameters[0]
+            outColumns.append((metricsFieldnameDict[mBaseName][0]+areaSuffix, metricAreas[:, j]))
+
+    # add per value (e.g., capita) calculations
+    zeroCountWarning = 0
+    missingCountWarning = 0
+    if zoneValueDict:
+        zoneValues = zonematrix.lookupZoneValues(zoneIdList, zoneValueDict)
+        perValueCalcs, classSqMs, zeroMask, missingMask = zonematrix.getPerValueCalcs(metricAreas, zoneValues, conversionFactor)
+
+        # get the output field name identifiers     
+        perValueSuffix = metricConst.perCapitaSuffix
+        meterSquaredSuffix = metricConst.meterSquaredSuffix
+
+        for j, mBaseName in enumerate(metricsBaseNameList):
+            outColumns.append((metricsFieldnameDict[mBaseName][1]+perValueSuffix, perValueCalcs[:, j]))
+            outColumns.append((metricsFieldnameDict[mBaseName][1]+meterSquaredSuffix, classSqMs[:, j]))
+
+        # keep track of the troublesome zones: a value of -99999 marks zones with a count value of zero, and a value
+        # of -55555 marks zones that do not overlap the population dataset
+        if metricsBaseNameList:
+            zeroCountWarning = int(zeroMask.sum())
+            missingCountWarning = int(missingMask.sum())
+
+    # add QACheck calculations/values
+    if zoneAreaDict:
         # find the index positions of any non-standard QA fields. Standard QA fields include: OVER, TOTA, EFFA, EXCA.
         # non-standard QA fields include: rTOTA, rEFFA, sTOTA, sEFFA, fTOTA, fEFFA
-        if zoneAreaDict:
-            calcBuffPct = False
-            qaCheckFlds = metricConst.qaCheckFieldParameters
-            for aFldParams in qaCheckFlds:
-                fldName = aFldParams[0]
-                if metricConst.pctBufferName:
-                    if fldName.startswith(metricConst.pctBufferName):
-                        buffIndx = qaCheckFlds.index(aFldParams)  
-                        calcBuffPct = True
-
-                    if fldName.startswith(metricConst.totaPctName):
-                        totaPctIndx = qaCheckFlds.index(aFldParams)
-
-
-                # use else or elif here, if additional non-standard QA fields are added
-
-        # create two sets to store the reporting unit IDs for troublesome per capita polygons: one for where the population 
-        # count in the reporting unit is zero, and one for where the reporting unit does not overlap with the input population dataset. 
-        # Sets will not allow duplicate values so their len() count will only include an RU ID once.
-        zeroCountWarning = set()
-        missingCountWarning = set()
-
-        for tabAreaTableRow in tabAreaTable:
-            tabAreaDict = tabAreaTableRow.tabAreaDict
-            effectiveArea = tabAreaTableRow.effectiveArea
-            excludedValues = tabAreaTableRow._excludedValues
-
-            # initiate a row to add to the metric output table
-            outTableRow = outTableRows.newRow()
-
-            # set the reporting unit id value in the output row
-            outTableRow.setValue(outIdField.name, tabAreaTableRow.zoneIdValue)
-
-            # sum the areas for the selected metric's grid codes   
-            for mBaseName in metricsBaseNameList: 
-                # get the grid codes for this specified metric
-                metricGridCodesList = lccClassesDict[mBaseName].uniqueValueIds
-                # get the class percentage area and it's actual area from the tabulate area table
-                metricPercentageAndArea = getMetricPercentAreaAndSum(metricGridCodesList, tabAreaDict, effectiveArea, excludedValues)
-
-                # add the calculation to the output row
-                outTableRow.setValue(metricsFieldnameDict[mBaseName][0], metricPercentageAndArea[0])
-
-                if globalConstants.metricAddName in optionalGroupsList:
-                    areaSuffix = globalConstants.areaFieldParameters[0]
-                    outTableRow.setValue(metricsFieldnameDict[mBaseName][0]+areaSuffix, metricPercentageAndArea[1])
-
-                # add per value (e.g., capita) calculations to row
-                if zoneValueDict:
-                    classSqM = metricPercentageAndArea[1] * conversionFactor
-
-                    # use a try statement in case the reporting unit does not overlap with the input population dataset
-                    try:
-                        zoneValue = zoneValueDict[tabAreaTableRow.zoneIdValue]
-
-                        # calculate the per capita value
-                        
-                        # Need to go zoneValue >= 1 as dividing with values below 1 assigns more land cover to the individual 
-                        # than exists in the reporting unit. In addition, if the zoneValue is very, very small (e.g. 0.000009),
-                        # the perValueCalc value can be so large that it will not fit in the output field
-                        if zoneValue >= 1:
-                            perValueCalc = classSqM / zoneValue
-                        else:
-                            # set a null value for areas with a count value of zero
-                            perValueCalc = -99999
-                            # keep track of the troublesome zone ID
-                            zeroCountWarning.add(tabAreaTableRow.zoneIdValue)
-
-                    except:
-                        # set a null value for areas that do not overlap the population dataset
-                        perValueCalc = -55555
-                        # keep track of the troublesome zone ID
-                        missingCountWarning.add(tabAreaTableRow.zoneIdValue)
-
-                    # get the output field name identifiers     
-                    perValueSuffix = metricConst.perCapitaSuffix
-                    meterSquaredSuffix = metricConst.meterSquaredSuffix
-
-                    # set the output field values
-                    outTableRow.setValue(metricsFieldnameDict[mBaseName][1]+perValueSuffix, perValueCalc)
-                    outTableRow.setValue(metricsFieldnameDict[mBaseName][1]+meterSquaredSuffix, classSqM)
-
-            # add QACheck calculations/values to row
-            if zoneAreaDict:
-                zoneArea = zoneAreaDict[tabAreaTableRow.zoneIdValue]
-                overlapCalc = ((tabAreaTableRow.totalArea)/zoneArea) * 100
-
-                # process standard QA Fields. Standard QA fields include: OVER, TOTA, EFFA, EXCA.
-                outTableRow.setValue(qaCheckFlds[0][0], overlapCalc)
-                outTableRow.setValue(qaCheckFlds[1][0], tabAreaTableRow.totalArea)
-                outTableRow.setValue(qaCheckFlds[2][0], tabAreaTableRow.effectiveArea)
-                outTableRow.setValue(qaCheckFlds[3][0], tabAreaTableRow.excludedArea)
-
-                # process non-standard QA fields (e.g., rTOTA, rEFFA)
-                if len(qaCheckFlds) > 4:
-                    if calcBuffPct:
-                        if reportingUnitAreaDict:
-                            ruEffectiveArea = reportingUnitAreaDict[tabAreaTableRow.zoneIdValue][1]
-                            ruTotalArea = reportingUnitAreaDict[tabAreaTableRow.zoneIdValue][0]
-                        else:
-                            ruEffectiveArea = zoneAreaDict[tabAreaTableRow.zoneIdValue]
-                            ruTotalArea = ruEffectiveArea
-
-                        # calculate the percentage of effective area in the reporting unit to the effective area of the entire reporting unit
-                        buffEffectiveArea = tabAreaTableRow.effectiveArea
-                        if ruEffectiveArea > 0:
-                            effaPercentCalc = (buffEffectiveArea/ruEffectiveArea) * 100
-                        else:
-                            effaPercentCalc = 0
-                        outTableRow.setValue(qaCheckFlds[buffIndx][0], effaPercentCalc)
+        calcBuffPct = False
+        qaCheckFlds = metricConst.qaCheckFieldParameters
+        for aFldParams in qaCheckFlds:
+            fldName = aFldParams[0]
+            if metricConst.pctBufferName:
+                if fldName.startswith(metricConst.pctBufferName):
+                    buffIndx = qaCheckFlds.index(aFldParams)  
+                    calcBuffPct = True
+
+                if fldName.startswith(metricConst.totaPctName):
+                    totaPctIndx = qaCheckFlds.index(aFldParams)
+
+        zoneAreas = np.array([zoneAreaDict[zoneId] for zoneId in zoneIdList], dtype=np.float64)
+
+        # process standard QA Fields. Standard QA fields include: OVER, TOTA, EFFA, EXCA.
+        outColumns.append((qaCheckFlds[0][0], zonematrix.getPercentage(totalArea, zoneAreas)))
+        outColumns.append((qaCheckFlds[1][0], totalArea))
+        outColumns.append((qaCheckFlds[2][0], effectiveArea))
+        outColumns.append((qaCheckFlds[3][0], excludedArea))
+
+        # process non-standard QA fields (e.g., rTOTA, rEFFA)
+        if len(qaCheckFlds) > 4:
+            if calcBuffPct:
+                if reportingUnitAreaDict:
+                    ruEffectiveArea = np.array([reportingUnitAreaDict[zoneId][1] for zoneId in zoneIdList], dtype=np.float64)
+                    ruTotalArea = np.array([reportingUnitAreaDict[zoneId][0] for zoneId in zoneIdList], dtype=np.float64)
+                else:
+                    ruEffectiveArea = zoneAreas
+                    ruTotalArea = ruEffectiveArea
 
-                        # calculate the percentage of the reporting unit that is in the buffer area
-                        buffTotalArea = tabAreaTableRow.totalArea
-                        totaPercentCalc = (buffTotalArea/ruTotalArea) * 100
-                        outTableRow.setValue(qaCheckFlds[totaPctIndx][0], totaPercentCalc)
+                # calculate the percentage of effective area in the reporting unit to the effective area of the entire reporting unit
+                outColumns.append((qaCheckFlds[buffIndx][0], zonematrix.getPercentage(effectiveArea, ruEffectiveArea)))
 
-                    # use else or elif here, if additional non-standard QA fields are added
+                # calculate the percentage of the reporting unit that is in the buffer area
+                outColumns.append((qaCheckFlds[totaPctIndx][0], zonematrix.getPercentage(totalArea, ruTotalArea)))
 
-            # commit the row to the output table
-            outTableRows.insertRow(outTableRow)
+            # use else or elif here, if additional non-standard QA fields are added
 
-        # report to the user if null values for troublesome reporting units were inserted into the output table 
-        if len(zeroCountWarning) > 0:
-            arcpy.AddWarning("Zero population was found in %s reporting units. A value of -99999 was assigned to the Per Capita fields for those records." % len(zeroCountWarning))        
-        if len(missingCountWarning) > 0:
-            arcpy.AddWarning("Population data was missing for %s reporting units. A value of -55555 was assigned to the Per Capita fields for those records." % len(missingCountWarning)) 
+    # write all rows to the output table in one pass, or all columns at once to a columnar output table
+    columnar.writeColumns(newTable, outColumns)
 
-    finally:
+    # report to the user if null values for troublesome reporting units were inserted into the output table 
+    if zeroCountWarning > 0:
+        arcpy.AddWarning("Zero population was found in %s reporting units. A value of -99999 was assigned to the Per Capita fields for those records." % zeroCountWarning)        
+    if missingCountWarning > 0:
+        arcpy.AddWarning("Population data was missing for %s reporting units. A value of -55555 was assigned to the Per Capita fields for those records." % missingCountWarning) 
 
-        # delete cursor and row objects to remove locks on the data
-        try:
-            del outTableRows
-            del outTableRow
-            del tabAreaTable
-            del tabAreaTableRow
-        except:
-            pass
+    # release the tabulate area table
+    del tabAreaTable
 
 
 # def landCoverProportionsOLD(lccClassesDict, metricsBaseNameList, optionalGroupsList, metricConst, outIdField, newTable, 
@@ -461,7 +424,7 @@ def landCoverCoefficientCalculator(lccValuesDict, metricsBaseNameList, optionalG
 
     try:
         # create the cursor to add data to the output table
-        outTableRows = arcpy.InsertCursor(newTable)        
+        outTableRows = columnar.openInsertCursor(newTable)        
 
         for tabAreaTableRow in tabAreaTable:
 
@@ -497,6 +460,10 @@ def landCoverCoefficientCalculator(lccValuesDict, metricsBaseNameList, optionalG
             # commit the row to the output table
             outTableRows.insertRow(outTableRow)
 
+        # a columnar output table is written once all of its rows are added
+        if isinstance(newTable, columnar.ColumnarTable):
+            newTable.save()
+
     finally:
 
         # delete cursor and row objects to remove locks on the data
@@ -545,8 +512,8 @@ def lineDensityCalculator(inLines,inAreas,areaUID,unitArea,outLines,densityField
     outLines, lineLengthFieldName = vector.splitDissolveMerge(inLines,inAreas,areaUID,outLines,inLengthField,lineClass,logFile)
 
     # Next join the reporting units layer to the merged roads layer
-    logArcpy("arcpy.JoinField_management",(outLines, areaUID.name, inAreas, areaUID.name, [unitArea]),logFile)
-    arcpy.JoinField_management(outLines, areaUID.name, inAreas, areaUID.name, [unitArea])
+    with logArcpy("arcpy.JoinField_management",(outLines, areaUID.name, inAreas, areaUID.name, [unitArea]),logFile):
+        arcpy.JoinField_management(outLines, areaUID.name, inAreas, areaUID.name, [unitArea])
     # Set up a calculation expression for density.
     calcExpression = "!" + lineLengthFieldName + "!/!" + unitArea + "!"
     densityField = vector.addCalculateField(outLines,densityField,"DOUBLE",calcExpression,'#',logFile)
@@ -592,7 +559,7 @@ def landCoverDiversity(metricConst, outIdField, newTable, tabAreaTable, zoneArea
 
     try:      
         # create the cursor to add data to the output table
-        outTableRows = arcpy.InsertCursor(newTable)        
+        outTableRows = columnar.openInsertCursor(newTable)        
 
         for tabAreaTableRow in tabAreaTable:
 
@@ -623,6 +590,10 @@ def landCoverDiversity(metricConst, outIdField, newTable, tabAreaTable, zoneArea
             # commit the row to the output table
             outTableRows.insertRow(outTableRow)
 
+        # a columnar output table is written once all of its rows are added
+        if isinstance(newTable, columnar.ColumnarTable):
+            newTable.save()
+
     finally:
 
         # delete cursor and row objects to remove locks on the data
@@ -738,65 +709,33 @@ def getCoreEdgeRatio(outIdField, newTable, tabAreaTable, metricsFieldnameDict, z
         # Check to see if newTable has already been set up
         rowcount = int(arcpy.GetCount_management(newTable).getOutput(0))
         if rowcount == 0:
-            outTableRows = arcpy.InsertCursor(newTable)
-            for k in CoreEdgeDict.keys():
-                # initiate a row to add to the metric output table
-                outTableRow = outTableRows.newRow()
-
-                # set the reporting unit id value in the output row
-                outTableRow.setValue(outIdField.name, k)
-
-                # commit the row to the output table
-                outTableRows.insertRow(outTableRow)
-            del outTableRows, outTableRow
+            # add a row with the reporting unit id value for each reporting unit
+            cursors.insertRows(newTable, [outIdField.name], [(k,) for k in CoreEdgeDict.keys()])
 
         # assemble the names for the core and edge fields    
         outClassName = metricsFieldnameDict[m][1]
         coreFieldName = metricConst.coreField[0]+outClassName+metricConst.coreField[1]
         edgeFieldName = metricConst.edgeField[0]+outClassName+metricConst.edgeField[1]
-
-        # create the cursor to add data to the output table
-        outTableRows = arcpy.UpdateCursor(newTable)        
-        outTableRow = outTableRows.next()
-        while outTableRow:
-            uid = outTableRow.getValue(outIdField.name)
-            # populate the edge to core ratio for the current reporting unit
-            if (uid in CoreEdgeDict):
-                outTableRow.setValue(metricsFieldnameDict[m][0], CoreEdgeDict[uid][0])
-                outTableRow.setValue(coreFieldName, CoreEdgeDict[uid][1])
-                outTableRow.setValue(edgeFieldName, CoreEdgeDict[uid][2])
-            else:
-                outTableRow.setValue(metricsFieldnameDict[m][0], 0)
-                outTableRow.setValue(coreFieldName, 0)
-                outTableRow.setValue(edgeFieldName, 0)
-
-
-            # add QACheck calculations/values to row
-            if zoneAreaDict:
-                zoneArea = zoneAreaDict[uid]
-                qaCheckFlds = metricConst.qaCheckFieldParameters
-
-                if (uid in CoreEdgeDict):
-                    overlapCalc = ((CoreEdgeDict[uid][3])/zoneArea) * 100
-                    outTableRow.setValue(qaCheckFlds[0][0], overlapCalc)
-                    outTableRow.setValue(qaCheckFlds[1][0], CoreEdgeDict[uid][3])
-                    outTableRow.setValue(qaCheckFlds[2][0], CoreEdgeDict[uid][4])
-                    outTableRow.setValue(qaCheckFlds[3][0], CoreEdgeDict[uid][5])
-                else:
-                    outTableRow.setValue(qaCheckFlds[0][0], 0)
-                    outTableRow.setValue(qaCheckFlds[1][0], 0)
-                    outTableRow.setValue(qaCheckFlds[2][0], 0)
-                    outTableRow.setValue(qaCheckFlds[3][0], 0)                       
-
-            # commit the row to the output table
-            outTableRows.updateRow(outTableRow)
-            outTableRow = outTableRows.next()
+        updateFieldNames = [metricsFieldnameDict[m][0], coreFieldName, edgeFieldName]
+        
+        # the edge to core ratio, percent core, and percent edge of each reporting unit, in updateFieldNames order
+        updateValuesDict = dict((uid, list(results[:3])) for uid, results in CoreEdgeDict.items())
+        
+        # add QACheck calculations/values to the values
+        if zoneAreaDict:
+            qaCheckFlds = metricConst.qaCheckFieldParameters
+            updateFieldNames += [qaFld[0] for qaFld in qaCheckFlds[:4]]
+            for uid, results in CoreEdgeDict.items():
+                overlapCalc = ((results[3])/zoneAreaDict[uid]) * 100
+                updateValuesDict[uid] += [overlapCalc, results[3], results[4], results[5]]
+        
+        # populate the output table; reporting units without land cover values get zeros
+        cursors.updateRowsByKey(newTable, outIdField.name, updateFieldNames, updateValuesDict, 
+                                [0] * len(updateFieldNames))
     finally:
 
-        # delete cursor and row objects to remove locks on the data
+        # release the tabulate area table
         try:
-            del outTableRows
-            del outTableRow
             del tabAreaTable
             del tabAreaTableRow
         except:
@@ -868,102 +807,107 @@ def getPatchNumbers(outIdField, newTable, reportingUnitIdField, metricsFieldname
         # put the proper field delimiters around the ID field name for SQL expressions
         delimitedField = arcpy.AddFieldDelimiters(inReportingUnitFeature, reportingUnitIdField)
 
-        # Initialize custom progress indicator
-        totalRUs = len(zoneAreaDict)
-        loopProgress = messages.loopProgress(totalRUs)
-
-        #For each Reporting Unit run Tabulate Area Analysis and add the results to a dictionary
-        for aZone in zoneAreaDict.keys():
-            # set initial metric values
-            numPatch = 0
-            patchArea = 0
-            otherArea = 0
-            excludedArea = 0
-            lrgPatch = 0
-            avePatch = 0
-            mdnPatch = 0
-            lrgProportion = 0
-            patchDensity = 0
-
-            if isinstance(aZone, int): # reporting unit id is an integer - convert to string for SQL expression
-                squery = f"{delimitedField} = {aZone}"
-            else: # reporting unit id is a string - enclose it in single quotes for SQL expression
-                squery = f"{delimitedField} = '{aZone}'"
-
-            #Create a feature layer of the single reporting unit
-            if arcpy.Exists("subwatersheds_Layer"):
-                # delete the layer in case the geoprocessing overwrite output option is turned off
+        if globalConstants.patchMetricsBackend == globalConstants.numpyBackendName:
+            # summarize the patch raster for every reporting unit in a single pass
+            resultsDict = getPatchResultsFromGrid(zoneAreaDict, metricConst, inReportingUnitFeature, reportingUnitIdField, 
+                                                  inLandCoverGrid, conversionFactor)
+        else:
+            # Initialize custom progress indicator
+            totalRUs = len(zoneAreaDict)
+            loopProgress = messages.loopProgress(totalRUs)
+
+            #For each Reporting Unit run Tabulate Area Analysis and add the results to a dictionary
+            for aZone in zoneAreaDict.keys():
+                # set initial metric values
+                numPatch = 0
+                patchArea = 0
+                otherArea = 0
+                excludedArea = 0
+                lrgPatch = 0
+                avePatch = 0
+                mdnPatch = 0
+                lrgProportion = 0
+                patchDensity = 0
+
+                if isinstance(aZone, int): # reporting unit id is an integer - convert to string for SQL expression
+                    squery = f"{delimitedField} = {aZone}"
+                else: # reporting unit id is a string - enclose it in single quotes for SQL expression
+                    squery = f"{delimitedField} = '{aZone}'"
+
+                #Create a feature layer of the single reporting unit
+                if arcpy.Exists("subwatersheds_Layer"):
+                    # delete the layer in case the geoprocessing overwrite output option is turned off
+                    arcpy.Delete_management("subwatersheds_Layer")
+                arcpy.MakeFeatureLayer_management(inReportingUnitFeature,"subwatersheds_Layer",squery)
+
+                #Set the geoprocessing extent to just the extent of the selected reporting unit
+                selectedRUName = f"selectedRU_{aZone}"
+                arcpy.CopyFeatures_management("subwatersheds_Layer", selectedRUName)
+
+                #Tabulate areas of patches within single reporting unit
+                if arcpy.Exists("temptable"):
+                    # delete the temp table in case the geoprocessing overwrite output option is turned off
+                    arcpy.Delete_management("temptable")
+                tabareaTable = "temptable"
+                arcpy.sa.TabulateArea(selectedRUName, reportingUnitIdField, inLandCoverGrid,"Value", tabareaTable, processingCellSize)
+
+                #Delete the single reporting unit feature layer
                 arcpy.Delete_management("subwatersheds_Layer")
-            arcpy.MakeFeatureLayer_management(inReportingUnitFeature,"subwatersheds_Layer",squery)
+                arcpy.Delete_management(selectedRUName)
 
-            #Set the geoprocessing extent to just the extent of the selected reporting unit
-            selectedRUName = f"selectedRU_{aZone}"
-            arcpy.CopyFeatures_management("subwatersheds_Layer", selectedRUName)
+                rowcount = int(arcpy.GetCount_management(tabareaTable).getOutput(0))
+                if rowcount == 0:
+                    AddMsg(f"No land cover grid data found in {aZone}", 1)
 
-            #Tabulate areas of patches within single reporting unit
-            if arcpy.Exists("temptable"):
-                # delete the temp table in case the geoprocessing overwrite output option is turned off
-                arcpy.Delete_management("temptable")
-            tabareaTable = "temptable"
-            arcpy.sa.TabulateArea(selectedRUName, reportingUnitIdField, inLandCoverGrid,"Value", tabareaTable, processingCellSize)
+                else:
+                    #Loop through each row in the table and calculate the patch metrics 
+                    rows = arcpy.SearchCursor(tabareaTable)
+                    row = rows.next()
 
-            #Delete the single reporting unit feature layer
-            arcpy.Delete_management("subwatersheds_Layer")
-            arcpy.Delete_management(selectedRUName)
+                    while row:
+                        flds = arcpy.ListFields(tabareaTable)
+                        valueFieldsList = [f.name for f in flds if "VALUE" in f.name]
 
-            rowcount = int(arcpy.GetCount_management(tabareaTable).getOutput(0))
-            if rowcount == 0:
-                AddMsg(f"No land cover grid data found in {aZone}", 1)
+                        patchAreaList = [row.getValue(fld) for fld in valueFieldsList if fld not in ignoreFieldList]
 
-            else:
-                #Loop through each row in the table and calculate the patch metrics 
-                rows = arcpy.SearchCursor(tabareaTable)
-                row = rows.next()
-
-                while row:
-                    flds = arcpy.ListFields(tabareaTable)
-                    valueFieldsList = [f.name for f in flds if "VALUE" in f.name]
-
-                    patchAreaList = [row.getValue(fld) for fld in valueFieldsList if fld not in ignoreFieldList]
-
-                    # find the area of the OTHER and EXCLUDED classes if they are found in the reporting unit
-                    try:
-                        otherArea = row.getValue("VALUE_0")
-                    except:
-                        otherArea = 0
-
-                    try:
-                        excludedArea = row.getValue("VALUE__9999")
-                    except:
-                        excludedArea = 0
-
-                    if len(patchAreaList) == 0:
-                        AddMsg(f"No patches found in {aZone}", 1)
-
-                    else: 
-                        numPatch = len(patchAreaList)
-                        patchArea = sum(patchAreaList)
-                        lrgPatch = max(patchAreaList)
-                        mdnPatch = np.median(patchAreaList)
-                        avePatch = patchArea/numPatch
-                        lrgProportion = (lrgPatch/patchArea) * 100
-
-                        #convert to square kilometers
-                        rasterRUArea = otherArea + patchArea
-                        rasterRUAreaKM = rasterRUArea* (conversionFactor/1000000)
-                        patchDensity = numPatch/rasterRUAreaKM         
+                        # find the area of the OTHER and EXCLUDED classes if they are found in the reporting unit
+                        try:
+                            otherArea = row.getValue("VALUE_0")
+                        except:
+                            otherArea = 0
 
-                    row = rows.next()
+                        try:
+                            excludedArea = row.getValue("VALUE__9999")
+                        except:
+                            excludedArea = 0
 
-            resultsDict[aZone] = (lrgProportion,numPatch,avePatch,mdnPatch,patchDensity,lrgPatch,patchArea,otherArea,excludedArea,zoneAreaDict[aZone])
+                        if len(patchAreaList) == 0:
+                            AddMsg(f"No patches found in {aZone}", 1)
 
-            if arcpy.Exists(selectedRUName):
-                arcpy.Delete_management(selectedRUName)
+                        else: 
+                            numPatch = len(patchAreaList)
+                            patchArea = sum(patchAreaList)
+                            lrgPatch = max(patchAreaList)
+                            mdnPatch = np.median(patchAreaList)
+                            avePatch = patchArea/numPatch
+                            lrgProportion = (lrgPatch/patchArea) * 100
 
-            if arcpy.Exists(tabareaTable):
-                arcpy.Delete_management(tabareaTable)
+                            #convert to square kilometers
+                            rasterRUArea = otherArea + patchArea
+                            rasterRUAreaKM = rasterRUArea* (conversionFactor/1000000)
+                            patchDensity = numPatch/rasterRUAreaKM         
+
+                        row = rows.next()
+
+                resultsDict[aZone] = (lrgProportion,numPatch,avePatch,mdnPatch,patchDensity,lrgPatch,patchArea,otherArea,excludedArea,zoneAreaDict[aZone])
+
+                if arcpy.Exists(selectedRUName):
+                    arcpy.Delete_management(selectedRUName)
 
-            loopProgress.update()
+                if arcpy.Exists(tabareaTable):
+                    arcpy.Delete_management(tabareaTable)
+
+                loopProgress.update()
 
         # Restore the original environment extent
         env.extent = _tempEnvironment3
@@ -1051,6 +995,68 @@ def getPatchNumbers(outIdField, newTable, reportingUnitIdField, metricsFieldname
     return resultsDict
 
 
+def getPatchResultsFromGrid(zoneAreaDict, metricConst, inReportingUnitFeature, reportingUnitIdField, inPatchRaster,
+                            conversionFactor, logFile=None):
+    """ Calculates the patch metrics of every reporting unit with one pass over the patch raster
+
+    **Description:**
+
+        The reporting units are rasterized once onto the patch raster grid. Zone and patch raster blocks are then read
+        together and the cell count of every reporting unit/patch pair is accumulated (see patches.ZonePatchCounter).
+        The patch metrics of all reporting units are computed from those counts at once. This replaces the per
+        reporting unit feature layer, copy, and TabulateArea steps of getPatchNumbers and returns the same results.
+
+    **Arguments:**
+
+        * *zoneAreaDict* - dictionary with the area of each reporting unit keyed to its ID value
+        * *metricConst* - an object with constants specific to the metric being run (pm)
+        * *inReportingUnitFeature* - reporting unit polygon feature class
+        * *reportingUnitIdField* - the field holding the reporting unit ID values
+        * *inPatchRaster* - patch raster produced by raster.createPatchRaster
+        * *conversionFactor* - float value to convert area values to square meters
+        * *logFile* - CatalogPath and name of the text log file. It can be None
+
+    **Returns:**
+
+        * dictionary - for each reporting unit ID, the tuple (lrgProportion, numPatch, avePatch, mdnPatch, patchDensity,
+                       lrgPatch, patchArea, otherArea, excludedArea, zoneArea)
+
+    """
+
+    patchRasterObj = arcpy.Raster(inPatchRaster)
+    cellArea = patchRasterObj.meanCellWidth * patchRasterObj.meanCellHeight
+
+    zoneRaster, zoneIdList, oidZoneLookup = raster.getZoneRaster(inReportingUnitFeature, reportingUnitIdField,
+                                                                 patchRasterObj.meanCellWidth, logFile, inPatchRaster)
+
+    counter = patches.ZonePatchCounter()
+    for zoneBlock, patchBlock in raster.iterAlignedBlocks(zoneRaster, inPatchRaster, globalConstants.numpyBlockSize):
+        counter.addBlock(zonalhist.remapZones(zoneBlock, oidZoneLookup), patchBlock, patchRasterObj.noDataValue)
+
+    zones, patchValues, cellCounts = counter.getPairs()
+    stats = patches.getZonePatchStatistics(zones, patchValues, cellCounts, len(zoneIdList), cellArea, 
+                                           metricConst.otherValue, metricConst.excludedValue, conversionFactor)
+
+    zoneIndexDict = dict((zoneId, i) for i, zoneId in enumerate(zoneIdList))
+    resultsDict = {}
+    for aZone in zoneAreaDict.keys():
+        i = zoneIndexDict.get(aZone)
+        if i is None or not stats["hasData"][i]:
+            AddMsg(f"No land cover grid data found in {aZone}", 1)
+            resultsDict[aZone] = (0, 0, 0, 0, 0, 0, 0, 0, 0, zoneAreaDict[aZone])
+            continue
+
+        if stats["numPatch"][i] == 0:
+            AddMsg(f"No patches found in {aZone}", 1)
+
+        resultsDict[aZone] = (float(stats["lrgProportion"][i]), int(stats["numPatch"][i]), float(stats["avePatch"][i]),
+                              float(stats["mdnPatch"][i]), float(stats["patchDensity"][i]), float(stats["lrgPatch"][i]),
+                              float(stats["patchArea"][i]), float(stats["otherArea"][i]), float(stats["excludedArea"][i]),
+                              zoneAreaDict[aZone])
+
+    return resultsDict
+
+
 def getWeightedPopDensity(inReportingUnitFeature,reportingUnitIdField,ruAreaFld,inCensusFeature,inPopField,outTable,
                           metricConst,cleanupList,index,timer,logFile):
     """ Performs a transfer of population from input census features to input reporting unit features using simple
@@ -1242,21 +1248,21 @@ def getPolygonPopCount(inPolygonFeature,inPolygonIdField,inCensusFeature,inPopFi
     """
     # Construct a table with a field containing the area weighted population count for each input polygon unit
     try:
-        logArcpy('arcpy.TabulateIntersection_analysis', (inPolygonFeature,[inPolygonIdField],inCensusFeature,outTable,[classField],[inPopField]), logFile)
-        arcpy.TabulateIntersection_analysis(inPolygonFeature,[inPolygonIdField],inCensusFeature,outTable,[classField],[inPopField])
+        with logArcpy('arcpy.TabulateIntersection_analysis', (inPolygonFeature,[inPolygonIdField],inCensusFeature,outTable,[classField],[inPopField]), logFile):
+            arcpy.TabulateIntersection_analysis(inPolygonFeature,[inPolygonIdField],inCensusFeature,outTable,[classField],[inPopField])
     except:
         raise errors.attilaException(errorConstants.tabulateIntersectionError)
 
     # Rename the population count field.
     outPopField = metricConst.populationCountFieldNames[index]
-    logArcpy('arcpy.AlterField_management', (outTable, inPopField, outPopField, outPopField), logFile)
-    arcpy.AlterField_management(outTable, inPopField, outPopField, outPopField)
+    with logArcpy('arcpy.AlterField_management', (outTable, inPopField, outPopField, outPopField), logFile):
+        arcpy.AlterField_management(outTable, inPopField, outPopField, outPopField)
 
 def replaceNullValues(inTable,inField,newValue,logFile=None):
     # Replace NULL values in a field with the supplied value
     whereClause = inField+" IS NULL"
-    logArcpy("arcpy.UpdateCursor",(inTable, whereClause, "", inField),logFile)
-    updateCursor = arcpy.UpdateCursor(inTable, whereClause, "", inField)
+    with logArcpy("arcpy.UpdateCursor",(inTable, whereClause, "", inField),logFile):
+        updateCursor = arcpy.UpdateCursor(inTable, whereClause, "", inField)
     for updateRow in updateCursor:
         updateRow.setValue(inField, newValue)
         # Persist all of the updates for this row.
@@ -1341,8 +1347,8 @@ def landCoverViews(metricsBaseNameList, metricConst, viewRadius, viewThreshold,
     # view radius buffer
     
     AddMsg(f"{timer.now()} Joining {basename(facilityLCPTable)} to {arcpy.Describe(facilityRUIDTable).baseName} to maintain a record for all facilities.", 0, logFile)
-    logArcpy("arcpy.management.JoinField", (facilityRUIDTable, "OBJECTID", facilityLCPTable, "ORIG_FID"), logFile)
-    arcpy.management.JoinField(facilityRUIDTable, "OBJECTID", facilityLCPTable, "ORIG_FID")
+    with logArcpy("arcpy.management.JoinField", (facilityRUIDTable, "OBJECTID", facilityLCPTable, "ORIG_FID"), logFile):
+        arcpy.management.JoinField(facilityRUIDTable, "OBJECTID", facilityLCPTable, "ORIG_FID")
     
     # Summarizing facilities with low views by Reporting Unit
     stats = []
@@ -1355,8 +1361,8 @@ def landCoverViews(metricsBaseNameList, metricConst, viewRadius, viewThreshold,
     namePrefix = f"{metricConst.statsResultTable}{viewRadius.split()[0]}_"
     statsResultTable = files.nameIntermediateFile([namePrefix,"Dataset"], cleanupList)
     AddMsg(f"{timer.now()} Summarizing facilities with low views by Reporting Unit. Intermediate: {basename(statsResultTable)}", 0, logFile)
-    logArcpy("arcpy.Statistics_analysis",(facilityRUIDTable, statsResultTable, stats, reportingUnitIdField),logFile)
-    arcpy.Statistics_analysis(facilityRUIDTable, statsResultTable, stats, reportingUnitIdField)
+    with logArcpy("arcpy.Statistics_analysis",(facilityRUIDTable, statsResultTable, stats, reportingUnitIdField),logFile):
+        arcpy.Statistics_analysis(facilityRUIDTable, statsResultTable, stats, reportingUnitIdField)
 
 ###  This commented out section can be used if INFO tables are not an option for ATtILA metric tables  ###  
 #    #Rename the fields in the result table
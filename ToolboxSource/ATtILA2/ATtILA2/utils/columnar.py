@@ -0,0 +1,288 @@
+""" Columnar output tables for the ATtILA metric tools
+
+    A ColumnarTable stands in for the geodatabase output table of a metric tool when globalConstants.outputTableBackend
+    is "COLUMNAR". It is given the fields that table.createMetricOutputTable would add, takes the metric values a column
+    at a time (see writeColumns) or a row at a time through an insert cursor (see openInsertCursor), and writes them in
+    one step: to a Parquet or Arrow IPC file next to the output table, and, if globalConstants.columnarExportToGeodatabase
+    is set, to the geodatabase table with one NumPyArrayToTable call. The minimum and maximum of each column are kept as
+    the columns are written, so log.logWriteOutputTableInfo does not read the table back.
+
+"""
+import os
+import collections
+import numpy as np
+import arcpy
+
+from ATtILA2 import errors
+from ATtILA2.constants import globalConstants
+from ATtILA2.constants import errorConstants
+from ATtILA2.utils import cursors
+from ATtILA2.utils.log import logArcpy
+
+# NumPy type of the values of each AddField field type keyword; text fields are sized to their longest value
+_numpyTypes = {"SHORT": np.int16, "LONG": np.int32, "BIGINTEGER": np.int64, "FLOAT": np.float32,
+               "DOUBLE": np.float64, "TEXT": np.str_}
+
+_fileExtensions = {globalConstants.parquetFormatName: ".parquet", globalConstants.arrowFormatName: ".arrow"}
+
+# field of a ColumnarTable, with the properties logged for ArcPy fields
+ColumnField = collections.namedtuple("ColumnField", "name aliasName type length precision scale")
+
+
+def isEnabled():
+    """ Returns True if metric output tables are to be written as ColumnarTables """
+
+    return globalConstants.outputTableBackend == globalConstants.columnarBackendName
+
+
+def getColumnarFileName(outTable, fileFormat):
+    """ Returns the name of the *fileFormat* file written for *outTable*, in the folder of its workspace """
+
+    outTablePath, outTableName = os.path.split(str(outTable))
+    if os.path.splitext(outTablePath)[1].lower() in [".gdb", ".mdb", ".sde"]:
+        outTablePath = os.path.dirname(outTablePath)
+    return os.path.join(outTablePath, os.path.splitext(outTableName)[0] + _fileExtensions[fileFormat])
+
+
+class ColumnarTable(object):
+    """ Metric output table held as columns in memory until it is saved
+
+    **Description:**
+
+        Fields are added with addField in the order they would be added to the geodatabase table. Values are set a
+        whole column at a time with setColumn, or appended a row at a time with the cursor of getInsertCursor; fields
+        given no value are null. save writes the columns and keeps the row count and the minimum and maximum of each
+        numeric column.
+
+    **Arguments:**
+
+        * *outTable* - file name including path for the ATtILA output table
+        * *logFile* - log file object, or None
+
+    """
+
+    def __init__(self, outTable, logFile=None):
+        self.outTable = str(outTable)
+        self.logFile = logFile
+        self.fields = []
+        self.columns = {}
+        self.statistics = {}
+        self.rowCount = 0
+        self.fileName = None
+
+    def __str__(self):
+        return self.outTable
+
+    def _getFieldName(self, fieldName):
+        # field names are not case sensitive, as in a geodatabase
+        for field in self.fields:
+            if field.name.upper() == fieldName.upper():
+                return field.name
+        raise errors.attilaException(f"Field {fieldName} does not exist in {os.path.basename(self.outTable)}")
+
+    def addField(self, fieldName, fieldType, fieldPrecision=None, fieldScale=None, fieldLength=None):
+        """ Adds a field, as AddField_management would; fields that already exist are left as they are """
+
+        if fieldName.upper() in [field.name.upper() for field in self.fields]:
+            return
+        self.fields.append(ColumnField(fieldName, fieldName, fieldType.upper(), fieldLength, fieldPrecision,
+                                       fieldScale))
+        self.columns[fieldName] = [None] * self.rowCount
+
+    def setColumn(self, fieldName, values):
+        """ Sets every value of a field from a list or NumPy array """
+
+        self.columns[self._getFieldName(fieldName)] = values
+        self.rowCount = max(self.rowCount, len(values))
+
+    def appendRow(self, valueDict):
+        """ Adds a row from a dictionary of field name: value; fields not in *valueDict* are null """
+
+        valueDict = dict((self._getFieldName(fieldName), value) for fieldName, value in valueDict.items())
+        for field in self.fields:
+            column = self.columns[field.name]
+            if not isinstance(column, list):
+                column = self.columns[field.name] = list(column)
+            column.append(valueDict.get(field.name))
+        self.rowCount += 1
+
+    def getInsertCursor(self, fieldNames=None):
+        """ Returns a cursor that appends rows, given as sequences in *fieldNames* order or as rows of newRow """
+
+        return _ColumnarInsertCursor(self, fieldNames or [field.name for field in self.fields])
+
+    def getColumnArray(self, field):
+        """ Returns the values of *field* as a NumPy array of its field type; nulls are NaN, or empty text """
+
+        values = self.columns[field.name]
+        if len(values) < self.rowCount:
+            values = list(values) + [None] * (self.rowCount - len(values))
+        numpyType = _numpyTypes.get(field.type, np.float64)
+        if numpyType is np.str_:
+            return np.array(["" if value is None else str(value) for value in values], dtype=np.str_)
+
+        values = np.asarray(values)
+        if values.dtype == object:
+            nulls = np.array([value is None for value in values], dtype=bool)
+            values = np.where(nulls, np.nan, values).astype(np.float64)
+            if nulls.any() and not np.issubdtype(numpyType, np.floating):
+                # integer fields with nulls are kept as floating point, as NumPy integers have no null
+                return values
+        return values.astype(numpyType)
+
+    def save(self):
+        """ Writes the columns to the columnar file and the geodatabase table; returns the name of the file, or None
+
+        **Description:**
+
+            The file is written in globalConstants.columnarFileFormat to the folder of the output table's workspace (see
+            getColumnarFileName). The geodatabase table is written if globalConstants.columnarExportToGeodatabase is
+            set. The row count and the minimum and maximum of each numeric column are kept in *rowCount* and
+            *statistics*.
+
+        """
+
+        arrays = collections.OrderedDict((field.name, self.getColumnArray(field)) for field in self.fields)
+        self.statistics = dict((fieldName, getColumnStatistics(array)) for fieldName, array in arrays.items())
+
+        fileFormat = globalConstants.columnarFileFormat
+        if fileFormat:
+            self.fileName = getColumnarFileName(self.outTable, fileFormat)
+            writeArrowFile(arrays, self.fileName, fileFormat)
+
+        if globalConstants.columnarExportToGeodatabase:
+            if arcpy.env.overwriteOutput and arcpy.Exists(self.outTable):
+                arcpy.Delete_management(self.outTable)
+            with logArcpy("arcpy.da.NumPyArrayToTable", (f"{len(arrays)} columns", self.outTable), self.logFile):
+                arcpy.da.NumPyArrayToTable(getStructuredArray(arrays), self.outTable)
+
+        return self.fileName
+
+
+class _ColumnarRow(object):
+    """ Row of a ColumnarTable insert cursor; values may be set with setValue or as attributes """
+
+    def __init__(self):
+        object.__setattr__(self, "_values", {})
+
+    def setValue(self, fieldName, value):
+        self._values[fieldName] = value
+
+    def getValue(self, fieldName):
+        return self._values.get(fieldName)
+
+    def __setattr__(self, fieldName, value):
+        self.setValue(fieldName, value)
+
+
+class _ColumnarInsertCursor(object):
+    """ Insert cursor of a ColumnarTable, usable as an arcpy.da.InsertCursor or a legacy arcpy.InsertCursor """
+
+    def __init__(self, table, fieldNames):
+        self._table = table
+        self._fieldNames = list(fieldNames)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def newRow(self):
+        return _ColumnarRow()
+
+    def insertRow(self, row):
+        if isinstance(row, _ColumnarRow):
+            self._table.appendRow(row._values)
+        else:
+            self._table.appendRow(dict(zip(self._fieldNames, row)))
+
+
+def getColumnStatistics(array):
+    """ Returns the minimum and maximum of a numeric column, ignoring NaN, or (None, None) """
+
+    if not np.issubdtype(array.dtype, np.number) or not np.isfinite(array).any():
+        return None, None
+    array = array[~np.isnan(array)] if np.issubdtype(array.dtype, np.floating) else array
+    return array.min().item(), array.max().item()
+
+
+def getStructuredArray(arrays):
+    """ Returns a NumPy structured array of the columns in *arrays*, a dictionary of field name: array """
+
+    rowCount = len(next(iter(arrays.values()))) if arrays else 0
+    structured = np.empty(rowCount, dtype=[(fieldName, array.dtype) for fieldName, array in arrays.items()])
+    for fieldName, array in arrays.items():
+        structured[fieldName] = array
+    return structured
+
+
+def writeArrowFile(arrays, fileName, fileFormat):
+    """ Writes the columns in *arrays* to a Parquet or Arrow IPC file in one step
+
+    **Arguments:**
+
+        * *arrays* - dictionary of field name: NumPy array, in field order
+        * *fileName* - name of the file, including path
+        * *fileFormat* - globalConstants.parquetFormatName or globalConstants.arrowFormatName
+
+    **Returns:**
+
+        * None
+
+    """
+
+    try:
+        import pyarrow
+    except ImportError:
+        raise errors.attilaException(errorConstants.pyarrowMissingError)
+
+    arrowTable = pyarrow.table(collections.OrderedDict(arrays))
+    if fileFormat == globalConstants.parquetFormatName:
+        import pyarrow.parquet
+        # Parquet keeps the minimum, maximum and null count of each column in the file's metadata
+        pyarrow.parquet.write_table(arrowTable, fileName, write_statistics=True)
+    else:
+        import pyarrow.feather
+        pyarrow.feather.write_feather(arrowTable, fileName)
+
+
+def openInsertCursor(newTable, fieldNames=None):
+    """ Returns an insert cursor for *newTable*: a ColumnarTable cursor, or an arcpy.da.InsertCursor for *fieldNames*
+        or, with no *fieldNames*, a legacy arcpy.InsertCursor """
+
+    if isinstance(newTable, ColumnarTable):
+        return newTable.getInsertCursor(fieldNames)
+    if fieldNames is None:
+        return arcpy.InsertCursor(newTable)
+    return arcpy.da.InsertCursor(newTable, fieldNames)
+
+
+def writeColumns(newTable, outColumns):
+    """ Writes (field name, column of values) pairs to *newTable*
+
+    **Description:**
+
+        A ColumnarTable is given the columns as they are and saved. A geodatabase table is filled with one insert cursor
+        pass over the rows (see cursors.insertRows).
+
+    **Arguments:**
+
+        * *newTable* - ColumnarTable or geodatabase table
+        * *outColumns* - list of (field name, list or NumPy array of values) pairs of equal length
+
+    **Returns:**
+
+        * None
+
+    """
+
+    if isinstance(newTable, ColumnarTable):
+        for fieldName, values in outColumns:
+            newTable.setColumn(fieldName, values)
+        newTable.save()
+        return
+
+    outFieldNames = [fieldName for fieldName, values in outColumns]
+    outValueLists = [values if isinstance(values, list) else values.tolist() for fieldName, values in outColumns]
+    cursors.insertRows(newTable, outFieldNames, zip(*outValueLists))
@@ -0,0 +1,166 @@
+""" Bulk table reads and writes with arcpy.da cursors
+
+    These functions stand in for the legacy arcpy.SearchCursor, InsertCursor and UpdateCursor with their per field
+    getValue and setValue calls. Rows are read with one arcpy.da.SearchCursor in blocks of up to
+    globalConstants.cursorBlockSize rows, each a NumPy structured array whose fields follow the requested field list, and
+    written with one arcpy.da.InsertCursor or UpdateCursor from sequences in field list order.
+
+"""
+import itertools
+import numpy as np
+import arcpy
+
+from ATtILA2.constants import globalConstants
+
+# NumPy type of the values of each ArcGIS field type; other field types (text, dates, geometry) are read as objects
+_numpyTypes = {"SmallInteger": np.int16, "Integer": np.int32, "BigInteger": np.int64, "OID": np.int64,
+               "Single": np.float32, "Double": np.float64}
+
+
+def getBlockDtype(inTable, fieldNames):
+    """ Returns the NumPy structured array dtype of the row blocks of *inTable* read for *fieldNames*
+
+    **Description:**
+
+        Numeric fields get the NumPy type of their ArcGIS field type, and all other fields, including tokens such as
+        SHAPE@, are read as Python objects. Field names in the dtype are spelled as in *fieldNames*.
+
+    **Arguments:**
+
+        * *inTable* - table, feature class, or layer
+        * *fieldNames* - list of field names
+
+    **Returns:**
+
+        * numpy.dtype
+
+    """
+
+    fieldTypes = dict((f.name.upper(), f.type) for f in arcpy.ListFields(inTable))
+    return np.dtype([(fieldName, _numpyTypes.get(fieldTypes.get(fieldName.upper()), object))
+                     for fieldName in fieldNames])
+
+
+def _toBlock(rows, dtype):
+    """ Returns a list of row tuples as a structured array of *dtype*; integer columns holding nulls become float64,
+        with NaN for null, as NumPy integers have no null """
+
+    columns = list(zip(*rows)) if rows else [()] * len(dtype.names)
+    blockTypes = []
+    for fieldName, column in zip(dtype.names, columns):
+        fieldType = dtype.fields[fieldName][0]
+        if fieldType != object and None in column:
+            fieldType = np.dtype(np.float64)
+        blockTypes.append((fieldName, fieldType))
+
+    block = np.empty(len(rows), dtype=blockTypes)
+    for (fieldName, fieldType), column in zip(blockTypes, columns):
+        # None becomes NaN in floating point columns
+        block[fieldName] = column if fieldType == object else np.array(column, dtype=fieldType)
+    return block
+
+
+def iterRowBlocks(inTable, fieldNames, whereClause=None, blockSize=None):
+    """ Yields the rows of *inTable* as NumPy structured arrays of up to *blockSize* rows
+
+    **Description:**
+
+        The table is read with one arcpy.da.SearchCursor. Each block has the fields of *fieldNames* in that order,
+        typed as in getBlockDtype, except that an integer field with a null value in the block is float64 with NaN for
+        null in that block.
+
+    **Arguments:**
+
+        * *inTable* - table, feature class, or layer
+        * *fieldNames* - list of field names
+        * *whereClause* - optional SQL expression selecting the rows
+        * *blockSize* - number of rows in each block; globalConstants.cursorBlockSize if None
+
+    **Returns:**
+
+        * generator of NumPy structured arrays
+
+    """
+
+    dtype = getBlockDtype(inTable, fieldNames)
+    blockSize = blockSize or globalConstants.cursorBlockSize
+    with arcpy.da.SearchCursor(inTable, fieldNames, whereClause) as cursor:
+        while True:
+            rows = list(itertools.islice(cursor, blockSize))
+            if not rows:
+                return
+            yield _toBlock(rows, dtype)
+
+
+def readRows(inTable, fieldNames, whereClause=None):
+    """ Returns all rows of *inTable* as one NumPy structured array with the fields of *fieldNames* (see
+        iterRowBlocks) """
+
+    blocks = list(iterRowBlocks(inTable, fieldNames, whereClause))
+    if not blocks:
+        return _toBlock([], getBlockDtype(inTable, fieldNames))
+    if len(blocks) == 1:
+        return blocks[0]
+    # blocks differ in type where an integer field holds nulls in some of them
+    dtype = np.dtype([(fieldName, np.result_type(*[block.dtype[i] for block in blocks]))
+                      for i, fieldName in enumerate(blocks[0].dtype.names)])
+    return np.concatenate([block.astype(dtype) for block in blocks])
+
+
+def insertRows(outTable, fieldNames, rows):
+    """ Appends rows to *outTable* with one arcpy.da.InsertCursor
+
+    **Arguments:**
+
+        * *outTable* - table or feature class
+        * *fieldNames* - list of field names
+        * *rows* - NumPy structured array with the fields of *fieldNames* in that order, or an iterable of sequences
+                        of values in *fieldNames* order
+
+    **Returns:**
+
+        * int - the number of rows inserted
+
+    """
+
+    if isinstance(rows, np.ndarray):
+        rows = rows.tolist()
+    rowCount = 0
+    with arcpy.da.InsertCursor(outTable, fieldNames) as cursor:
+        for row in rows:
+            cursor.insertRow(row)
+            rowCount += 1
+    return rowCount
+
+
+def updateRowsByKey(inTable, keyField, fieldNames, valuesByKey, missingValues=None):
+    """ Sets the values of *fieldNames* in each row of *inTable* from the entry of its *keyField* value
+
+    **Description:**
+
+        The table is updated with one arcpy.da.UpdateCursor. Rows whose key is not in *valuesByKey* are given
+        *missingValues*, or are left as they are if *missingValues* is None.
+
+    **Arguments:**
+
+        * *inTable* - table or feature class
+        * *keyField* - field whose values are the keys of *valuesByKey*
+        * *fieldNames* - list of the fields to update
+        * *valuesByKey* - dictionary of key: sequence of values in *fieldNames* order
+        * *missingValues* - sequence of values in *fieldNames* order for rows without an entry, or None
+
+    **Returns:**
+
+        * int - the number of rows updated
+
+    """
+
+    rowCount = 0
+    with arcpy.da.UpdateCursor(inTable, [keyField] + list(fieldNames)) as cursor:
+        for row in cursor:
+            values = valuesByKey.get(row[0], missingValues)
+            if values is None:
+                continue
+            cursor.updateRow([row[0]] + list(values))
+            rowCount += 1
+    return rowCount
@@ -0,0 +1,172 @@
+""" Exact Euclidean distance transforms on NumPy arrays
+
+    The squared distance from every cell to the nearest source cell is found in two separable passes, as described by
+    Felzenszwalb and Huttenlocher: a pass down the columns finds the distance to the nearest source in each column, and
+    a pass along the rows takes the lower envelope of the parabolas rooted at each column. Both passes take time
+    proportional to the number of cells. Each pass loops over one axis and treats every row (or column) of the other
+    axis at once with array operations. Distances are in cells, between cell centers. These routines do not touch
+    arcpy.
+
+"""
+import math
+import numpy as np
+
+# stands in for an infinite squared distance in the envelope pass; larger than any squared distance on a raster block
+_farDistance = 1e20
+
+
+def getColumnDistances(sourceMask):
+    """ Returns the distance, in cells, from each cell to the nearest source cell in its own column
+
+    **Arguments:**
+
+        * *sourceMask* - 2D boolean array, True for source cells
+
+    **Returns:**
+
+        * 2D float array - distances, infinite in columns without a source
+
+    """
+
+    nRows = sourceMask.shape[0]
+    distances = np.where(sourceMask, 0.0, np.inf)
+    for row in range(1, nRows):
+        np.minimum(distances[row], distances[row - 1] + 1, out=distances[row])
+    for row in range(nRows - 2, -1, -1):
+        np.minimum(distances[row], distances[row + 1] + 1, out=distances[row])
+
+    return distances
+
+
+def getRowEnvelopeDistances(squaredDistances):
+    """ Runs the lower envelope pass of the distance transform along every row at once
+
+    **Description:**
+
+        Each column q of a row contributes the parabola (x - q)^2 + f(q), where f holds the squared distances found by
+        getColumnDistances. The squared distance transform of the row is the lower envelope of these parabolas. The
+        envelope of every row is built in one sweep across the columns, keeping a stack of parabolas for each row.
+
+    **Arguments:**
+
+        * *squaredDistances* - 2D float array of squared column distances (f), with _farDistance for no source
+
+    **Returns:**
+
+        * 2D float array - squared distances to the nearest source cell, about _farDistance where there is none
+
+    """
+
+    nRows, nCols = squaredDistances.shape
+    rowIndex = np.arange(nRows)
+    f = squaredDistances
+    positions = np.zeros((nRows, nCols), dtype=np.int64)   # column of each parabola on the stack
+    bounds = np.empty((nRows, nCols + 1), dtype=np.float64) # envelope boundaries between stacked parabolas
+    bounds[:, 0] = -np.inf
+    bounds[:, 1] = np.inf
+    top = np.zeros(nRows, dtype=np.int64)
+
+    for q in range(1, nCols):
+        fq = f[:, q] + q * q
+        while True:
+            v = positions[rowIndex, top]
+            crossing = (fq - (f[rowIndex, v] + v * v)) / (2.0 * (q - v))
+            hidden = crossing <= bounds[rowIndex, top]
+            if not hidden.any():
+                break
+            top[hidden] -= 1
+        top += 1
+        positions[rowIndex, top] = q
+        bounds[rowIndex, top] = crossing
+        bounds[rowIndex, top + 1] = np.inf
+
+    result = np.empty((nRows, nCols), dtype=np.float64)
+    top[:] = 0
+    for q in range(nCols):
+        while True:
+            passed = bounds[rowIndex, top + 1] < q
+            if not passed.any():
+                break
+            top[passed] += 1
+        v = positions[rowIndex, top]
+        result[:, q] = (q - v) ** 2 + f[rowIndex, v]
+
+    return result
+
+
+def getSquaredDistances(sourceMask):
+    """ Returns the exact squared Euclidean distance, in cells, from each cell to the nearest source cell
+
+    **Arguments:**
+
+        * *sourceMask* - 2D boolean array, True for source cells
+
+    **Returns:**
+
+        * 2D float array - squared distances, whole numbers, infinite where the array holds no source
+
+    """
+
+    columnDistances = getColumnDistances(sourceMask)
+    squaredDistances = np.where(np.isinf(columnDistances), _farDistance, columnDistances * columnDistances)
+    result = getRowEnvelopeDistances(squaredDistances)
+    result[result >= _farDistance / 2] = np.inf
+
+    return result
+
+
+def getEdgeHalo(edgeWidth):
+    """ Returns the number of halo cells needed to classify edge cells for an edge of *edgeWidth* cells
+
+        A class cell is an edge cell when a source lies closer than *edgeWidth* + 0.5 cells, so no source further than
+        that many cells along a row or column can matter.
+    """
+
+    return int(math.floor(float(edgeWidth) + 0.5))
+
+
+def getEdgeCoreClasses(classMask, excludedMask, validMask, edgeWidths, halo, codes=(1, 2, 3, 4), noDataValue=0):
+    """ Classifies the cells of a block, inside its halo, as excluded, other, edge, or core for each edge width
+
+    **Description:**
+
+        The block equivalent of raster.getEdgeCoreGrid: class cells within *edgeWidth* + 0.5 cell widths of an other or
+        excluded cell are edge, the remaining class cells are core. NoData cells are not sources, so class cells next
+        to NoData or to the raster boundary are not made edge. One distance transform serves every edge width.
+
+    **Arguments:**
+
+        * *classMask* - 2D boolean array, True for cells of the class of interest, halo included
+        * *excludedMask* - 2D boolean array, True for cells with excluded values
+        * *validMask* - 2D boolean array, True for cells with data within the raster extent
+        * *edgeWidths* - list of edge widths in cells
+        * *halo* - number of halo cells on each side of the block. Must be at least getEdgeHalo of the widest edge
+        * *codes* - output codes for excluded, other, edge, and core cells
+        * *noDataValue* - output code for NoData cells
+
+    **Returns:**
+
+        * dictionary - edge width: 2D integer array of codes for the block without its halo
+
+    """
+
+    excludedCode, otherCode, edgeCode, coreCode = codes
+    squaredDistances = getSquaredDistances(validMask & ~classMask)
+
+    inner = (slice(halo, classMask.shape[0] - halo), slice(halo, classMask.shape[1] - halo))
+    classMask, excludedMask, validMask = classMask[inner], excludedMask[inner], validMask[inner]
+    squaredDistances = squaredDistances[inner]
+
+    baseCodes = np.full(classMask.shape, noDataValue, dtype=np.int32)
+    baseCodes[validMask] = otherCode
+    baseCodes[validMask & excludedMask] = excludedCode
+
+    edgeCoreCodes = {}
+    for edgeWidth in edgeWidths:
+        codesArray = baseCodes.copy()
+        isCore = squaredDistances >= (float(edgeWidth) + 0.5) ** 2
+        codesArray[classMask & validMask] = edgeCode
+        codesArray[classMask & validMask & isCore] = coreCode
+        edgeCoreCodes[edgeWidth] = codesArray
+
+    return edgeCoreCodes
@@ -0,0 +1,337 @@
+""" Focal sums over rectangular and circular neighborhoods
+
+    Rectangular windows are summed with integral images (summed-area tables): once the integral image of a grid is
+    built, the sum of any rectangular window takes four lookups, so the cost per cell does not depend on the window size
+    and one integral image serves every window size. Circular neighborhoods are summed either one neighborhood row at a
+    time or, for large radii, with an FFT convolution, and their cell counts come from lattice point counting. Blocks of
+    a large raster are read with a halo of extra cells on each side, wide enough for the largest neighborhood, which
+    makes the block results identical to a whole grid calculation. These routines do not touch arcpy.
+
+"""
+import os
+import json
+import math
+import tempfile
+import numpy as np
+
+
+def getWindowOffsets(windowSize):
+    """ Returns the number of cells a window of *windowSize* reaches before and after its processing cell
+
+        Odd windows are centered on the processing cell. Even windows reach one cell further before (up or left) the
+        processing cell than after it.
+    """
+
+    windowSize = int(windowSize)
+    after = (windowSize - 1) // 2
+
+    return windowSize - 1 - after, after
+
+
+def getHaloWidth(windowSizes):
+    """ Returns the number of halo cells needed on each side of a block to calculate all of the *windowSizes* """
+
+    return max(max(getWindowOffsets(windowSize)) for windowSize in windowSizes)
+
+
+def getIntegralImage(array, dtype=np.int64):
+    """ Builds the integral image of a 2D array
+
+    **Description:**
+
+        Entry [i, j] of the integral image is the sum of array[:i, :j], so the integral image has one more row and one
+        more column than the array, the first of each being zero.
+
+    **Arguments:**
+
+        * *array* - 2D array (e.g., a 0/1 class indicator)
+        * *dtype* - accumulator type. The default integer type keeps counts exact
+
+    **Returns:**
+
+        * 2D array - the integral image
+
+    """
+
+    nRows, nCols = array.shape
+    integral = np.zeros((nRows + 1, nCols + 1), dtype=dtype)
+    np.cumsum(array, axis=0, dtype=dtype, out=integral[1:, 1:])
+    np.cumsum(integral[1:, 1:], axis=1, out=integral[1:, 1:])
+
+    return integral
+
+
+def getWindowSums(integral, windowSize, halo):
+    """ Returns the sum of the *windowSize* x *windowSize* window around each cell inside the halo of a block
+
+    **Arguments:**
+
+        * *integral* - integral image of the block, halo included (see getIntegralImage)
+        * *windowSize* - number of rows and columns in the window. Its offsets may not exceed *halo*
+        * *halo* - number of halo cells on each side of the block
+
+    **Returns:**
+
+        * 2D array - window sums for the block without its halo
+
+    """
+
+    before, after = getWindowOffsets(windowSize)
+    nRows = integral.shape[0] - 1 - 2 * halo
+    nCols = integral.shape[1] - 1 - 2 * halo
+    top, bottom = halo - before, halo + after + 1
+    left, right = halo - before, halo + after + 1
+
+    return (integral[bottom:bottom + nRows, right:right + nCols] - integral[top:top + nRows, right:right + nCols] -
+            integral[bottom:bottom + nRows, left:left + nCols] + integral[top:top + nRows, left:left + nCols])
+
+
+def getFocalClassSums(valueBlock, insideMask, noDataValue, classValuesDict, windowSizes, halo):
+    """ Counts the cells of each class in windows of each size around every cell inside the halo of a block
+
+    **Description:**
+
+        This is the block equivalent of a FocalStatistics SUM with the NODATA option on a class (1) / other (0) grid:
+        a window that holds a NoData cell yields NoData, while the part of a window that falls beyond the raster extent
+        is simply left out of the count.
+
+    **Arguments:**
+
+        * *valueBlock* - 2D array of grid values (e.g., land cover), halo included
+        * *insideMask* - boolean array, True for the cells of *valueBlock* that lie within the raster extent
+        * *noDataValue* - value of the NoData cells in *valueBlock*. None if the raster has no NoData cells
+        * *classValuesDict* - dictionary of key: collection of grid values counted for the key (e.g., a metric class)
+        * *windowSizes* - list of window sizes (number of rows and columns)
+        * *halo* - number of halo cells on each side of the block. Must be at least getHaloWidth(*windowSizes*)
+
+    **Returns:**
+
+        * dictionary - (key, window size): 2D float array of class counts with NaN where the window holds NoData
+
+    """
+
+    validMask = insideMask if noDataValue is None else insideMask & (valueBlock != noDataValue)
+    noDataIntegral = getIntegralImage(insideMask & ~validMask)
+    noDataWindows = dict((windowSize, getWindowSums(noDataIntegral, windowSize, halo) > 0) for windowSize in windowSizes)
+
+    focalSums = {}
+    for key, classValues in classValuesDict.items():
+        classIntegral = getIntegralImage(np.isin(valueBlock, list(classValues)) & validMask)
+        for windowSize in windowSizes:
+            sums = getWindowSums(classIntegral, windowSize, halo).astype(np.float64)
+            sums[noDataWindows[windowSize]] = np.nan
+            focalSums[(key, windowSize)] = sums
+
+    return focalSums
+
+
+def getCircleHalfWidths(radius):
+    """ Returns the half width, in cells, of each row of a circular neighborhood of *radius* cells
+
+        A cell belongs to the neighborhood when its center lies within *radius* cell widths of the processing cell
+        center (dx * dx + dy * dy <= radius * radius), the rule followed by an NbrCircle neighborhood in CELL units.
+        Row i of the result is the row at offset i - *radius* from the processing cell.
+    """
+
+    radius = int(radius)
+
+    return np.array([math.isqrt(radius * radius - dy * dy) for dy in range(-radius, radius + 1)], dtype=np.int64)
+
+
+def getCircleKernel(radius):
+    """ Returns the circular neighborhood of *radius* cells as a square 0/1 array with the processing cell at its center """
+
+    radius = int(radius)
+    kernel = np.zeros((2 * radius + 1, 2 * radius + 1), dtype=np.float64)
+    for row, halfWidth in enumerate(getCircleHalfWidths(radius)):
+        kernel[row, radius - halfWidth:radius + halfWidth + 1] = 1
+
+    return kernel
+
+
+def getFFTLength(minimumLength):
+    """ Returns the smallest integer >= *minimumLength* whose only prime factors are 2, 3, and 5 (fast FFT sizes) """
+
+    length = max(int(minimumLength), 1)
+    while True:
+        remainder = length
+        for factor in (2, 3, 5):
+            while remainder % factor == 0:
+                remainder //= factor
+        if remainder == 1:
+            return length
+        length += 1
+
+
+def getCircleSumsDirect(indicator, radius, halo):
+    """ Sums a 0/1 array over a circular neighborhood around each cell inside the halo, one neighborhood row at a time
+
+    **Description:**
+
+        Each row of a circular neighborhood is a single run of cells, so with row-wise cumulative sums a neighborhood
+        sum takes two lookups per row. The cost per cell grows with the radius, not with its square.
+
+    **Arguments:**
+
+        * *indicator* - 2D 0/1 array, halo included
+        * *radius* - neighborhood radius in cells. May not exceed *halo*
+        * *halo* - number of halo cells on each side of the block
+
+    **Returns:**
+
+        * 2D integer array - neighborhood sums for the block without its halo
+
+    """
+
+    nRows = indicator.shape[0] - 2 * halo
+    nCols = indicator.shape[1] - 2 * halo
+    rowIntegral = np.zeros((indicator.shape[0], indicator.shape[1] + 1), dtype=np.int64)
+    np.cumsum(indicator, axis=1, dtype=np.int64, out=rowIntegral[:, 1:])
+
+    sums = np.zeros((nRows, nCols), dtype=np.int64)
+    for dy, halfWidth in zip(range(-int(radius), int(radius) + 1), getCircleHalfWidths(radius)):
+        rows = rowIntegral[halo + dy:halo + dy + nRows]
+        sums += rows[:, halo + halfWidth + 1:halo + halfWidth + 1 + nCols] - rows[:, halo - halfWidth:halo - halfWidth + nCols]
+
+    return sums
+
+
+def getCircleSumsFFT(indicator, radius, halo):
+    """ Sums a 0/1 array over a circular neighborhood around each cell inside the halo with an FFT convolution
+
+    **Description:**
+
+        The block is convolved with the neighborhood kernel in the frequency domain. Because the halo is at least as
+        wide as the radius, the cyclic wrap-around of the FFT only reaches halo cells, so the transform needs no padding
+        beyond the next fast FFT length. The cost per cell grows with the logarithm of the block size, whatever the
+        radius. Sums are rounded back to exact integer counts.
+
+    **Arguments:**
+
+        * *indicator* - 2D 0/1 array, halo included
+        * *radius* - neighborhood radius in cells. May not exceed *halo*
+        * *halo* - number of halo cells on each side of the block
+
+    **Returns:**
+
+        * 2D integer array - neighborhood sums for the block without its halo
+
+    """
+
+    radius = int(radius)
+    nRows = indicator.shape[0] - 2 * halo
+    nCols = indicator.shape[1] - 2 * halo
+    fftShape = (getFFTLength(indicator.shape[0]), getFFTLength(indicator.shape[1]))
+
+    spectrum = np.fft.rfft2(indicator.astype(np.float64), fftShape)
+    spectrum *= np.fft.rfft2(getCircleKernel(radius), fftShape)
+    convolved = np.fft.irfft2(spectrum, fftShape)
+    del spectrum
+
+    # the convolution places the sum centered on cell (i, j) at (i + radius, j + radius)
+    return np.rint(convolved[halo + radius:halo + radius + nRows, halo + radius:halo + radius + nCols]).astype(np.int64)
+
+
+def getCircleSumMethod(radius, blockShape, fftCostFactor=0.6):
+    """ Chooses between getCircleSumsDirect and getCircleSumsFFT for a radius and a block shape (halo included)
+
+        The direct sums cost about one pass over the block per neighborhood row (2 * radius + 1 passes); the FFT costs
+        about *fftCostFactor* passes per doubling of the number of cells in the block (measured with numpy.fft). The
+        cheaper of the two is returned.
+    """
+
+    directCost = 2 * int(radius) + 1
+    fftCost = fftCostFactor * math.log2(max(blockShape[0] * blockShape[1], 2))
+
+    return getCircleSumsDirect if directCost <= fftCost else getCircleSumsFFT
+
+
+def countCircleCells(radius, cellSize=None):
+    """ Returns the number of cells in a circular neighborhood by counting lattice points
+
+    **Description:**
+
+        A cell is in the neighborhood when its center lies within the radius of the processing cell center, the rule
+        followed by an NbrCircle neighborhood. For each row of the neighborhood, the number of cell centers within the
+        radius is found with an integer square root, so the count is exact and takes time proportional to the radius.
+
+    **Arguments:**
+
+        * *radius* - radius of the neighborhood, in cells or, if *cellSize* is given, in map units
+        * *cellSize* - cell size for a radius in map units (NbrCircle "MAP" units)
+
+    **Returns:**
+
+        * integer - number of cells in the neighborhood
+
+    """
+
+    radiusInCells = float(radius) / float(cellSize) if cellSize else float(radius)
+    if radiusInCells.is_integer():
+        return int(getCircleHalfWidths(int(radiusInCells)).sum()) * 2 + 2 * int(radiusInCells) + 1
+
+    squaredRadius = radiusInCells * radiusInCells
+    reach = int(math.floor(radiusInCells))
+    return sum(2 * int(math.floor(math.sqrt(squaredRadius - dy * dy))) + 1 for dy in range(-reach, reach + 1))
+
+
+class CircleCellCountMemo(object):
+    """ Circular neighborhood cell counts kept in a JSON file, so each radius is counted only once across runs
+
+    **Description:**
+
+        Counts are keyed by radius and cell size. The file is read once, when the memo is created, and rewritten
+        whenever a new count is added. A file that cannot be read or written only costs the memo its persistence.
+
+    """
+
+    def __init__(self, fileName=None):
+        """ Constructor - Called when created
+
+            * fileName - the JSON file. If None, ATtILA2_circleCellCounts.json in the system temporary folder is used
+        """
+
+        self.fileName = fileName or os.path.join(tempfile.gettempdir(), "ATtILA2_circleCellCounts.json")
+        try:
+            with open(self.fileName) as memoFile:
+                self._counts = dict(json.load(memoFile))
+        except (OSError, ValueError, TypeError):
+            self._counts = {}
+
+
+    def get(self, radius, cellSize=None):
+        """ Returns the number of cells in the circular neighborhood (see countCircleCells) """
+
+        key = f"{float(radius)!r}|{float(cellSize) if cellSize else None!r}"
+        count = self._counts.get(key)
+        if count is None:
+            count = countCircleCells(radius, cellSize)
+            self._counts[key] = count
+            self._save()
+
+        return count
+
+
+    def _save(self):
+        # write to a temporary file first so that a concurrent run never reads a partial file
+        try:
+            fileHandle, tempName = tempfile.mkstemp(suffix=".json", dir=os.path.dirname(os.path.abspath(self.fileName)))
+            with os.fdopen(fileHandle, "w") as memoFile:
+                json.dump(self._counts, memoFile)
+            os.replace(tempName, self.fileName)
+        except OSError:
+            pass
+
+
+# memo objects by file name, so the file is read once per process
+_circleCellCountMemos = {}
+
+
+def getCircleCellCountMemo(fileName=None):
+    """ Returns the CircleCellCountMemo for *fileName*, creating it on first use """
+
+    memo = _circleCellCountMemos.get(fileName)
+    if memo is None:
+        memo = _circleCellCountMemos[fileName] = CircleCellCountMemo(fileName)
+
+    return memo
@@ -19,6 +19,11 @@ import sys
 from . import constants
 import copy
 from glob import glob
+import hmac
+import hashlib
+import pickle
+import secrets
+import tempfile
 from collections import defaultdict
 from xml.dom.minidom import NamedNodeMap
 
@@ -1111,6 +1116,122 @@ class LandCoverCoefficient(object):
     def populateCoefficientValue(self, passedValue):
         self.value = float(passedValue)
      
+# first bytes of a compiled snapshot file; the HMAC-SHA256 signature and the pickled payload follow
+_snapshotMagic = b"ATtILA2 LCC snapshot\n"
+
+
+def _getUserCacheFolder():
+    """ Returns the folder for ATtILA2 caches private to the current user, creating it if needed """
+    
+    if sys.platform == "win32":
+        baseFolder = os.environ.get("LOCALAPPDATA") or os.path.expanduser(os.path.join("~", "AppData", "Local"))
+    else:
+        baseFolder = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser(os.path.join("~", ".cache"))
+    folder = os.path.join(baseFolder, "ATtILA2")
+    os.makedirs(folder, mode=0o700, exist_ok=True)
+    return folder
+
+
+def _getSnapshotSigningKey():
+    """ Returns the user's secret key for signing compiled snapshots, creating it on first use
+    
+    **Description:**
+        
+        The key is random and readable by the user alone, so no one else can write a snapshot that passes 
+        _readSnapshot, even in a shared snapshot folder.
+    
+    """
+    
+    keyFileName = constants.SnapshotKeyFile or os.path.join(_getUserCacheFolder(), "lccSnapshot.key")
+    try:
+        fileHandle = os.open(keyFileName, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        pass
+    else:
+        with os.fdopen(fileHandle, "wb") as keyFile:
+            keyFile.write(secrets.token_bytes(32))
+    
+    with open(keyFileName, "rb") as keyFile:
+        signingKey = keyFile.read()
+    if len(signingKey) < 32:
+        # another run is still writing the key
+        raise ValueError("the snapshot signing key is incomplete")
+    return signingKey
+
+
+def _getSnapshotFileName(lccFilePath, excludeEmptyClasses):
+    """ Returns the path of the compiled snapshot file for an LCC file and class option """
+    
+    folder = constants.SnapshotCacheFolder or _getUserCacheFolder()
+    pathKey = "%s|%s" % (os.path.normcase(os.path.abspath(lccFilePath)), bool(excludeEmptyClasses))
+    return os.path.join(folder, "ATtILA2_lcc_%s.snapshot" % hashlib.sha1(pathKey.encode("utf-8")).hexdigest())
+
+
+def _getSnapshotKey(lccFilePath, excludeEmptyClasses, lccBytes):
+    """ Returns the key that a compiled snapshot must match to stand in for parsing the LCC file
+    
+    **Description:**
+        
+        The key holds the snapshot format version, the absolute path, modification time and size of the file, the 
+        class option and a SHA-256 hash of the file content, so an edited file never matches an old snapshot, even when
+        its modification time is unchanged.
+    
+    """
+    
+    fileStat = os.stat(lccFilePath)
+    return (constants.SnapshotFormatVersion, os.path.normcase(os.path.abspath(lccFilePath)), fileStat.st_mtime_ns, 
+            fileStat.st_size, bool(excludeEmptyClasses), hashlib.sha256(lccBytes).hexdigest())
+
+
+def _signSnapshot(snapshotKey, payload):
+    """ Returns the HMAC-SHA256 signature of a snapshot payload for *snapshotKey*, made with the user's signing key """
+    
+    keyBytes = repr(snapshotKey).encode("utf-8")
+    return hmac.new(_getSnapshotSigningKey(), keyBytes + b"\n" + payload, hashlib.sha256).digest()
+
+
+def _readSnapshot(snapshotFileName, snapshotKey):
+    """ Returns the attribute dictionary stored in a compiled snapshot, or None if it is missing, stale, damaged or not
+        signed with the user's key. The payload is only unpickled once its signature is checked """
+    
+    try:
+        with open(snapshotFileName, "rb") as snapshotFile:
+            content = snapshotFile.read()
+        if not content.startswith(_snapshotMagic):
+            return None
+        signature = content[len(_snapshotMagic):len(_snapshotMagic) + 32]
+        payload = content[len(_snapshotMagic) + 32:]
+        # the signature covers the snapshot key, so a stale snapshot fails the check as well
+        if not hmac.compare_digest(signature, _signSnapshot(snapshotKey, payload)):
+            return None
+        attributes = pickle.loads(payload)
+    except Exception:
+        return None
+    
+    # a snapshot that loads but lacks the parsed parts is treated as damaged
+    if not (isinstance(attributes.get("values"), LandCoverValues) and 
+            isinstance(attributes.get("classes"), LandCoverClasses) and 
+            isinstance(attributes.get("metadata"), LandCoverMetadata)):
+        return None
+    
+    return attributes
+
+
+def _writeSnapshot(snapshotFileName, snapshotKey, attributes):
+    """ Writes a compiled snapshot. A snapshot that cannot be written only costs the next run a parse """
+    
+    try:
+        payload = pickle.dumps(attributes, pickle.HIGHEST_PROTOCOL)
+        signature = _signSnapshot(snapshotKey, payload)
+        # write to a temporary file first so that a concurrent run never reads a partial snapshot
+        fileHandle, tempName = tempfile.mkstemp(suffix=".snapshot", dir=os.path.dirname(snapshotFileName))
+        with os.fdopen(fileHandle, "wb") as snapshotFile:
+            snapshotFile.write(_snapshotMagic + signature + payload)
+        os.replace(tempName, snapshotFileName)
+    except Exception:
+        pass
+
+
 class LandCoverClassificationBase(object):
     """ This class holds all the details about a Land Cover Classification(LCC).
 
@@ -1173,6 +1294,10 @@ class LandCoverClassification(LandCoverClassificationBase):
         This class holds :py:class:`LandCoverClasses`, :py:class:`LandCoverValues` and :py:class:`LandCoverMetadata`
         objects and has helpful methods for extracting information from them.     
         
+        The parsed classification is kept as a compiled snapshot (see constants.SnapshotCacheFolder), so later loads 
+        of an unchanged file skip the XML parse. A snapshot only stands in for the file while the file's path, 
+        modification time, size and content hash all match, and only when it is signed with the user's own key.
+        
     **Arguments:**
         
         * *lccFilePath* - File path to LCC XML file (.xml file extension)
@@ -1226,8 +1351,20 @@ class LandCoverClassification(LandCoverClassificationBase):
         self.__uniqueValueIdsWithExcludes = None
         self.lccFilePath = lccFilePath
         
+        with open(lccFilePath, "rb") as lccFile:
+            lccBytes = lccFile.read()
+        
+        # Use the compiled snapshot of this file when it is still current
+        if constants.SnapshotCacheEnabled:
+            snapshotFileName = _getSnapshotFileName(lccFilePath, excludeEmptyClasses)
+            snapshotKey = _getSnapshotKey(lccFilePath, excludeEmptyClasses, lccBytes)
+            attributes = _readSnapshot(snapshotFileName, snapshotKey)
+            if attributes is not None:
+                self.__dict__.update(attributes)
+                return
+        
         # Load file into DOM
-        lccDocument = minidom.parse(lccFilePath)
+        lccDocument = minidom.parseString(lccBytes)
         
         # Load Values
         valuesNode = lccDocument.getElementsByTagName(constants.XmlElementValues)[0]
@@ -1250,6 +1387,10 @@ class LandCoverClassification(LandCoverClassificationBase):
         
         self.populateClassoverwriteFields()
         
+        if constants.SnapshotCacheEnabled:
+            attributes = dict((name, value) for name, value in self.__dict__.items() if name != "lccFilePath")
+            _writeSnapshot(snapshotFileName, snapshotKey, attributes)
+        
     def getUniqueValueIds(self):
         """  Get a `frozenset`_ containing all unique valueIds in the Land Cover Classification.
          
@@ -16,6 +16,13 @@ AutoSaveFileName = "autoSave.xml"
 TimeInterval = 5000     # 1 sec = 1000 millseconds
 overwriteFieldList = ['caemField', 'flcpField', 'flcvField', 'lcospField', 'lcpField', 'rlcpField', 'splcpField']
 
+# Compiled snapshots of parsed LCC files, so each file is parsed with minidom only once until it changes. Snapshots are
+# signed with a key private to the user and are only unpickled when their signature matches
+SnapshotCacheEnabled = True
+SnapshotCacheFolder = None      # None uses a cache folder private to the user (see lcc._getUserCacheFolder)
+SnapshotKeyFile = None          # None keeps the signing key in the user's cache folder
+SnapshotFormatVersion = 2       # increase when the classes in utils.lcc or the snapshot file layout change
+
 
 # XML Elements
 XmlElementClasses = "classes"
@@ -8,9 +8,7 @@ from ATtILA2.constants import errorConstants
 from datetime import datetime
 from ATtILA2.datetimeutil import DateTimer
 from .messages import AddMsg
-# import pandas
-# from pandas import DataFrame
-from pandas.api.types import is_numeric_dtype
+from . import trace
 from ATtILA2.utils import pandasutil
 
 
@@ -98,6 +96,24 @@ def logWriteOutputTableInfo(newTable, logFile, metricConst):
     logFile.write('\n')
     logFile.write('Table Field Attributes: NAME ; ALIAS ; TYPE ; LENGTH ; PRECISION ; SCALE ; MIN ; MAX \n') # Do we also want MEAN?
     
+    # imported here, as utils.columnar imports this module
+    from .columnar import ColumnarTable
+    if isinstance(newTable, ColumnarTable):
+        # a columnar output table keeps the minimum and maximum of its columns as it writes them
+        for f in newTable.fields:
+            fMin, fMax = newTable.statistics.get(f.name, (None, None))
+            if fMin is None or f.name in metricConst.idFields:
+                fMin = fMax = "NA"
+            logFile.write(f'FIELD: {f.name} ; {f.aliasName} ; {f.type} ; {f.length} ; {f.precision} ; {f.scale} ; {fMin} ; {fMax} \n')
+        logFile.write('\n')
+        logFile.write(f'TABLE ROW COUNT: {newTable.rowCount}\n')
+        if newTable.fileName:
+            logFile.write(f'COLUMNAR FILE: {newTable.fileName}\n')
+        return
+    
+    # pandas is imported on first use, as it takes longer to import than the rest of ATtILA2
+    from pandas.api.types import is_numeric_dtype
+    
     newFields = arcpy.ListFields(newTable)
     #fieldNames = [field.name for field in newFields]
     df = pandasutil.table_to_pd_df(newTable)
@@ -363,7 +379,8 @@ def arcpyLog(function, arguments, fxStr, logFile, logOnly=True):
     """
     
     # perform the arcpy operation
-    result = function(*arguments)
+    with trace.ArcpyCallSpan(fxStr, arguments) as arcpyCall:
+        result = arcpyCall.result = function(*arguments)
     
     if logFile: # record processing step if the user choose LOGFILE in the Additional options
         # parse the arguments tuple into a comma-delimited string enclosed in parentheses
@@ -378,17 +395,20 @@ def arcpyLog(function, arguments, fxStr, logFile, logOnly=True):
 
 
 def logArcpy(fxStr, arguments, logFile, logOnly=True):
-    """ Performs an ArcPy function and writes its syntax as a string to tool history/details and/or a log file.
+    """ Writes the syntax of an ArcPy function as a string to tool history/details and/or a log file.
     
     **Description:**
 
-        Performs an ArcPy operation given the ArcPy function and a tuple of its arguments. The full syntax
-        of the ArcPy command is written to the tool details pane and/or a log file if one is provided. If the 
-        tuple contains only one argument, the argument must end in a comma (e.g., (inReportingUnitFeature,))
+        The full syntax of the ArcPy command is written to the tool details pane and/or a log file if one is 
+        provided. If the tuple contains only one argument, the argument must end in a comma 
+        (e.g., (inReportingUnitFeature,)). Used as a context manager around the ArcPy call it logs, the call is also
+        recorded in the timing trace (see trace.ArcpyCallSpan):
+        
+            with logArcpy("arcpy.sa.EucDistance", (otherGrid,), logFile):
+                distGrid = EucDistance(otherGrid)
         
     **Arguments:**
     
-        * *function* - the ArcPy function without enclosing quotation marks (e.g., arcpy.gp.TabulateArea_sa)
         * *arguments* - a tuple of function arguments
                         If the tuple has only one value (i.e., only one argument), a comma after the value 
                         is necessary in order for Python to handle it as a tuple instead of a string (e.g., (inValue,)) 
@@ -400,7 +420,7 @@ def logArcpy(fxStr, arguments, logFile, logOnly=True):
         
     **Returns:**
 
-        * results of ArcPy function or None if one is not produced
+        * trace.ArcpyCallSpan - context manager that traces the ArcPy call made inside it
         
     """
     
@@ -413,5 +433,4 @@ def logArcpy(fxStr, arguments, logFile, logOnly=True):
         else: # write the ArcPy function with its arguments to the Tool Details pane and to a log file
             AddMsg(f'{timer.now()} {fxStr}{paramStr}', 0, logFile)
     
-    # return result
-    return
\ No newline at end of file
+    return trace.ArcpyCallSpan(fxStr, arguments)
\ No newline at end of file
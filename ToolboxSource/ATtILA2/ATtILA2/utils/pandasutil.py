@@ -1,6 +1,6 @@
 import arcpy
-import pandas as pd
-from pandas import DataFrame
+
+# pandas is imported by each function on first use, as it takes longer to import than the rest of ATtILA2
 
 def fc_to_pd_df(feature_class, field_list):
     """
@@ -9,6 +9,7 @@ def fc_to_pd_df(feature_class, field_list):
     :param field_list: Fields for input.
     :return: Pandas DataFrame object.
     """
+    from pandas import DataFrame
     return DataFrame(
         arcpy.da.FeatureClassToNumPyArray(
             in_table=feature_class,
@@ -22,6 +23,7 @@ def table_to_pd_df(table):
     """Similar to the above function, this turns a table in a gdb to Pandas
     Data Frame for subsequent analysis
     """
+    import pandas as pd
     data = []
     fields = [f.name for f in arcpy.ListFields(table)]
     with arcpy.da.SearchCursor(table,fields) as cursor: 
@@ -0,0 +1,101 @@
+""" Utilities for running independent tasks in a pool of worker processes
+
+    Tasks are handed out one at a time as workers become free, so a worker that draws a few large tasks does not hold up
+    the others: idle workers keep taking the remaining tasks. Results come back in completion order, tagged with the
+    position of their task, and callers sort on that position to get deterministic output.
+
+"""
+import os
+import sys
+import multiprocessing
+
+
+def getWorkerCount(requestedCount=None):
+    """ Returns the number of worker processes to use
+
+    **Arguments:**
+
+        * *requestedCount* - number of workers asked for. None or 0 uses every core but one; 1 means run serially
+
+    **Returns:**
+
+        * integer - number of worker processes, at least 1
+
+    """
+
+    if requestedCount:
+        return max(int(requestedCount), 1)
+
+    return max((os.cpu_count() or 1) - 1, 1)
+
+
+def getWorkerNumber():
+    """ Returns the number (starting at 1) of the current worker process in its pool, or 0 in the main process """
+
+    identity = multiprocessing.current_process()._identity
+    return identity[0] if identity else 0
+
+
+def _getContext():
+    # ArcGIS Pro runs script tools inside ArcGISPro.exe; workers must be started with the Python interpreter instead
+    if sys.platform == 'win32':
+        pythonExe = os.path.join(sys.exec_prefix, 'python.exe')
+        if os.path.exists(pythonExe):
+            multiprocessing.set_executable(pythonExe)
+        return multiprocessing.get_context('spawn')
+
+    return multiprocessing.get_context()
+
+
+def _runIndexedTask(indexedTask):
+    position, workerFunction, task = indexedTask
+    return position, workerFunction(task)
+
+
+def runTasks(workerFunction, taskList, workerCount, initializer=None, initArgs=(), progress=None, onResult=None):
+    """ Runs *workerFunction* on every task of *taskList* in a pool of worker processes
+
+    **Description:**
+
+        Tasks are dispatched one at a time (chunk size 1) in the order given, so callers should list the largest tasks
+        first. *workerFunction* and *initializer* must be defined at the top level of an importable module so that they
+        can be sent to the workers. Each worker runs *initializer* once, before its first task, which is the place to
+        set up per-worker scratch workspaces. With a *workerCount* of 1, the tasks run in the current process and
+        *initializer* is not called.
+
+    **Arguments:**
+
+        * *workerFunction* - function that takes one task and returns its result
+        * *taskList* - list of picklable tasks
+        * *workerCount* - number of worker processes
+        * *initializer* - optional function run once in each worker
+        * *initArgs* - arguments for *initializer*
+        * *progress* - optional object with an update() method (e.g., messages.loopProgress) called after each task
+        * *onResult* - optional function called in the current process with the position and result of each task as
+                       soon as it is done. Its return value is kept in place of the result, so large results (e.g.,
+                       arrays) can be consumed and dropped as they arrive
+
+    **Returns:**
+
+        * list - the result of each task, in the order of *taskList*
+
+    """
+
+    results = [None] * len(taskList)
+
+    if workerCount <= 1 or len(taskList) <= 1:
+        for position, task in enumerate(taskList):
+            result = workerFunction(task)
+            results[position] = onResult(position, result) if onResult else result
+            if progress:
+                progress.update()
+        return results
+
+    indexedTasks = [(position, workerFunction, task) for position, task in enumerate(taskList)]
+    with _getContext().Pool(min(workerCount, len(taskList)), initializer, initArgs) as pool:
+        for position, result in pool.imap_unordered(_runIndexedTask, indexedTasks, chunksize=1):
+            results[position] = onResult(position, result) if onResult else result
+            if progress:
+                progress.update()
+
+    return results
@@ -0,0 +1,333 @@
+""" Utilities for summarizing patch rasters by zone with NumPy
+
+    A patch raster (see raster.createPatchRaster) carries a RegionGroup patch number in every class cell, the other value
+    in non-class cells and the excluded value in excluded cells. Patch numbers are unique across the whole raster, so a
+    patch that straddles two blocks keeps the same number in both and blocks are stitched by simply adding up the cell
+    counts of each zone/patch pair. These routines do not touch arcpy.
+
+"""
+import numpy as np
+
+# zone/patch pairs are packed into a single int64 key: the zone index in the high 32 bits, the patch raster value
+# (shifted to be non-negative) in the low 32 bits
+_PATCH_OFFSET = 2 ** 31
+_ZONE_SHIFT = 2 ** 32
+
+
+class ZonePatchCounter(object):
+    """ Accumulates the number of cells of every patch raster value in every zone, one raster block at a time
+
+    **Description:**
+
+        Only zone/patch pairs that occur are stored, so memory is bounded by the number of distinct pairs rather than
+        by zones x patches. Block results are merged every *mergeEvery* blocks to keep the pending list short.
+
+    """
+
+    def __init__(self, mergeEvery=32):
+        self._keys = np.zeros(0, dtype=np.int64)
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._pending = []
+        self._mergeEvery = mergeEvery
+
+
+    def addBlock(self, zoneBlock, patchBlock, patchNoData=None):
+        """ Adds the cells of one block
+
+        **Arguments:**
+
+            * *zoneBlock* - array of dense zone indexes; negative values are outside of every zone
+            * *patchBlock* - array of patch raster values with the same shape as *zoneBlock*
+            * *patchNoData* - patch raster value that marks NoData cells. These cells are not counted
+
+        """
+
+        zoneBlock = np.asarray(zoneBlock).ravel()
+        patchBlock = np.asarray(patchBlock).ravel()
+
+        keep = zoneBlock >= 0
+        if patchNoData is not None:
+            keep &= patchBlock != patchNoData
+        if not keep.any():
+            return
+
+        keys = zoneBlock[keep].astype(np.int64) * _ZONE_SHIFT + (patchBlock[keep].astype(np.int64) + _PATCH_OFFSET)
+        blockKeys, blockCounts = np.unique(keys, return_counts=True)
+        self._pending.append((blockKeys, blockCounts))
+
+        if len(self._pending) >= self._mergeEvery:
+            self._merge()
+
+
+    def _merge(self):
+        if not self._pending:
+            return
+
+        keys = np.concatenate([self._keys] + [k for k, c in self._pending])
+        counts = np.concatenate([self._counts] + [c for k, c in self._pending])
+        self._keys, inverse = np.unique(keys, return_inverse=True)
+        self._counts = np.bincount(inverse.ravel(), weights=counts, minlength=len(self._keys)).astype(np.int64)
+        self._pending = []
+
+
+    def getPairs(self):
+        """ Returns the zone indexes, patch raster values, and cell counts of every zone/patch pair, sorted by zone """
+
+        self._merge()
+        zones = self._keys // _ZONE_SHIFT
+        patchValues = (self._keys % _ZONE_SHIFT) - _PATCH_OFFSET
+
+        return zones, patchValues, self._counts.copy()
+
+
+def _groupMedian(groups, values, groupCount):
+    """ Median of *values* within each group, matching np.median (mean of the two middle values for even counts) """
+
+    medians = np.zeros(groupCount, dtype=np.float64)
+    if len(values) == 0:
+        return medians
+
+    order = np.lexsort((values, groups))
+    sortedGroups = groups[order]
+    sortedValues = values[order]
+
+    groupSizes = np.bincount(sortedGroups, minlength=groupCount)
+    groupStarts = np.concatenate([[0], np.cumsum(groupSizes)[:-1]])
+    hasValues = groupSizes > 0
+
+    lowIndex = groupStarts + (groupSizes - 1) // 2
+    highIndex = groupStarts + groupSizes // 2
+    medians[hasValues] = (sortedValues[lowIndex[hasValues]] + sortedValues[highIndex[hasValues]]) / 2.0
+
+    return medians
+
+
+def getZonePatchStatistics(zones, patchValues, cellCounts, zoneCount, cellArea, otherValue, excludedValue,
+                           conversionFactor):
+    """ Computes the patch metrics of every zone from its zone/patch cell counts
+
+    **Description:**
+
+        Mirrors the per reporting unit calculation of calculate.getPatchNumbers. A patch is any patch raster value
+        other than *otherValue* and *excludedValue* with at least one cell in the zone; the area of a patch is the area
+        of its cells inside the zone.
+
+    **Arguments:**
+
+        * *zones* - zone index of each zone/patch pair
+        * *patchValues* - patch raster value of each pair
+        * *cellCounts* - number of cells of each pair
+        * *zoneCount* - number of zones
+        * *cellArea* - area of a single cell
+        * *otherValue* - patch raster value of non-class cells (e.g., 0)
+        * *excludedValue* - patch raster value of excluded cells (e.g., -9999)
+        * *conversionFactor* - float value to convert area values to square meters
+
+    **Returns:**
+
+        * dictionary of 1D arrays, one value per zone, keyed by: numPatch, patchArea, lrgPatch, mdnPatch, avePatch,
+          lrgProportion, patchDensity, otherArea, excludedArea, hasData
+
+    """
+
+    zones = np.asarray(zones, dtype=np.int64)
+    patchValues = np.asarray(patchValues)
+    areas = np.asarray(cellCounts, dtype=np.float64) * cellArea
+
+    isOther = patchValues == otherValue
+    isExcluded = patchValues == excludedValue
+    isPatch = ~(isOther | isExcluded)
+
+    otherArea = np.bincount(zones[isOther], weights=areas[isOther], minlength=zoneCount)
+    excludedArea = np.bincount(zones[isExcluded], weights=areas[isExcluded], minlength=zoneCount)
+    hasData = np.bincount(zones, minlength=zoneCount) > 0
+
+    patchZones = zones[isPatch]
+    patchAreas = areas[isPatch]
+    numPatch = np.bincount(patchZones, minlength=zoneCount)
+    patchArea = np.bincount(patchZones, weights=patchAreas, minlength=zoneCount)
+
+    lrgPatch = np.zeros(zoneCount, dtype=np.float64)
+    if len(patchZones):
+        np.maximum.at(lrgPatch, patchZones, patchAreas)
+    mdnPatch = _groupMedian(patchZones, patchAreas, zoneCount)
+
+    withPatches = numPatch > 0
+    avePatch = np.zeros(zoneCount, dtype=np.float64)
+    lrgProportion = np.zeros(zoneCount, dtype=np.float64)
+    patchDensity = np.zeros(zoneCount, dtype=np.float64)
+
+    avePatch[withPatches] = patchArea[withPatches] / numPatch[withPatches]
+    lrgProportion[withPatches] = (lrgPatch[withPatches] / patchArea[withPatches]) * 100
+
+    # convert to square kilometers
+    rasterRUAreaKM = (otherArea + patchArea) * (conversionFactor / 1000000)
+    patchDensity[withPatches] = numPatch[withPatches] / rasterRUAreaKM[withPatches]
+
+    return {"numPatch": numPatch,
+            "patchArea": patchArea,
+            "lrgPatch": lrgPatch,
+            "mdnPatch": mdnPatch,
+            "avePatch": avePatch,
+            "lrgProportion": lrgProportion,
+            "patchDensity": patchDensity,
+            "otherArea": otherArea,
+            "excludedArea": excludedArea,
+            "hasData": hasData}
+
+
+def getPatchEdgeCells(zoneBlock, patchBlock, otherValue, excludedValue, patchNoData=None, halo=1):
+    """ Finds the patch cells on the edge of their zone/patch region inside a block read with a halo
+
+    **Description:**
+
+        A cell is an edge cell if any of its four neighbors belongs to a different zone or patch. The distance between
+        two regions is always reached between edge cells, so only these need to be placed in the search tree. Cells in
+        the halo are only used as neighbors.
+
+    **Arguments:**
+
+        * *zoneBlock* - array of dense zone indexes; negative values are outside of every zone
+        * *patchBlock* - array of patch raster values with the same shape as *zoneBlock*
+        * *otherValue* - patch raster value of non-class cells (e.g., 0)
+        * *excludedValue* - patch raster value of excluded cells (e.g., -9999)
+        * *patchNoData* - patch raster value that marks NoData cells
+        * *halo* - number of rows and columns on each side of the block that belong to neighboring blocks (at least 1)
+
+    **Returns:**
+
+        * 1D arrays - row and column (relative to the first cell inside the halo), zone index, and patch value of each
+          edge cell
+
+    """
+
+    zoneBlock = np.asarray(zoneBlock)
+    patchBlock = np.asarray(patchBlock)
+
+    isPatch = (zoneBlock >= 0) & (patchBlock != otherValue) & (patchBlock != excludedValue)
+    if patchNoData is not None:
+        isPatch &= patchBlock != patchNoData
+
+    inner = (slice(halo, zoneBlock.shape[0] - halo), slice(halo, zoneBlock.shape[1] - halo))
+    isEdge = np.zeros(zoneBlock.shape, dtype=bool)
+    for rowShift, colShift in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+        neighbor = (slice(halo + rowShift, zoneBlock.shape[0] - halo + rowShift), 
+                    slice(halo + colShift, zoneBlock.shape[1] - halo + colShift))
+        isEdge[inner] |= ((zoneBlock[neighbor] != zoneBlock[inner]) | (patchBlock[neighbor] != patchBlock[inner]) |
+                          ~isPatch[neighbor])
+    isEdge &= isPatch
+
+    rows, cols = np.nonzero(isEdge[inner])
+
+    return rows, cols, zoneBlock[inner][rows, cols], patchBlock[inner][rows, cols]
+
+
+def _cellGap(dx, dy, cellWidth, cellHeight):
+    """ Shortest distance between two cells given the distance between their centers """
+
+    return np.hypot(np.maximum(np.abs(dx) - cellWidth, 0), np.maximum(np.abs(dy) - cellHeight, 0))
+
+
+def getMeanNearestPatchDistances(zones, patchValues, x, y, zoneCount, cellWidth, cellHeight, firstK=8):
+    """ Computes the mean distance from each patch to its closest neighboring patch in the same zone
+
+    **Description:**
+
+        Mirrors vector.tabulateMDCP, which clips the dissolved patch polygons to each reporting unit and runs
+        GenerateNearTable. Here the edge cells of every zone/patch region are placed in one scipy cKDTree. Zones are
+        kept apart by a third coordinate (the zone index times a distance longer than the grid), so the closest cells
+        of a zone are always in the same zone. Each edge cell asks for its *firstK* closest cells and the request is
+        doubled for the cells that found no other patch, dropping cells that can no longer beat the best distance
+        already found for their patch. Distances are measured between cell edges, as between the patch polygons.
+
+    **Arguments:**
+
+        * *zones* - zone index of each edge cell
+        * *patchValues* - patch raster value of each edge cell
+        * *x*, *y* - cell center coordinates of each edge cell
+        * *zoneCount* - number of zones
+        * *cellWidth*, *cellHeight* - cell dimensions
+        * *firstK* - number of closest cells requested in the first round
+
+    **Returns:**
+
+        * 1D arrays, one value per zone - number of patches with a neighbor, number of patches without a neighbor, and
+          mean distance to the closest patch. Zones without patches get -9999 for all three; zones with a single patch
+          get 0, 1, and 0
+
+    """
+
+    from scipy.spatial import cKDTree
+
+    zones = np.asarray(zones, dtype=np.int64)
+    patchValues = np.asarray(patchValues, dtype=np.int64)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    pwn = np.full(zoneCount, -9999, dtype=np.int64)
+    pwon = np.full(zoneCount, -9999, dtype=np.int64)
+    meanDist = np.full(zoneCount, -9999, dtype=np.float64)
+    if len(zones) == 0:
+        return pwn, pwon, meanDist
+
+    # number the zone/patch regions
+    regionKeys = zones * _ZONE_SHIFT + (patchValues + _PATCH_OFFSET)
+    regionKeyList, regions = np.unique(regionKeys, return_inverse=True)
+    regions = regions.ravel()
+    regionZones = regionKeyList // _ZONE_SHIFT
+    numPatch = np.bincount(regionZones, minlength=zoneCount)
+
+    pwn[numPatch == 1] = 0
+    pwon[numPatch == 1] = 1
+    meanDist[numPatch == 1] = 0
+
+    # only edge cells of zones with two or more patches take part in the search
+    searched = numPatch[zones] > 1
+    if not searched.any():
+        return pwn, pwon, meanDist
+
+    cellIndex = np.nonzero(searched)[0]
+    zoneSpacing = 2.0 * (np.ptp(x) + np.ptp(y) + cellWidth + cellHeight)
+    points = np.column_stack([x[cellIndex], y[cellIndex], zones[cellIndex] * zoneSpacing])
+    cellRegions = regions[cellIndex]
+    cellZones = zones[cellIndex]
+    tree = cKDTree(points)
+
+    bestDist = np.full(len(regionKeyList), np.inf)
+    cellDiagonal = np.hypot(cellWidth, cellHeight)
+    pending = np.arange(len(cellIndex))
+    k = min(firstK, len(cellIndex))
+    while len(pending):
+        centerDists, neighbors = tree.query(points[pending], k=k)
+        centerDists = centerDists.reshape(len(pending), -1)
+        neighbors = neighbors.reshape(len(pending), -1)
+
+        # cells of other zones come after all the cells of a cell's own zone, so a hit in another zone means that
+        # the cell's own zone has no more cells to search
+        sameZone = cellZones[neighbors] == cellZones[pending][:, np.newaxis]
+        otherPatch = sameZone & (cellRegions[neighbors] != cellRegions[pending][:, np.newaxis])
+        gaps = _cellGap(points[neighbors, 0] - points[pending][:, 0:1], points[neighbors, 1] - points[pending][:, 1:2],
+                        cellWidth, cellHeight)
+        gaps = np.where(otherPatch, gaps, np.inf)
+        np.minimum.at(bestDist, cellRegions[pending], gaps.min(axis=1))
+
+        # cells whose k closest cells all belong to their own patch and zone may still have a closer neighboring patch,
+        # unless even the k-th closest cell is farther away than the best distance found for the patch
+        unresolved = ~otherPatch.any(axis=1) & sameZone.all(axis=1)
+        couldImprove = (centerDists[:, -1] - cellDiagonal) < bestDist[cellRegions[pending]]
+        pending = pending[unresolved & couldImprove]
+        if k == len(cellIndex):
+            break
+        k = min(2 * k, len(cellIndex))
+
+    searchedRegions = numPatch[regionZones] > 1
+    regionDist = np.where(searchedRegions, bestDist, 0)
+    pwnSearched = np.bincount(regionZones[searchedRegions], minlength=zoneCount)
+    distSums = np.bincount(regionZones[searchedRegions], weights=regionDist[searchedRegions], minlength=zoneCount)
+
+    multiple = numPatch > 1
+    pwn[multiple] = pwnSearched[multiple]
+    pwon[multiple] = numPatch[multiple] - pwnSearched[multiple]
+    meanDist[multiple] = distSums[multiple] / pwnSearched[multiple]
+
+    return pwn, pwon, meanDist
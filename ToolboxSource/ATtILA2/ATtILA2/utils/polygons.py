@@ -3,8 +3,15 @@
     .. _arcpy: http://help.arcgis.com/en/arcgisdesktop/10.0/help/index.html#/What_is_ArcPy/000v000000v7000000/
 """
 
+import os
+import heapq
+import shutil
+import tempfile
+import itertools
 import arcpy
+import numpy as np
 from . import messages
+from ATtILA2.constants import globalConstants
 
 
 def getIdAreaDict(polyFc, keyField, spatialRef):
@@ -86,14 +93,27 @@ def getMultiPartIdAreaDict(polyFc, keyField, spatialRef):
     return zoneAreaDict
 
 
-def findOverlaps(polyFc):
+def findOverlaps(polyFc, chunkSize=None):
     """ Get the OID values for polygon features that have areas of overlap with other polygons in the same theme.
         **Description:**
         Identify polygons that have overlapping areas with other polygons in the same theme and generate a set of their 
         OID field value. Nested polygons (i.e., polygons contained within the boundaries of another polygon) are also
         selected with this routine. 
+        
+        Only pairs of polygons whose envelopes intersect can overlap, so the envelopes are read first and swept in 
+        order of their minimum x coordinate to find the candidate pairs (see findEnvelopePairs). The exact geometry 
+        tests are then run on the candidate pairs alone, reading the geometry of the candidate polygons with a cursor.
+        
+        With a *chunkSize*, the envelopes are streamed: they are read and sorted *chunkSize* at a time into runs kept in
+        temporary files, and the runs are merged and swept in order (see _iterEnvelopeRuns and _iterCandidatePairs), so
+        the sweep holds at most *chunkSize* envelopes unless more envelopes than that cross a single vertical line. The
+        candidate pairs are tested *chunkSize* pairs at a time, reading the geometries of only the polygons of those
+        pairs and releasing them before the next pairs are tested.
         **Arguments:**
         * *polyFc* - Polygon Feature Class
+        * *chunkSize* - optional maximum number of envelopes swept, and of candidate pairs tested, at a time. If None, 
+                        the value of globalConstants.overlapIndexChunkSize is used; if that is also None, everything is
+                        held in memory at once
            
          **Returns:** 
          * set - A set of OID field values, a dictionary of overlaps, and OID field name
@@ -102,90 +122,329 @@ def findOverlaps(polyFc):
     overlapDict = {}
     
     oidField = arcpy.ListFields(polyFc, '', 'OID')[0]
+    if chunkSize is None:
+        chunkSize = globalConstants.overlapIndexChunkSize
     
-    # Get a count of the number of reporting units to give an accurate progress estimate.
-    n = int(arcpy.GetCount_management(polyFc).getOutput(0))
-    # Initialize custom progress indicator
-    loopProgress = messages.loopProgress(n)
+    # the cursor position of each polygon is kept to order the results
+    neighborDict = {}
+    runFolder = tempfile.mkdtemp(prefix="overlapIndex") if chunkSize else None
+    try:
+        pairChunks = _iterPairChunks(_iterCandidatePairs(_iterEnvelopeRuns(polyFc, chunkSize, runFolder), chunkSize), 
+                                     chunkSize)
+        for firstOids, firstPositions, secondOids, secondPositions in pairChunks:
+            shapeDict = _readShapes(polyFc, set(firstOids) | set(secondOids))
+            
+            # Initialize custom progress indicator
+            loopProgress = messages.loopProgress(len(firstOids))
+            
+            for oid1, i, oid2, j in zip(firstOids, firstPositions, secondOids, secondPositions):
+                shape1 = shapeDict[oid1]
+                shape2 = shapeDict[oid2]
+                # check to see if the polygons overlap, or if one of them is nested within the other
+                if shape1.overlaps(shape2) or ((shape1.contains(shape2) or shape1.within(shape2)) and not shape1.equals(shape2)):
+                    neighborDict.setdefault((i, oid1), []).append((j, oid2))
+                    neighborDict.setdefault((j, oid2), []).append((i, oid1))
+                
+                loopProgress.update()
+            del shapeDict
+    finally:
+        if runFolder:
+            shutil.rmtree(runFolder, ignore_errors=True)
     
-    for row in arcpy.SearchCursor(polyFc, '', '', 'Shape; %s' % oidField.name):
-        idlist = []
-        for row2 in arcpy.SearchCursor(polyFc, '', '', 'Shape; %s' % oidField.name):
-            # check to see if the polygon overlaps the second shape, or if the second shape is nested within
-            if row2.Shape.overlaps(row.Shape) or row2.Shape.contains(row.Shape) and not row2.Shape.equals(row.Shape):
-                overlapSet.add(row.getValue(oidField.name))
-                overlapSet.add(row2.getValue(oidField.name))
-
-                if row.getValue(oidField.name) not in overlapDict.keys():
-                    idlist.append(row2.getValue(oidField.name))
-                    overlapDict[row.getValue(oidField.name)] = idlist
-                elif row.getValue(oidField.name) in overlapDict.keys():
-                    idlist = overlapDict[row.getValue(oidField.name)]
-                    idlist.append(row2.getValue(oidField.name))
-            elif row2.Shape.within(row.Shape)and not row2.Shape.equals(row.Shape):
-                print("Shape Within")
-                overlapSet.add(row.getValue(oidField.name))
-                overlapSet.add(row2.getValue(oidField.name))
-
-                if row.getValue(oidField.name) not in overlapDict.keys():
-                    idlist.append(row2.getValue(oidField.name))
-                    overlapDict[row.getValue(oidField.name)] = idlist
-                elif row.getValue(oidField.name) in overlapDict.keys():
-                    idlist = overlapDict[row.getValue(oidField.name)]
-                    idlist.append(row2.getValue(oidField.name))
-                    
-        loopProgress.update()
+    # List the overlapping polygons of each polygon in cursor order
+    for i, oid in sorted(neighborDict.keys()):
+        overlapSet.add(oid)
+        overlapDict[oid] = [oid2 for j, oid2 in sorted(neighborDict[(i, oid)])]
 
     return overlapSet, oidField.name, overlapDict
 
-def findNonOverlapGroups(overlapDict):
+
+# cursor position, OID and envelope of a polygon, as read by _iterEnvelopeRuns
+_envelopeDtype = np.dtype([("xMin", np.float64), ("yMin", np.float64), ("xMax", np.float64), ("yMax", np.float64),
+                           ("oid", np.int64), ("position", np.int64)])
+
+
+def _saveEnvelopeRun(records, runFolder, runNumber):
+    """ Sorts envelope records by XMin; returns them as an array, or as a read-only memory map of a file in *runFolder* """
+    
+    run = np.array(records, dtype=_envelopeDtype)
+    run = run[np.argsort(run["xMin"], kind='stable')]
+    if runFolder is None:
+        return run
+    
+    runFile = os.path.join(runFolder, f"run{runNumber}.npy")
+    np.save(runFile, run)
+    return np.load(runFile, mmap_mode='r')
+
+
+def _iterEnvelopeRuns(polyFc, chunkSize, runFolder):
+    """ Yields the envelope records of *polyFc* in order of XMin, merging runs of *chunkSize* sorted records """
+    
+    runs = []
+    records = []
+    with arcpy.da.SearchCursor(polyFc, ["OID@", "SHAPE@"]) as cursor:
+        for position, (oid, shape) in enumerate(cursor):
+            extent = shape.extent
+            records.append((extent.XMin, extent.YMin, extent.XMax, extent.YMax, oid, position))
+            if chunkSize and len(records) == chunkSize:
+                runs.append(_saveEnvelopeRun(records, runFolder, len(runs)))
+                records = []
+    if records:
+        runs.append(_saveEnvelopeRun(records, runFolder, len(runs)))
+    
+    def iterRun(run):
+        # a memory mapped run is read a block at a time
+        blockSize = chunkSize or max(len(run), 1)
+        for start in range(0, len(run), blockSize):
+            yield from run[start:start + blockSize].tolist()
+    
+    yield from heapq.merge(*[iterRun(run) for run in runs], key=lambda record: record[0])
+
+
+def _iterCandidatePairs(records, chunkSize):
+    """ Yields the candidate pairs of the envelope records, which arrive in order of XMin, as arrays of the first OIDs,
+        first positions, second OIDs and second positions
+    
+        The sweep holds the envelopes that may still intersect the envelopes to come (the active envelopes) and takes in
+        enough new envelopes to make up *chunkSize*, at least one at a time. Pairs of two active envelopes were found
+        when the second of them was taken in, so only pairs with a new envelope are reported.
+    """
+    
+    active = np.zeros(0, dtype=_envelopeDtype)
+    while True:
+        batchSize = max(chunkSize - len(active), 1) if chunkSize else None
+        batch = np.array(list(itertools.islice(records, batchSize)), dtype=_envelopeDtype)
+        if not len(batch):
+            return
+        
+        active = active[active["xMax"] >= batch["xMin"][0]]
+        combined = np.concatenate([active, batch])
+        envelopes = np.column_stack([combined["xMin"], combined["yMin"], combined["xMax"], combined["yMax"]])
+        firsts, seconds = findEnvelopePairs(envelopes)
+        isNew = seconds >= len(active)
+        firsts = firsts[isNew]
+        seconds = seconds[isNew]
+        if len(firsts):
+            yield (combined["oid"][firsts], combined["position"][firsts], combined["oid"][seconds], 
+                   combined["position"][seconds])
+        active = combined
+
+
+def _iterPairChunks(pairs, chunkSize):
+    """ Regroups the candidate pairs from _iterCandidatePairs into lists of up to *chunkSize* pairs (all of them if
+        *chunkSize* is None) """
+    
+    pending = [[], [], [], []]
+    for pairArrays in pairs:
+        for pendingList, pairArray in zip(pending, pairArrays):
+            pendingList.extend(pairArray.tolist())
+        while chunkSize and len(pending[0]) >= chunkSize:
+            yield [pendingList[:chunkSize] for pendingList in pending]
+            pending = [pendingList[chunkSize:] for pendingList in pending]
+    if pending[0]:
+        yield pending
+
+
+def _readShapes(polyFc, oids):
+    """ Returns a dictionary of the geometries of the polygons whose OID is in *oids*, read in one cursor pass """
+    
+    shapeDict = {}
+    with arcpy.da.SearchCursor(polyFc, ["OID@", "SHAPE@"]) as cursor:
+        for oid, shape in cursor:
+            if oid in oids:
+                shapeDict[oid] = shape
+    return shapeDict
+
+
+def findEnvelopePairs(envelopes, chunkSize=None):
+    """ Find the pairs of envelopes that intersect with a sort and sweep on the minimum x coordinate.
+        **Description:**
+        The envelopes are sorted by their minimum x coordinate. An envelope can only intersect the envelopes that 
+        follow it in that order up to the first one that starts beyond its maximum x coordinate; those are found with 
+        a binary search and then checked on the y axis. Envelopes that only touch are reported as intersecting.
+        
+        If a *chunkSize* is given, the sorted envelopes are swept one chunk at a time against the envelopes that follow
+        them, so the candidate comparison arrays never cover more than *chunkSize* envelopes at a time.
+        **Arguments:**
+        * *envelopes* - array of shape (n, 4) holding XMin, YMin, XMax, YMax for each envelope
+        * *chunkSize* - optional maximum number of envelopes swept at a time
+           
+         **Returns:** 
+         * two integer arrays - the positions in *envelopes* of the first and second envelope of each pair (first < second)
+""" 
+    envelopes = np.asarray(envelopes, dtype=np.float64).reshape(-1, 4)
+    n = len(envelopes)
+    if not chunkSize:
+        chunkSize = max(n, 1)
+    
+    order = np.argsort(envelopes[:, 0], kind='stable')
+    sortedEnvelopes = envelopes[order]
+    xMins = sortedEnvelopes[:, 0]
+    
+    firstList = []
+    secondList = []
+    for chunkStart in range(0, n, chunkSize):
+        chunk = sortedEnvelopes[chunkStart:chunkStart + chunkSize]
+        # each envelope is compared with the envelopes that follow it and start before it ends
+        starts = np.arange(chunkStart, chunkStart + len(chunk)) + 1
+        ends = np.searchsorted(xMins, chunk[:, 2], side='right')
+        counts = np.maximum(ends - starts, 0)
+        if not counts.sum():
+            continue
+        
+        firsts = np.repeat(np.arange(chunkStart, chunkStart + len(chunk)), counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        seconds = np.repeat(starts, counts) + offsets
+        
+        yOverlap = ((sortedEnvelopes[seconds, 1] <= sortedEnvelopes[firsts, 3]) & 
+                    (sortedEnvelopes[firsts, 1] <= sortedEnvelopes[seconds, 3]))
+        firstList.append(firsts[yOverlap])
+        secondList.append(seconds[yOverlap])
+    
+    if not firstList:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    
+    firsts = order[np.concatenate(firstList)]
+    seconds = order[np.concatenate(secondList)]
+    
+    return np.minimum(firsts, seconds), np.maximum(firsts, seconds)
+
+
+def findNonOverlapGroups(overlapDict, recolorPasses=None):
     """ Create a dictionary of unique non overlapping polygons 
         *** Description: ****
         Creates a dictionary of unique list of polygons that do not overlap.
         
+        The overlapping polygons form a graph with an edge between each pair of overlapping polygons, and each group of
+        non overlapping polygons is a color class of that graph. Each group becomes one output layer, so the graph is
+        colored with as few colors as the heuristics find: the better of a DSatur and a largest first coloring, 
+        followed by iterated greedy recoloring passes (see colorOverlapGraph). The number of groups and their sizes 
+        are reported.
+        
         *** Arguments: ***  
         * *Dictionary* - Dictionary of overlapping OIDs
+        * *recolorPasses* - optional number of iterated greedy recoloring passes. If None, the value of 
+                            globalConstants.overlapRecolorPasses is used
         
         **Returns:** 
         
-        * dictionary - A dictionary of OIDs that belong to a group of nonoverlapping polygons 
+        * dictionary - A dictionary of OIDs that belong to a group of nonoverlapping polygons. Groups are numbered from
+                       1 in order of decreasing size
       
     """ 
-    group = 1
+    if recolorPasses is None:
+        recolorPasses = globalConstants.overlapRecolorPasses
+    
+    colorDict = colorOverlapGraph(overlapDict, recolorPasses)
+    
+    groupLists = {}
+    for oid in overlapDict.keys():
+        groupLists.setdefault(colorDict[oid], []).append(oid)
+    groupLists = sorted(groupLists.values(), key=len, reverse=True)
+    
     nonoverlapGroupDict = {}
-    while len(overlapDict) != 0:
-        alist = []
-        #get the first OID in the overlap Dictionary
-        k = list(overlapDict.keys())[0]
-        # loop through the dictionary to check which polygons the first oid overlaps
-        for z in overlapDict.keys():
-            #if OID is not in the overlapDict value for a key then add that key to a list - this means these oids don't overlap the first OID
-            if k not in overlapDict[z]:
-                alist.append(z)
-        #for each of the OID in alist         
-        for a in alist:
-            #Loop through the overlapDict
-            for k in overlapDict.keys():
-                #if the OID is in alist
-                if k in alist:
-                    #then loop through alist
-                    for a in alist:
-                        #Check to see if any of the OIDs overlap any of the others in the list
-                        #if it does then remove it from alist
-                        if a in overlapDict[k]:
-                            alist.remove(a)
-
-
-        #Create a new dictionary that groups non overlapping polygons
+    for group, alist in enumerate(groupLists, 1):
         nonoverlapGroupDict[group] = alist
-        #For each of the OIDs in alist remove them from the overlap Dictionary
-        for a in alist:
-            del overlapDict[a]
-        group = group + 1
-    print(nonoverlapGroupDict)
+    
+    if nonoverlapGroupDict:
+        groupSizes = [len(alist) for alist in groupLists]
+        messages.AddMsg(f"{len(overlapDict)} overlapping polygons were placed in {len(groupSizes)} groups of non "
+                        f"overlapping polygons. Group sizes range from {groupSizes[-1]} to {groupSizes[0]} polygons "
+                        f"(mean {sum(groupSizes) / len(groupSizes):.1f}).")
 
     return nonoverlapGroupDict
 
+
+def colorOverlapGraph(overlapDict, recolorPasses=10):
+    """ Assign a color to each polygon so that no two overlapping polygons share a color
+        *** Description: ****
+        Two colorings are built and the one with fewer colors is kept: DSatur, which always colors next the polygon 
+        whose overlapping polygons already use the most distinct colors, and largest first, which colors polygons in 
+        order of decreasing number of overlaps. Colors are then refined with iterated greedy recoloring: polygons are 
+        recolored greedily one color class at a time, largest classes first. A pass never uses more colors than the 
+        coloring it starts from and often frees a color. Passes stop when a pass does not reduce the number of colors.
+        
+        *** Arguments: ***  
+        * *overlapDict* - Dictionary of overlapping OIDs keyed by OID
+        * *recolorPasses* - largest number of iterated greedy recoloring passes
+        
+        **Returns:** 
+        
+        * dictionary - color number (starting at 0) keyed by OID
+      
+    """ 
+    # Build a symmetric adjacency list, ignoring OIDs listed as their own neighbor
+    adjacencyDict = dict((oid, set()) for oid in overlapDict.keys())
+    for oid, neighborList in overlapDict.items():
+        for neighbor in neighborList:
+            if neighbor != oid:
+                adjacencyDict[oid].add(neighbor)
+                adjacencyDict.setdefault(neighbor, set()).add(oid)
+    
+    if not adjacencyDict:
+        return {}
+    
+    colorDict = _dsaturColoring(adjacencyDict)
+    largestFirst = sorted(adjacencyDict.keys(), key=lambda oid: len(adjacencyDict[oid]), reverse=True)
+    largestFirstDict = _greedyColoring(adjacencyDict, largestFirst)
+    if _colorCount(largestFirstDict) < _colorCount(colorDict):
+        colorDict = largestFirstDict
+    
+    for recolorPass in range(recolorPasses):
+        classDict = {}
+        for oid in adjacencyDict.keys():
+            classDict.setdefault(colorDict[oid], []).append(oid)
+        order = []
+        for classList in sorted(classDict.values(), key=len, reverse=True):
+            order.extend(classList)
+        recolorDict = _greedyColoring(adjacencyDict, order)
+        improved = _colorCount(recolorDict) < _colorCount(colorDict)
+        colorDict = recolorDict
+        if not improved:
+            break
+    
+    return colorDict
+
+
+def _colorCount(colorDict):
+    return len(set(colorDict.values()))
+
+
+def _greedyColoring(adjacencyDict, order):
+    """ Give each OID, in the given order, the lowest color not used by its already colored neighbors """
+    colorDict = {}
+    for oid in order:
+        usedColors = set(colorDict[neighbor] for neighbor in adjacencyDict[oid] if neighbor in colorDict)
+        color = 0
+        while color in usedColors:
+            color += 1
+        colorDict[oid] = color
+    return colorDict
+
+
+def _dsaturColoring(adjacencyDict):
+    """ DSatur coloring: color next the uncolored OID with the most distinct neighbor colors, breaking ties by degree """
+    colorDict = {}
+    neighborColors = dict((oid, set()) for oid in adjacencyDict.keys())
+    # heap entries are (-saturation, -degree, position, oid); stale entries are skipped when popped
+    positionDict = dict((oid, position) for position, oid in enumerate(adjacencyDict.keys()))
+    heap = [(0, -len(adjacencyDict[oid]), positionDict[oid], oid) for oid in adjacencyDict.keys()]
+    heapq.heapify(heap)
+    while heap:
+        negSaturation, negDegree, position, oid = heapq.heappop(heap)
+        if oid in colorDict or -negSaturation != len(neighborColors[oid]):
+            continue
+        color = 0
+        while color in neighborColors[oid]:
+            color += 1
+        colorDict[oid] = color
+        for neighbor in adjacencyDict[oid]:
+            if neighbor not in colorDict and color not in neighborColors[neighbor]:
+                neighborColors[neighbor].add(color)
+                heapq.heappush(heap, (-len(neighborColors[neighbor]), -len(adjacencyDict[neighbor]), 
+                                      positionDict[neighbor], neighbor))
+    return colorDict
+
 def createNonOverlapLayers(overlapList, nonoverlapGroupDict, OID, inputLayer, outputLoc, ext):
     """ Create a series of nonoverlapping polygon layers
         *** Description: ****
@@ -3,15 +3,24 @@
 """
 import arcpy
 import os
+import hashlib
+import uuid
+import numpy as np
 from os.path import basename
 from arcpy.sa import Con,EucDistance,Raster,Reclassify,RegionGroup,RemapValue,SetNull,Extent, IsNull
 from . import *
 from .messages import AddMsg
 ## this is the code copied from pylet-master\pylet\arcpyutil\raster.py
 import arcpy as _arcpy
-from arcpy.sa.Functions import CreateConstantRaster
 from . import files
+from . import zonalhist
+from . import parallel
+from . import sumgrid
+from . import focal
+from . import distance
+from . import messages
 from .log import logArcpy
+from ATtILA2.constants import globalConstants
 from ATtILA2.datetimeutil import DateTimer
 
 timer = DateTimer()
@@ -27,13 +36,13 @@ def buildRAT(inRaster, logFile=None):
     if inRasterObj.hasRAT == False:
         
         AddMsg(f"{timer.now()} Building attribute table for {inRasterObj.name}.", 0, logFile)
-        logArcpy("arcpy.management.BuildRasterAttributeTable", (inRaster, "NONE"), logFile)
-        arcpy.management.BuildRasterAttributeTable(inRaster, "NONE")
+        with logArcpy("arcpy.management.BuildRasterAttributeTable", (inRaster, "NONE"), logFile):
+            arcpy.management.BuildRasterAttributeTable(inRaster, "NONE")
         
     if len(statisticsList) == 0:
         AddMsg(f"{timer.now()} Calculating statistics for {inRasterObj.name}.", 0, logFile)
-        logArcpy("arcpy.management.CalculateStatistics", (inRaster, ), logFile)
-        arcpy.management.CalculateStatistics(inRaster)
+        with logArcpy("arcpy.management.CalculateStatistics", (inRaster, ), logFile):
+            arcpy.management.CalculateStatistics(inRaster)
 
     return inRasterObj.hasRAT
 
@@ -80,40 +89,141 @@ def getRasterPointFromRowColumn(raster, row, column):
     return point
 
 
+class RasterMetadata(object):
+    """ The cell geometry, value set and value counts of a raster dataset, read once
+
+    **Description:**
+
+        The values and counts come from the raster attribute table when the raster has one. Otherwise the raster is
+        read in blocks of globalConstants.numpyBlockSize rows and columns and its values are counted, so no attribute
+        table has to be built just to learn the values. Use getRasterMetadata rather than creating these directly, so
+        that every caller in a run shares one read.
+
+    """
+
+    def __init__(self, inRaster, logFile=None):
+        """ Constructor - Called when created
+
+            * inRaster - catalog path to an integer raster
+            * logFile - optional log file
+        """
+
+        rasterObj = Raster(inRaster)
+        self.catalogPath = str(inRaster)
+        self.name = rasterObj.name
+        self.extent = rasterObj.extent
+        self.cellSize = rasterObj.meanCellWidth
+        self.nRows = rasterObj.height
+        self.nCols = rasterObj.width
+        self.noDataValue = rasterObj.noDataValue
+        self.hasRAT = rasterObj.hasRAT
+
+        if self.hasRAT:
+            with arcpy.da.SearchCursor(inRaster, ["VALUE", "COUNT"]) as cursor:
+                self.valueCounts = dict((value, count) for value, count in cursor)
+        else:
+            AddMsg(f"{timer.now()} Counting the values of {self.name} without an attribute table.", 0, logFile)
+            self.valueCounts = {}
+            for row0, col0, blockRows, blockCols in zonalhist.iterBlockWindows(self.nRows, self.nCols,
+                                                                               globalConstants.numpyBlockSize):
+                lowerLeft = arcpy.Point(self.extent.XMin + col0 * self.cellSize,
+                                        self.extent.YMax - (row0 + blockRows) * self.cellSize)
+                valueBlock = arcpy.RasterToNumPyArray(inRaster, lowerLeft, blockCols, blockRows)
+                zonalhist.addValueCounts(self.valueCounts, valueBlock, self.noDataValue)
+
+        self.values = sorted(self.valueCounts)
+
+
+def _getRasterFingerprint(inRaster):
+    """ Returns a key that changes when the raster dataset at *inRaster* is replaced or edited """
+
+    rasterObj = Raster(inRaster)
+    extent = rasterObj.extent
+    catalogPath = str(inRaster)
+    fingerprint = [catalogPath, rasterObj.height, rasterObj.width, rasterObj.meanCellWidth, rasterObj.noDataValue,
+                   extent.XMin, extent.YMin, extent.XMax, extent.YMax]
+
+    return tuple(fingerprint) + _getDatasetStamp(catalogPath)
+
+
+def _getDatasetStamp(catalogPath):
+    """ Returns the on-disk modification stamp of a dataset, or an empty tuple for datasets not stored in files
+    
+    **Description:**
+    
+        A dataset that is a file (e.g., a GeoTIFF) is stamped with its own modification time and size. A dataset 
+        stored inside a folder-based workspace (e.g., a file geodatabase, or a shapefile's folder) is stamped with the
+        latest modification time of the files in that folder, since editing it rewrites files of the workspace without
+        changing the time of the workspace folder itself.
+    
+    """
+    
+    if os.path.isfile(catalogPath):
+        fileStat = os.stat(catalogPath)
+        return (catalogPath, fileStat.st_mtime_ns, fileStat.st_size)
+    
+    workspace = catalogPath if os.path.isdir(catalogPath) else os.path.dirname(catalogPath)
+    if workspace and os.path.isdir(workspace):
+        with os.scandir(workspace) as entries:
+            latest = max([entry.stat().st_mtime_ns for entry in entries if entry.is_file()] + [0])
+        return (workspace, latest)
+    
+    return ()
+
+
+# RasterMetadata objects by raster fingerprint, shared by every caller in the current process
+_rasterMetadataCache = {}
+
+
+def getRasterMetadata(inRaster, logFile=None):
+    """ Returns the RasterMetadata of *inRaster*, reading the raster only the first time it is asked for
+
+    **Arguments:**
+
+        * *inRaster* - catalog path to an integer raster
+        * *logFile* - optional log file
+
+    **Returns:**
+
+        * RasterMetadata
+
+    """
+
+    fingerprint = _getRasterFingerprint(inRaster)
+    metadata = _rasterMetadataCache.get(fingerprint)
+    if metadata is None:
+        metadata = _rasterMetadataCache[fingerprint] = RasterMetadata(inRaster, logFile)
+
+    return metadata
+
+
+def clearRasterMetadata():
+    """ Forgets every RasterMetadata read so far (e.g., after a raster was edited in place) """
+
+    _rasterMetadataCache.clear()
+
+
 def getRasterValues(inRaster, logFile=None):
     """Utility for creating a python list of values from a raster's VALUE field.
     
     ** Description: **
         
-        This function will open a search cursor on the raster and iterate through all the rows
-        and collect all values in a python list object. By design, values in the raster's VALUE
-        field are unique.
+        The values are read once per raster dataset by getRasterMetadata, from the raster attribute table if there is
+        one or by counting the raster's values block by block if not, and served from memory to later callers. By 
+        design, the values in the list are unique.
     
     **Arguments:**
     
-        * *raster* - any raster dataset with an attribute table.
+        * *raster* - any integer raster dataset
    
     **Returns:**
     
-        * *valuesList - a python list of unique values
+        * *valuesList - a python list of unique values, in ascending order
         
     """
     
-    # Step through the attribute table and gather all values in a list    
-    rows = _arcpy.SearchCursor(inRaster) 
-    
-    valuesList = []
-    for row in rows:
-        valuesList.append(row.getValue("VALUE"))
-    
-    del row
-    del rows
-    
-    return valuesList
-
-    # ## New Method
-    # valueList = [row[0] for row in arcpy.da.SearchCursor(inRaster, ['Value'])]
-    # return valueList
+    # return a copy so that callers can sort or trim the list
+    return list(getRasterMetadata(inRaster, logFile).values)
 
 
 def splitRasterYN(inRaster, maxSide):
@@ -189,19 +299,19 @@ def clipRaster(inReportingUnitFeature, inRaster, DateTimer, metricConst, logFile
         bufferDistance = f"{bufferFloat} {linearUnits}"
         clipBufferName = arcpy.CreateScratchName("tmpClipBuffer","","FeatureClass")
         
-        logArcpy('arcpy.Buffer_analysis', (inReportingUnitFeature, clipBufferName, bufferDistance, "#", "#", "ALL"), logFile)
-        clipBuffer = arcpy.Buffer_analysis(inReportingUnitFeature, clipBufferName, bufferDistance, "#", "#", "ALL")
+        with logArcpy('arcpy.Buffer_analysis', (inReportingUnitFeature, clipBufferName, bufferDistance, "#", "#", "ALL"), logFile):
+            clipBuffer = arcpy.Buffer_analysis(inReportingUnitFeature, clipBufferName, bufferDistance, "#", "#", "ALL")
         
         # Clipping input grid to desired extent...
-        logArcpy('arcpy.Clip_management', (inRaster, "#", scratchName, clipBuffer, "", "NONE"), logFile)
-        clippedGrid = arcpy.Clip_management(inRaster, "#", scratchName, clipBuffer, "", "NONE")
+        with logArcpy('arcpy.Clip_management', (inRaster, "#", scratchName, clipBuffer, "", "NONE"), logFile):
+            clippedGrid = arcpy.Clip_management(inRaster, "#", scratchName, clipBuffer, "", "NONE")
         arcpy.Delete_management(clipBuffer)
     else:
-        logArcpy('arcpy.Clip_management', (inRaster, "#", scratchName, inReportingUnitFeature, "", "NONE"), logFile)
-        clippedGrid = arcpy.Clip_management(inRaster, "#", scratchName, inReportingUnitFeature, "", "NONE")
+        with logArcpy('arcpy.Clip_management', (inRaster, "#", scratchName, inReportingUnitFeature, "", "NONE"), logFile):
+            clippedGrid = arcpy.Clip_management(inRaster, "#", scratchName, inReportingUnitFeature, "", "NONE")
     
-    logArcpy('arcpy.BuildRasterAttributeTable_management', (clippedGrid, "Overwrite"), logFile)
-    arcpy.BuildRasterAttributeTable_management(clippedGrid, "Overwrite")
+    with logArcpy('arcpy.BuildRasterAttributeTable_management', (clippedGrid, "Overwrite"), logFile):
+        arcpy.BuildRasterAttributeTable_management(clippedGrid, "Overwrite")
 
     AddMsg(f"{timer.now()} Reduction complete")
     
@@ -223,8 +333,8 @@ def getIntersectOfGrids(lccObj,inLandCoverGrid, inSlopeGrid, inSlopeThresholdVal
     AddMsg(f"{timer.now()} Generating land cover above slope threshold grid", 0, logFile)    
     delimitedVALUE = arcpy.AddFieldDelimiters(SLPGrid,"VALUE")
     whereClause = f"{delimitedVALUE} >= {inSlopeThresholdValue}"
-    logArcpy("arcpy.sa.Con", (SLPGrid, LCGrid, AreaBelowThresholdValue, whereClause), logFile)
-    SLPxLCGrid = arcpy.sa.Con(SLPGrid, LCGrid, AreaBelowThresholdValue, whereClause)
+    with logArcpy("arcpy.sa.Con", (SLPGrid, LCGrid, AreaBelowThresholdValue, whereClause), logFile):
+        SLPxLCGrid = arcpy.sa.Con(SLPGrid, LCGrid, AreaBelowThresholdValue, whereClause)
      
     # get the frozenset of excluded values (i.e., values not to use when calculating the reporting unit effective area)
     excludedValues = lccObj.values.getExcludedValueIds()
@@ -233,8 +343,8 @@ def getIntersectOfGrids(lccObj,inLandCoverGrid, inSlopeGrid, inSlopeThresholdVal
         AddMsg(f"{timer.now()} Inserting EXCLUDED values into areas below slope threshold", 0, logFile)
         # build a whereClause string (e.g. "VALUE" = 11 or "VALUE" = 12") to identify where excluded values occur on the land cover grid
         whereExcludedClause = buildWhereValueClause(SLPGrid, excludedValues)
-        logArcpy("arcpy.sa.Con", (LCGrid, LCGrid, SLPxLCGrid, whereExcludedClause), logFile)
-        SLPxLCGrid = arcpy.sa.Con(LCGrid, LCGrid, SLPxLCGrid, whereExcludedClause)
+        with logArcpy("arcpy.sa.Con", (LCGrid, LCGrid, SLPxLCGrid, whereExcludedClause), logFile):
+            SLPxLCGrid = arcpy.sa.Con(LCGrid, LCGrid, SLPxLCGrid, whereExcludedClause)
     
     return SLPxLCGrid
 
@@ -248,8 +358,8 @@ def getSetNullGrid(inConditionalGrid, inReplacementGrid, nullValuesList, logFile
     whereClause = buildWhereValueClause(conditionalRaster, nullValuesList)
 
     replaceRaster = Raster(inReplacementGrid)
-    logArcpy("arcpy.sa.SetNull", (conditionalRaster, replaceRaster, whereClause), logFile)
-    nullSubstituteGrid = arcpy.sa.SetNull(conditionalRaster, replaceRaster, whereClause)
+    with logArcpy("arcpy.sa.SetNull", (conditionalRaster, replaceRaster, whereClause), logFile):
+        nullSubstituteGrid = arcpy.sa.SetNull(conditionalRaster, replaceRaster, whereClause)
     
     return nullSubstituteGrid
 
@@ -360,35 +470,46 @@ def getEdgeCoreGrid(m, lccObj, lccClassesDict, inLandCoverGrid, PatchEdgeWidth_s
     # generate a reclass list where each item in the list is a two item list: the original grid value, and the reclass value
     reclassPairs = getInOutOtherReclassPairs(landCoverValues, classValuesList, excludedValuesList, newValuesList)
             
-    AddMsg(f"{timer.now()} Step 1 of 4: Reclassifying land cover grid to Class = 3, Other = 2, and Excluded = 1", 0, logFile)
-    logArcpy('Reclassify', (inLandCoverGrid,"VALUE", RemapValue(reclassPairs)), logFile)
-    reclassGrid = Reclassify(inLandCoverGrid,"VALUE", RemapValue(reclassPairs))
-    
-    AddMsg(f"{timer.now()} Step 2 of 4: Setting Class areas to Null", 0, logFile)
-    delimitedVALUE = arcpy.AddFieldDelimiters(reclassGrid,"VALUE")
-    logArcpy('SetNull', (reclassGrid, 1, f"delimitedVALUE = 3"), logFile)
-    otherGrid = SetNull(reclassGrid, 1, delimitedVALUE+" = 3")
-    
-    AddMsg(f"{timer.now()} Step 3 of 4: Finding distance from Other", 0, logFile)
-    logArcpy('EucDistance', (otherGrid,), logFile)
-    distGrid = EucDistance(otherGrid)
-    
-    AddMsg(f"{timer.now()} Step 4 of 4: Delimiting Class areas to Edge = 3 and Core = 4", 0, logFile)
-    edgeDist = (float(PatchEdgeWidth_str) + 0.5) * Raster(inLandCoverGrid).meanCellWidth
-    logArcpy('Con', (f"(distGrid >= {edgeDist}) & reclassGrid", 4, reclassGrid), logFile)
-    zonesGrid = Con((distGrid >= edgeDist) & reclassGrid, 4, reclassGrid)
-    
-    # it appears that ArcGIS cannot process the BuildRasterAttributeTable request without first saving the raster.
-    # This step wasn't the case earlier. Either ESRI changed things, or I altered something in ATtILA that unwittingly caused this. -DE
     namePrefix = f"{shortName}_Raster{m.upper()}{PatchEdgeWidth_str}_"
     scratchName = arcpy.CreateScratchName(namePrefix, "", "RasterDataset")
     scratchNameReference[0] = scratchName
-    zonesGrid.save(scratchName)
+    
+    if globalConstants.edgeCoreBackend == globalConstants.numpyBackendName:
+        AddMsg(f"{timer.now()} Classifying land cover grid to Excluded = 1, Other = 2, Edge = 3, and Core = 4 with a {PatchEdgeWidth_str} cell edge width", 0, logFile)
+        edgeWidth = float(PatchEdgeWidth_str)
+        edgeCoreGrid = getEdgeCoreSumGrids(inLandCoverGrid, classValuesList, excludedValuesList, [edgeWidth], 
+                                           globalConstants.numpyBlockSize)[edgeWidth]
+        saveSumGrid(edgeCoreGrid, scratchName, globalConstants.sumGridTileSize, ["KeepIntermediates"], logFile, 
+                    asInteger=True)
+        edgeCoreGrid.close()
+        zonesGrid = Raster(scratchName)
+    else:
+        AddMsg(f"{timer.now()} Step 1 of 4: Reclassifying land cover grid to Class = 3, Other = 2, and Excluded = 1", 0, logFile)
+        with logArcpy('Reclassify', (inLandCoverGrid,"VALUE", RemapValue(reclassPairs)), logFile):
+            reclassGrid = Reclassify(inLandCoverGrid,"VALUE", RemapValue(reclassPairs))
+        
+        AddMsg(f"{timer.now()} Step 2 of 4: Setting Class areas to Null", 0, logFile)
+        delimitedVALUE = arcpy.AddFieldDelimiters(reclassGrid,"VALUE")
+        with logArcpy('SetNull', (reclassGrid, 1, f"delimitedVALUE = 3"), logFile):
+            otherGrid = SetNull(reclassGrid, 1, delimitedVALUE+" = 3")
+        
+        AddMsg(f"{timer.now()} Step 3 of 4: Finding distance from Other", 0, logFile)
+        with logArcpy('EucDistance', (otherGrid,), logFile):
+            distGrid = EucDistance(otherGrid)
+        
+        AddMsg(f"{timer.now()} Step 4 of 4: Delimiting Class areas to Edge = 3 and Core = 4", 0, logFile)
+        edgeDist = (float(PatchEdgeWidth_str) + 0.5) * Raster(inLandCoverGrid).meanCellWidth
+        with logArcpy('Con', (f"(distGrid >= {edgeDist}) & reclassGrid", 4, reclassGrid), logFile):
+            zonesGrid = Con((distGrid >= edgeDist) & reclassGrid, 4, reclassGrid)
+        
+        # it appears that ArcGIS cannot process the BuildRasterAttributeTable request without first saving the raster.
+        # This step wasn't the case earlier. Either ESRI changed things, or I altered something in ATtILA that unwittingly caused this. -DE
+        zonesGrid.save(scratchName)
              
-    logArcpy('arcpy.BuildRasterAttributeTable_management', (zonesGrid, "Overwrite"), logFile)
-    arcpy.BuildRasterAttributeTable_management(zonesGrid, "Overwrite")
-    logArcpy('arcpy.AddField_management', (zonesGrid, "CATEGORY", "TEXT", "#", "#", "10"), logFile)
-    arcpy.AddField_management(zonesGrid, "CATEGORY", "TEXT", "#", "#", "10")
+    with logArcpy('arcpy.BuildRasterAttributeTable_management', (zonesGrid, "Overwrite"), logFile):
+        arcpy.BuildRasterAttributeTable_management(zonesGrid, "Overwrite")
+    with logArcpy('arcpy.AddField_management', (zonesGrid, "CATEGORY", "TEXT", "#", "#", "10"), logFile):
+        arcpy.AddField_management(zonesGrid, "CATEGORY", "TEXT", "#", "#", "10")
     
     # Use categoryDict to pass on labels; should be in the format {gridValue1 : "category1 string", gridValue2: "category2 string", etc}
     categoryDict = {1:"Excluded", 2:"Other", 3:"Edge", 4:"Core"}
@@ -440,34 +561,34 @@ def createPatchRaster(m, lccObj, lccClassesDict, inLandCoverGrid, metricConst, m
         maxSep = intMaxSeparation * Raster(inLandCoverGrid).meanCellWidth
         delimitedVALUE = arcpy.AddFieldDelimiters(reclassGrid,"VALUE")
         whereClause = f"{delimitedVALUE} < {classValue}"
-        logArcpy("arcpy.sa.SetNull", (reclassGrid, 1, whereClause), logFile)
-        classRaster = arcpy.sa.SetNull(reclassGrid, 1, whereClause)
-        logArcpy("arcpy.sa.EucDistance", (classRaster, maxSep, fltProcessingCellSize), logFile)
-        eucDistanceRaster = arcpy.sa.EucDistance(classRaster, maxSep, fltProcessingCellSize)
+        with logArcpy("arcpy.sa.SetNull", (reclassGrid, 1, whereClause), logFile):
+            classRaster = arcpy.sa.SetNull(reclassGrid, 1, whereClause)
+        with logArcpy("arcpy.sa.EucDistance", (classRaster, maxSep, fltProcessingCellSize), logFile):
+            eucDistanceRaster = arcpy.sa.EucDistance(classRaster, maxSep, fltProcessingCellSize)
 
         # Run Region Group analysis on UserEuclidPlus, ignores 0/NoData values
         AddMsg(f"{timer.now()} Assigning unique numbers to each unconnected cluster of Class:{m}.", 0, logFile)
-        logArcpy("arcpy.sa.RegionGroup", (f"{eucDistanceRaster} >= 0","EIGHT","CROSS","ADD_LINK","0"), logFile)
-        UserEuclidRegionGroup = arcpy.sa.RegionGroup(eucDistanceRaster >= 0,"EIGHT","CROSS","ADD_LINK","0")
+        with logArcpy("arcpy.sa.RegionGroup", (f"{eucDistanceRaster} >= 0","EIGHT","CROSS","ADD_LINK","0"), logFile):
+            UserEuclidRegionGroup = arcpy.sa.RegionGroup(eucDistanceRaster >= 0,"EIGHT","CROSS","ADD_LINK","0")
 
         # Maintain the original boundaries of each patch
-        logArcpy("arcpy.sa.Con", (f"reclassGrid == {classValue}",UserEuclidRegionGroup, reclassGrid), logFile)
-        regionOther = arcpy.sa.Con(reclassGrid == classValue,UserEuclidRegionGroup, reclassGrid)
+        with logArcpy("arcpy.sa.Con", (f"reclassGrid == {classValue}",UserEuclidRegionGroup, reclassGrid), logFile):
+            regionOther = arcpy.sa.Con(reclassGrid == classValue,UserEuclidRegionGroup, reclassGrid)
 
     if intMinPatchSize > 1:
         AddMsg(f"{timer.now()} Eliminating clusters below minimum patch size.", 0, logFile)
         delimitedCOUNT = arcpy.AddFieldDelimiters(regionOther,"COUNT")
         whereClause = f"{delimitedCOUNT} < {intMinPatchSize}"
-        logArcpy("arcpy.sa.Con", (regionOther, otherValue, regionOther, whereClause), logFile)
-        regionOtherFinal = arcpy.sa.Con(regionOther, otherValue, regionOther, whereClause)
+        with logArcpy("arcpy.sa.Con", (regionOther, otherValue, regionOther, whereClause), logFile):
+            regionOtherFinal = arcpy.sa.Con(regionOther, otherValue, regionOther, whereClause)
     else:
         regionOtherFinal = regionOther
 
     # add the excluded class areas back to the raster if present
     if excludedValuesList:
         AddMsg(f"{timer.now()} Adding excluded class areas to patch raster.", 0, logFile)
-        logArcpy("arcpy.sa.Con", (f"reclassGrid == {excludedValue}", reclassGrid, regionOtherFinal), logFile)
-        regionOtherExcluded = arcpy.sa.Con(reclassGrid == excludedValue, reclassGrid, regionOtherFinal)
+        with logArcpy("arcpy.sa.Con", (f"reclassGrid == {excludedValue}", reclassGrid, regionOtherFinal), logFile):
+            regionOtherExcluded = arcpy.sa.Con(reclassGrid == excludedValue, reclassGrid, regionOtherFinal)
     else:
         regionOtherExcluded = regionOtherFinal
 
@@ -543,7 +664,7 @@ def getRemapBinsByPercentStep(maxValue, pctStep):
     return reclassBins
 
 
-def getPatchViewGrid(m, classValuesList, excludedValuesList, inLandCoverGrid, landCoverValues, viewRadius, conValues, minimumPatchSize, timer, saveIntermediates, metricConst, logFile):
+def getPatchViewGrid(m, classValuesList, excludedValuesList, inLandCoverGrid, landCoverValues, viewRadius, conValues, minimumPatchSize, timer, saveIntermediates, metricConst, logFile, cleanupList=None):
     # create class (value = 1) / other (value = 0) / excluded grid (value = 0) raster
     # define the reclass values
     classValue = 1
@@ -555,34 +676,52 @@ def getPatchViewGrid(m, classValuesList, excludedValuesList, inLandCoverGrid, la
     reclassPairs = getInOutOtherReclassPairs(landCoverValues, classValuesList, excludedValuesList, newValuesList)
       
     AddMsg(f"{timer.now()} Reclassifying selected {m.upper()} land cover class to 1. All other values = 0.", 0, logFile)
-    logArcpy("arcpy.sa.Reclassify",(inLandCoverGrid,"VALUE", RemapValue(reclassPairs)),logFile)
-    reclassGrid = arcpy.sa.Reclassify(inLandCoverGrid,"VALUE", RemapValue(reclassPairs))
+    with logArcpy("arcpy.sa.Reclassify",(inLandCoverGrid,"VALUE", RemapValue(reclassPairs)),logFile):
+        reclassGrid = arcpy.sa.Reclassify(inLandCoverGrid,"VALUE", RemapValue(reclassPairs))
  
     if int(minimumPatchSize) > 1:
         # find patches of selected land cover >= the minimum patch size requirement
                     
         AddMsg(f"{timer.now()} Calculating size of class patches.", 0, logFile)
-        logArcpy("arcpy.sa.RegionGroup",(reclassGrid,"EIGHT","WITHIN","ADD_LINK"),logFile)
-        regionGrid = arcpy.sa.RegionGroup(reclassGrid,"EIGHT","WITHIN","ADD_LINK")
+        with logArcpy("arcpy.sa.RegionGroup",(reclassGrid,"EIGHT","WITHIN","ADD_LINK"),logFile):
+            regionGrid = arcpy.sa.RegionGroup(reclassGrid,"EIGHT","WITHIN","ADD_LINK")
                     
         AddMsg(f"{timer.now()} Assigning 1 to patches >= minimum size threshold of {minimumPatchSize} cells.", 0, logFile)
         delimitedCOUNT = arcpy.AddFieldDelimiters(regionGrid,"COUNT")
         whereClause = delimitedCOUNT+" >= " + minimumPatchSize + " AND LINK = 1"
-        logArcpy("arcpy.sa.Con",(regionGrid, classValue, 0, whereClause),logFile)
-        patchGrid = arcpy.sa.Con(regionGrid, classValue, 0, whereClause)
+        with logArcpy("arcpy.sa.Con",(regionGrid, classValue, 0, whereClause),logFile):
+            patchGrid = arcpy.sa.Con(regionGrid, classValue, 0, whereClause)
     else:
         patchGrid = reclassGrid
         
-    AddMsg(f"{timer.now()} Performing focal SUM on patches of {m.upper()} using {viewRadius} cell radius circular neighborhood.", 0, logFile)
-    neighborhood = arcpy.sa.NbrCircle(int(viewRadius), "CELL")
-    logArcpy("arcpy.sa.FocalStatistics",(f"patchGrid == {classValue}", neighborhood, "SUM", "DATA"),logFile)
-    focalGrid = arcpy.sa.FocalStatistics(patchGrid == classValue, neighborhood, "SUM", "DATA")
-    
-    
-    AddMsg(f"{timer.now()} Reclassifying focal SUM results into a single-value raster where 1 = potential view area.", 0, logFile)
     whereValue = conValues[0]
     trueValue = conValues[1]
-    viewGrid = Con(Raster(focalGrid) > whereValue, trueValue)
+    if globalConstants.focalBackend == globalConstants.numpyBackendName:
+        AddMsg(f"{timer.now()} Summing patches of {m.upper()} within a {viewRadius} cell radius circular neighborhood, keeping sums > {whereValue} as the potential view area.", 0, logFile)
+        viewSumGrid = getCircleFocalSumGrid(patchGrid, classValue, int(viewRadius), globalConstants.numpyBlockSize, 
+                                            whereValue, trueValue)
+        namePrefix = f"{metricConst.shortName}_{m.upper()}_View_"
+        if cleanupList:
+            viewName = files.nameIntermediateFile([namePrefix, "RasterDataset"], cleanupList)
+        else:
+            viewName = arcpy.CreateScratchName(namePrefix, "", "RasterDataset")
+        tileCount = saveSumGrid(viewSumGrid, viewName, globalConstants.sumGridTileSize, cleanupList or ["KeepIntermediates"], 
+                                logFile, asInteger=True)
+        viewSumGrid.close()
+        if tileCount == 0:
+            # no cell reaches the threshold: return an all NoData grid, as Con would
+            viewGrid = SetNull(patchGrid >= 0, trueValue)
+        else:
+            viewGrid = Raster(viewName)
+    else:
+        AddMsg(f"{timer.now()} Performing focal SUM on patches of {m.upper()} using {viewRadius} cell radius circular neighborhood.", 0, logFile)
+        neighborhood = arcpy.sa.NbrCircle(int(viewRadius), "CELL")
+        with logArcpy("arcpy.sa.FocalStatistics",(f"patchGrid == {classValue}", neighborhood, "SUM", "DATA"),logFile):
+            focalGrid = arcpy.sa.FocalStatistics(patchGrid == classValue, neighborhood, "SUM", "DATA")
+        
+        
+        AddMsg(f"{timer.now()} Reclassifying focal SUM results into a single-value raster where 1 = potential view area.", 0, logFile)
+        viewGrid = Con(Raster(focalGrid) > whereValue, trueValue)
     
     # save the intermediate raster if save intermediates option has been chosen
     if saveIntermediates: 
@@ -605,10 +744,10 @@ def getPatchViewGrid(m, classValuesList, excludedValuesList, inLandCoverGrid, la
             fieldSize = 10
         
         if not patchGrid.hasRAT:
-            logArcpy("arcpy.BuildRasterAttributeTable_management",(patchGrid, "Overwrite"),logFile)
-            arcpy.BuildRasterAttributeTable_management(patchGrid, "Overwrite")
-        logArcpy("arcpy.AddField_management",(patchGrid, "CATEGORY", "TEXT", "#", "#", str(fieldSize)),logFile)
-        arcpy.AddField_management(patchGrid, "CATEGORY", "TEXT", "#", "#", str(fieldSize))
+            with logArcpy("arcpy.BuildRasterAttributeTable_management",(patchGrid, "Overwrite"),logFile):
+                arcpy.BuildRasterAttributeTable_management(patchGrid, "Overwrite")
+        with logArcpy("arcpy.AddField_management",(patchGrid, "CATEGORY", "TEXT", "#", "#", str(fieldSize)),logFile):
+            arcpy.AddField_management(patchGrid, "CATEGORY", "TEXT", "#", "#", str(fieldSize))
         
         # Use categoryDict to pass on labels; should be in the format {gridValue1 : "category1 string", gridValue2: "category2 string", etc}
         # Undefined grid values will appear as NULL
@@ -640,72 +779,31 @@ def updateCategoryLabels(Raster, categoryDict):
 
 
 def getCircleCellCount(inRaster, radiusInCells):
-    maxCellCount = lookupCircleCellCount(radiusInCells)
-    
-    if maxCellCount == 0:
-        maxCellCount = calcCircleCellCount(inRaster, radiusInCells)
-        
-    return maxCellCount
+    """ Returns the number of cells in a circular neighborhood (NbrCircle in CELL units) of *radiusInCells*
+
+    **Description:**
+
+        The count is taken from the lookup table when the radius is listed there. Otherwise it is calculated by 
+        counting lattice points (see utils.focal.countCircleCells) and kept in the on-disk memo named by 
+        globalConstants.circleCellCountMemoFile, so no geoprocessing is needed for any radius.
 
-def calcCircleCellCount(inRaster,radiusInCells):
-    """Utility for calculating the maximum cell count for a circular neighborhood of a given radius.
-    
-    ** Description: **
-        
-        This function will create a constant raster with a value of 1, the cell resolution of the
-        Raster parameter, and the smallest extent possible to generate one full circular neighborhood area
-        with the supplied radius in cell count.
-        
-        The generated constant raster will be used in a focal statistics circle neighboorhood operation to 
-        determine the maximum cell count possible for the neighborhood. The maximum cell count is returned.
-    
     **Arguments:**
-    
-        * *inRaster* - any raster dataset with an attribute table.
-        * *radiusInCells* - integer value
-   
+
+        * *inRaster* - the raster the neighborhood is used on. Counts in CELL units do not depend on it
+        * *radiusInCells* - radius of the neighborhood in cells
+
     **Returns:**
-    
-        * *integer - maximum cell count for circle neighborhood
-        
+
+        * integer - maximum cell count for circle neighborhood
+
     """
+
+    maxCellCount = lookupCircleCellCount(radiusInCells)
     
-    from arcpy import env
-    
-    # Prepare to replace and reset the environmental output coordinate system
-    tempEnvOCS = env.outputCoordinateSystem
-    
-    # determine the smallest needed extent to generate one full circular buffer
-    # adding 1 to the input radius will give the smallest needed. adding 3 will give some wiggle room
-    inRasterDesc = arcpy.Describe(inRaster)
-    cellSize = inRasterDesc.meanCellHeight    
-    diameterCellCount = (2 * radiusInCells) + 3
-    extentWidth = cellSize * diameterCellCount
-    
-    xMin = inRasterDesc.extent.XMin
-    yMin = inRasterDesc.extent.YMin
-    xMax = xMin + extentWidth
-    yMax = yMin + extentWidth
-    
-    outExtent = Extent(xMin, yMin, xMax, yMax)
-    
-    # Extent units will be in the linear units of the environmental output coordinate system
-    # Temporarily set them to match the input raster
-    env.outputCoordinateSystem = inRasterDesc.spatialReference
-    
-    oneRaster = CreateConstantRaster(1, "INTEGER", cellSize, outExtent)
-    #oneRaster.save("oneRaster")
-    
-    neighborhood = arcpy.sa.NbrCircle(radiusInCells, "CELL")
-    nbrCntGrid = arcpy.sa.FocalStatistics(oneRaster == 1, neighborhood, "SUM", "NODATA")
-    #nbrCntGrid.save("nbrCntGrid")
-    
-    circleCellCount = nbrCntGrid.maximum
-    
-    # reset the environments
-    env.outputCoordinateSystem = tempEnvOCS
-    
-    return circleCellCount
+    if maxCellCount == 0:
+        maxCellCount = focal.getCircleCellCountMemo(globalConstants.circleCellCountMemoFile).get(radiusInCells)
+        
+    return maxCellCount
 
 
 def lookupCircleCellCount(radiusInCells):
@@ -820,15 +918,15 @@ def getWalkabilityGrid(vectorFeatures, inValue, inBaseValue, fileNameBase, cellS
             namePrefix = f"{fileNameBase}_Raster_Polygon_"
             rasterName = files.nameIntermediateFile([namePrefix,"RasterDataset"],cleanupList)
             AddMsg(f"{timer.now()} Converting {fcName} to raster. Intermediate: {basename(rasterName)}", 0, logFile)
-            logArcpy('arcpy.conversion.PolygonToRaster', (fc, valueField, rasterName, "MAXIMUM_AREA", "NONE", cellSize, "BUILD"), logFile)
-            polygonRaster = arcpy.conversion.PolygonToRaster(fc, valueField, rasterName, "MAXIMUM_AREA", "NONE", cellSize, "BUILD")
+            with logArcpy('arcpy.conversion.PolygonToRaster', (fc, valueField, rasterName, "MAXIMUM_AREA", "NONE", cellSize, "BUILD"), logFile):
+                polygonRaster = arcpy.conversion.PolygonToRaster(fc, valueField, rasterName, "MAXIMUM_AREA", "NONE", cellSize, "BUILD")
             rasterList[0] = polygonRaster
         elif fcType == "Polyline":
             namePrefix = f"{fileNameBase}_Raster_Line_"
             rasterName = files.nameIntermediateFile([namePrefix,"RasterDataset"],cleanupList)
             AddMsg(f"{timer.now()} Converting {fcName} to raster. Intermediate: {basename(rasterName)}", 0, logFile)
-            logArcpy('arcpy.conversion.PolylineToRaster', (fc, valueField, rasterName, "MAXIMUM_LENGTH", "NONE", cellSize, "BUILD"), logFile)
-            lineRaster = arcpy.conversion.PolylineToRaster(fc, valueField, rasterName, "MAXIMUM_LENGTH", "NONE", cellSize, "BUILD")
+            with logArcpy('arcpy.conversion.PolylineToRaster', (fc, valueField, rasterName, "MAXIMUM_LENGTH", "NONE", cellSize, "BUILD"), logFile):
+                lineRaster = arcpy.conversion.PolylineToRaster(fc, valueField, rasterName, "MAXIMUM_LENGTH", "NONE", cellSize, "BUILD")
             rasterList[1] = lineRaster
 
     # trim the list of rasters to process based on what rasters were generated above
@@ -841,23 +939,23 @@ def getWalkabilityGrid(vectorFeatures, inValue, inBaseValue, fileNameBase, cellS
     rasterOne = Raster(rastersToMerge[0])
     if len(rastersToMerge) == 1: # inputs features were either polyline or polygon, not both
         AddMsg(f"{timer.now()} Setting converted raster cell values to {inValue} where features exist. Everywhere else will be set to {inBaseValue}. Intermediate: {basename(resultRasterName)}", 0, logFile)
-        logArcpy('arcpy.sa.Con', (f"IsNull({rasterOne})", inBaseValue, inValue), logFile)
-        resultRaster = arcpy.sa.Con(IsNull(rasterOne), inBaseValue, inValue)
+        with logArcpy('arcpy.sa.Con', (f"IsNull({rasterOne})", inBaseValue, inValue), logFile):
+            resultRaster = arcpy.sa.Con(IsNull(rasterOne), inBaseValue, inValue)
 
     elif len(rastersToMerge) == 2: # inputs were a combination of polyline and polygon features
         AddMsg(f"{timer.now()} Combining converted rasters and setting output cell values to {inValue} where features exist. Everywhere else will be set to {inBaseValue}. Intermediate: {basename(resultRasterName)}", 0, logFile)
         rasterTwo = Raster(rastersToMerge[1])
-        logArcpy('arcpy.sa.Con', (f'IsNull({rasterOne})', inBaseValue, inValue), logFile)
-        conOne = arcpy.sa.Con(IsNull(rasterOne), inBaseValue, inValue)
-        logArcpy('arcpy.sa.Con', (f'IsNull({rasterTwo})', conOne, inValue), logFile)
-        resultRaster = arcpy.sa.Con(IsNull(rasterTwo), conOne, inValue)
+        with logArcpy('arcpy.sa.Con', (f'IsNull({rasterOne})', inBaseValue, inValue), logFile):
+            conOne = arcpy.sa.Con(IsNull(rasterOne), inBaseValue, inValue)
+        with logArcpy('arcpy.sa.Con', (f'IsNull({rasterTwo})', conOne, inValue), logFile):
+            resultRaster = arcpy.sa.Con(IsNull(rasterTwo), conOne, inValue)
         
     resultRaster.save(resultRasterName)
     
     return resultRaster, cleanupList
 
 
-def getParkRaster(metricConst,inParkFeature,oidFld,parkID,buffDist,costRaster,distNumber,expandNumber,calcAreaFld,inCensusDataset,inPopField,nullRaster,popNone,popZero,cleanupList):
+def getParkRaster(metricConst,inParkFeature,oidFld,parkID,buffDist,costRaster,distNumber,expandNumber,calcAreaFld,inCensusDataset,inPopField,nullRaster,popNone,popZero,cleanupList,rasterName=None,accumulator=None):
     
     arcpy.env.pyramid = "NONE"
     arcpy.env.overwriteOutput = True
@@ -934,9 +1032,14 @@ def getParkRaster(metricConst,inParkFeature,oidFld,parkID,buffDist,costRaster,di
                 popZero.append(parkID)
                 cost_con =  Con(expand_raster, float(sqm_person), None, "VALUE >= 0")
     
-                namePrefix = f"{metricConst.shortName}_Access_Id{parkID}_"
-                rasterName = files.nameIntermediateFile([namePrefix,"RasterDataset"],cleanupList)
-                cost_con.save(rasterName)
+                if accumulator is not None:
+                    # add the park's values straight into the running sum instead of saving a raster
+                    addRasterToSumGrid(cost_con, accumulator)
+                else:
+                    if not rasterName:
+                        namePrefix = f"{metricConst.shortName}_Access_Id{parkID}_"
+                        rasterName = files.nameIntermediateFile([namePrefix,"RasterDataset"],cleanupList)
+                    cost_con.save(rasterName)
             
             else:
                 # Cost distance value to park area divided by surrounding population
@@ -945,12 +1048,795 @@ def getParkRaster(metricConst,inParkFeature,oidFld,parkID,buffDist,costRaster,di
     
                 cost_con =  Con(expand_raster, float(sqm_person), None, "VALUE >= 0")
     
-                namePrefix = f"{metricConst.shortName}_Access_Id{parkID}_"
-                rasterName = files.nameIntermediateFile([namePrefix,"RasterDataset"],cleanupList)
-                cost_con.save(rasterName)
+                if accumulator is not None:
+                    # add the park's values straight into the running sum instead of saving a raster
+                    addRasterToSumGrid(cost_con, accumulator)
+                else:
+                    if not rasterName:
+                        namePrefix = f"{metricConst.shortName}_Access_Id{parkID}_"
+                        rasterName = files.nameIntermediateFile([namePrefix,"RasterDataset"],cleanupList)
+                    cost_con.save(rasterName)
 
         valuesList = [outPop, sqm_person]
         
         arcpy.Delete_management("in_memory")
     
     return rasterName, nullRaster, popNone, popZero, valuesList
+
+
+def mosaicSumRasters(rasterList, outWS, outName, cellSize, batchSize, cleanupList, logFile=None, pixelType="64_BIT"):
+    """ Sums overlapping rasters into a new raster with MosaicToNewRaster, a batch of inputs at a time
+
+    **Description:**
+
+        When there are more than *batchSize* input rasters, they are summed in batches into intermediate rasters, which
+        are summed in turn, so that no single MosaicToNewRaster call receives thousands of inputs. Sums are
+        associative, so the result equals a single SUM mosaic of all of the inputs.
+
+    **Arguments:**
+
+        * *rasterList* - list of raster catalog paths
+        * *outWS* - workspace for the output raster
+        * *outName* - name of the output raster
+        * *cellSize* - output cell size
+        * *batchSize* - largest number of rasters mosaicked in one call
+        * *cleanupList* - object containing commands and parameters to perform at cleanup time
+        * *logFile* - CatalogPath and name of the text log file. It can be None
+        * *pixelType* - MosaicToNewRaster pixel type of the intermediate and output rasters
+
+    """
+
+    batchSize = max(int(batchSize), 2)
+    while len(rasterList) > batchSize:
+        partialRasters = []
+        for start in range(0, len(rasterList), batchSize):
+            batch = rasterList[start:start + batchSize]
+            if len(batch) == 1:
+                partialRasters.extend(batch)
+                continue
+            partialName = files.nameIntermediateFile(["xsum_", "RasterDataset"], cleanupList)
+            with logArcpy("arcpy.management.MosaicToNewRaster", (batch, os.path.dirname(partialName), basename(partialName), "#", pixelType, cellSize, 1, "SUM", "FIRST"), logFile):
+                arcpy.management.MosaicToNewRaster(batch, os.path.dirname(partialName), basename(partialName), "#", pixelType, 
+                                                   cellSize, 1, "SUM", "FIRST")
+            partialRasters.append(partialName)
+        rasterList = partialRasters
+
+    with logArcpy("arcpy.management.MosaicToNewRaster", (rasterList, outWS, outName, "#", pixelType, cellSize, 1, "SUM", "FIRST"), logFile):
+        arcpy.management.MosaicToNewRaster(rasterList, outWS, outName, "#", pixelType, cellSize, 1, "SUM", "FIRST")
+
+
+def addRasterToSumGrid(inRaster, sumGrid):
+    """ Adds the values of a raster to a sumgrid.RunningSumGrid that shares its cell size and alignment """
+
+    rasterObj = Raster(inRaster)
+    array = arcpy.RasterToNumPyArray(rasterObj, nodata_to_value=np.nan)
+    sumGrid.add(array, rasterObj.extent.XMin, rasterObj.extent.YMax)
+
+
+class _ParkArrayCollector(object):
+    """ Stands in for a RunningSumGrid in a park worker process: keeps the added arrays for the main process """
+
+    def __init__(self):
+        self.arrays = []
+
+    def add(self, array, xMin, yMax):
+        self.arrays.append((np.asarray(array, dtype=np.float32), xMin, yMax))
+
+
+def createSumGrid(inExtent=None, cellSize=None, snapRaster=None, folder=None):
+    """ Creates a sumgrid.RunningSumGrid covering an extent on the processing grid
+
+    **Description:**
+
+        The grid's corner is moved outward onto the cell boundaries of the snap raster, so that rasters created with
+        the same snap raster and cell size environments line up with the grid cells.
+
+    **Arguments:**
+
+        * *inExtent* - extent to cover. If None, the extent environment is used
+        * *cellSize* - cell size. If None, the cell size environment is used
+        * *snapRaster* - raster to align to. If None, the snap raster environment is used, if set
+        * *folder* - folder for the memory-mapped file. If None, the scratch folder environment is used
+
+    **Returns:**
+
+        * sumgrid.RunningSumGrid
+
+    """
+
+    inExtent = inExtent or arcpy.env.extent
+    cellSize = float(cellSize or arcpy.env.cellSize)
+    snapRaster = snapRaster or arcpy.env.snapRaster
+    folder = folder or arcpy.env.scratchFolder
+
+    xSnap, ySnap = inExtent.XMin, inExtent.YMax
+    if snapRaster:
+        snapExtent = Raster(snapRaster).extent
+        xSnap, ySnap = snapExtent.XMin, snapExtent.YMax
+
+    xMin = xSnap + np.floor((inExtent.XMin - xSnap) / cellSize) * cellSize
+    yMax = ySnap + np.ceil((inExtent.YMax - ySnap) / cellSize) * cellSize
+    nCols = int(np.ceil((inExtent.XMax - xMin) / cellSize))
+    nRows = int(np.ceil((yMax - inExtent.YMin) / cellSize))
+
+    return sumgrid.RunningSumGrid(xMin, yMax, cellSize, nRows, nCols, folder)
+
+
+def saveSumGrid(sumGrid, outRaster, tileSize, cleanupList, logFile=None, asInteger=False):
+    """ Writes the cells of a sumgrid.RunningSumGrid that hold data to a raster
+
+    **Description:**
+
+        The grid is written one tile at a time with NumPyArrayToRaster, and tiles that hold no data are skipped. When
+        there is more than one tile, the tiles are combined with MosaicToNewRaster and then deleted.
+
+    **Arguments:**
+
+        * *sumGrid* - the running sum grid
+        * *outRaster* - catalog path of the output raster
+        * *tileSize* - largest number of rows and columns written at a time
+        * *cleanupList* - object containing commands and parameters to perform at cleanup time. The tiles are deleted
+          by saveSumGrid itself
+        * *logFile* - CatalogPath and name of the text log file. It can be None
+        * *asInteger* - if True, the values are rounded and saved as a 32 bit integer raster
+
+    **Returns:**
+
+        * integer - the number of tiles holding data
+
+    """
+
+    if asInteger:
+        noDataValue, dtype, pixelType = np.iinfo(np.int32).min, np.int32, "32_BIT_SIGNED"
+    else:
+        noDataValue, dtype, pixelType = -3.4e38, np.float64, "64_BIT"
+    tileRasters = []
+    for row0, col0, tile in sumGrid.iterTiles(tileSize):
+        lowerLeft = arcpy.Point(sumGrid.xMin + col0 * sumGrid.cellSize, 
+                                sumGrid.yMax - (row0 + tile.shape[0]) * sumGrid.cellSize)
+        tileValues = np.where(np.isnan(tile), noDataValue, np.rint(tile) if asInteger else tile).astype(dtype)
+        tileRaster = arcpy.NumPyArrayToRaster(tileValues, lowerLeft, sumGrid.cellSize, sumGrid.cellSize, noDataValue)
+        tileRasters.append(tileRaster)
+
+    if len(tileRasters) == 1:
+        tileRasters[0].save(outRaster)
+    elif tileRasters:
+        # the tiles only hold pieces of the output raster, so they are deleted once it is mosaicked, whatever the 
+        # caller does with its own intermediates
+        tileNames = []
+        try:
+            for tileRaster in tileRasters:
+                tileName = arcpy.CreateScratchName("xtile_", "", "RasterDataset")
+                tileRaster.save(tileName)
+                tileNames.append(tileName)
+            mosaicSumRasters(tileNames, os.path.dirname(outRaster), basename(outRaster), sumGrid.cellSize, 
+                             len(tileNames), cleanupList, logFile, pixelType)
+        finally:
+            for tileName in tileNames:
+                arcpy.Delete_management(tileName)
+
+    return len(tileRasters)
+
+
+def getFocalProportionGrids(inValueRaster, classValuesDict, windowSizes, blockSize, keepCounts=False, folder=None):
+    """ Calculates the percentage of each window around every cell that belongs to each class, for every window size
+
+    **Description:**
+
+        The raster is read once, one block at a time with a halo wide enough for the largest window, and the focal
+        sums of every class and window size are taken from the integral images of the block (see utils.focal). The 
+        results are the same as reclassifying the raster to class (1) / other (0), running FocalStatistics SUM with a
+        rectangular neighborhood and the NODATA option, and dividing by the number of cells in the window. Each result
+        is kept in a sumgrid.RunningSumGrid, which can be written out with saveSumGrid.
+
+    **Arguments:**
+
+        * *inValueRaster* - the raster holding class values (e.g., a land cover grid)
+        * *classValuesDict* - dictionary of key: collection of grid values that make up the class (e.g., a metric class)
+        * *windowSizes* - list of window sizes (number of rows and columns)
+        * *blockSize* - maximum number of rows and columns read at a time, not counting the halo
+        * *keepCounts* - if True, grids of the class cell counts are kept as well
+        * *folder* - folder for the memory-mapped files. If None, the scratch folder environment is used
+
+    **Returns:**
+
+        * dictionary - (key, window size): (percentage grid, count grid or None)
+
+    """
+
+    rasterObj = Raster(inValueRaster)
+    extent = rasterObj.extent
+    cellSize = rasterObj.meanCellWidth
+    nRows, nCols = rasterObj.height, rasterObj.width
+    noDataValue = rasterObj.noDataValue
+    folder = folder or arcpy.env.scratchFolder
+    halo = focal.getHaloWidth(windowSizes)
+
+    def newGrid():
+        return sumgrid.RunningSumGrid(extent.XMin, extent.YMax, cellSize, nRows, nCols, folder)
+
+    focalGrids = {}
+    for key in classValuesDict:
+        for windowSize in windowSizes:
+            focalGrids[(key, windowSize)] = (newGrid(), newGrid() if keepCounts else None)
+
+    for row0, col0, blockRows, blockCols in zonalhist.iterBlockWindows(nRows, nCols, blockSize):
+        lowerLeft = arcpy.Point(extent.XMin + (col0 - halo) * cellSize, extent.YMax - (row0 + blockRows + halo) * cellSize)
+        valueBlock = arcpy.RasterToNumPyArray(inValueRaster, lowerLeft, blockCols + 2 * halo, blockRows + 2 * halo, 
+                                              noDataValue)
+        rows = np.arange(row0 - halo, row0 + blockRows + halo)
+        cols = np.arange(col0 - halo, col0 + blockCols + halo)
+        insideMask = ((rows >= 0) & (rows < nRows))[:, np.newaxis] & ((cols >= 0) & (cols < nCols))[np.newaxis, :]
+
+        focalSums = focal.getFocalClassSums(valueBlock, insideMask, noDataValue, classValuesDict, windowSizes, halo)
+        xMin = extent.XMin + col0 * cellSize
+        yMax = extent.YMax - row0 * cellSize
+        for (key, windowSize), sums in focalSums.items():
+            percentGrid, countGrid = focalGrids[(key, windowSize)]
+            percentGrid.add((sums / (windowSize * windowSize)) * 100, xMin, yMax)
+            if countGrid is not None:
+                countGrid.add(sums, xMin, yMax)
+
+    return focalGrids
+
+
+def getCircleFocalSumGrid(inRaster, classValue, radius, blockSize, threshold=None, trueValue=1, folder=None):
+    """ Counts the cells equal to *classValue* within a circular neighborhood of every cell of a raster
+
+    **Description:**
+
+        The same count as FocalStatistics SUM with an NbrCircle neighborhood in CELL units and the DATA option, run on
+        (inRaster == classValue). The raster is read one block at a time with a halo of *radius* cells, and each block
+        is summed either one neighborhood row at a time or, for large radii, with an FFT convolution, whichever 
+        utils.focal.getCircleSumMethod expects to be faster. Memory use is set by *blockSize* and *radius*, not by
+        the size of the raster.
+
+    **Arguments:**
+
+        * *inRaster* - integer raster (e.g., a class (1) / other (0) patch grid)
+        * *classValue* - the value counted
+        * *radius* - neighborhood radius in cells
+        * *blockSize* - maximum number of rows and columns read at a time, not counting the halo
+        * *threshold* - optional count. If given, cells whose count exceeds it get *trueValue* and all other cells are
+                        NoData, as with Con(focalGrid > threshold, trueValue)
+        * *trueValue* - value given to the cells above the threshold
+        * *folder* - folder for the memory-mapped file. If None, the scratch folder environment is used
+
+    **Returns:**
+
+        * sumgrid.RunningSumGrid - the counts, or the thresholded grid, which can be written out with saveSumGrid
+
+    """
+
+    rasterObj = Raster(inRaster)
+    extent = rasterObj.extent
+    cellSize = rasterObj.meanCellWidth
+    nRows, nCols = rasterObj.height, rasterObj.width
+    radius = int(radius)
+    halo = radius
+    outGrid = sumgrid.RunningSumGrid(extent.XMin, extent.YMax, cellSize, nRows, nCols, folder or arcpy.env.scratchFolder)
+
+    for row0, col0, blockRows, blockCols in zonalhist.iterBlockWindows(nRows, nCols, blockSize):
+        lowerLeft = arcpy.Point(extent.XMin + (col0 - halo) * cellSize, extent.YMax - (row0 + blockRows + halo) * cellSize)
+        # NoData cells and cells beyond the raster extent are read as a value other than classValue
+        valueBlock = arcpy.RasterToNumPyArray(inRaster, lowerLeft, blockCols + 2 * halo, blockRows + 2 * halo, 
+                                              classValue - 1)
+        indicator = (valueBlock == classValue).astype(np.uint8)
+        del valueBlock
+
+        circleSums = focal.getCircleSumMethod(radius, indicator.shape)(indicator, radius, halo)
+        if threshold is None:
+            blockValues = circleSums.astype(np.float64)
+        else:
+            blockValues = np.where(circleSums > threshold, float(trueValue), np.nan)
+        outGrid.add(blockValues, extent.XMin + col0 * cellSize, extent.YMax - row0 * cellSize)
+
+    return outGrid
+
+
+def getEdgeCoreSumGrids(inValueRaster, classValues, excludedValues, edgeWidths, blockSize, folder=None):
+    """ Classifies a land cover raster into excluded (1), other (2), edge (3), and core (4) cells for each edge width
+
+    **Description:**
+
+        The NumPy counterpart of the Reclassify, SetNull, EucDistance, and Con steps of getEdgeCoreGrid. The raster is
+        read once, one block at a time with a halo as wide as the widest edge, and one exact distance transform of each
+        block (see utils.distance) classifies the block for every edge width. Each result is kept in a 
+        sumgrid.RunningSumGrid, which can be written out with saveSumGrid.
+
+    **Arguments:**
+
+        * *inValueRaster* - the land cover raster
+        * *classValues* - collection of grid values of the class of interest
+        * *excludedValues* - collection of grid values tagged as excluded in the lcc file
+        * *edgeWidths* - list of edge widths in cells
+        * *blockSize* - maximum number of rows and columns read at a time, not counting the halo
+        * *folder* - folder for the memory-mapped files. If None, the scratch folder environment is used
+
+    **Returns:**
+
+        * dictionary - edge width: sumgrid.RunningSumGrid of class codes, NaN for NoData
+
+    """
+
+    rasterObj = Raster(inValueRaster)
+    extent = rasterObj.extent
+    cellSize = rasterObj.meanCellWidth
+    nRows, nCols = rasterObj.height, rasterObj.width
+    noDataValue = rasterObj.noDataValue
+    folder = folder or arcpy.env.scratchFolder
+    halo = max(distance.getEdgeHalo(edgeWidth) for edgeWidth in edgeWidths)
+    classValues, excludedValues = list(classValues), list(excludedValues)
+
+    edgeCoreGrids = dict((edgeWidth, sumgrid.RunningSumGrid(extent.XMin, extent.YMax, cellSize, nRows, nCols, folder)) 
+                         for edgeWidth in edgeWidths)
+
+    for row0, col0, blockRows, blockCols in zonalhist.iterBlockWindows(nRows, nCols, blockSize):
+        lowerLeft = arcpy.Point(extent.XMin + (col0 - halo) * cellSize, extent.YMax - (row0 + blockRows + halo) * cellSize)
+        valueBlock = arcpy.RasterToNumPyArray(inValueRaster, lowerLeft, blockCols + 2 * halo, blockRows + 2 * halo, 
+                                              noDataValue)
+        rows = np.arange(row0 - halo, row0 + blockRows + halo)
+        cols = np.arange(col0 - halo, col0 + blockCols + halo)
+        validMask = ((rows >= 0) & (rows < nRows))[:, np.newaxis] & ((cols >= 0) & (cols < nCols))[np.newaxis, :]
+        if noDataValue is not None:
+            validMask &= valueBlock != noDataValue
+
+        # values in both lists are class values, as in getInOutOtherReclassPairs
+        classMask = np.isin(valueBlock, classValues)
+        excludedMask = np.isin(valueBlock, excludedValues) & ~classMask
+        blockCodes = distance.getEdgeCoreClasses(classMask, excludedMask, validMask, edgeWidths, halo)
+
+        xMin = extent.XMin + col0 * cellSize
+        yMax = extent.YMax - row0 * cellSize
+        for edgeWidth, codes in blockCodes.items():
+            edgeCoreGrids[edgeWidth].add(np.where(codes == 0, np.nan, codes), xMin, yMax)
+
+    return edgeCoreGrids
+
+
+# workspace of the current park worker process (see _initParkWorker)
+_parkWorkerWorkspace = None
+
+
+def _initParkWorker(envSettings, scratchFolder):
+    """ Sets up a park worker process: copies the geoprocessing environments of the main process and creates a file
+        geodatabase of its own in *scratchFolder* so that workers never write to the same workspace """
+    global _parkWorkerWorkspace
+
+    gdbName = f"worker{parallel.getWorkerNumber()}.gdb"
+    _parkWorkerWorkspace = os.path.join(scratchFolder, gdbName)
+    if not arcpy.Exists(_parkWorkerWorkspace):
+        arcpy.management.CreateFileGDB(scratchFolder, gdbName)
+
+    for envName, envValue in envSettings.items():
+        setattr(arcpy.env, envName, envValue)
+    arcpy.env.workspace = _parkWorkerWorkspace
+    arcpy.env.scratchWorkspace = _parkWorkerWorkspace
+
+
+def processParkTask(parkTask):
+    """ Runs getParkRaster for one park in a worker process
+
+    **Arguments:**
+
+        * *parkTask* - tuple of (metricConst, inParkFeature, oidFld, parkID, buffDist, costRaster, distNumber, 
+                       expandNumber, calcAreaFld, inCensusDataset, inPopField, accumulate). If accumulate is True, the
+                       park's values are returned as arrays instead of being saved as a raster
+
+    **Returns:**
+
+        * tuple - (park raster catalog path, list of (array, xMin, yMax) tuples if accumulating, or None, 
+                  [outPop, sqm_person], list of anomaly names for the park: "nullRaster", "popNone", and/or "popZero", 
+                  error message or None)
+
+    """
+
+    getParkRasterArgs, accumulate = parkTask[:11], parkTask[11]
+    metricConst, inParkFeature, oidFld, parkID = getParkRasterArgs[:4]
+    nullRaster, popNone, popZero = [], [], []
+    if accumulate:
+        # hand the park's values back to the main process, which adds them to its running sum grid
+        rasterName = None
+        accumulator = _ParkArrayCollector()
+    else:
+        # name the output after the park so that reruns and the mosaic order do not depend on which worker ran the park
+        rasterName = os.path.join(arcpy.env.workspace, f"{metricConst.shortName}_Access_Id{parkID}")
+        accumulator = None
+    try:
+        parkRaster, nullRaster, popNone, popZero, valuesList = getParkRaster(*(getParkRasterArgs + (nullRaster, popNone, 
+                                                                               popZero, ["KeepIntermediates"], 
+                                                                               rasterName, accumulator)))
+    except Exception as e:
+        return None, None, [], str(e)
+
+    anomalies = [name for name, ids in (("nullRaster", nullRaster), ("popNone", popNone), ("popZero", popZero)) if ids]
+    if accumulate:
+        parkRaster = accumulator.arrays
+    return parkRaster, valuesList, anomalies, None
+
+
+def getParkRastersInParallel(metricConst, inParkFeature, oidFld, parkList, buffDist, costRaster, distNumber, expandNumber,
+                             calcAreaFld, inCensusDataset, inPopField, workerCount, cleanupList, timer, logFile=None, 
+                             accumulator=None):
+    """ Calculates the accessibility raster of every park in a pool of worker processes
+
+    **Description:**
+
+        Each park is one task. Parks are handed out largest first, one at a time, so that a worker that finishes early
+        takes the next waiting park instead of idling while another works through a large one. Each worker writes to
+        its own file geodatabase in a scratch folder and names its outputs after the park ID, so output names do not
+        depend on scheduling. Results are gathered in the order of *parkList*.
+
+    **Arguments:**
+
+        * *metricConst* - an object with constants specific to the metric being run (paaa)
+        * *inParkFeature* - park polygon feature class with the *calcAreaFld* field populated
+        * *oidFld* - the park ID field
+        * *parkList* - list of park ID values
+        * *buffDist*, *costRaster*, *distNumber*, *expandNumber*, *calcAreaFld*, *inCensusDataset*, *inPopField* - 
+          passed on to getParkRaster
+        * *workerCount* - number of worker processes
+        * *cleanupList* - object containing commands and parameters to perform at cleanup time
+        * *timer* - a DateTimer object used to time stamp messages
+        * *logFile* - CatalogPath and name of the text log file. It can be None
+        * *accumulator* - optional sumgrid.RunningSumGrid. If given, the workers send back each park's values and they
+                          are added to the running sum as they arrive; no park rasters are saved
+
+    **Returns:**
+
+        * list - park raster catalog paths in *parkList* order (empty when accumulating)
+        * list, list, list - park IDs that did not rasterize, whose population was none, and whose population was zero
+        * dictionary - [outPop, sqm_person] keyed by park ID
+
+    """
+
+    inParkFeature = str(inParkFeature)
+
+    # schedule the largest parks first; their cost distance calculations take the longest
+    areaDict = {}
+    with arcpy.da.SearchCursor(inParkFeature, [oidFld, calcAreaFld]) as cursor:
+        for parkID, parkArea in cursor:
+            areaDict[parkID] = parkArea or 0
+    scheduledParks = sorted(parkList, key=lambda parkID: areaDict.get(parkID, 0), reverse=True)
+
+    scratchFolder = os.path.join(arcpy.env.scratchFolder, f"{metricConst.shortName}_workers")
+    os.makedirs(scratchFolder, exist_ok=True)
+    if not cleanupList[0] == "KeepIntermediates":
+        cleanupList.append((arcpy.Delete_management,(scratchFolder,)))
+
+    envSettings = {"extent": str(arcpy.env.extent), 
+                   "outputCoordinateSystem": arcpy.env.outputCoordinateSystem.exportToString() 
+                                             if arcpy.env.outputCoordinateSystem else None,
+                   "snapRaster": arcpy.env.snapRaster,
+                   "cellSize": arcpy.env.cellSize,
+                   "overwriteOutput": True}
+
+    taskList = [(metricConst, inParkFeature, oidFld, str(parkID), buffDist, costRaster, distNumber, expandNumber, 
+                 calcAreaFld, inCensusDataset, inPopField, accumulator is not None) for parkID in scheduledParks]
+
+    def addParkArrays(position, result):
+        # add the park's values to the running sum as soon as they arrive and keep only the park's summary
+        parkArrays, valuesList, anomalies, errorMessage = result
+        for array, xMin, yMax in parkArrays or []:
+            accumulator.add(array, xMin, yMax)
+        return None, valuesList, anomalies, errorMessage
+
+    AddMsg(f"{timer.now()} Processing {len(taskList)} parks with {workerCount} worker processes. Intermediates: {scratchFolder}", 0, logFile)
+    results = parallel.runTasks(processParkTask, taskList, workerCount, _initParkWorker, (envSettings, scratchFolder),
+                                messages.loopProgress(len(taskList)), addParkArrays if accumulator is not None else None)
+
+    resultDict = dict(zip(scheduledParks, results))
+    mosaicRasters = []
+    anomalyDict = {"nullRaster": [], "popNone": [], "popZero": []}
+    aaaDict = {}
+    for parkID in parkList:
+        parkRaster, valuesList, anomalies, errorMessage = resultDict[parkID]
+        if errorMessage:
+            AddMsg(f"Failed while processing Park ID: {parkID}", 2)
+            if logFile:
+                logFile.write(f"    Park ID {parkID} failed: {errorMessage}\n")
+            continue
+        if parkRaster:
+            mosaicRasters.append(parkRaster)
+        for anomaly in anomalies:
+            anomalyDict[anomaly].append(str(parkID))
+        aaaDict[parkID] = valuesList
+
+    return mosaicRasters, anomalyDict["nullRaster"], anomalyDict["popNone"], anomalyDict["popZero"], aaaDict
+
+
+def rasterizeZones(inZoneFeature, zoneIdField, outZoneRaster, cellSize=None, logFile=None, snapRaster=None):
+    """ Converts reporting unit polygons to a raster of object IDs and builds the object ID to zone lookup.
+
+    **Description:**
+
+        The polygons are rasterized on their object ID field so that text, float, or duplicated zone ID values can all
+        be handled the same way. Cells are aligned to *snapRaster*, so that the zone raster can be read cell for cell
+        against it (see iterAlignedBlocks), or else to the current snap raster environment. Polygons that share a zone
+        ID value are assigned the same zone index.
+
+    **Arguments:**
+
+        * *inZoneFeature* - reporting unit polygon feature class
+        * *zoneIdField* - the field holding the zone ID values
+        * *outZoneRaster* - catalog path and name for the object ID raster
+        * *cellSize* - cell size for the zone raster. If None, the processing cell size environment is used
+        * *logFile* - CatalogPath and name of the text log file. It can be None
+        * *snapRaster* - raster whose cells the zone raster lines up with (e.g., the land cover grid). If None, the
+          snap raster environment is used
+
+    **Returns:**
+
+        * list - sorted zone ID values. The position of an ID in the list is its zone index
+        * numpy array - zone index for every object ID (-1 for object IDs that do not exist)
+
+    """
+
+    oidField = arcpy.Describe(inZoneFeature).OIDFieldName
+    if not cellSize:
+        cellSize = arcpy.env.cellSize
+
+    with arcpy.EnvManager(snapRaster=snapRaster or arcpy.env.snapRaster):
+        with logArcpy("arcpy.conversion.PolygonToRaster", (inZoneFeature, oidField, outZoneRaster, "CELL_CENTER", "NONE", cellSize), logFile):
+            arcpy.conversion.PolygonToRaster(inZoneFeature, oidField, outZoneRaster, "CELL_CENTER", "NONE", cellSize)
+
+    return getZoneLookup(inZoneFeature, zoneIdField)
+
+
+def getZoneLookup(inZoneFeature, zoneIdField):
+    """ Returns the sorted zone ID values and the object ID to zone index lookup of a reporting unit feature class
+    
+        See rasterizeZones for the returned values.
+    """
+
+    oidZoneIdPairs = []
+    with arcpy.da.SearchCursor(inZoneFeature, ["OID@", zoneIdField]) as cursor:
+        for row in cursor:
+            oidZoneIdPairs.append(row)
+
+    zoneIdList = sorted(set(zoneId for oid, zoneId in oidZoneIdPairs))
+    zoneIndexDict = dict((zoneId, i) for i, zoneId in enumerate(zoneIdList))
+
+    maxOid = max([oid for oid, zoneId in oidZoneIdPairs] + [0])
+    oidZoneLookup = np.full(maxOid + 1, -1, dtype=np.int64)
+    for oid, zoneId in oidZoneIdPairs:
+        oidZoneLookup[oid] = zoneIndexDict[zoneId]
+
+    return zoneIdList, oidZoneLookup
+
+
+def _getLayerStamp(inZoneFeature, desc):
+    """ Returns the definition query and a hash of the object IDs a feature layer holds, or an empty tuple for 
+        datasets that are not layers
+    
+    **Description:**
+    
+        Layers of the same feature class share its catalog path, so they are told apart by what they select: the 
+        definition query, and the object IDs read through the layer, which honor both the definition query and any
+        selection.
+    
+    """
+    
+    if desc.dataType not in ("FeatureLayer", "Layer"):
+        return ()
+    
+    oidHash = hashlib.sha1()
+    with arcpy.da.SearchCursor(inZoneFeature, ["OID@"]) as cursor:
+        for row in cursor:
+            oidHash.update(b"%d," % row[0])
+    return (getattr(desc, "whereClause", None) or "", oidHash.hexdigest())
+
+
+def getZoneRasterKey(inZoneFeature, cellSize=None, snapRaster=None):
+    """ Returns a key that identifies the object ID raster rasterizeZones would make from *inZoneFeature*
+    
+    **Description:**
+    
+        The key combines a fingerprint of the reporting unit dataset (its path, feature count, extent and on-disk
+        modification stamp, and for a layer its definition query and selected object IDs) with everything that sets 
+        the cell alignment of PolygonToRaster: the cell size, a fingerprint of the snap raster (*snapRaster*, or else
+        the snap raster environment), and the extent and output coordinate system environments.
+    
+    """
+    
+    if not cellSize:
+        cellSize = arcpy.env.cellSize
+    snapRaster = snapRaster or arcpy.env.snapRaster
+    desc = arcpy.Describe(inZoneFeature)
+    extent = desc.extent
+    catalogPath = str(desc.catalogPath)
+    outputCoordinateSystem = arcpy.env.outputCoordinateSystem
+    
+    key = (catalogPath, int(arcpy.GetCount_management(inZoneFeature).getOutput(0)), 
+           extent.XMin, extent.YMin, extent.XMax, extent.YMax, _getDatasetStamp(catalogPath), str(cellSize), 
+           _getRasterFingerprint(snapRaster) if snapRaster else None, str(arcpy.env.extent), 
+           outputCoordinateSystem.name if outputCoordinateSystem else None, _getLayerStamp(inZoneFeature, desc))
+    
+    return hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:16]
+
+
+# name prefixes of the cached zone rasters of getZoneRaster and of the rasters they are rasterized to
+zoneRasterPrefix = "xzone_"
+zoneRasterPartialPrefix = "xzonepart_"
+
+
+def getZoneRaster(inZoneFeature, zoneIdField, cellSize=None, logFile=None, snapRaster=None):
+    """ Returns a cached object ID raster of the reporting units, rasterizing them only if no tool has done so yet
+    
+    **Description:**
+    
+        Zone rasters are kept in globalConstants.zoneRasterCacheFolder (the scratch folder by default) under a name 
+        made from getZoneRasterKey, so every metric run against the same reporting units, cell size and alignment 
+        reads the same raster, in this process or a later one. A changed reporting unit dataset or alignment gives a
+        new key and a new raster. The zone ID lookup is read from the feature class on every call. 
+        
+        A zone raster is rasterized under a name of its own and only renamed to its cached name once PolygonToRaster
+        has finished, so a failed or cancelled run never leaves a partial raster to be reused, and processes that share
+        the cache folder (e.g., batch workers) never write to the same raster. If another process renames its raster 
+        into place first, that one is used. Cached rasters are not intermediates: tools do not delete them. Use
+        clearZoneRasterCache to empty the cache folder.
+    
+    **Arguments:**
+    
+        * *inZoneFeature* - reporting unit polygon feature class
+        * *zoneIdField* - the field holding the zone ID values
+        * *cellSize* - cell size for the zone raster. If None, the processing cell size environment is used
+        * *logFile* - CatalogPath and name of the text log file. It can be None
+        * *snapRaster* - raster the zone raster is read against (e.g., the land cover grid); its cells are lined up 
+          with the raster's cells. If None, the snap raster environment is used
+    
+    **Returns:**
+    
+        * string - catalog path of the object ID raster
+        * list - sorted zone ID values. The position of an ID in the list is its zone index
+        * numpy array - zone index for every object ID (-1 for object IDs that do not exist)
+    
+    """
+    
+    folder = globalConstants.zoneRasterCacheFolder or arcpy.env.scratchFolder
+    zoneRaster = os.path.join(folder, f"{zoneRasterPrefix}{getZoneRasterKey(inZoneFeature, cellSize, snapRaster)}.tif")
+    
+    if arcpy.Exists(zoneRaster):
+        AddMsg(f"{timer.now()} Reusing the zone raster of {basename(str(inZoneFeature))}.", 0, logFile)
+        zoneIdList, oidZoneLookup = getZoneLookup(inZoneFeature, zoneIdField)
+        return zoneRaster, zoneIdList, oidZoneLookup
+    
+    partialRaster = os.path.join(folder, f"{zoneRasterPartialPrefix}{os.getpid()}_{uuid.uuid4().hex[:12]}.tif")
+    try:
+        zoneIdList, oidZoneLookup = rasterizeZones(inZoneFeature, zoneIdField, partialRaster, cellSize, logFile, 
+                                                   snapRaster)
+        try:
+            with logArcpy("arcpy.management.Rename", (partialRaster, zoneRaster), logFile):
+                arcpy.management.Rename(partialRaster, zoneRaster)
+        except arcpy.ExecuteError:
+            # another process cached the same zone raster first
+            if not arcpy.Exists(zoneRaster):
+                raise
+    finally:
+        if arcpy.Exists(partialRaster):
+            arcpy.Delete_management(partialRaster)
+    
+    return zoneRaster, zoneIdList, oidZoneLookup
+
+
+def clearZoneRasterCache(folder=None):
+    """ Deletes the cached zone rasters of getZoneRaster, and any left by rasterizations that did not finish
+    
+    **Arguments:**
+    
+        * *folder* - the cache folder. If None, globalConstants.zoneRasterCacheFolder or the scratch folder 
+          environment is used
+    
+    **Returns:**
+    
+        * integer - the number of rasters deleted
+    
+    """
+    
+    folder = folder or globalConstants.zoneRasterCacheFolder or arcpy.env.scratchFolder
+    _tempWorkspace = arcpy.env.workspace
+    try:
+        arcpy.env.workspace = folder
+        cachedRasters = [name for name in arcpy.ListRasters("xzone*") or [] 
+                         if name.startswith((zoneRasterPrefix, zoneRasterPartialPrefix))]
+    finally:
+        arcpy.env.workspace = _tempWorkspace
+    
+    deletedCount = 0
+    for name in cachedRasters:
+        try:
+            arcpy.Delete_management(os.path.join(folder, name))
+            deletedCount += 1
+        except arcpy.ExecuteError:
+            # a raster another process still has open is left for a later call
+            pass
+    
+    return deletedCount
+
+
+def isGridAligned(inRaster, snapRaster):
+    """ Returns True if the cells of *inRaster* line up with the cells of *snapRaster*: the cell sizes are equal and
+        the corners of the two rasters are a whole number of cells apart """
+
+    rasterObj = Raster(inRaster)
+    snapObj = Raster(snapRaster)
+    cellWidth = rasterObj.meanCellWidth
+    cellHeight = rasterObj.meanCellHeight
+    if (abs(cellWidth - snapObj.meanCellWidth) > 1e-9 * cellWidth or 
+        abs(cellHeight - snapObj.meanCellHeight) > 1e-9 * cellHeight):
+        return False
+
+    for offset, size in [(rasterObj.extent.XMin - snapObj.extent.XMin, cellWidth), 
+                         (rasterObj.extent.YMin - snapObj.extent.YMin, cellHeight)]:
+        cells = offset / size
+        if abs(cells - round(cells)) > 1e-6:
+            return False
+
+    return True
+
+
+def iterAlignedBlocks(inZoneRaster, inValueRaster, blockSize, zoneNoData=-1):
+    """ A generator of matching zone and value blocks covering the extent of the zone raster.
+
+    **Description:**
+
+        The zone raster is walked one block at a time and the same window is read from the value raster with
+        arcpy.RasterToNumPyArray. Both rasters must share cell size and alignment (e.g., a zone raster produced by
+        rasterizeZones with the value raster as the snap raster). Value raster cells outside of its extent are returned
+        as the value raster's NoData value.
+
+    **Arguments:**
+
+        * *inZoneRaster* - the zone raster; its extent defines the area read
+        * *inValueRaster* - the raster holding class values (e.g., a land cover grid)
+        * *blockSize* - maximum number of rows and columns read at a time
+        * *zoneNoData* - value assigned to zone raster NoData cells
+
+    **Returns:**
+
+        * generator of tuples - (zone block, value block)
+
+    """
+
+    for row0, col0, zoneBlock, valueBlock in iterAlignedBlockWindows(inZoneRaster, inValueRaster, blockSize, 0, zoneNoData):
+        yield zoneBlock, valueBlock
+
+
+def iterAlignedBlockWindows(inZoneRaster, inValueRaster, blockSize, halo=0, zoneNoData=-1):
+    """ A generator of matching zone and value blocks, with their position, covering the extent of the zone raster.
+
+    **Description:**
+
+        Works like iterAlignedBlocks, but each block is widened by *halo* cells on every side so that neighborhood
+        operations (e.g., finding patch edge cells) can be done one block at a time. Halo cells beyond the zone raster
+        extent are returned as *zoneNoData* and as the value raster's NoData value.
+
+    **Arguments:**
+
+        * *inZoneRaster* - the zone raster; its extent defines the area read
+        * *inValueRaster* - the raster holding class values (e.g., a land cover grid)
+        * *blockSize* - maximum number of rows and columns read at a time, not counting the halo
+        * *halo* - number of extra rows and columns read on each side of a block
+        * *zoneNoData* - value assigned to zone raster NoData cells
+
+    **Returns:**
+
+        * generator of tuples - (first row, first column, zone block, value block). The row and column are those of the
+          first cell inside the halo, counted from the upper left corner of the zone raster
+
+    """
+
+    zoneObj = Raster(inZoneRaster)
+    zoneExtent = zoneObj.extent
+    cellWidth = zoneObj.meanCellWidth
+    cellHeight = zoneObj.meanCellHeight
+
+    for row0, col0, nRows, nCols in zonalhist.iterBlockWindows(zoneObj.height, zoneObj.width, blockSize):
+        lowerLeft = arcpy.Point(zoneExtent.XMin + (col0 - halo) * cellWidth, 
+                                zoneExtent.YMax - (row0 + nRows + halo) * cellHeight)
+        nCols += 2 * halo
+        nRows += 2 * halo
+        zoneBlock = arcpy.RasterToNumPyArray(inZoneRaster, lowerLeft, nCols, nRows, zoneNoData)
+        valueBlock = arcpy.RasterToNumPyArray(inValueRaster, lowerLeft, nCols, nRows)
+        yield row0, col0, zoneBlock, valueBlock
+
@@ -0,0 +1,102 @@
+""" A running sum grid backed by a NumPy memory-mapped file
+
+    Small rasters (e.g., the accessibility area of one park) are added into the grid as soon as they are produced, so
+    they never have to be saved as rasters of their own and summed later. Only the rows touched by an addition are paged
+    into memory. Cells that no addition has reached stay NaN, which marks NoData. These routines do not touch arcpy.
+
+"""
+import os
+import tempfile
+import numpy as np
+
+from . import zonalhist
+
+
+class RunningSumGrid(object):
+    """ Accumulates the sum of many small, aligned arrays on a fixed grid
+
+    **Description:**
+
+        The grid is defined by the coordinates of its upper left corner, its cell size, and its number of rows and
+        columns. Added arrays must share the grid's cell size and alignment; parts of an array that fall outside of the
+        grid are ignored. NaN cells of an added array are NoData and leave the sum unchanged.
+
+    """
+
+    def __init__(self, xMin, yMax, cellSize, nRows, nCols, folder=None):
+        """ Constructor - Called when created
+
+            * xMin, yMax - coordinates of the upper left corner of the grid
+            * cellSize - width and height of a cell
+            * nRows, nCols - grid dimensions
+            * folder - folder for the memory-mapped file. If None, the system temporary folder is used
+        """
+
+        self.xMin = float(xMin)
+        self.yMax = float(yMax)
+        self.cellSize = float(cellSize)
+        self.nRows = int(nRows)
+        self.nCols = int(nCols)
+        self.addCount = 0
+
+        fileHandle, self.fileName = tempfile.mkstemp(suffix=".sumgrid", dir=folder)
+        os.close(fileHandle)
+        self._grid = np.memmap(self.fileName, dtype=np.float64, mode="w+", shape=(self.nRows, self.nCols))
+        for row0, col0, nr, nc in zonalhist.iterBlockWindows(self.nRows, self.nCols, 4096):
+            self._grid[row0:row0 + nr, col0:col0 + nc] = np.nan
+
+
+    def add(self, array, xMin, yMax):
+        """ Adds an array whose upper left corner is at (*xMin*, *yMax*) into the running sum
+
+        **Returns:**
+
+            * boolean - True if any part of the array fell on the grid
+
+        """
+
+        array = np.asarray(array, dtype=np.float64)
+        row0 = int(round((self.yMax - yMax) / self.cellSize))
+        col0 = int(round((xMin - self.xMin) / self.cellSize))
+
+        # clip the array to the grid
+        r0, c0 = max(row0, 0), max(col0, 0)
+        r1, c1 = min(row0 + array.shape[0], self.nRows), min(col0 + array.shape[1], self.nCols)
+        if r0 >= r1 or c0 >= c1:
+            return False
+
+        values = array[r0 - row0:r1 - row0, c0 - col0:c1 - col0]
+        window = self._grid[r0:r1, c0:c1]
+        hasValue = ~np.isnan(values)
+        with np.errstate(invalid='ignore'):
+            self._grid[r0:r1, c0:c1] = np.where(hasValue, np.where(np.isnan(window), 0, window) + values, window)
+        self.addCount += 1
+
+        return True
+
+
+    def iterTiles(self, tileSize):
+        """ A generator of the tiles of the grid that hold data
+
+        **Returns:**
+
+            * generator of tuples - (first row, first column, tile array with NaN as NoData)
+
+        """
+
+        for row0, col0, nr, nc in zonalhist.iterBlockWindows(self.nRows, self.nCols, tileSize):
+            tile = np.array(self._grid[row0:row0 + nr, col0:col0 + nc])
+            if not np.isnan(tile).all():
+                yield row0, col0, tile
+
+
+    def close(self):
+        """ Releases and deletes the memory-mapped file """
+
+        if self._grid is not None:
+            del self._grid
+            self._grid = None
+            try:
+                os.remove(self.fileName)
+            except OSError:
+                pass
@@ -1,5 +1,38 @@
 import arcpy
-from ATtILA2.utils.log import logArcpy
+import numpy as np
+from ATtILA2.utils.log import arcpyLog, logArcpy
+from ATtILA2.constants import globalConstants
+from . import cursors
+from . import raster
+from . import zonalhist
+from .messages import AddMsg
+
+
+# Zone by class area matrices by tabulation key while tabulations are shared (see startSharedTabulations), else None
+_sharedAreaMatrices = None
+
+
+def startSharedTabulations():
+    """ Starts serving TabulateAreaTable objects from the area matrices of earlier, identical tabulations
+    
+    **Description:**
+    
+        Until stopSharedTabulations is called, every TabulateAreaTable keeps its zone by class area matrix in memory,
+        and a later table with the same reporting units, zone ID field, land cover grid, backend and processing 
+        environments is built from that matrix instead of being tabulated again. Datasets are matched by fingerprint 
+        (see raster.getZoneRasterKey), so an intermediate dataset recreated under an earlier name is tabulated anew.
+    
+    """
+    
+    global _sharedAreaMatrices
+    _sharedAreaMatrices = {}
+
+
+def stopSharedTabulations():
+    """ Stops sharing tabulations and releases the area matrices kept since startSharedTabulations """
+    
+    global _sharedAreaMatrices
+    _sharedAreaMatrices = None
 
 
 class TabulateAreaTable(object):
@@ -17,12 +50,17 @@ class TabulateAreaTable(object):
     _tabAreaValueFields = None
     _tabAreaTableRows = None
     _destroyTable = True
+    _areaMatrix = None
     
 
-    def __init__(self, inReportingUnitFeature, reportingUnitIdField, inLandCoverGrid, logFile, tableName=None, lccObj=None):
+    def __init__(self, inReportingUnitFeature, reportingUnitIdField, inLandCoverGrid, logFile, tableName=None, lccObj=None,
+                 backend=None):
         """ Constructor - Called when created 
         
             If tableName is None, the table will be deleted, otherwise it persists
+            
+            backend selects how the table is built (globalConstants.arcpyBackendName or globalConstants.numpyBackendName).
+            If None, globalConstants.tabulateAreaBackend is used.
         
         """
         
@@ -31,6 +69,7 @@ class TabulateAreaTable(object):
         self._inLandCoverGrid = inLandCoverGrid
         self._tableName = tableName
         self._logFile = logFile
+        self._backend = backend or globalConstants.tabulateAreaBackend
         
         if lccObj:
             self._excludedValues = lccObj.values.getExcludedValueIds()
@@ -43,28 +82,186 @@ class TabulateAreaTable(object):
     def _createNewTable(self):
         """ Create the underlying arcpy table"""
         
+        if _sharedAreaMatrices is not None:
+            tabulationKey = self._getTabulationKey()
+            if tabulationKey in _sharedAreaMatrices:
+                AddMsg("Reusing the zonal tabulation of an earlier metric.", 0, self._logFile)
+                self.setAreaMatrix(*_sharedAreaMatrices[tabulationKey])
+                return
+        
+        self._createTabulation()
+        
+        if _sharedAreaMatrices is not None:
+            _sharedAreaMatrices[tabulationKey] = self.getAreaMatrix()
+    
+    
+    def _getTabulationKey(self):
+        """ Identifies the tabulation by its input datasets, zone ID field, backend and processing environments """
+        
+        mask = arcpy.env.mask
+        return (raster.getZoneRasterKey(self._inReportingUnitFeature), self._reportingUnitIdField, 
+                raster._getRasterFingerprint(self._inLandCoverGrid), self._backend, str(mask) if mask else None)
+    
+    
+    def _createTabulation(self):
+        """ Tabulate the zone by class areas with the selected backend """
+        
+        if self._backend == globalConstants.numpyBackendName and self._numpyBackendSupported():
+            self._createNumpyTable()
+            return
+        
         if self._tableName:
             self._destroyTable = False
             self._tableName = arcpy.CreateScratchName(self._tableName, "", self._datasetType)
         else:
             self._tableName = arcpy.CreateScratchName(self._tempTableName, "", self._datasetType)
             
-        logArcpy('arcpy.gp.TabulateArea_sa', (self._inReportingUnitFeature, self._reportingUnitIdField, self._inLandCoverGrid, self._value, self._tableName), self._logFile)
-        arcpy.gp.TabulateArea_sa(self._inReportingUnitFeature, self._reportingUnitIdField, self._inLandCoverGrid, self._value, self._tableName)
+        arcpyLog(arcpy.gp.TabulateArea_sa, (self._inReportingUnitFeature, self._reportingUnitIdField, self._inLandCoverGrid, self._value, self._tableName), 'arcpy.gp.TabulateArea_sa', self._logFile)
+        
+        self._openTable()
+        
+    
+    def _openTable(self):
+        """ Reads the value fields of the tabulate area table self._tableName and starts reading its rows """
         
-        self._tabAreaTableRows = arcpy.SearchCursor(self._tableName)        
         self._tabAreaValueFields = arcpy.ListFields(self._tableName, self._valueFieldPrefix + "*" )
         self._tabAreaValues = [int(aFld.name.replace(self._valueFieldPrefix,"")) for aFld in self._tabAreaValueFields]
+        self._tabAreaTableRows = self._readTableRows()
          
         self._tabAreaDict = dict(zip(self._tabAreaValues,[])) 
         
+    
+    def _readTableRows(self):
+        """ Yields a row object for each row of the tabulate area table, read in blocks with arcpy.da cursors """
+        
+        # the ID field is read once, even where it is also among the value fields (e.g., a DOUBLE ID field in the
+        # core and edge tabulation, whose value fields are all its DOUBLE fields)
+        fieldNames = [self._reportingUnitIdField] + [aFld.name for aFld in self._tabAreaValueFields 
+                                                     if aFld.name.upper() != self._reportingUnitIdField.upper()]
+        for rowBlock in cursors.iterRowBlocks(self._tableName, fieldNames):
+            for values in rowBlock.tolist():
+                yield _ArrayRow(fieldNames, values)
+        
+    
+    def _numpyBackendSupported(self):
+        """ The NumPy backend counts land cover cells directly, so it requires the processing cell size to equal the
+            land cover cell size and the snap raster, if any, to line up with the land cover cells. Otherwise 
+            TabulateArea must resample and the arcpy backend is used instead. The NumPy backend does not apply the
+            mask environment either, so the arcpy backend is also used when a mask is set."""
+        
+        if arcpy.env.mask:
+            AddMsg("A mask is set. Using the ArcGIS TabulateArea tool.", 0, self._logFile)
+            return False
+        
+        snapRaster = arcpy.env.snapRaster
+        if snapRaster and not raster.isGridAligned(self._inLandCoverGrid, snapRaster):
+            AddMsg("Snap raster cells do not line up with the land cover cells. Using the ArcGIS TabulateArea tool.", 0, self._logFile)
+            return False
+        
+        gridCellSize = arcpy.Raster(self._inLandCoverGrid).meanCellWidth
+        envCellSize = arcpy.env.cellSize
+        try:
+            if envCellSize and abs(float(envCellSize) - gridCellSize) > 1e-9 * gridCellSize:
+                AddMsg("Processing cell size differs from the land cover cell size. Using the ArcGIS TabulateArea tool.", 0, self._logFile)
+                return False
+        except (TypeError, ValueError):
+            # cell size environments such as MAXOF or MINOF leave the land cover cell size in effect
+            pass
+        
+        return True
+    
+    
+    def _createNumpyTable(self):
+        """ Build the zone by class area table with NumPy instead of TabulateArea """
+        
+        landCoverObj = arcpy.Raster(self._inLandCoverGrid)
+        cellSize = landCoverObj.meanCellWidth
+        cellArea = landCoverObj.meanCellWidth * landCoverObj.meanCellHeight
         
+        zoneRaster, zoneIdList, oidZoneLookup = raster.getZoneRaster(self._inReportingUnitFeature, 
+                                                                     self._reportingUnitIdField, cellSize, self._logFile,
+                                                                     self._inLandCoverGrid)
+        
+        hist = zonalhist.ZoneClassHistogram(len(zoneIdList))
+        for zoneBlock, valueBlock in raster.iterAlignedBlocks(zoneRaster, self._inLandCoverGrid, globalConstants.numpyBlockSize):
+            hist.addBlock(zonalhist.remapZones(zoneBlock, oidZoneLookup), valueBlock, landCoverObj.noDataValue)
+        
+        self.setAreaMatrix(zoneIdList, hist.classValues, hist.getAreaMatrix(cellArea))
+    
+    
+    def setAreaMatrix(self, zoneIdList, classValues, areaMatrix):
+        """ Serve rows from an in-memory zone by class area matrix
+        
+            * zoneIdList - zone ID value for each matrix row
+            * classValues - grid value for each matrix column
+            * areaMatrix - area of each grid value in each zone
+            
+            Zones without any tabulated area are dropped, as they are from TabulateArea output. If the table is to
+            persist (i.e., intermediates are kept), the matrix is also written to a geodatabase table.
+        """
+        
+        areaMatrix = np.asarray(areaMatrix, dtype=np.float64)
+        zoneIdList = list(zoneIdList)
+        classValues = [int(v) for v in classValues]
+        keepRows = np.flatnonzero(areaMatrix.sum(axis=1) > 0) if areaMatrix.size else []
+        
+        self._tabAreaValueFields = [_ArrayField(self._valueFieldPrefix + str(v)) for v in classValues]
+        self._tabAreaValues = classValues
+        self._tabAreaDict = dict(zip(self._tabAreaValues,[]))
+        
+        fieldNames = [self._reportingUnitIdField] + [aFld.name for aFld in self._tabAreaValueFields]
+        rows = [_ArrayRow(fieldNames, [zoneIdList[i]] + areaMatrix[i].tolist()) for i in keepRows]
+        self._tabAreaTableRows = iter(rows)
+        self._areaMatrix = ([zoneIdList[i] for i in keepRows], classValues, areaMatrix[keepRows])
+        
+        if self._tableName:
+            self._destroyTable = False
+            self._tableName = arcpy.CreateScratchName(self._tableName, "", self._datasetType)
+            self._saveAreaMatrix(fieldNames, [zoneIdList[i] for i in keepRows], areaMatrix[keepRows])
+        
+    
+    def _saveAreaMatrix(self, fieldNames, zoneIds, areaMatrix):
+        """ Write the in-memory area matrix to self._tableName with the same layout as a TabulateArea table """
+        
+        idArray = np.asarray(zoneIds)
+        if idArray.dtype.kind in ('U', 'S', 'O'):
+            idArray = idArray.astype(str)
+        dtype = [(fieldNames[0], idArray.dtype)] + [(f, np.float64) for f in fieldNames[1:]]
+        
+        outArray = np.empty(len(zoneIds), dtype=dtype)
+        outArray[fieldNames[0]] = idArray
+        for i, f in enumerate(fieldNames[1:]):
+            outArray[f] = areaMatrix[:, i]
+        
+        with logArcpy('arcpy.da.NumPyArrayToTable', ("numpyAreaMatrix", self._tableName), self._logFile):
+            arcpy.da.NumPyArrayToTable(outArray, self._tableName)
+        
+        
+    def getAreaMatrix(self):
+        """ Return the whole table at once as a zone by grid value area matrix
+        
+            Returns a tuple of (list of zone ID values, list of grid values, 2D array of areas) with matrix rows in
+            table order. This is an alternative to iterating over TabulateAreaRow objects; use one or the other.
+        """
+        
+        if self._areaMatrix is None:
+            fieldNames = [self._reportingUnitIdField] + [aFld.name for aFld in self._tabAreaValueFields]
+            tableArray = cursors.readRows(self._tableName, fieldNames)
+            areaMatrix = np.empty((len(tableArray), len(self._tabAreaValueFields)), dtype=np.float64)
+            for i, aFld in enumerate(self._tabAreaValueFields):
+                areaMatrix[:, i] = tableArray[aFld.name]
+            
+            self._areaMatrix = (tableArray[self._reportingUnitIdField].tolist(), list(self._tabAreaValues), areaMatrix)
+        
+        return self._areaMatrix
+    
+    
     def __del__(self):
         """ Destructor - Called when deleted (Housekeeping)"""
         
         del self._tabAreaTableRows
         
-        if self._destroyTable:
+        if self._destroyTable and self._tableName:
             arcpy.Delete_management(self._tableName)
     
     
@@ -143,3 +340,19 @@ class TabulateAreaRow(object):
         del self._row
 
 
+
+class _ArrayField(object):
+    """ Minimal stand-in for an arcpy Field object describing a column of an in-memory tabulate area table """
+    
+    def __init__(self, name):
+        self.name = name
+
+
+class _ArrayRow(object):
+    """ Minimal stand-in for an arcpy row object holding one zone of an in-memory tabulate area table """
+    
+    def __init__(self, fieldNames, values):
+        self._values = dict(zip(fieldNames, values))
+        
+    def getValue(self, fieldName):
+        return self._values[fieldName]
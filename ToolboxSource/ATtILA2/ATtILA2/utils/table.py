@@ -8,8 +8,11 @@ import os
 from os.path import basename
 
 import arcpy
+import numpy as np
 
 from . import fields
+from . import columnar
+from . import cursors
 from ATtILA2.constants import globalConstants
 from ATtILA2.datetimeutil import DateTimer
 from ATtILA2.utils.log import logArcpy
@@ -18,7 +21,8 @@ from ATtILA2.utils.messages import AddMsg
 timer = DateTimer()
 
 def createMetricOutputTable(outTable, outIdField, metricsBaseNameList, metricsFieldnameDict, metricFieldParams, 
-                            qaCheckFlds=None, addAreaFldParams=None, additionalFields=None, logFile=None):
+                            qaCheckFlds=None, addAreaFldParams=None, additionalFields=None, logFile=None,
+                            allowColumnar=False):
     """ Returns new empty table for ATtILA metric generation output with appropriate fields for selected metric
     
     **Description:**
@@ -42,44 +46,51 @@ def createMetricOutputTable(outTable, outIdField, metricsBaseNameList, metricsFi
                         generation (e.g., optionalFlds = [["LC_Overlap","FLOAT",6,1]])
         * *addAreaFldParams* - a list of filename parameters for the optional Add Area Fields selection 
                         (e.g., ["_A","DOUBLE",15,0])
+        * *allowColumnar* - True if the caller writes the table with calculate.landCoverProportions,
+                        landCoverCoefficientCalculator or landCoverDiversity, which also write columnar output tables
         
     **Returns:**
 
-        * table (type unknown - string representation?)
+        * table (type unknown - string representation?), or a columnar.ColumnarTable if *allowColumnar* is True and
+                        globalConstants.outputTableBackend is "COLUMNAR"
         
     """
     outTablePath, outTableName = os.path.split(outTable)
-        
-    # need to strip the dbf extension if the outpath is a geodatabase; 
-    # should control this in the validate step or with an arcpy.ValidateTableName call
-    logArcpy('arcpy.CreateTable_management', (outTablePath, outTableName), logFile)
-    newTable = arcpy.CreateTable_management(outTablePath, outTableName)
     
     # Field objects in ArcGIS 10 service pack 0 have a type property that is incompatible with some of the AddField 
     # tool's Field Type keywords. This addresses that issue
     outIdFieldType = fields.convertFieldTypeKeyword(outIdField)
     
-    logArcpy('arcpy.AddField_management',(newTable, outIdField.name, outIdFieldType, outIdField.precision, outIdField.scale), logFile)
-    arcpy.AddField_management(newTable, outIdField.name, outIdFieldType, outIdField.precision, outIdField.scale)
-    
-    # add metric fields to the output table.
-    [logArcpy('arcpy.AddField_management',(newTable, metricsFieldnameDict[mBaseName][0],metricFieldParams[2],metricFieldParams[3],metricFieldParams[4]),logFile )for mBaseName in metricsBaseNameList]
-    [arcpy.AddField_management(newTable, metricsFieldnameDict[mBaseName][0], metricFieldParams[2], metricFieldParams[3], metricFieldParams[4])for mBaseName in metricsBaseNameList]
-
-    # add any metric specific additional fields to the output table
+    # AddField parameters of every output field in table order: the id field, the metric fields, any metric specific
+    # additional fields, any optional QA fields, and any optional area fields
+    fieldParametersList = [(outIdField.name, outIdFieldType, outIdField.precision, outIdField.scale)]
+    fieldParametersList += [(metricsFieldnameDict[mBaseName][0], metricFieldParams[2], metricFieldParams[3], 
+                             metricFieldParams[4]) for mBaseName in metricsBaseNameList]
     if additionalFields:
         for aFldParams in additionalFields:
-            [logArcpy('arcpy.AddField_management',(newTable,aFldParams[0]+metricsFieldnameDict[mBaseName][1]+aFldParams[1],aFldParams[2],aFldParams[3],aFldParams[4]),logFile)for mBaseName in metricsBaseNameList]
-            [arcpy.AddField_management(newTable, aFldParams[0]+metricsFieldnameDict[mBaseName][1]+aFldParams[1], aFldParams[2], aFldParams[3], aFldParams[4]) for mBaseName in metricsBaseNameList]
-
-    # add any optional fields to the output table
+            fieldParametersList += [(aFldParams[0]+metricsFieldnameDict[mBaseName][1]+aFldParams[1], aFldParams[2], 
+                                     aFldParams[3], aFldParams[4]) for mBaseName in metricsBaseNameList]
     if qaCheckFlds:
-        [logArcpy('arcpy.AddField_management', (newTable, qaFld[0], qaFld[1], qaFld[2]), logFile) for qaFld in qaCheckFlds]
-        [arcpy.AddField_management(newTable, qaFld[0], qaFld[1], qaFld[2]) for qaFld in qaCheckFlds]
-        
+        fieldParametersList += [(qaFld[0], qaFld[1], qaFld[2]) for qaFld in qaCheckFlds]
     if addAreaFldParams:
-        [logArcpy('arcpy.AddField_management',(newTable,metricsFieldnameDict[mBaseName][0]+addAreaFldParams[0],addAreaFldParams[1],addAreaFldParams[2],addAreaFldParams[3]),logFile)for mBaseName in metricsBaseNameList]
-        [arcpy.AddField_management(newTable, metricsFieldnameDict[mBaseName][0]+addAreaFldParams[0], addAreaFldParams[1], addAreaFldParams[2], addAreaFldParams[3]) for mBaseName in metricsBaseNameList]
+        fieldParametersList += [(metricsFieldnameDict[mBaseName][0]+addAreaFldParams[0], addAreaFldParams[1], 
+                                 addAreaFldParams[2], addAreaFldParams[3]) for mBaseName in metricsBaseNameList]
+    
+    if allowColumnar and columnar.isEnabled():
+        # the fields are kept in memory and written with the values (see utils.columnar)
+        newTable = columnar.ColumnarTable(outTable, logFile)
+        for fieldParameters in fieldParametersList:
+            newTable.addField(*fieldParameters)
+        return newTable
+        
+    # need to strip the dbf extension if the outpath is a geodatabase; 
+    # should control this in the validate step or with an arcpy.ValidateTableName call
+    with logArcpy('arcpy.CreateTable_management', (outTablePath, outTableName), logFile):
+        newTable = arcpy.CreateTable_management(outTablePath, outTableName)
+    
+    for fieldParameters in fieldParametersList:
+        with logArcpy('arcpy.AddField_management', (newTable,) + fieldParameters, logFile):
+            arcpy.AddField_management(newTable, *fieldParameters)
          
     # delete the 'Field1' field if it exists in the new output table.
     fields.deleteFields(newTable, ["field1"])
@@ -133,21 +144,21 @@ def createPolygonValueCountTable(inPolygonFeature,inPolygonIdField,inValueDatase
             env.cellSize = desc.meanCellWidth
 
             # calculate the population for the polygon features using zonal statistics as table
-            logArcpy("arcpy.sa.ZonalStatisticsAsTable",(inPolygonFeature, inPolygonIdField, inValueDataset, outTable, "DATA", "SUM"),logFile)
-            arcpy.sa.ZonalStatisticsAsTable(inPolygonFeature, inPolygonIdField, inValueDataset, outTable, "DATA", "SUM")
+            with logArcpy("arcpy.sa.ZonalStatisticsAsTable",(inPolygonFeature, inPolygonIdField, inValueDataset, outTable, "DATA", "SUM"),logFile):
+                arcpy.sa.ZonalStatisticsAsTable(inPolygonFeature, inPolygonIdField, inValueDataset, outTable, "DATA", "SUM")
 
             # Rename the population count field.
             outValueField = metricConst.valueCountFieldNames[index]
             try:
-                logArcpy("arcpy.AlterField_management",(outTable, "SUM", outValueField, outValueField),logFile)
-                arcpy.AlterField_management(outTable, "SUM", outValueField, outValueField)
+                with logArcpy("arcpy.AlterField_management",(outTable, "SUM", outValueField, outValueField),logFile):
+                    arcpy.AlterField_management(outTable, "SUM", outValueField, outValueField)
             except:
-                logArcpy("arcpy.AddField_management",(outTable, outValueField, "DOUBLE"),logFile)
-                arcpy.AddField_management(outTable, outValueField, "DOUBLE")
-                logArcpy("arcpy.CalculateField_management",(outTable, outValueField, '!SUM!'),logFile)
-                arcpy.CalculateField_management(outTable, outValueField, '!SUM!')
-                logArcpy("arcpy.DeleteField_management",(outTable, ["SUM"]),logFile)
-                arcpy.DeleteField_management(outTable, ["SUM"])
+                with logArcpy("arcpy.AddField_management",(outTable, outValueField, "DOUBLE"),logFile):
+                    arcpy.AddField_management(outTable, outValueField, "DOUBLE")
+                with logArcpy("arcpy.CalculateField_management",(outTable, outValueField, '!SUM!'),logFile):
+                    arcpy.CalculateField_management(outTable, outValueField, '!SUM!')
+                with logArcpy("arcpy.DeleteField_management",(outTable, ["SUM"]),logFile):
+                    arcpy.DeleteField_management(outTable, ["SUM"])
         
         else: # census features are polygons
             # Create a copy of the census feature class that we can add new fields to for calculations.
@@ -157,32 +168,32 @@ def createPolygonValueCountTable(inPolygonFeature,inPolygonIdField,inValueDatase
             tempName = f"{metricConst.shortName}_{desc.baseName}_"
             tempCensusFeature = files.nameIntermediateFile([tempName,"FeatureClass"],cleanupList)
             AddMsg(f"{timer.now()} Creating a working copy of {basename(inValueDataset)}. Intermediate: {basename(tempCensusFeature)}", 0, logFile)
-            logArcpy("arcpy.FeatureClassToFeatureClass_conversion",(inValueDataset,env.workspace,os.path.basename(tempCensusFeature),"",fieldMappings),logFile)
-            inValueDataset = arcpy.FeatureClassToFeatureClass_conversion(inValueDataset,env.workspace,os.path.basename(tempCensusFeature),"",fieldMappings)
+            with logArcpy("arcpy.FeatureClassToFeatureClass_conversion",(inValueDataset,env.workspace,os.path.basename(tempCensusFeature),"",fieldMappings),logFile):
+                inValueDataset = arcpy.FeatureClassToFeatureClass_conversion(inValueDataset,env.workspace,os.path.basename(tempCensusFeature),"",fieldMappings)
 
             # Add a dummy field to the copied census feature class and calculate it to a value of 1.
             classField = "tmpClass"
-            logArcpy("arcpy.AddField_management",(inValueDataset,classField,"SHORT"),logFile)
-            arcpy.AddField_management(inValueDataset,classField,"SHORT")
-            logArcpy("arcpy.CalculateField_management",(inValueDataset,classField,1),logFile)
-            arcpy.CalculateField_management(inValueDataset,classField,1)
+            with logArcpy("arcpy.AddField_management",(inValueDataset,classField,"SHORT"),logFile):
+                arcpy.AddField_management(inValueDataset,classField,"SHORT")
+            with logArcpy("arcpy.CalculateField_management",(inValueDataset,classField,1),logFile):
+                arcpy.CalculateField_management(inValueDataset,classField,1)
             
             # Construct a table with a field containing the area weighted value count for each input polygon unit
-            logArcpy("arcpy.TabulateIntersection_analysis",(inPolygonFeature,[inPolygonIdField],inValueDataset,outTable,[classField],[inValueField]),logFile)
-            arcpy.TabulateIntersection_analysis(inPolygonFeature,[inPolygonIdField],inValueDataset,outTable,[classField],[inValueField])
+            with logArcpy("arcpy.TabulateIntersection_analysis",(inPolygonFeature,[inPolygonIdField],inValueDataset,outTable,[classField],[inValueField]),logFile):
+                arcpy.TabulateIntersection_analysis(inPolygonFeature,[inPolygonIdField],inValueDataset,outTable,[classField],[inValueField])
             
             # Rename the population count field.
             outValueField = metricConst.valueCountFieldNames[index]
             try:
-                logArcpy("arcpy.AlterField_management",(outTable, inValueField, outValueField, outValueField),logFile)
-                arcpy.AlterField_management(outTable, inValueField, outValueField, outValueField)
+                with logArcpy("arcpy.AlterField_management",(outTable, inValueField, outValueField, outValueField),logFile):
+                    arcpy.AlterField_management(outTable, inValueField, outValueField, outValueField)
             except:
-                logArcpy("arcpy.AddField_management",(outTable, outValueField, "DOUBLE"),logFile)
-                arcpy.AddField_management(outTable, outValueField, "DOUBLE")
-                logArcpy("arcpy.CalculateField_management",(outTable, outValueField, '!SUM!'),logFile)
-                arcpy.CalculateField_management(outTable, outValueField, '!SUM!')
-                logArcpy("arcpy.DeleteField_management",(outTable, ["SUM"]),logFile)
-                arcpy.DeleteField_management(outTable, ["SUM"])
+                with logArcpy("arcpy.AddField_management",(outTable, outValueField, "DOUBLE"),logFile):
+                    arcpy.AddField_management(outTable, outValueField, "DOUBLE")
+                with logArcpy("arcpy.CalculateField_management",(outTable, outValueField, '!SUM!'),logFile):
+                    arcpy.CalculateField_management(outTable, outValueField, '!SUM!')
+                with logArcpy("arcpy.DeleteField_management",(outTable, ["SUM"]),logFile):
+                    arcpy.DeleteField_management(outTable, ["SUM"])
             
         return outTable, outValueField
 
@@ -219,11 +230,8 @@ def getIdValueDict(inTable, keyField, valueField):
 
     zoneValueDict = {}
     
-    rows = arcpy.SearchCursor(inTable)
-    for row in rows:
-        key = row.getValue(keyField)
-        value = row.getValue(valueField)
-        zoneValueDict[key] = (value)
+    for rowBlock in cursors.iterRowBlocks(inTable, [keyField, valueField]):
+        zoneValueDict.update(zip(rowBlock[keyField].tolist(), rowBlock[valueField].tolist()))
 
     return zoneValueDict
 
@@ -254,22 +262,14 @@ def getZoneSumValueDict(inTable, keyField, excludedValueFields):
     valueFieldPrefix = "VALUE_"
     zoneSumValueDict = {}
     tabAreaValueFields = arcpy.ListFields(inTable, valueFieldPrefix + "*" )
+    sumFieldNames = [aFld.name for aFld in tabAreaValueFields if aFld.name not in excludedValueFields]
     
-    # initialize the total value
-    valueTotal = 0
-    
-    rows = arcpy.SearchCursor(inTable)
-    for row in rows:
-        key = row.getValue(keyField)
-
-        for aFld in tabAreaValueFields:
-            if aFld.name not in excludedValueFields:
-                valueTotal += row.getValue(aFld.name)
-
-        zoneSumValueDict[key] = (valueTotal)
-       
-        # reset the total value to zero 
-        valueTotal = 0
+    for rowBlock in cursors.iterRowBlocks(inTable, [keyField] + sumFieldNames):
+        # sum the selected fields of every row in the block at once
+        valueTotals = np.zeros(len(rowBlock))
+        for fieldName in sumFieldNames:
+            valueTotals += rowBlock[fieldName]
+        zoneSumValueDict.update(zip(rowBlock[keyField].tolist(), valueTotals.tolist()))
         
     return zoneSumValueDict
         
@@ -349,7 +349,8 @@ def baseNameTruncation(outputFldName, metricFieldParams, maxFieldNameSize, mBase
    
     return outputFldName, outClassName
 
-def tableWriterByClass(outTable, metricsBaseNameList, optionalGroupsList, metricConst, lccObj, outIdField, logFile, additionalFields=None):
+def tableWriterByClass(outTable, metricsBaseNameList, optionalGroupsList, metricConst, lccObj, outIdField, logFile, additionalFields=None,
+                       allowColumnar=False):
     """ Processes tool dialog parameters and options for output table generation. Class metrics option.
         
     **Description:**
@@ -377,6 +378,7 @@ def tableWriterByClass(outTable, metricsBaseNameList, optionalGroupsList, metric
         * *outIdField* - the output id field. Generally a clone of the input id field except where the fieldtype = "OID"
         * *additionalFields* - a list of lists containing field parameters for additional metric fields to be generated
                         (e.g., [[CoreField],[EdgeField]] in the CAEM tool)
+        * *allowColumnar* - True if the table may be a columnar output table (see createMetricOutputTable)
         
     **Returns:**
 
@@ -453,12 +455,13 @@ def tableWriterByClass(outTable, metricsBaseNameList, optionalGroupsList, metric
             
     # create the specified output table
     newTable = createMetricOutputTable(outTable,outIdField,metricsBaseNameList,metricsFieldnameDict,metricFieldParams, 
-                                       qaCheckFlds,addAreaFldParams,additionalFields,logFile)
+                                       qaCheckFlds,addAreaFldParams,additionalFields,logFile,allowColumnar)
     
     return newTable, metricsFieldnameDict
 
 
-def tableWriterByCoefficient(outTable, metricsBaseNameList, optionalGroupsList, metricConst, lccObj, outIdField, logFile):
+def tableWriterByCoefficient(outTable, metricsBaseNameList, optionalGroupsList, metricConst, lccObj, outIdField, logFile,
+                             allowColumnar=False):
     """ Processes tool dialog parameters and options for output table generation. Coefficient metrics option.
         
     **Description:**
@@ -484,6 +487,7 @@ def tableWriterByCoefficient(outTable, metricsBaseNameList, optionalGroupsList,
         * *metricConst* - a class object with the variable constants for a particular metric family as attributes 
         * *lccObj* - a class object of the selected land cover classification file 
         * *outIdField* - the output id field. Generally a clone of the input id field except where the fieldtype = "OID"
+        * *allowColumnar* - True if the table may be a columnar output table (see createMetricOutputTable)
         
     **Returns:**
 
@@ -524,12 +528,12 @@ def tableWriterByCoefficient(outTable, metricsBaseNameList, optionalGroupsList,
               
     # create the specified output table
     newTable = createMetricOutputTable(outTable,outIdField,metricsBaseNameList,metricsFieldnameDict, 
-                                       metricFieldParams, qaCheckFields, None, None, logFile)
+                                       metricFieldParams, qaCheckFields, None, None, logFile, allowColumnar)
     
     return newTable, metricsFieldnameDict
 
 
-def tableWriterNoLcc(outTable, metricsBaseNameList, optionalGroupsList, metricConst, outIdField, logFile):
+def tableWriterNoLcc(outTable, metricsBaseNameList, optionalGroupsList, metricConst, outIdField, logFile, allowColumnar=False):
     """ Processes tool dialog parameters and options for output table generation. Non LCC metrics option.
         
     **Description:**
@@ -554,6 +558,7 @@ def tableWriterNoLcc(outTable, metricsBaseNameList, optionalGroupsList, metricCo
                         (e.g., ["QAFIELDS", "AREAFIELDS", "INTERMEDIATES"])
         * *metricConst* - a class object with the variable constants for a particular metric family as attributes 
         * *outIdField* - the output id field. Generally a clone of the input id field except where the fieldtype = "OID"
+        * *allowColumnar* - True if the table may be a columnar output table (see createMetricOutputTable)
         
     **Returns:**
 
@@ -599,7 +604,7 @@ def tableWriterNoLcc(outTable, metricsBaseNameList, optionalGroupsList, metricCo
                 
     # create the specified output table
     newTable = createMetricOutputTable(outTable,outIdField,metricsBaseNameList,metricsFieldnameDict, 
-                                       metricFieldParams, qaCheckFlds, addAreaFldParams, None, logFile)
+                                       metricFieldParams, qaCheckFlds, addAreaFldParams, None, logFile, allowColumnar)
     
     return newTable, metricsFieldnameDict
 
@@ -612,8 +617,9 @@ def transferField(fromTable,toTable,fromFields,toFields,joinField,classField="#"
         For each field specified, this function transfers the values from the source table to the destination table. 
         If no class field is specified, this is accomplished by the addJoinCalculateField function - a simple join based
         on reporting unit ID
-        If a class field is specified, this function uses a search cursor and update cursor to pivot the metrics to 
-        an output table with one row per reporting unit and a metric field for each class.
+        If a class field is specified, the source table is read once into a dictionary keyed by reporting unit ID (see
+        getPivotDict) and the pivoted metrics are written to the output table, one row per reporting unit and a metric
+        field for each class, with a single update cursor pass.
     **Arguments:**
         * *fromTable* - the source table
         * *toTable* - the destination table
@@ -654,46 +660,62 @@ def transferField(fromTable,toTable,fromFields,toFields,joinField,classField="#"
                 # Get the properties of the source field
                 fromFieldObj = arcpy.ListFields(fromTable,fromField)[0]
                 # Add the new field to the output table with the appropriate properties and the valid name
-                logArcpy("arcpy.AddField_management",(toTable,classToField,fromFieldObj.type,fromFieldObj.precision,fromFieldObj.scale,fromFieldObj.length,"",fromFieldObj.isNullable,fromFieldObj.required,fromFieldObj.domain),logFile)
-                arcpy.AddField_management(toTable,classToField,fromFieldObj.type,fromFieldObj.precision,fromFieldObj.scale,
-                          fromFieldObj.length,"",fromFieldObj.isNullable,fromFieldObj.required,fromFieldObj.domain)
+                with logArcpy("arcpy.AddField_management",(toTable,classToField,fromFieldObj.type,fromFieldObj.precision,fromFieldObj.scale,fromFieldObj.length,"",fromFieldObj.isNullable,fromFieldObj.required,fromFieldObj.domain),logFile):
+                    arcpy.AddField_management(toTable,classToField,fromFieldObj.type,fromFieldObj.precision,fromFieldObj.scale,
+                              fromFieldObj.length,"",fromFieldObj.isNullable,fromFieldObj.required,fromFieldObj.domain)
                 
-        AddMsg(f"{timer.now()} Using a search cursor and an update cursor to pivot the metrics to a table with one row per reporting unit and a metric field for each class.", 0, logFile)        
-        # In preparation for the upcoming whereclause, add the appropriate delimiters to the join field
-        joinFieldDelim = arcpy.AddFieldDelimiters(fromTable,joinField)
-        # In preparation for the upcoming whereclause, set up the appropriate delimiter function for the join value
-        delimitJoinValues = fields.valueDelimiter(arcpy.ListFields(fromTable,joinField)[0].type)
-        # Initialize an update cursor on the output table
-        updateCursor = arcpy.UpdateCursor(toTable)
-        # For each row in the output table (each reporting unit)
-        for updateRow in updateCursor:
-            # Grab the reporting unit ID
-            joinID = updateRow.getValue(joinField)
-            # Create a whereclause for selecting the corresponding rows in the source table
-            whereClause = joinFieldDelim + " = " + delimitJoinValues(joinID)
-            # Initialize a search cursor on the source table for this reporting unit
-            fetchCursor = arcpy.SearchCursor(fromTable,whereClause)
-            # For each row in the source table (which should correspond to each class in this reporting unit)
-            for fetchRow in fetchCursor:
-                # obtain the class value that will link us to the correct output field
-                classValue = fetchRow.getValue(classField)
-                # for each desired output metric (which we have saved in a list of tuples with the input and valid output fieldnames)
-                for (fromField,toField) in transferClassFields[classValue]:
-                    # Set the output field value equal to the correct source value
-                    updateRow.setValue(toField,fetchRow.getValue(fromField))
-                # Clean up our row element for memory management and to remove locks
-                del fetchRow
-            # Clean up our row element for memory management and to remove locks
-            del fetchCursor
-            # Persist all of the updates for this row.
-            updateCursor.updateRow(updateRow)
-            # Clean up our row element for memory management and to remove locks
-            del updateRow
-        # Clean up our row element for memory management and to remove locks
-        del updateCursor
+        AddMsg(f"{timer.now()} Indexing the source table by {joinField} and writing one row per reporting unit with a metric field for each class.", 0, logFile)
+        # Read the source table once, building the pivoted output values for each reporting unit
+        pivotDict = getPivotDict(fromTable, joinField, classField, transferClassFields)
+        # The output fields in the order they will be requested from the update cursor
+        toFieldList = []
+        for classValue in classValues:
+            toFieldList.extend([toField for (fromField,toField) in transferClassFields[classValue]])
+        toFieldIndex = dict((toField, i + 1) for i, toField in enumerate(toFieldList))
+        # Write the pivoted values for all of the reporting units in a single pass over the output table
+        with arcpy.da.UpdateCursor(toTable, [joinField] + toFieldList) as updateCursor:
+            for updateRow in updateCursor:
+                pivotValues = pivotDict.get(updateRow[0])
+                if pivotValues is None:
+                    continue
+                for (toField,value) in pivotValues.items():
+                    updateRow[toFieldIndex[toField]] = value
+                updateCursor.updateRow(updateRow)
         AddMsg(f"{timer.now()} Finished recording values to {basename(toTable)}.", 0, logFile)
             
 
+def getPivotDict(fromTable,joinField,classField,transferClassFields):
+    '''This function reads a source table once and returns its metric values pivoted by class, keyed by join value
+    **Description:**
+        Each source row holds the metrics of one class in one reporting unit. The values are gathered into a dictionary
+        keyed by the join field value, each entry holding the output fieldname and value pairs for that reporting unit.
+        Memory is bounded by the number of reporting units times the number of output fields, which is the size of 
+        the pivoted output itself.
+    **Arguments:**
+        * *fromTable* - the source table
+        * *joinField* - the field holding the reporting unit ID values
+        * *classField* - the field with class values
+        * *transferClassFields* - a dictionary of lists of (source fieldname, output fieldname) tuples keyed by class value
+    **Returns:**
+        * *pivotDict* - a dictionary of {output fieldname: value} dictionaries keyed by join value
+    '''
+    # Request each source field once, regardless of how many classes use it
+    fromFieldList = []
+    for fieldPairs in transferClassFields.values():
+        for (fromField,toField) in fieldPairs:
+            if fromField not in fromFieldList:
+                fromFieldList.append(fromField)
+    fromFieldIndex = dict((fromField, i + 2) for i, fromField in enumerate(fromFieldList))
+    
+    pivotDict = {}
+    with arcpy.da.SearchCursor(fromTable, [joinField, classField] + fromFieldList) as fetchCursor:
+        for fetchRow in fetchCursor:
+            pivotValues = pivotDict.setdefault(fetchRow[0], {})
+            for (fromField,toField) in transferClassFields[fetchRow[1]]:
+                pivotValues[toField] = fetchRow[fromFieldIndex[fromField]]
+    return pivotDict
+
+
 def addJoinCalculateField(fromTable,toTable,fromField,toField,joinField,logFile=None):
     '''This function transfers one field to another via a simple JoinField operation, but also allows for a field to be 
        renamed as part of the transfer.
@@ -716,11 +738,11 @@ def addJoinCalculateField(fromTable,toTable,fromField,toField,joinField,logFile=
         # Get the properties of the from field for transfer
         fromField = arcpy.ListFields(fromTable,fromField)[0]
         # Add the new field with the new name
-        logArcpy("arcpy.AddField_management",(fromTable,toField,fromField.type,fromField.precision,fromField.scale,fromField.length,"",fromField.isNullable,fromField.required,fromField.domain),logFile)
-        arcpy.AddField_management(fromTable,toField,fromField.type,fromField.precision,fromField.scale,fromField.length,"",fromField.isNullable,fromField.required,fromField.domain)
+        with logArcpy("arcpy.AddField_management",(fromTable,toField,fromField.type,fromField.precision,fromField.scale,fromField.length,"",fromField.isNullable,fromField.required,fromField.domain),logFile):
+            arcpy.AddField_management(fromTable,toField,fromField.type,fromField.precision,fromField.scale,fromField.length,"",fromField.isNullable,fromField.required,fromField.domain)
         # Calculate the field
-        logArcpy("arcpy.CalculateField_management",(fromTable,toField,'!'+ fromField.name +'!',"PYTHON"),logFile)
-        arcpy.CalculateField_management(fromTable,toField,'!'+ fromField.name +'!',"PYTHON")
+        with logArcpy("arcpy.CalculateField_management",(fromTable,toField,'!'+ fromField.name +'!',"PYTHON"),logFile):
+            arcpy.CalculateField_management(fromTable,toField,'!'+ fromField.name +'!',"PYTHON")
     # Perform the joinfield
     """ If the joinField field is not found in toTable, it is assumed that
     the joinField was an object ID field that was lost in a format conversion"""
@@ -729,12 +751,12 @@ def addJoinCalculateField(fromTable,toTable,fromField,toField,joinField,logFile=
         uIDFields = arcpy.ListFields(toTable,"",'OID')
     uIDField = uIDFields[0] # This is an arcpy field object
     joinField_In_toTable = uIDField.name    
-    logArcpy("arcpy.JoinField_management",(toTable,joinField_In_toTable,fromTable,joinField,toField),logFile)
-    arcpy.JoinField_management(toTable,joinField_In_toTable,fromTable,joinField,toField)
+    with logArcpy("arcpy.JoinField_management",(toTable,joinField_In_toTable,fromTable,joinField,toField),logFile):
+        arcpy.JoinField_management(toTable,joinField_In_toTable,fromTable,joinField,toField)
     # If we added a temp field
     if fromField != toField:
-        logArcpy("arcpy.DeleteField_management",(fromTable,toField),logFile)
-        arcpy.DeleteField_management(fromTable,toField)
+        with logArcpy("arcpy.DeleteField_management",(fromTable,toField),logFile):
+            arcpy.DeleteField_management(fromTable,toField)
     
 def getClassFieldName(fieldName,classVal,table):
     '''This function generates a valid fieldname based on the combination of a desired fieldname and a class value
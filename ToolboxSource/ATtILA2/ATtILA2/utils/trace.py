@@ -0,0 +1,200 @@
+""" Utilities for recording a structured timing trace of tool steps and ArcPy calls
+
+    When globalConstants.traceFile names a file, every metricCalc step and every ArcPy call run through log.arcpyLog,
+    or wrapped in a "with log.logArcpy(...):" block, adds one JSON line to it. A logArcpy call used as a plain
+    statement only logs, as it runs before its ArcPy call and cannot time it. Each line is a Chrome trace "complete"
+    event (ph "X") with the start time and duration in microseconds, the process and thread ids, and, in its args, the
+    processor time, the peak resident memory of the process and the row counts of the step's input and output 
+    datasets. Lines from several worker processes may share a file. convertToChromeTrace wraps the lines in the JSON
+    object read by chrome://tracing and Perfetto. With no trace file, tracing costs one check per step or call.
+
+"""
+import os
+import json
+import time
+import threading
+import contextlib
+import arcpy
+
+from ATtILA2.constants import globalConstants
+from ATtILA2.datetimeutil import ResourceTimer
+
+def isEnabled():
+    """ Returns True if trace events are being recorded """
+
+    return bool(globalConstants.traceFile)
+
+
+def startTrace(fileName):
+    """ Starts recording trace events to *fileName*, adding to any events already in it """
+
+    globalConstants.traceFile = fileName
+
+
+def stopTrace():
+    """ Stops recording trace events """
+
+    globalConstants.traceFile = None
+
+
+def getRowCount(dataset):
+    """ Returns the number of rows in a table or feature class, or None if *dataset* is not one """
+
+    if not isinstance(dataset, str) or not dataset:
+        return None
+    try:
+        if not arcpy.Exists(dataset):
+            return None
+        return int(arcpy.management.GetCount(dataset).getOutput(0))
+    except Exception:
+        return None
+
+
+def _getRowCounts(datasetList):
+    rowCounts = [getRowCount(dataset) for dataset in datasetList]
+    return [rowCount for rowCount in rowCounts if rowCount is not None]
+
+
+def writeEvent(name, category, startTime, wallSeconds, cpuSeconds=None, peakMemory=None, inputRows=None,
+               outputRows=None, **args):
+    """ Adds one complete event to the trace file
+
+    **Arguments:**
+
+        * *name* - name of the step or ArcPy function
+        * *category* - event category (e.g., "metricCalc" or "arcpy")
+        * *startTime* - start of the event, in seconds since the epoch
+        * *wallSeconds* - elapsed time of the event
+        * *cpuSeconds* - processor time used by the process during the event
+        * *peakMemory* - peak resident memory of the process in bytes
+        * *inputRows* - list of row counts of the input datasets
+        * *outputRows* - list of row counts of the output datasets
+        * *args* - other values to record with the event
+
+    """
+
+    if not isEnabled():
+        return
+
+    if cpuSeconds is not None:
+        cpuSeconds = round(cpuSeconds, 6)
+    args.update(wallSeconds=round(wallSeconds, 6), cpuSeconds=cpuSeconds, peakMemory=peakMemory, inputRows=inputRows,
+                outputRows=outputRows)
+    event = {"name": name, "cat": category, "ph": "X", "ts": int(startTime * 1e6), "dur": int(wallSeconds * 1e6),
+             "pid": os.getpid(), "tid": threading.get_ident(), "args": args}
+
+    # one write of one line in append mode, so that worker processes can share the file
+    with open(globalConstants.traceFile, "a") as traceFile:
+        traceFile.write(json.dumps(event, default=str) + "\n")
+
+
+@contextlib.contextmanager
+def traceSpan(name, category, inputs=(), outputs=(), **args):
+    """ Context manager that records the work inside it as one trace event
+
+    **Description:**
+
+        Row counts of *inputs* are taken when the block starts, and of *outputs* when it ends; datasets that do not
+        exist, or have no rows to count (e.g., rasters), are left out. An exception raised in the block is recorded in
+        the event and raised again.
+
+    **Arguments:**
+
+        * *name* - name of the event
+        * *category* - event category
+        * *inputs* - datasets read by the block
+        * *outputs* - datasets written by the block
+        * *args* - other values to record with the event
+
+    """
+
+    if not isEnabled():
+        yield
+        return
+
+    inputRows = _getRowCounts(inputs)
+    timer = ResourceTimer()
+    startTime = time.time()
+    timer.start()
+    try:
+        yield
+    except BaseException as e:
+        args["error"] = repr(e)
+        raise
+    finally:
+        timer.stop()
+        writeEvent(name, category, startTime, timer.wallSeconds, timer.cpuSeconds, timer.peakMemory, inputRows,
+                   _getRowCounts(outputs), **args)
+
+
+class ArcpyCallSpan(object):
+    """ Context manager that records an ArcPy call made inside it as one trace event
+
+    **Description:**
+
+        The string arguments of the call that name existing datasets when the block starts are its inputs. Those that
+        only exist once it ends are its outputs, along with the first output of the call's Result, when it is set as
+        the *result* attribute (e.g., an output that overwrote an existing dataset). Row counts of both are recorded
+        (see traceSpan). With no trace file, the arguments are not looked at.
+
+    **Arguments:**
+
+        * *name* - the ArcPy function as a string
+        * *arguments* - a tuple of the function arguments
+
+    """
+
+    def __init__(self, name, arguments):
+        self.name = name
+        self.arguments = arguments
+        self.result = None
+        self._span = None
+
+    def __enter__(self):
+        if not isEnabled():
+            return self
+
+        self._datasets = [argument for argument in self.arguments if isinstance(argument, str) and argument]
+        self._inputs = [dataset for dataset in self._datasets if _exists(dataset)]
+        self._outputs = []
+        self._span = traceSpan(self.name, "arcpy", inputs=self._inputs, outputs=self._outputs)
+        self._span.__enter__()
+        return self
+
+    def __exit__(self, excType, excValue, excTraceback):
+        if self._span is None:
+            return False
+
+        if excType is None:
+            self._outputs.extend(dataset for dataset in self._datasets if dataset not in self._inputs)
+            resultOutput = _getResultOutput(self.result)
+            if resultOutput and resultOutput not in self._outputs:
+                self._outputs.append(resultOutput)
+        return self._span.__exit__(excType, excValue, excTraceback)
+
+
+def _exists(dataset):
+    try:
+        return bool(arcpy.Exists(dataset))
+    except Exception:
+        return False
+
+
+def _getResultOutput(result):
+    """ Returns the first output of an ArcPy Result as a string, or None """
+
+    try:
+        output = result.getOutput(0)
+    except Exception:
+        return None
+    return output if isinstance(output, str) else None
+
+
+def convertToChromeTrace(traceFileName, outFileName):
+    """ Writes the events of a JSON lines trace file as a Chrome trace JSON object, for chrome://tracing or Perfetto """
+
+    with open(traceFileName) as traceFile:
+        events = [json.loads(line) for line in traceFile if line.strip()]
+
+    with open(outFileName, "w") as outFile:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, outFile)
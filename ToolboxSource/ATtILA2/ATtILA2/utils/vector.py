@@ -10,7 +10,12 @@ from .messages import AddMsg
 from .fields import valueDelimiter
 from arcpy.sa.Functions import SetNull
 from .log import logArcpy
+from . import raster
+from . import patches
+from . import zonalhist
+from ATtILA2.constants import globalConstants
 from arcpy import env
+import numpy as np
 from os.path import basename
 
 
@@ -43,17 +48,17 @@ def bufferFeaturesByID(inFeatures, repUnits, outFeatures, bufferDist, ruIDField,
         # By using the "LIST" option and the unit ID field, the output contains a single multipart feature for every 
         # reporting unit.  The output is written to the user's scratch workspace.
         AddMsg(f"{timer.now()} Buffering input features: in_memory/bFeats", 0, logFile)
-        logArcpy("arcpy.Buffer_analysis", (inFeatures,"in_memory/bFeats", bufferDist,"FULL","ROUND","LIST",ruLinkField), logFile) 
-        bufferedFeatures = arcpy.Buffer_analysis(inFeatures,"in_memory/bFeats", bufferDist,"FULL","ROUND","LIST",ruLinkField)
+        with logArcpy("arcpy.Buffer_analysis", (inFeatures,"in_memory/bFeats", bufferDist,"FULL","ROUND","LIST",ruLinkField), logFile): 
+            bufferedFeatures = arcpy.Buffer_analysis(inFeatures,"in_memory/bFeats", bufferDist,"FULL","ROUND","LIST",ruLinkField)
         
         # If the input features are polygons, we need to erase the the input polyons from the buffer output
         inGeom = arcpy.Describe(inFeatures).shapeType
         if inGeom == "Polygon":
             AddMsg(f"{timer.now()} Erasing polygon areas from buffer areas: in_memory/bFeats2", 0, logFile)
-            logArcpy("arcpy.Erase_analysis",(bufferedFeatures,inFeatures,"in_memory/bFeats2"), logFile)
-            newBufferFeatures = arcpy.Erase_analysis(bufferedFeatures,inFeatures,"in_memory/bFeats2")
-            logArcpy("arcpy.Delete_management", (bufferedFeatures,), logFile)
-            arcpy.Delete_management(bufferedFeatures)
+            with logArcpy("arcpy.Erase_analysis",(bufferedFeatures,inFeatures,"in_memory/bFeats2"), logFile):
+                newBufferFeatures = arcpy.Erase_analysis(bufferedFeatures,inFeatures,"in_memory/bFeats2")
+            with logArcpy("arcpy.Delete_management", (bufferedFeatures,), logFile):
+                arcpy.Delete_management(bufferedFeatures)
             bufferedFeatures = newBufferFeatures
         
         # The script will be iterating through reporting units and using a whereclause to select each feature, so it will 
@@ -170,8 +175,8 @@ def bufferFeaturesByIntersect(inFeatures, repUnits, outFeatures, bufferDist, uni
                 copyFCNameBase = f"{toolShortName}_{inFCName}_"
                 copyFCName = files.nameIntermediateFile([copyFCNameBase,"FeatureClass"], cleanupList)
                 AddMsg(f"{timer.now()} Creating a copy of {inFCName} without M or Z values: {basename(copyFCName)}", 0, logFile)
-                logArcpy("arcpy.FeatureClassToFeatureClass_conversion", (inFC, env.workspace, basename(copyFCName)), logFile)
-                inFC = arcpy.FeatureClassToFeatureClass_conversion(inFC, env.workspace, basename(copyFCName))
+                with logArcpy("arcpy.FeatureClassToFeatureClass_conversion", (inFC, env.workspace, basename(copyFCName)), logFile):
+                    inFC = arcpy.FeatureClassToFeatureClass_conversion(inFC, env.workspace, basename(copyFCName))
                 inFCDesc = arcpy.Describe(inFC)
                 inFCName = inFCDesc.baseName
 
@@ -185,8 +190,8 @@ def bufferFeaturesByIntersect(inFeatures, repUnits, outFeatures, bufferDist, uni
             # the reporting units and the stream feature, the Intersect operation will fail. Skip to the next stream feature
             # when this occurs.
             try:
-                logArcpy("arcpy.Intersect_analysis", ([repUnits,inFC],firstIntersectionName,"ALL","","INPUT"), logFile)
-                intersectResult = arcpy.Intersect_analysis([repUnits,inFC],firstIntersectionName,"ALL","","INPUT")
+                with logArcpy("arcpy.Intersect_analysis", ([repUnits,inFC],firstIntersectionName,"ALL","","INPUT"), logFile):
+                    intersectResult = arcpy.Intersect_analysis([repUnits,inFC],firstIntersectionName,"ALL","","INPUT")
             except:
                 AddMsg(f"No features of {inFCName} intersect with features of {repUnitsName}. Omitting {inFCName} from further processing.", 1, logFile)
                 continue
@@ -205,21 +210,21 @@ def bufferFeaturesByIntersect(inFeatures, repUnits, outFeatures, bufferDist, uni
             gdbTest = arcpy.Describe(intersectResult).dataType
             arcVersion = arcpy.GetInstallInfo()['Version']
             if gdbTest == "FeatureClass" and arcVersion >= '10.2.1':
-                logArcpy("arcpy.AlterField_management", (intersectResult,unitID,newUnitID,newUnitID), logFile)
-                arcpy.AlterField_management(intersectResult,unitID,newUnitID,newUnitID)
+                with logArcpy("arcpy.AlterField_management", (intersectResult,unitID,newUnitID,newUnitID), logFile):
+                    arcpy.AlterField_management(intersectResult,unitID,newUnitID,newUnitID)
             else:
                 # Get the properties of the unitID field
                 fromFieldObj = arcpy.ListFields(intersectResult,unitID)[0]
                 # Add the new field to the output table with the appropriate properties and the valid name
-                logArcpy("arcpy.AddField_management", (intersectResult,newUnitID,fromFieldObj.type,fromFieldObj.precision,fromFieldObj.scale,
-                          fromFieldObj.length,fromFieldObj.aliasName,fromFieldObj.isNullable,fromFieldObj.required,
-                          fromFieldObj.domain), logFile)
-                arcpy.AddField_management(intersectResult,newUnitID,fromFieldObj.type,fromFieldObj.precision,fromFieldObj.scale,fromFieldObj.length,
-                                          fromFieldObj.aliasName,fromFieldObj.isNullable,fromFieldObj.required,fromFieldObj.domain)
+                with logArcpy("arcpy.AddField_management", (intersectResult,newUnitID,fromFieldObj.type,fromFieldObj.precision,fromFieldObj.scale,
+                               fromFieldObj.length,fromFieldObj.aliasName,fromFieldObj.isNullable,fromFieldObj.required,
+                               fromFieldObj.domain), logFile):
+                    arcpy.AddField_management(intersectResult,newUnitID,fromFieldObj.type,fromFieldObj.precision,fromFieldObj.scale,fromFieldObj.length,
+                                              fromFieldObj.aliasName,fromFieldObj.isNullable,fromFieldObj.required,fromFieldObj.domain)
                 
                 # Copy the field values from the old to the new field
-                logArcpy("arcpy.CalculateField_management", (intersectResult,newUnitID,arcpy.AddFieldDelimiters(intersectResult,unitID)), logFile)
-                arcpy.CalculateField_management(intersectResult,newUnitID,arcpy.AddFieldDelimiters(intersectResult,unitID))
+                with logArcpy("arcpy.CalculateField_management", (intersectResult,newUnitID,arcpy.AddFieldDelimiters(intersectResult,unitID)), logFile):
+                    arcpy.CalculateField_management(intersectResult,newUnitID,arcpy.AddFieldDelimiters(intersectResult,unitID))
 
             try:
                 # Buffer these in-memory selected features and merge the output into multipart features by reporting unit ID
@@ -236,32 +241,32 @@ def bufferFeaturesByIntersect(inFeatures, repUnits, outFeatures, bufferDist, uni
                     licenseLevel = arcpy.CheckProduct("ArcInfo")
                     sysExecutable = arcpy.glob.os.path.basename(arcpy.sys.executable)
                     if licenseLevel in ["AlreadyInitialized","Available"] or sysExecutable.upper() == "PYTHON.EXE":
-                        logArcpy("arcpy.Buffer_analysis", (intersectResult,bufferName,bufferDist,"OUTSIDE_ONLY","ROUND","LIST",[newUnitID]), logFile)
-                        bufferResult = arcpy.Buffer_analysis(intersectResult,bufferName,bufferDist,"OUTSIDE_ONLY","ROUND","LIST",[newUnitID])
+                        with logArcpy("arcpy.Buffer_analysis", (intersectResult,bufferName,bufferDist,"OUTSIDE_ONLY","ROUND","LIST",[newUnitID]), logFile):
+                            bufferResult = arcpy.Buffer_analysis(intersectResult,bufferName,bufferDist,"OUTSIDE_ONLY","ROUND","LIST",[newUnitID])
                         AddMsg(f"{timer.now()} Repairing buffer areas for input areal features.", 0, logFile)
-                        logArcpy("arcpy.RepairGeometry_management", (bufferResult,), logFile)
-                        arcpy.RepairGeometry_management(bufferResult)
+                        with logArcpy("arcpy.RepairGeometry_management", (bufferResult,), logFile):
+                            arcpy.RepairGeometry_management(bufferResult)
                     else:
-                        logArcpy("arcpy.Buffer_analysis", (intersectResult,bufferName,bufferDist,"FULL","ROUND","LIST",[newUnitID]), logFile)
-                        bufferResult = arcpy.Buffer_analysis(intersectResult,bufferName,bufferDist,"FULL","ROUND","LIST",[newUnitID])
+                        with logArcpy("arcpy.Buffer_analysis", (intersectResult,bufferName,bufferDist,"FULL","ROUND","LIST",[newUnitID]), logFile):
+                            bufferResult = arcpy.Buffer_analysis(intersectResult,bufferName,bufferDist,"FULL","ROUND","LIST",[newUnitID])
                         AddMsg(f"{timer.now()} Repairing buffer areas for input areal features.", 0, logFile)
-                        logArcpy("arcpy.RepairGeometry_management", (bufferResult,), logFile)
-                        arcpy.RepairGeometry_management(bufferResult)
+                        with logArcpy("arcpy.RepairGeometry_management", (bufferResult,), logFile):
+                            arcpy.RepairGeometry_management(bufferResult)
                         bufferErase = files.nameIntermediateFile([f"{inFCNamePrefix}_bufferErase_","FeatureClass"],cleanupList)
                         AddMsg(f"{timer.now()} Erasing polygon areas from buffer areas. Intermediate: {basename(bufferErase)}", 0, logFile)
-                        logArcpy("arcpy.Erase_analysis", (bufferResult,inFC,bufferErase), logFile)
-                        newBufferFeatures = arcpy.Erase_analysis(bufferResult,inFC,bufferErase)
+                        with logArcpy("arcpy.Erase_analysis", (bufferResult,inFC,bufferErase), logFile):
+                            newBufferFeatures = arcpy.Erase_analysis(bufferResult,inFC,bufferErase)
                         bufferResult = newBufferFeatures
                 else:
-                    logArcpy("arcpy.Buffer_analysis", (intersectResult,bufferName,bufferDist,"FULL","ROUND","LIST",[newUnitID]), logFile)
-                    bufferResult = arcpy.Buffer_analysis(intersectResult,bufferName,bufferDist,"FULL","ROUND","LIST",[newUnitID])
+                    with logArcpy("arcpy.Buffer_analysis", (intersectResult,bufferName,bufferDist,"FULL","ROUND","LIST",[newUnitID]), logFile):
+                        bufferResult = arcpy.Buffer_analysis(intersectResult,bufferName,bufferDist,"FULL","ROUND","LIST",[newUnitID])
                     AddMsg(f"{timer.now()} Repairing buffer areas for input linear features.", 0, logFile)
-                    logArcpy("arcpy.RepairGeometry_management", (bufferResult,), logFile)
-                    arcpy.RepairGeometry_management(bufferResult)
+                    with logArcpy("arcpy.RepairGeometry_management", (bufferResult,), logFile):
+                        arcpy.RepairGeometry_management(bufferResult)
             except:
                 AddMsg(f"{timer.now()} BUFFER FAILED: Repairing geometry for {basename(firstIntersectionName)} and trying buffer again.", 1, logFile)
-                logArcpy("arcpy.management.RepairGeometry", (intersectResult,), logFile)
-                arcpy.management.RepairGeometry(intersectResult)
+                with logArcpy("arcpy.management.RepairGeometry", (intersectResult,), logFile):
+                    arcpy.management.RepairGeometry(intersectResult)
 
                 inGeom = inFCDesc.shapeType
                 if inGeom == "Polygon":
@@ -270,34 +275,34 @@ def bufferFeaturesByIntersect(inFeatures, repUnits, outFeatures, bufferDist, uni
                     # the right license level, revert to buffer/erase option if it's not available.
                     licenseLevel = arcpy.CheckProduct("ArcInfo")
                     if licenseLevel in ["AlreadyInitialized","Available"]:
-                        logArcpy("arcpy.Buffer_analysis", (intersectResult,bufferName,bufferDist,"OUTSIDE_ONLY","ROUND","LIST",[newUnitID]), logFile)
-                        bufferResult = arcpy.Buffer_analysis(intersectResult,bufferName,bufferDist,"OUTSIDE_ONLY","ROUND","LIST",[newUnitID])
+                        with logArcpy("arcpy.Buffer_analysis", (intersectResult,bufferName,bufferDist,"OUTSIDE_ONLY","ROUND","LIST",[newUnitID]), logFile):
+                            bufferResult = arcpy.Buffer_analysis(intersectResult,bufferName,bufferDist,"OUTSIDE_ONLY","ROUND","LIST",[newUnitID])
                         AddMsg(f"{timer.now()} Repairing buffer areas for input areal features.", 0, logFile)
-                        logArcpy("arcpy.RepairGeometry_management", (bufferResult,), logFile)
-                        arcpy.RepairGeometry_management(bufferResult)
+                        with logArcpy("arcpy.RepairGeometry_management", (bufferResult,), logFile):
+                            arcpy.RepairGeometry_management(bufferResult)
                     else:
-                        logArcpy("arcpy.Buffer_analysis", (intersectResult,bufferName,bufferDist,"FULL","ROUND","LIST",[newUnitID]), logFile)
-                        bufferResult = arcpy.Buffer_analysis(intersectResult,bufferName,bufferDist,"FULL","ROUND","LIST",[newUnitID])
+                        with logArcpy("arcpy.Buffer_analysis", (intersectResult,bufferName,bufferDist,"FULL","ROUND","LIST",[newUnitID]), logFile):
+                            bufferResult = arcpy.Buffer_analysis(intersectResult,bufferName,bufferDist,"FULL","ROUND","LIST",[newUnitID])
                         AddMsg(f"{timer.now()} Repairing buffer areas for input areal features.", 0, logFile)
-                        logArcpy("arcpy.RepairGeometry_management", (bufferResult,), logFile)
-                        arcpy.RepairGeometry_management(bufferResult)
+                        with logArcpy("arcpy.RepairGeometry_management", (bufferResult,), logFile):
+                            arcpy.RepairGeometry_management(bufferResult)
                         bufferErase = files.nameIntermediateFile([f"{inFCName}_bufferErase_","FeatureClass"],cleanupList)
                         AddMsg(f"{timer.now()} Erasing polygon areas from buffer areas: {basename(bufferErase)}", 0, logFile)
-                        logArcpy("arcpy.Erase_analysis", (bufferResult,inFC,bufferErase), logFile)
-                        newBufferFeatures = arcpy.Erase_analysis(bufferResult,inFC,bufferErase)
+                        with logArcpy("arcpy.Erase_analysis", (bufferResult,inFC,bufferErase), logFile):
+                            newBufferFeatures = arcpy.Erase_analysis(bufferResult,inFC,bufferErase)
                         bufferResult = newBufferFeatures
                 else:
-                    logArcpy("arcpy.Buffer_analysis", (intersectResult,bufferName,bufferDist,"FULL","ROUND","LIST",[newUnitID]), logFile)
-                    bufferResult = arcpy.Buffer_analysis(intersectResult,bufferName,bufferDist,"FULL","ROUND","LIST",[newUnitID])
+                    with logArcpy("arcpy.Buffer_analysis", (intersectResult,bufferName,bufferDist,"FULL","ROUND","LIST",[newUnitID]), logFile):
+                        bufferResult = arcpy.Buffer_analysis(intersectResult,bufferName,bufferDist,"FULL","ROUND","LIST",[newUnitID])
                     AddMsg(f"{timer.now()} Repairing buffer areas for input linear features.".format(timer.now()), 0, logFile)
-                    logArcpy("arcpy.RepairGeometry_management", (bufferResult,), logFile)
-                    arcpy.RepairGeometry_management(bufferResult)
+                    with logArcpy("arcpy.RepairGeometry_management", (bufferResult,), logFile):
+                        arcpy.RepairGeometry_management(bufferResult)
             
             # Intersect the buffers with the reporting units
             secondIntersectionName = files.nameIntermediateFile([f"{inFCNamePrefix}_2ndintersect_","FeatureClass"],cleanupList)
             AddMsg(f"{timer.now()} Intersecting buffer features and reporting units. Intermediate: {basename(secondIntersectionName)}", 0, logFile)
-            secondIntersectResult = arcpy.Intersect_analysis([repUnits,bufferResult],secondIntersectionName,"ALL","","INPUT")
-            logArcpy("arcpy.Intersect_analysis", ([repUnits,bufferResult],secondIntersectionName,"ALL","","INPUT"), logFile)            
+            with logArcpy("arcpy.Intersect_analysis", ([repUnits,bufferResult],secondIntersectionName,"ALL","","INPUT"), logFile):
+                secondIntersectResult = arcpy.Intersect_analysis([repUnits,bufferResult],secondIntersectionName,"ALL","","INPUT")
 
             # # Select only those intersected features whose reporting unit IDs match 
             # # This ensures that buffer areas that fall outside of the input feature's reporting unit are excluded
@@ -318,8 +323,8 @@ def bufferFeaturesByIntersect(inFeatures, repUnits, outFeatures, bufferDist, uni
             # This ensures that buffer areas that fall outside of the input feature's reporting unit are excluded
             AddMsg(f"{timer.now()} Trimming buffer zones to reporting unit boundaries", 0, logFile)
             whereClause = arcpy.AddFieldDelimiters(secondIntersectResult,unitID) + " = " + arcpy.AddFieldDelimiters(secondIntersectResult,newUnitID)
-            logArcpy("arcpy.MakeFeatureLayer_management", (secondIntersectResult,"matchingBuffers",whereClause), logFile)
-            matchingBuffers = arcpy.MakeFeatureLayer_management(secondIntersectResult,"matchingBuffers",whereClause)
+            with logArcpy("arcpy.MakeFeatureLayer_management", (secondIntersectResult,"matchingBuffers",whereClause), logFile):
+                matchingBuffers = arcpy.MakeFeatureLayer_management(secondIntersectResult,"matchingBuffers",whereClause)
             
             # Dissolve those by reporting Unit ID.  
             if len(inFeaturesList) > 1:
@@ -328,12 +333,12 @@ def bufferFeaturesByIntersect(inFeatures, repUnits, outFeatures, bufferDist, uni
                 finalOutputName = outFeatures # If this is the only one, it's already named.
             
             AddMsg(f"{timer.now()} Dissolving second intersection by reporting unit. Intermediate: {basename(finalOutputName)}", 0, logFile)
-            logArcpy("arcpy.Dissolve_management", (matchingBuffers,finalOutputName,unitID), logFile)
-            finalOutput = arcpy.Dissolve_management(matchingBuffers,finalOutputName,unitID)
+            with logArcpy("arcpy.Dissolve_management", (matchingBuffers,finalOutputName,unitID), logFile):
+                finalOutput = arcpy.Dissolve_management(matchingBuffers,finalOutputName,unitID)
             
             # Clean up the feature layer selection for the next iteration.
-            logArcpy("arcpy.Delete_management", (matchingBuffers,), logFile)
-            arcpy.Delete_management(matchingBuffers)
+            with logArcpy("arcpy.Delete_management", (matchingBuffers,), logFile):
+                arcpy.Delete_management(matchingBuffers)
             
             # keep track of list of outputs.  
             outputList.append(finalOutput)
@@ -342,45 +347,45 @@ def bufferFeaturesByIntersect(inFeatures, repUnits, outFeatures, bufferDist, uni
         if len(outputList) > 1:
             mergeName = files.nameIntermediateFile([f"{toolShortName}_merge_","FeatureClass"],cleanupList)
             AddMsg(f"{timer.now()} Merging buffer zones from all input Stream features. Intermediate: {basename(mergeName)}", 0, logFile)
-            logArcpy("arcpy.Merge_management", (outputList,mergeName), logFile)
-            mergeOutput = arcpy.Merge_management(outputList,mergeName)
+            with logArcpy("arcpy.Merge_management", (outputList,mergeName), logFile):
+                mergeOutput = arcpy.Merge_management(outputList,mergeName)
             AddMsg(f"{timer.now()} Dissolving merged buffer zones. Intermediate: {basename(outFeatures)}", 0, logFile)
-            logArcpy("arcpy.Dissolve_management", (mergeOutput,outFeatures,unitID), logFile)
-            finalOutput = arcpy.Dissolve_management(mergeOutput,outFeatures,unitID)
+            with logArcpy("arcpy.Dissolve_management", (mergeOutput,outFeatures,unitID), logFile):
+                finalOutput = arcpy.Dissolve_management(mergeOutput,outFeatures,unitID)
             # If any of the input features are polygons, we need to perform a final erase of the interior of these polygons from the output.
             AddMsg(f"{timer.now()} Removing interior waterbody areas from dissolve result.", 0, logFile)
             if len(eraseList) > 0:
                 #  Merge all eraseFeatures so we only have to do this once.
                 eraseName = files.nameIntermediateFile([f"{toolShortName}_erasePolygons_","FeatureClass"],cleanupList)
-                logArcpy('arcpy.Merge_management', (eraseList,eraseName), logFile)
-                eraseFeatureClass = arcpy.Merge_management(eraseList,eraseName)
+                with logArcpy('arcpy.Merge_management', (eraseList,eraseName), logFile):
+                    eraseFeatureClass = arcpy.Merge_management(eraseList,eraseName)
                 # Rename the old final output so that it becomes an intermediate dataset
                 oldfinalOutputName = files.nameIntermediateFile([f"{outFeatures}_preErase_","FeatureClass"],cleanupList)
-                logArcpy('arcpy.Rename_management', (finalOutput, oldfinalOutputName, "FeatureClass"), logFile)
-                preEraseOutput = arcpy.Rename_management(finalOutput, oldfinalOutputName, "FeatureClass")
+                with logArcpy('arcpy.Rename_management', (finalOutput, oldfinalOutputName, "FeatureClass"), logFile):
+                    preEraseOutput = arcpy.Rename_management(finalOutput, oldfinalOutputName, "FeatureClass")
                 try:
-                    logArcpy('arcpy.Erase_analysis', (preEraseOutput,eraseFeatureClass,outFeatures), logFile)
-                    finalOutput = arcpy.Erase_analysis(preEraseOutput,eraseFeatureClass,outFeatures)
+                    with logArcpy('arcpy.Erase_analysis', (preEraseOutput,eraseFeatureClass,outFeatures), logFile):
+                        finalOutput = arcpy.Erase_analysis(preEraseOutput,eraseFeatureClass,outFeatures)
                 except:
-                    logArcpy('arcpy.FeatureClassToFeatureClass_conversion', (eraseFeatureClass,"%scratchworkspace%","badEraseFeatures"), logFile)
-                    badEraseFeatures = arcpy.FeatureClassToFeatureClass_conversion(eraseFeatureClass,"%scratchworkspace%","badEraseFeatures")
-                    logArcpy('arcpy.FeatureClassToFeatureClass_conversion', (preEraseOutput,"%scratchworkspace%","badBuffer"), logFile)
-                    badBuffer = arcpy.FeatureClassToFeatureClass_conversion(preEraseOutput,"%scratchworkspace%","badBuffer")
+                    with logArcpy('arcpy.FeatureClassToFeatureClass_conversion', (eraseFeatureClass,"%scratchworkspace%","badEraseFeatures"), logFile):
+                        badEraseFeatures = arcpy.FeatureClassToFeatureClass_conversion(eraseFeatureClass,"%scratchworkspace%","badEraseFeatures")
+                    with logArcpy('arcpy.FeatureClassToFeatureClass_conversion', (preEraseOutput,"%scratchworkspace%","badBuffer"), logFile):
+                        badBuffer = arcpy.FeatureClassToFeatureClass_conversion(preEraseOutput,"%scratchworkspace%","badBuffer")
                     # There is a small chance that this buffer operation will produce a feature class with invalid geometry.  Try a repair.
-                    logArcpy('arcpy.RepairGeometry_management', (badBuffer,"DELETE_NULL"), logFile)
-                    arcpy.RepairGeometry_management(badBuffer,"DELETE_NULL")
+                    with logArcpy('arcpy.RepairGeometry_management', (badBuffer,"DELETE_NULL"), logFile):
+                        arcpy.RepairGeometry_management(badBuffer,"DELETE_NULL")
                     
-                    logArcpy('arcpy.RepairGeometry_management', (badEraseFeatures,"DELETE_NULL"), logFile)
-                    arcpy.RepairGeometry_management(badEraseFeatures,"DELETE_NULL")
+                    with logArcpy('arcpy.RepairGeometry_management', (badEraseFeatures,"DELETE_NULL"), logFile):
+                        arcpy.RepairGeometry_management(badEraseFeatures,"DELETE_NULL")
                     
-                    logArcpy('arcpy.Erase_analysis', (badBuffer,badEraseFeatures,outFeatures), logFile)
-                    finalOutput = arcpy.Erase_analysis(badBuffer,badEraseFeatures,outFeatures)
+                    with logArcpy('arcpy.Erase_analysis', (badBuffer,badEraseFeatures,outFeatures), logFile):
+                        finalOutput = arcpy.Erase_analysis(badBuffer,badEraseFeatures,outFeatures)
                     
-                    logArcpy('arcpy.Delete_management', (badBuffer,), logFile)
-                    arcpy.Delete_management(badBuffer)
+                    with logArcpy('arcpy.Delete_management', (badBuffer,), logFile):
+                        arcpy.Delete_management(badBuffer)
                     
-                    logArcpy('arcpy.Delete_management', (badEraseFeatures,), logFile)
-                    arcpy.Delete_management(badEraseFeatures)
+                    with logArcpy('arcpy.Delete_management', (badEraseFeatures,), logFile):
+                        arcpy.Delete_management(badEraseFeatures)
         
         return finalOutput, cleanupList 
     finally:
@@ -436,11 +441,11 @@ def bufferFeaturesWithoutBorders(inFeatures, repUnits, outFeatures, bufferDist,
             # because borders are not enforced, features outside of the reporting unit can impact the results.
             # need to find all input features in the reporting units and also those that are within the buffer distance of the reporting unit's edge.
             AddMsg(f"{timer.now()} Selecting features from {inFCName} within {bufferDist} of Reporting units.", 0, logFile)
-            logArcpy("arcpy.MakeFeatureLayer_management", (inFC, "inFC_lyr"), logFile)
-            inFeatureLayer = arcpy.MakeFeatureLayer_management(inFC, "inFC_lyr")
+            with logArcpy("arcpy.MakeFeatureLayer_management", (inFC, "inFC_lyr"), logFile):
+                inFeatureLayer = arcpy.MakeFeatureLayer_management(inFC, "inFC_lyr")
             
-            logArcpy("arcpy.SelectLayerByLocation_management", (inFeatureLayer,'WITHIN_A_DISTANCE', repUnits, bufferDist), logFile)
-            arcpy.SelectLayerByLocation_management(inFeatureLayer,'WITHIN_A_DISTANCE', repUnits, bufferDist)
+            with logArcpy("arcpy.SelectLayerByLocation_management", (inFeatureLayer,'WITHIN_A_DISTANCE', repUnits, bufferDist), logFile):
+                arcpy.SelectLayerByLocation_management(inFeatureLayer,'WITHIN_A_DISTANCE', repUnits, bufferDist)
             
             if inFCDesc.shapeType == "Polygon":
                 eraseList.append(inFC)
@@ -460,26 +465,26 @@ def bufferFeaturesWithoutBorders(inFeatures, repUnits, outFeatures, bufferDist,
                 # the right license level, revert to buffer/erase option if it's not available.
                 licenseLevel = arcpy.CheckProduct("ArcInfo")
                 if licenseLevel in ["AlreadyInitialized","Available"]:
-                    logArcpy("arcpy.Buffer_analysis", (inFeatureLayer,bufferName,bufferDist,"OUTSIDE_ONLY"), logFile)
-                    bufferResult = arcpy.Buffer_analysis(inFeatureLayer,bufferName,bufferDist,"OUTSIDE_ONLY")
+                    with logArcpy("arcpy.Buffer_analysis", (inFeatureLayer,bufferName,bufferDist,"OUTSIDE_ONLY"), logFile):
+                        bufferResult = arcpy.Buffer_analysis(inFeatureLayer,bufferName,bufferDist,"OUTSIDE_ONLY")
                 else:
-                    logArcpy("arcpy.Buffer_analysis", (inFeatureLayer,bufferName,bufferDist,"FULL","ROUND"), logFile)
-                    bufferResult = arcpy.Buffer_analysis(inFeatureLayer,bufferName,bufferDist,"FULL","ROUND")
+                    with logArcpy("arcpy.Buffer_analysis", (inFeatureLayer,bufferName,bufferDist,"FULL","ROUND"), logFile):
+                        bufferResult = arcpy.Buffer_analysis(inFeatureLayer,bufferName,bufferDist,"FULL","ROUND")
 
             else:
-                logArcpy("arcpy.Buffer_analysis", (inFeatureLayer,bufferName,bufferDist,"FULL","ROUND"), logFile)
-                bufferResult = arcpy.Buffer_analysis(inFeatureLayer,bufferName,bufferDist,"FULL","ROUND")
+                with logArcpy("arcpy.Buffer_analysis", (inFeatureLayer,bufferName,bufferDist,"FULL","ROUND"), logFile):
+                    bufferResult = arcpy.Buffer_analysis(inFeatureLayer,bufferName,bufferDist,"FULL","ROUND")
           
             AddMsg(f"{timer.now()} Repairing buffer areas for input features.", 0, logFile)
-            logArcpy("arcpy.RepairGeometry_management", (bufferResult,), logFile)
-            arcpy.RepairGeometry_management(bufferResult)
+            with logArcpy("arcpy.RepairGeometry_management", (bufferResult,), logFile):
+                arcpy.RepairGeometry_management(bufferResult)
             
             # keep track of list of outputs.  
             mergeList.append(bufferResult)
             
             # remove the temporary stream layer
-            logArcpy("arcpy.Delete_management", (inFeatureLayer,), logFile)
-            arcpy.Delete_management(inFeatureLayer)
+            with logArcpy("arcpy.Delete_management", (inFeatureLayer,), logFile):
+                arcpy.Delete_management(inFeatureLayer)
 
                 
         # merge buffer features from all input feature classes into a single feature class.
@@ -497,8 +502,8 @@ def bufferFeaturesWithoutBorders(inFeatures, repUnits, outFeatures, bufferDist,
         else:
             AddMsg(f"{timer.now()} Removing unnecessary fields from buffered feature. Intermediate: {basename(mergeName)}", 0, logFile)
         
-        logArcpy("arcpy.Merge_management", (mergeList,mergeName,fieldMappings), logFile)
-        mergeOutput = arcpy.Merge_management(mergeList,mergeName,fieldMappings)
+        with logArcpy("arcpy.Merge_management", (mergeList,mergeName,fieldMappings), logFile):
+            mergeOutput = arcpy.Merge_management(mergeList,mergeName,fieldMappings)
 
         
         # Perform an Intersect on erased buffers to assign the Reporting Unit's ID value to the buffer zones within and 
@@ -506,8 +511,8 @@ def bufferFeaturesWithoutBorders(inFeatures, repUnits, outFeatures, bufferDist,
         namePrefix = toolShortName+"_Intersect_"
         intersectName = files.nameIntermediateFile([namePrefix,"FeatureClass"],cleanupList)
         AddMsg(f"{timer.now()} Assigning Reporting unit ID values to buffer zones. Intermediate: {basename(intersectName)}", 0, logFile)
-        logArcpy("arcpy.Intersect_analysis", ([repUnits,mergeOutput],intersectName,"ALL","","INPUT"), logFile) 
-        intersectFeatureClass = arcpy.Intersect_analysis([repUnits,mergeOutput],intersectName,"ALL","","INPUT")
+        with logArcpy("arcpy.Intersect_analysis", ([repUnits,mergeOutput],intersectName,"ALL","","INPUT"), logFile): 
+            intersectFeatureClass = arcpy.Intersect_analysis([repUnits,mergeOutput],intersectName,"ALL","","INPUT")
         
         if len(eraseList) > 0:
             # If any of the input features are polygons, we need to perform a final erase of the interior of these polygons from the output.
@@ -517,8 +522,8 @@ def bufferFeaturesWithoutBorders(inFeatures, repUnits, outFeatures, bufferDist,
                 namePrefix = toolShortName+"_ErasePolygons_"
                 erasePolygonsName = files.nameIntermediateFile([namePrefix,"FeatureClass"],cleanupList)
                 AddMsg(f"{timer.now()} Creating a single erase feature from all polygon Stream features. Intermediate: {basename(erasePolygonsName)}", 0, logFile)
-                logArcpy("arcpy.Merge_management", (eraseList, erasePolygonsName), logFile)
-                eraseFeatureClass = arcpy.Merge_management(eraseList, erasePolygonsName)
+                with logArcpy("arcpy.Merge_management", (eraseList, erasePolygonsName), logFile):
+                    eraseFeatureClass = arcpy.Merge_management(eraseList, erasePolygonsName)
             else:
                 eraseFeatureClass = eraseList[0]
 
@@ -527,36 +532,36 @@ def bufferFeaturesWithoutBorders(inFeatures, repUnits, outFeatures, bufferDist,
             AddMsg(f"{timer.now()} Removing interior waterbody areas from buffer result. Intermediate: {basename(erasedOutputName)}", 0, logFile) 
     
             try:
-                logArcpy("arcpy.Erase_analysis", (intersectFeatureClass, eraseFeatureClass, erasedOutputName), logFile)
-                erasedOutput = arcpy.Erase_analysis(intersectFeatureClass, eraseFeatureClass, erasedOutputName)
+                with logArcpy("arcpy.Erase_analysis", (intersectFeatureClass, eraseFeatureClass, erasedOutputName), logFile):
+                    erasedOutput = arcpy.Erase_analysis(intersectFeatureClass, eraseFeatureClass, erasedOutputName)
             except:
-                logArcpy("arcpy.FeatureClassToFeatureClass_conversion", (eraseFeatureClass,"%scratchworkspace%","badEraseFeatures"), logFile)
-                badEraseFeatures = arcpy.FeatureClassToFeatureClass_conversion(eraseFeatureClass,"%scratchworkspace%","badEraseFeatures")
+                with logArcpy("arcpy.FeatureClassToFeatureClass_conversion", (eraseFeatureClass,"%scratchworkspace%","badEraseFeatures"), logFile):
+                    badEraseFeatures = arcpy.FeatureClassToFeatureClass_conversion(eraseFeatureClass,"%scratchworkspace%","badEraseFeatures")
                 
-                logArcpy("arcpy.FeatureClassToFeatureClass_conversion", (intersectFeatureClass,"%scratchworkspace%","badBuffer"), logFile)
-                badBuffer = arcpy.FeatureClassToFeatureClass_conversion(intersectFeatureClass,"%scratchworkspace%","badBuffer")
+                with logArcpy("arcpy.FeatureClassToFeatureClass_conversion", (intersectFeatureClass,"%scratchworkspace%","badBuffer"), logFile):
+                    badBuffer = arcpy.FeatureClassToFeatureClass_conversion(intersectFeatureClass,"%scratchworkspace%","badBuffer")
                 
                 # There is a small chance that this buffer operation will produce a feature class with invalid geometry.  Try a repair.
-                logArcpy("arcpy.RepairGeometry_management", (badBuffer,"DELETE_NULL"), logFile)
-                arcpy.RepairGeometry_management(badBuffer,"DELETE_NULL")
+                with logArcpy("arcpy.RepairGeometry_management", (badBuffer,"DELETE_NULL"), logFile):
+                    arcpy.RepairGeometry_management(badBuffer,"DELETE_NULL")
                 
-                logArcpy("arcpy.RepairGeometry_management", (badEraseFeatures,"DELETE_NULL"), logFile)
-                arcpy.RepairGeometry_management(badEraseFeatures,"DELETE_NULL")
+                with logArcpy("arcpy.RepairGeometry_management", (badEraseFeatures,"DELETE_NULL"), logFile):
+                    arcpy.RepairGeometry_management(badEraseFeatures,"DELETE_NULL")
                 
-                logArcpy("arcpy.Erase_analysis", (badBuffer, badEraseFeatures, erasedOutputName), logFile)
-                erasedOutput = arcpy.Erase_analysis(badBuffer, badEraseFeatures, erasedOutputName)
+                with logArcpy("arcpy.Erase_analysis", (badBuffer, badEraseFeatures, erasedOutputName), logFile):
+                    erasedOutput = arcpy.Erase_analysis(badBuffer, badEraseFeatures, erasedOutputName)
                 
-                logArcpy("arcpy.Delete_management", (badBuffer,), logFile)
-                arcpy.Delete_management(badBuffer)
+                with logArcpy("arcpy.Delete_management", (badBuffer,), logFile):
+                    arcpy.Delete_management(badBuffer)
                 
-                logArcpy("arcpy.Delete_management", (badEraseFeatures,), logFile)
-                arcpy.Delete_management(badEraseFeatures)
+                with logArcpy("arcpy.Delete_management", (badEraseFeatures,), logFile):
+                    arcpy.Delete_management(badEraseFeatures)
         else:
             erasedOutput = intersectFeatureClass
         
         AddMsg(f"{timer.now()} Dissolving intersections by reporting unit.", 0, logFile)
-        logArcpy("arcpy.Dissolve_management", (erasedOutput,outFeatures,unitID), logFile)
-        finalOutput = arcpy.Dissolve_management(erasedOutput,outFeatures,unitID)
+        with logArcpy("arcpy.Dissolve_management", (erasedOutput,outFeatures,unitID), logFile):
+            finalOutput = arcpy.Dissolve_management(erasedOutput,outFeatures,unitID)
         
         return finalOutput, cleanupList 
     finally:
@@ -586,15 +591,15 @@ def getIntersectOfPolygons(repUnits, uIDField, secondPoly, outFeatures, cleanupL
     # Intersect the reporting unit features with the floodplain features 
     intersectFeatures = files.nameIntermediateFile([toolShortName+"_Intersect_","FeatureClass"], cleanupList)
     AddMsg(f"{timer.now()} Intersecting {desc1.basename} with {desc2.basename}. Intermediate: {basename(intersectFeatures)}", 0, logFile)
-    logArcpy("arcpy.Intersect_analysis", ([repUnits, secondPoly],intersectFeatures,"ALL","","INPUT"), logFile)
-    intersection = arcpy.Intersect_analysis([repUnits, secondPoly],intersectFeatures,"ALL","","INPUT")
+    with logArcpy("arcpy.Intersect_analysis", ([repUnits, secondPoly],intersectFeatures,"ALL","","INPUT"), logFile):
+        intersection = arcpy.Intersect_analysis([repUnits, secondPoly],intersectFeatures,"ALL","","INPUT")
      
     # Dissolve the intersected lines on the unit ID fields.
     outFeatures = files.nameIntermediateFile([outFeatures,"FeatureClass"], cleanupList)
     dissolveFields = uIDField
     AddMsg(f"{timer.now()} Dissolving {desc2.basename} zone features. Intermediate: {basename(outFeatures)}", 0, logFile)  
-    logArcpy("arcpy.Dissolve_management", (intersection,outFeatures,dissolveFields,"","MULTI_PART","DISSOLVE_LINES"), logFile)
-    arcpy.Dissolve_management(intersection,outFeatures,dissolveFields,"","MULTI_PART","DISSOLVE_LINES")
+    with logArcpy("arcpy.Dissolve_management", (intersection,outFeatures,dissolveFields,"","MULTI_PART","DISSOLVE_LINES"), logFile):
+        arcpy.Dissolve_management(intersection,outFeatures,dissolveFields,"","MULTI_PART","DISSOLVE_LINES")
     
     # Delete following intermediate datasets in order to reduce clutter if Intermediates are to be saved
     #arcpy.Delete_management(intersection)
@@ -620,19 +625,19 @@ def splitDissolveMerge(lines,repUnits,uIDField,mergedLines,inLengthField,lineCla
     # Get a unique name with full path for the output features - will default to current workspace:
     intersectFeatures = arcpy.CreateScratchName("tmpIntersect","","FeatureClass")
     # Intersect the lines and the areal units
-    logArcpy("arcpy.Intersect_analysis",([repUnits, lines],intersectFeatures,"ALL","","INPUT"),logFile)
-    intersection = arcpy.Intersect_analysis([repUnits, lines],intersectFeatures,"ALL","","INPUT")
+    with logArcpy("arcpy.Intersect_analysis",([repUnits, lines],intersectFeatures,"ALL","","INPUT"),logFile):
+        intersection = arcpy.Intersect_analysis([repUnits, lines],intersectFeatures,"ALL","","INPUT")
     
     dissolveFields = uIDField.name
     if lineClass != '':
         dissolveFields = [uIDField.name, lineClass]
     
     # Dissolve the intersected lines on the unit ID (and optional line class) fields. 
-    logArcpy("arcpy.Dissolve_management",(intersection,mergedLines,dissolveFields,"","MULTI_PART","DISSOLVE_LINES"),logFile)
-    arcpy.Dissolve_management(intersection,mergedLines,dissolveFields,"","MULTI_PART","DISSOLVE_LINES")
+    with logArcpy("arcpy.Dissolve_management",(intersection,mergedLines,dissolveFields,"","MULTI_PART","DISSOLVE_LINES"),logFile):
+        arcpy.Dissolve_management(intersection,mergedLines,dissolveFields,"","MULTI_PART","DISSOLVE_LINES")
     
-    logArcpy("arcpy.Delete_management",(intersection,),logFile)
-    arcpy.Delete_management(intersection)
+    with logArcpy("arcpy.Delete_management",(intersection,),logFile):
+        arcpy.Delete_management(intersection)
     
     ## Add and calculate a length field for the new shapefile
     lengthFieldName = addLengthField(mergedLines,inLengthField,logFile)
@@ -649,13 +654,13 @@ def findIntersections(mergedRoads,inStreamFeature,mergedStreams,ruID,roadStreamM
     # Intersect the roads and the streams - the output is a multipoint feature class with one feature per combination 
     # of road class and streams per reporting unit
     AddMsg(f"{timer.now()} Intersecting the road and stream features. Intermediate: {basename(roadStreamMultiPoints)}")
-    logArcpy("arcpy.Intersect_analysis",([mergedRoads,inStreamFeature],roadStreamMultiPoints,"ALL","#","POINT"), 0, logFile)
-    arcpy.Intersect_analysis([mergedRoads,inStreamFeature],roadStreamMultiPoints,"ALL","#","POINT")
+    with logArcpy("arcpy.Intersect_analysis",([mergedRoads,inStreamFeature],roadStreamMultiPoints,"ALL","#","POINT"), 0, logFile):
+        arcpy.Intersect_analysis([mergedRoads,inStreamFeature],roadStreamMultiPoints,"ALL","#","POINT")
     
     # Because we want a count of individual intersection features, break apart the multipoints into single points
     AddMsg(f"{timer.now()} Converting intersection points from multi-point to single point. Intermediate: {basename(roadStreamIntersects)}", 0, logFile)
-    logArcpy("arcpy.MultipartToSinglepart_management",(roadStreamMultiPoints,roadStreamIntersects),logFile)
-    arcpy.MultipartToSinglepart_management(roadStreamMultiPoints,roadStreamIntersects)
+    with logArcpy("arcpy.MultipartToSinglepart_management",(roadStreamMultiPoints,roadStreamIntersects),logFile):
+        arcpy.MultipartToSinglepart_management(roadStreamMultiPoints,roadStreamIntersects)
     
     # Perform a frequency analysis to get a count of the number of crossings per class per reporting unit
     AddMsg(f"{timer.now()} Performing frequency analysis to determine the number crossings per reporting unit. Intermediate: {basename(roadStreamSummary)}", 0, logFile)
@@ -667,8 +672,8 @@ def findIntersections(mergedRoads,inStreamFeature,mergedStreams,ruID,roadStreamM
     # Lastly, calculate the number of stream crossings per kilometer of streams.
     AddMsg(f"{timer.now()} Calculating the number of stream crossings per kilometer of streams.", 0, logFile)
     # Join the stream layer to the summary table
-    logArcpy("arcpy.JoinField_management",(roadStreamSummary, ruID.name, mergedStreams, ruID.name, [streamLengthFieldName]), logFile)
-    arcpy.JoinField_management(roadStreamSummary, ruID.name, mergedStreams, ruID.name, [streamLengthFieldName])
+    with logArcpy("arcpy.JoinField_management",(roadStreamSummary, ruID.name, mergedStreams, ruID.name, [streamLengthFieldName]), logFile):
+        arcpy.JoinField_management(roadStreamSummary, ruID.name, mergedStreams, ruID.name, [streamLengthFieldName])
     
     # Set up a calculation expression for crossings per kilometer.
     calcExpression = "!FREQUENCY!/!" + streamLengthFieldName + "!"    
@@ -683,18 +688,18 @@ def roadsNearStreams(inStreamFeature,mergedStreams,bufferDist,inRoadFeature,inRe
     '''
     # For RNS metric, first buffer all the streams by the desired distance
     AddMsg(f"{timer.now()} Buffering stream features. Intermediate: {basename(streamBuffer)}", 0, logFile)
-    logArcpy("arcpy.Buffer_analysis", (inStreamFeature,streamBuffer,bufferDist,"FULL","ROUND","ALL","#"), logFile)
-    arcpy.Buffer_analysis(inStreamFeature,streamBuffer,bufferDist,"FULL","ROUND","ALL","#")
+    with logArcpy("arcpy.Buffer_analysis", (inStreamFeature,streamBuffer,bufferDist,"FULL","ROUND","ALL","#"), logFile):
+        arcpy.Buffer_analysis(inStreamFeature,streamBuffer,bufferDist,"FULL","ROUND","ALL","#")
     
     # Intersect the stream buffers with the input road layer to find road segments in the buffer zone
     AddMsg(f"{timer.now()} Intersecting road features with stream buffers.", 0, logFile)
-    logArcpy("arcpy.Intersect_analysis", ([inRoadFeature, streamBuffer],tmp1RdsNearStrms,"ALL","#","INPUT"), logFile)
-    intersect1 = arcpy.Intersect_analysis([inRoadFeature, streamBuffer],tmp1RdsNearStrms,"ALL","#","INPUT")
+    with logArcpy("arcpy.Intersect_analysis", ([inRoadFeature, streamBuffer],tmp1RdsNearStrms,"ALL","#","INPUT"), logFile):
+        intersect1 = arcpy.Intersect_analysis([inRoadFeature, streamBuffer],tmp1RdsNearStrms,"ALL","#","INPUT")
     
     # Intersect the roads in the buffer zones with the reporting unit feature to assign RU Id values to road segments
     AddMsg(f"{timer.now()} Assigning reporting unit feature ID values to road segments.", 0, logFile)
-    logArcpy("arcpy.Intersect_analysis", ([intersect1, inReportingUnitFeature],tmp2RdsNearStrms,"ALL","#","INPUT"), logFile)
-    intersect2 = arcpy.Intersect_analysis([intersect1, inReportingUnitFeature],tmp2RdsNearStrms,"ALL","#","INPUT")
+    with logArcpy("arcpy.Intersect_analysis", ([intersect1, inReportingUnitFeature],tmp2RdsNearStrms,"ALL","#","INPUT"), logFile):
+        intersect2 = arcpy.Intersect_analysis([intersect1, inReportingUnitFeature],tmp2RdsNearStrms,"ALL","#","INPUT")
     
     # if overlapping polygons exist in reporting unit theme, the above intersection may result in several rows of data for a given reporting unit.
     # perform a dissolve to get a 1 to 1 relationship with input to output. Include the class field if provided.
@@ -703,21 +708,21 @@ def roadsNearStreams(inStreamFeature,mergedStreams,bufferDist,inRoadFeature,inRe
     if roadClass != '':
         dissolveFields = [ruID.name, roadClass] 
     # Dissolve the intersected lines on the unit ID (and optional line class) fields.
-    logArcpy("arcpy.Dissolve_management", (intersect2,roadsNearStreams,dissolveFields, "#","MULTI_PART","DISSOLVE_LINES"), logFile)
-    arcpy.Dissolve_management(intersect2,roadsNearStreams,dissolveFields, "#","MULTI_PART","DISSOLVE_LINES")
+    with logArcpy("arcpy.Dissolve_management", (intersect2,roadsNearStreams,dissolveFields, "#","MULTI_PART","DISSOLVE_LINES"), logFile):
+        arcpy.Dissolve_management(intersect2,roadsNearStreams,dissolveFields, "#","MULTI_PART","DISSOLVE_LINES")
     
-    logArcpy("arcpy.Delete_management", (intersect1,), logFile)
-    arcpy.Delete_management(intersect1)
+    with logArcpy("arcpy.Delete_management", (intersect1,), logFile):
+        arcpy.Delete_management(intersect1)
     
-    logArcpy("arcpy.Delete_management", (intersect2,), logFile)
-    arcpy.Delete_management(intersect2)
+    with logArcpy("arcpy.Delete_management", (intersect2,), logFile):
+        arcpy.Delete_management(intersect2)
     
     # Add and calculate a length field for the new shapefile
     roadLengthFieldName = addLengthField(roadsNearStreams,inLengthField,logFile)
     
     # Next join the merged streams layer to the roads/streambuffer intersection layer
-    logArcpy("arcpy.JoinField_management", (roadsNearStreams, ruID.name, mergedStreams, ruID.name, [streamLengthFieldName]), logFile)
-    arcpy.JoinField_management(roadsNearStreams, ruID.name, mergedStreams, ruID.name, [streamLengthFieldName])
+    with logArcpy("arcpy.JoinField_management", (roadsNearStreams, ruID.name, mergedStreams, ruID.name, [streamLengthFieldName]), logFile):
+        arcpy.JoinField_management(roadsNearStreams, ruID.name, mergedStreams, ruID.name, [streamLengthFieldName])
     
     # Set up a calculation expression for the roads near streams fraction
     calcExpression = "!" + roadLengthFieldName + "!/!" + streamLengthFieldName + "!"
@@ -783,18 +788,22 @@ def addCalculateField(inFeatures,fieldName,fieldType,calcExpression,codeBlock='#
     # Check for existence of field.
     fieldList = arcpy.ListFields(inFeatures,fieldName)
     if not fieldList: # if the list of fields that exactly match the validated fieldname is empty, then add the field
-        logArcpy('arcpy.AddField_management', (inFeatures,fieldName, fieldType), logFile)
-        arcpy.AddField_management(inFeatures,fieldName, fieldType)
+        with logArcpy('arcpy.AddField_management', (inFeatures,fieldName, fieldType), logFile):
+            arcpy.AddField_management(inFeatures,fieldName, fieldType)
         
     else: # Otherwise warn the user that the field will be recalculated.
         AddMsg(f"The field {fieldName} already exists in {inFeatures}, its values will be recalculated.")
-    logArcpy('arcpy.CalculateField_management', (inFeatures,fieldName,calcExpression,"PYTHON",codeBlock), logFile)
-    arcpy.CalculateField_management(inFeatures,fieldName,calcExpression,"PYTHON",codeBlock)
+    with logArcpy('arcpy.CalculateField_management', (inFeatures,fieldName,calcExpression,"PYTHON",codeBlock), logFile):
+        arcpy.CalculateField_management(inFeatures,fieldName,calcExpression,"PYTHON",codeBlock)
     return fieldName   
 
 
 def tabulateMDCP(inPatchRaster, inReportingUnitFeature, reportingUnitIdField, rastoPolyFeature, patchCentroidsFeature, 
                  patchDissolvedFeature, nearPatchTable, zoneAreaDict, timer, pmResultsDict, logFile):
+    if globalConstants.mdcpBackend == globalConstants.numpyBackendName:
+        return tabulateMDCPFromGrid(inPatchRaster, inReportingUnitFeature, reportingUnitIdField, zoneAreaDict, timer, 
+                                    logFile)
+
     resultDict = {}
     
     # put the proper field delimiters around the ID field name for SQL expressions
@@ -802,8 +811,8 @@ def tabulateMDCP(inPatchRaster, inReportingUnitFeature, reportingUnitIdField, ra
     
     #Convert Final Patch Raster to polygon
     AddMsg(f"{timer.now()} Converting raster patches to polygons. Intermediate: {basename(rastoPolyFeature)}", 0, logFile)
-    logArcpy("arcpy.sa.SetNull", (inPatchRaster, inPatchRaster, "VALUE <= 0"), logFile)
-    patchOnlyRaster = arcpy.sa.SetNull(inPatchRaster, inPatchRaster, "VALUE <= 0")
+    with logArcpy("arcpy.sa.SetNull", (inPatchRaster, inPatchRaster, "VALUE <= 0"), logFile):
+        patchOnlyRaster = arcpy.sa.SetNull(inPatchRaster, inPatchRaster, "VALUE <= 0")
     
     
     # Check to see if all values are NULL (ALLNODATA: 0 = no, 1 = yes)
@@ -812,26 +821,26 @@ def tabulateMDCP(inPatchRaster, inReportingUnitFeature, reportingUnitIdField, ra
     
     if anyPatches == '0':
     
-        logArcpy("arcpy.RasterToPolygon_conversion", (patchOnlyRaster, rastoPolyFeature, "NO_Simplify", "VALUE"), logFile)
-        arcpy.RasterToPolygon_conversion(patchOnlyRaster, rastoPolyFeature, "NO_Simplify", "VALUE")
+        with logArcpy("arcpy.RasterToPolygon_conversion", (patchOnlyRaster, rastoPolyFeature, "NO_Simplify", "VALUE"), logFile):
+            arcpy.RasterToPolygon_conversion(patchOnlyRaster, rastoPolyFeature, "NO_Simplify", "VALUE")
         
         #Dissolve the polygons on Value Field to make sure each patch is represented by a single polygon.
         AddMsg(f"{timer.now()} Dissolving patch polygons by value field. Intermediate: {basename(patchDissolvedFeature)}", 0, logFile)
-        logArcpy("arcpy.Dissolve_management", (rastoPolyFeature, patchDissolvedFeature,"gridcode","#", "MULTI_PART","DISSOLVE_LINES"), logFile)
-        arcpy.Dissolve_management(rastoPolyFeature, patchDissolvedFeature,"gridcode","#", "MULTI_PART","DISSOLVE_LINES")
+        with logArcpy("arcpy.Dissolve_management", (rastoPolyFeature, patchDissolvedFeature,"gridcode","#", "MULTI_PART","DISSOLVE_LINES"), logFile):
+            arcpy.Dissolve_management(rastoPolyFeature, patchDissolvedFeature,"gridcode","#", "MULTI_PART","DISSOLVE_LINES")
           
         #Create a feature layer of the FinalPatch_poly_diss
-        logArcpy("arcpy.MakeFeatureLayer_management", (patchDissolvedFeature, "patchDissolvedLayer"), logFile)
-        patchDissolvedLayer = arcpy.MakeFeatureLayer_management(patchDissolvedFeature, "patchDissolvedLayer")
+        with logArcpy("arcpy.MakeFeatureLayer_management", (patchDissolvedFeature, "patchDissolvedLayer"), logFile):
+            patchDissolvedLayer = arcpy.MakeFeatureLayer_management(patchDissolvedFeature, "patchDissolvedLayer")
          
         #Convert Final Patch Raster to points to get the cell centroids
         AddMsg(f"{timer.now()} Converting raster patch cells to centroid points. Intermediate: {basename(patchCentroidsFeature)}", 0, logFile)
-        logArcpy("arcpy.RasterToPoint_conversion", (patchOnlyRaster, patchCentroidsFeature, "VALUE"), logFile)
-        arcpy.RasterToPoint_conversion(patchOnlyRaster, patchCentroidsFeature, "VALUE")
+        with logArcpy("arcpy.RasterToPoint_conversion", (patchOnlyRaster, patchCentroidsFeature, "VALUE"), logFile):
+            arcpy.RasterToPoint_conversion(patchOnlyRaster, patchCentroidsFeature, "VALUE")
          
         #Create a feature layer of the FinalPatch_centroids
-        logArcpy("arcpy.MakeFeatureLayer_management", (patchCentroidsFeature, "patchCentroidsLayer"), logFile)
-        patchCentroidsLayer = arcpy.MakeFeatureLayer_management(patchCentroidsFeature, "patchCentroidsLayer")
+        with logArcpy("arcpy.MakeFeatureLayer_management", (patchCentroidsFeature, "patchCentroidsLayer"), logFile):
+            patchCentroidsLayer = arcpy.MakeFeatureLayer_management(patchCentroidsFeature, "patchCentroidsLayer")
         
         # Initialize custom progress indicator
         totalRUs = len(zoneAreaDict)
@@ -991,11 +1000,11 @@ def tabulateMDCP(inPatchRaster, inReportingUnitFeature, reportingUnitIdField, ra
         if singlePatch > 0:
             AddMsg(f"{singlePatch} reporting units contained a single patch. MDCP was set to 0 for these units.", 1, logFile)
             
-        logArcpy("arcpy.Delete_management", (patchCentroidsLayer,), logFile)
-        arcpy.Delete_management(patchCentroidsLayer)
+        with logArcpy("arcpy.Delete_management", (patchCentroidsLayer,), logFile):
+            arcpy.Delete_management(patchCentroidsLayer)
         
-        logArcpy("arcpy.Delete_management", (patchDissolvedLayer,), logFile)
-        arcpy.Delete_management(patchDissolvedLayer)
+        with logArcpy("arcpy.Delete_management", (patchDissolvedLayer,), logFile):
+            arcpy.Delete_management(patchDissolvedLayer)
     
     else:
         AddMsg("No reporting units contained patches. Setting MDCP to -9999 for all units.", 1, logFile)
@@ -1010,6 +1019,83 @@ def tabulateMDCP(inPatchRaster, inReportingUnitFeature, reportingUnitIdField, ra
     return resultDict
 
 
+def tabulateMDCPFromGrid(inPatchRaster, inReportingUnitFeature, reportingUnitIdField, zoneAreaDict, timer, logFile=None):
+    """ Calculates the mean distance to closest patch (MDCP) of every reporting unit with a spatial tree
+
+    **Description:**
+
+        The grid counterpart of tabulateMDCP. Instead of converting patches to polygons and running Clip and
+        GenerateNearTable once per reporting unit, the reporting units are rasterized onto the patch raster grid, the
+        edge cells of every reporting unit/patch region are gathered in one tiled pass, and the closest neighboring
+        patch of every patch is found with a single KD-tree (see patches.getMeanNearestPatchDistances). As with the
+        clipped polygons, a patch split by a reporting unit boundary only counts its cells inside the unit.
+
+    **Arguments:**
+
+        * *inPatchRaster* - patch raster produced by raster.createPatchRaster
+        * *inReportingUnitFeature* - reporting unit polygon feature class
+        * *reportingUnitIdField* - the field holding the reporting unit ID values
+        * *zoneAreaDict* - dictionary with the area of each reporting unit keyed to its ID value
+        * *timer* - a DateTimer object used to time stamp messages
+        * *logFile* - CatalogPath and name of the text log file. It can be None
+
+    **Returns:**
+
+        * dictionary - "pwn,pwon,mean" strings keyed to the reporting unit ID values
+
+    """
+
+    resultDict = {}
+
+    patchRasterObj = arcpy.Raster(inPatchRaster)
+    cellWidth = patchRasterObj.meanCellWidth
+    cellHeight = patchRasterObj.meanCellHeight
+
+    AddMsg(f"{timer.now()} Finding the edge cells of patches in each reporting unit.", 0, logFile)
+    zoneRaster, zoneIdList, oidZoneLookup = raster.getZoneRaster(inReportingUnitFeature, reportingUnitIdField, 
+                                                                 cellWidth, logFile, inPatchRaster)
+    zoneExtent = arcpy.Raster(zoneRaster).extent
+
+    edgeCells = []
+    for row0, col0, zoneBlock, patchBlock in raster.iterAlignedBlockWindows(zoneRaster, inPatchRaster, 
+                                                                            globalConstants.numpyBlockSize, 1):
+        zoneBlock = zonalhist.remapZones(zoneBlock, oidZoneLookup)
+        # patches are the cells with values above 0, as in the SetNull step of tabulateMDCP
+        rows, cols, zones, patchValues = patches.getPatchEdgeCells(zoneBlock, patchBlock, 0, -9999, 
+                                                                   patchRasterObj.noDataValue)
+        x = zoneExtent.XMin + (col0 + cols + 0.5) * cellWidth
+        y = zoneExtent.YMax - (row0 + rows + 0.5) * cellHeight
+        edgeCells.append((zones, patchValues, x, y))
+
+    zones, patchValues, x, y = [np.concatenate([cells[i] for cells in edgeCells]) for i in range(4)]
+
+    AddMsg(f"{timer.now()} Finding the distance from each patch to its closest neighbor.", 0, logFile)
+    pwn, pwon, meanDist = patches.getMeanNearestPatchDistances(zones, patchValues, x, y, len(zoneIdList), 
+                                                               cellWidth, cellHeight)
+
+    zoneIndexDict = dict((zoneId, i) for i, zoneId in enumerate(zoneIdList))
+    noPatches = 0
+    singlePatch = 0
+    for aZone in zoneAreaDict.keys():
+        i = zoneIndexDict.get(aZone)
+        if i is None or pwn[i] == -9999:
+            resultDict[aZone] = "-9999,-9999,-9999"
+            noPatches += 1
+        elif pwon[i] == 1 and pwn[i] == 0:
+            resultDict[aZone] = "0,1,0"
+            singlePatch += 1
+        else:
+            resultDict[aZone] = f"{pwn[i]},{pwon[i]},{meanDist[i]}"
+
+    if noPatches > 0:
+        AddMsg(f"{noPatches} reporting units contained no patches. MDCP was set to -9999 for these units.", 1, logFile)
+    
+    if singlePatch > 0:
+        AddMsg(f"{singlePatch} reporting units contained a single patch. MDCP was set to 0 for these units.", 1, logFile)
+
+    return resultDict
+
+
 def mergeVectorsByType(inFeatures, fileNameBase, cleanupList, timer, logFile):
     """Returns a list of merged feature classes. List item one is polygon features, item two is polyline features, and item three is point features.
     **Description:**
@@ -1067,8 +1153,8 @@ def mergeVectorsByType(inFeatures, fileNameBase, cleanupList, timer, logFile):
                 namePrefix = fcName+"_Prj_"
                 prjFC = files.nameIntermediateFile([namePrefix, "FeatureClass"], cleanupList)
                 AddMsg(f"{timer.now()} Projecting {fcName} to {basename(prjFC)}.", 0, logFile)
-                logArcpy('arcpy.management.Project', (inFC, prjFC, outCS, transformMethod), logFile)   
-                arcpy.management.Project(inFC, prjFC, outCS, transformMethod)
+                with logArcpy('arcpy.management.Project', (inFC, prjFC, outCS, transformMethod), logFile):   
+                    arcpy.management.Project(inFC, prjFC, outCS, transformMethod)
             else:
                 prjFC = inFC
             
@@ -1090,8 +1176,8 @@ def mergeVectorsByType(inFeatures, fileNameBase, cleanupList, timer, logFile):
             AddMsg(f"{timer.now()} Merging {len(lineList)} line features from input features. Intermediate: {os.path.basename(mergeName)}", 0, logFile)
             # use fieldMappings to reduce file size and possible processing time.
             fieldMappings = getMinimumFieldMappings(lineList)
-            logArcpy('arcpy.Merge_management', (lineList,mergeName,fieldMappings), logFile)
-            mergeOutput = arcpy.Merge_management(lineList,mergeName,fieldMappings)
+            with logArcpy('arcpy.Merge_management', (lineList,mergeName,fieldMappings), logFile):
+                mergeOutput = arcpy.Merge_management(lineList,mergeName,fieldMappings)
             
             mergedOutputs[0] = mergeOutput
         elif len(lineList) == 1:
@@ -1103,8 +1189,8 @@ def mergeVectorsByType(inFeatures, fileNameBase, cleanupList, timer, logFile):
             AddMsg(f"{timer.now()} Merging {len(polyList)} polygon features from input features. Intermediate: {os.path.basename(mergeName)}", 0, logFile)
             # use fieldMappings to reduce file size and possible processing time.
             fieldMappings = getMinimumFieldMappings(polyList)
-            logArcpy('arcpy.Merge_management', (polyList,mergeName,fieldMappings), logFile)
-            mergeOutput = arcpy.Merge_management(polyList,mergeName,fieldMappings)
+            with logArcpy('arcpy.Merge_management', (polyList,mergeName,fieldMappings), logFile):
+                mergeOutput = arcpy.Merge_management(polyList,mergeName,fieldMappings)
             
             mergedOutputs[1] = mergeOutput
         elif len(polyList) == 1:
@@ -1116,8 +1202,8 @@ def mergeVectorsByType(inFeatures, fileNameBase, cleanupList, timer, logFile):
             AddMsg(f"{timer.now()} Merging {len(pointList)} point features from input features. Intermediate: {os.path.basename(mergeName)}", 0, logFile)
             # use fieldMappings to reduce file size and possible processing time.
             fieldMappings = getMinimumFieldMappings(pointList)
-            logArcpy('arcpy.Merge_management', (pointList,mergeName,fieldMappings), logFile)
-            mergeOutput = arcpy.Merge_management(pointList,mergeName,fieldMappings)
+            with logArcpy('arcpy.Merge_management', (pointList,mergeName,fieldMappings), logFile):
+                mergeOutput = arcpy.Merge_management(pointList,mergeName,fieldMappings)
             
             mergedOutputs[2] = mergeOutput
         elif len(pointList) == 1:
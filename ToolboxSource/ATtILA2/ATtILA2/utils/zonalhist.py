@@ -0,0 +1,208 @@
+""" Utilities for tabulating zone by class areas with NumPy
+
+    These routines are the array side of the NumPy tabulate area backend (see tabarea.TabulateAreaTable). They do not
+    touch arcpy, so raster blocks can come from arcpy.RasterToNumPyArray, a GeoTIFF reader or a NumPy memory-mapped
+    file alike.
+
+"""
+import numpy as np
+
+
+def iterBlockWindows(nRows, nCols, blockSize):
+    """ A generator for the row/column windows needed to visit a grid one block at a time
+
+    **Description:**
+
+        Windows are yielded in row major order starting in the upper left corner. Blocks along the right and bottom
+        edges of the grid are trimmed to the grid size.
+
+    **Arguments:**
+
+        * *nRows* - number of rows in the grid
+        * *nCols* - number of columns in the grid
+        * *blockSize* - maximum number of rows and columns in a block
+
+    **Returns:**
+
+        * generator of tuples - (first row, first column, number of rows, number of columns)
+
+    """
+
+    blockSize = max(int(blockSize), 1)
+    for row0 in range(0, nRows, blockSize):
+        for col0 in range(0, nCols, blockSize):
+            yield row0, col0, min(blockSize, nRows - row0), min(blockSize, nCols - col0)
+
+
+def remapZones(zoneBlock, zoneLookup, noDataValue=-1):
+    """ Converts raw zone raster values (e.g., object IDs) into dense zone indexes
+
+    **Arguments:**
+
+        * *zoneBlock* - integer array of raw zone raster values
+        * *zoneLookup* - integer array where zoneLookup[rawValue] is the zone index of that raw value, or -1
+        * *noDataValue* - the raw value used for cells outside of every zone
+
+    **Returns:**
+
+        * integer array of zone indexes, with -1 marking cells outside of every zone
+
+    """
+
+    zoneBlock = np.asarray(zoneBlock)
+    valid = (zoneBlock != noDataValue) & (zoneBlock >= 0) & (zoneBlock < len(zoneLookup))
+    zoneIndexes = np.full(zoneBlock.shape, -1, dtype=np.int64)
+    zoneIndexes[valid] = zoneLookup[zoneBlock[valid]]
+
+    return zoneIndexes
+
+
+class ZoneClassHistogram(object):
+    """ Accumulates a zone by class cell count matrix one raster block at a time
+
+    **Description:**
+
+        Zones are dense indexes from 0 to zoneCount - 1. Class values are collected as they are encountered, so a
+        block may introduce a value that was not seen before; the count matrix simply gains a column. Each block is
+        counted with a single np.bincount over the combined zone/class key.
+
+    """
+
+    def __init__(self, zoneCount, classValues=None):
+        """ Constructor - Called when created
+
+            * zoneCount - number of zones
+            * classValues - optional sequence of class values known in advance (e.g., from the raster attribute table)
+        """
+
+        self.zoneCount = int(zoneCount)
+        self._classValues = []
+        self._classIndex = {}
+        self._counts = np.zeros((self.zoneCount, 0), dtype=np.int64)
+        if classValues is not None:
+            self._addClassValues(sorted(int(v) for v in classValues))
+
+
+    def _addClassValues(self, newValues):
+        newValues = [v for v in newValues if v not in self._classIndex]
+        if not newValues:
+            return
+
+        for v in newValues:
+            self._classIndex[v] = len(self._classValues)
+            self._classValues.append(v)
+        self._counts = np.hstack([self._counts, np.zeros((self.zoneCount, len(newValues)), dtype=np.int64)])
+
+
+    def addBlock(self, zoneBlock, valueBlock, valueNoData=None):
+        """ Adds the cells of one block to the histogram
+
+        **Arguments:**
+
+            * *zoneBlock* - array of dense zone indexes; negative values are outside of every zone
+            * *valueBlock* - array of class values with the same shape as *zoneBlock*
+            * *valueNoData* - class value that marks NoData cells. These cells are not counted
+
+        """
+
+        zoneBlock = np.asarray(zoneBlock).ravel()
+        valueBlock = np.asarray(valueBlock).ravel()
+
+        keep = zoneBlock >= 0
+        if valueNoData is not None:
+            keep &= valueBlock != valueNoData
+        if not keep.any():
+            return
+
+        zones = zoneBlock[keep]
+        blockValues, blockClasses = np.unique(valueBlock[keep], return_inverse=True)
+        self._addClassValues([int(v) for v in blockValues])
+
+        nBlockValues = len(blockValues)
+        keys = zones * nBlockValues + blockClasses.ravel()
+        blockCounts = np.bincount(keys, minlength=self.zoneCount * nBlockValues).reshape(self.zoneCount, nBlockValues)
+
+        columns = [self._classIndex[int(v)] for v in blockValues]
+        self._counts[:, columns] += blockCounts
+
+
+    def addArrays(self, zoneArray, valueArray, valueNoData=None, blockSize=2048):
+        """ Adds two aligned full grids to the histogram one block at a time
+
+            Either array may be a np.memmap; only the block being counted is paged into memory.
+        """
+
+        nRows, nCols = np.shape(zoneArray)
+        for row0, col0, nr, nc in iterBlockWindows(nRows, nCols, blockSize):
+            self.addBlock(zoneArray[row0:row0 + nr, col0:col0 + nc], valueArray[row0:row0 + nr, col0:col0 + nc],
+                          valueNoData)
+
+
+    @property
+    def classValues(self):
+        """ Sorted list of the class values encountered """
+
+        return sorted(self._classValues)
+
+
+    def getCountMatrix(self):
+        """ Returns the zone by class cell count matrix with columns in *classValues* order """
+
+        order = np.argsort(self._classValues, kind='stable')
+        return self._counts[:, order]
+
+
+    def getAreaMatrix(self, cellArea):
+        """ Returns the zone by class area matrix with columns in *classValues* order """
+
+        return self.getCountMatrix() * float(cellArea)
+
+
+def tabulateArrays(zoneArray, valueArray, zoneCount, cellArea, valueNoData=None, blockSize=2048):
+    """ Returns the class values and the zone by class area matrix for two aligned grids
+
+    **Arguments:**
+
+        * *zoneArray* - 2D array of dense zone indexes; negative values are outside of every zone
+        * *valueArray* - 2D array of class values aligned with *zoneArray*
+        * *zoneCount* - number of zones
+        * *cellArea* - area of a single cell
+        * *valueNoData* - class value that marks NoData cells
+        * *blockSize* - maximum number of rows and columns processed at a time
+
+    **Returns:**
+
+        * list - sorted class values
+        * 2D array - area of each class (columns) in each zone (rows)
+
+    """
+
+    hist = ZoneClassHistogram(zoneCount)
+    hist.addArrays(zoneArray, valueArray, valueNoData, blockSize)
+
+    return hist.classValues, hist.getAreaMatrix(cellArea)
+
+
+def addValueCounts(valueCounts, valueBlock, valueNoData=None):
+    """ Adds the number of cells of each value in a block to a value histogram
+
+    **Arguments:**
+
+        * *valueCounts* - dictionary of value: cell count, updated in place
+        * *valueBlock* - array of integer raster values
+        * *valueNoData* - value that marks NoData cells, which are not counted
+
+    **Returns:**
+
+        * dictionary - *valueCounts*
+
+    """
+
+    valueBlock = np.asarray(valueBlock)
+    if valueNoData is not None:
+        valueBlock = valueBlock[valueBlock != valueNoData]
+    values, counts = np.unique(valueBlock, return_counts=True)
+    for value, count in zip(values.tolist(), counts.tolist()):
+        valueCounts[value] = valueCounts.get(value, 0) + count
+
+    return valueCounts
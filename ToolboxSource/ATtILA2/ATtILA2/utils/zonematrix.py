@@ -0,0 +1,152 @@
+""" Vectorized metric calculations on a zone by class area matrix
+
+    A tabulate area table is handled here as one matrix: a row for each zone and a column for each grid value. Land
+    cover class membership from the LCC file becomes an indicator matrix with a row for each grid value and a column for
+    each metric class, so the class areas of every zone come out of a single matrix product. These routines do not
+    touch arcpy.
+
+"""
+import numpy as np
+
+
+def getClassIndicatorMatrix(classValues, classValueIdsList, excludedValues):
+    """ Builds the grid value by metric class membership matrix
+
+    **Description:**
+
+        Entry [i, j] is 1 if grid value classValues[i] belongs to metric class j and is not an excluded value. Excluded
+        values never contribute to a metric class area (see calculate.getMetricPercentAreaAndSum). The matrix is held
+        dense: land cover grids carry at most a few hundred values, so it is small next to the area matrix.
+
+    **Arguments:**
+
+        * *classValues* - grid value for each column of the area matrix
+        * *classValueIdsList* - for each metric class, the collection of grid values assigned to it in the lcc file
+        * *excludedValues* - a set of grid values tagged in the lcc file to be excluded from the area calculations
+
+    **Returns:**
+
+        * 2D array - float indicator matrix of shape (number of grid values, number of metric classes)
+
+    """
+
+    columnIndex = dict((int(v), i) for i, v in enumerate(classValues))
+    indicator = np.zeros((len(classValues), len(classValueIdsList)), dtype=np.float64)
+    for j, valueIds in enumerate(classValueIdsList):
+        for aValueId in valueIds:
+            if aValueId in excludedValues:
+                continue
+            i = columnIndex.get(int(aValueId))
+            if i is not None: # the lcc defined value may not be found in the grid
+                indicator[i, j] = 1.0
+
+    return indicator
+
+
+def getZoneAreaSums(areaMatrix, classValues, excludedValues):
+    """ Returns the effective, excluded and total area of every zone
+
+    **Arguments:**
+
+        * *areaMatrix* - zone by grid value area matrix
+        * *classValues* - grid value for each column of the area matrix
+        * *excludedValues* - a set of grid values tagged in the lcc file to be excluded from the total area calculations
+
+    **Returns:**
+
+        * 1D array - effective area of each zone (area of grid values not excluded)
+        * 1D array - excluded area of each zone
+        * 1D array - total area of each zone
+
+    """
+
+    excludedMask = np.array([v in excludedValues for v in classValues], dtype=bool)
+    excludedArea = areaMatrix[:, excludedMask].sum(axis=1)
+    effectiveArea = areaMatrix[:, ~excludedMask].sum(axis=1)
+
+    return effectiveArea, excludedArea, effectiveArea + excludedArea
+
+
+def getPercentage(numerator, denominator):
+    """ Returns numerator / denominator * 100 with 0 wherever the denominator is not positive
+
+        Both arguments are broadcast, so a zone by class matrix may be divided by a per-zone column vector.
+    """
+
+    numerator = np.asarray(numerator, dtype=np.float64)
+    denominator = np.asarray(denominator, dtype=np.float64)
+    safeDenominator = np.where(denominator > 0, denominator, 1.0)
+
+    return np.where(denominator > 0, (numerator / safeDenominator) * 100, 0.0)
+
+
+def getMetricPercentAreasAndSums(areaMatrix, indicatorMatrix, effectiveArea):
+    """ Calculates the percentage of the effective area occupied by each metric class, and its area, for every zone
+
+    **Description:**
+
+        The matrix form of calculate.getMetricPercentAreaAndSum. Zones whose grid values are all excluded get a
+        percentage of 0.
+
+    **Arguments:**
+
+        * *areaMatrix* - zone by grid value area matrix
+        * *indicatorMatrix* - grid value by metric class matrix from getClassIndicatorMatrix
+        * *effectiveArea* - effective area of each zone
+
+    **Returns:**
+
+        * 2D array - zone by metric class percentage of effective area
+        * 2D array - zone by metric class area
+
+    """
+
+    metricAreas = np.dot(areaMatrix, indicatorMatrix)
+    metricPercents = getPercentage(metricAreas, np.asarray(effectiveArea)[:, np.newaxis])
+
+    return metricPercents, metricAreas
+
+
+def getPerValueCalcs(metricAreas, zoneValues, conversionFactor, zeroValueFlag=-99999, missingValueFlag=-55555):
+    """ Calculates the per value (e.g., square meters per capita) of every metric class in every zone
+
+    **Description:**
+
+        Metric class areas are converted to square meters and divided by the zone value. Zone values below 1 would
+        assign more land cover to the individual than exists in the reporting unit, so they receive *zeroValueFlag*.
+        Zones that have no value (e.g., do not overlap the population dataset) receive *missingValueFlag*.
+
+    **Arguments:**
+
+        * *metricAreas* - zone by metric class area matrix
+        * *zoneValues* - value for each zone, NaN where the zone has no value
+        * *conversionFactor* - float value to convert area values to square meters
+
+    **Returns:**
+
+        * 2D array - zone by metric class per value calculation
+        * 2D array - zone by metric class area in square meters
+        * 1D boolean array - zones flagged for a zone value below 1
+        * 1D boolean array - zones flagged for a missing zone value
+
+    """
+
+    classSqM = metricAreas * conversionFactor
+    zoneValues = np.asarray(zoneValues, dtype=np.float64)
+
+    missingMask = np.isnan(zoneValues)
+    zeroMask = ~missingMask & ~(zoneValues >= 1)
+    validMask = ~missingMask & ~zeroMask
+
+    safeValues = np.where(validMask, zoneValues, 1.0)
+    perValueCalcs = classSqM / safeValues[:, np.newaxis]
+    perValueCalcs[zeroMask, :] = zeroValueFlag
+    perValueCalcs[missingMask, :] = missingValueFlag
+
+    return perValueCalcs, classSqM, zeroMask, missingMask
+
+
+def lookupZoneValues(zoneIdList, zoneValueDict, missing=np.nan):
+    """ Returns a float array with the value of each zone in *zoneIdList*, or *missing* where the dictionary has none """
+
+    return np.array([zoneValueDict.get(zoneId, missing) for zoneId in zoneIdList], dtype=np.float64)
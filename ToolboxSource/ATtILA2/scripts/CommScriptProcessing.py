@@ -6,6 +6,8 @@
 
 import os
 import sys
+import shutil
+import arcpy
 
 from arcgis.features import GeoAccessor, GeoSeriesAccessor
 import pandas
@@ -14,17 +16,32 @@ import numpy
 from pathlib import Path
 from ATtILA2 import metric
 from ATtILA2.utils import parameters
+from ATtILA2.utils import batch
+from ATtILA2.utils import parallel
+from ATtILA2.constants import globalConstants
+from ATtILA2.constants import metricConstants
 
+# neighborhood widths, in cells, of the Greenspace and Impervious Proximity steps
+greenProxNeighborhoodSize = 251
+impProxNeighborhoodSize = 1001
+
+# file geodatabase of a batch worker process, used for its steps' scratch datasets and outputs; set by setGlobals
+_workerWorkspace = None
 
 
 def addTableToMap(tbl):
 	## to do:  wrap in try/except function to make sure in arc and a map exists.
+	if _workerWorkspace:
+		# batch worker processes have no map
+		return
 	Project = arcpy.mp.ArcGISProject("CURRENT")
 	Map = Project.listMaps()[0]	
 	Map.addTable(arcpy.mp.Table(tbl))
 	
 def addLayerToMap(lyr):
 	## to do:  wrap in try/except function to make sure in arc and a map exists.
+	if _workerWorkspace:
+		return
 	Project = arcpy.mp.ArcGISProject("CURRENT")
 	Map = Project.listMaps()[0]	
 	Map.addDataFromPath(lyr)
@@ -130,7 +147,7 @@ def EAGreenProx(inReportingUnitFeature, inLandCoverGrid, outWorkspace):
 	lccFilePath = os.path.join(lccPath, _lccName + '.xml')
 	
 	metricsToRun = 'green  -  [pgreen]  All Vegetative Areas'
-	inNeighborhoodSize = 251
+	inNeighborhoodSize = greenProxNeighborhoodSize
 	burnIn = 'true'
 	burnInValue = '1'
 	minPatchSiz = '300'
@@ -154,7 +171,7 @@ def EAImpProx(inReportingUnitFeature, inLandCoverGrid, outWorkspace):
 	lccFilePath = os.path.join(lccPath, _lccName + '.xml')
 	
 	metricsToRun = 'imp  -  [pimp]  Impervious Surface'
-	inNeighborhoodSize = 1001
+	inNeighborhoodSize = impProxNeighborhoodSize
 	burnIn = 'true'
 	burnInValue = '-99999'
 	minPatchSiz = '300'
@@ -434,33 +451,98 @@ def main(_argv):
 											 										 
 	inFloodplainDataset = r'E:\CommScripts_Testing\Input\Input.gdb\S_Fld_Haz_Ar'
 	
-	# for process in processesToRun.split("';'"):
+	# Each process is a batch step. Completed steps are recorded in a manifest next to the output workspace, so running
+	# the script again with the same inputs skips them and resumes at the first step that did not complete. Every step
+	# declares the datasets it makes, since the metric tools report their errors as messages and a step is only known
+	# to have completed when its outputs exist.
 	processesToRun = processesToRun.split("';'")
-	if 'Land Cover Characteristics' in processesToRun:
-		arcpy.AddMessage('*** Start Land Cover Characteristics ***')
-		EALandCoverPC(inReportingUnitFeature, reportingUnitIdField, inLandCoverGrid, inPopField, outWorkspace)
-	if 'Riparian Buffers' in processesToRun:
-		arcpy.AddMessage('*** Start Riparian Buffers ***')
-		EARiparianBuffers(inReportingUnitFeature, reportingUnitIdField, inLandCoverGrid, inFlowLineFeatures, inAreaFeatures, inWaterbodyFeatures, scratchWorkspace, outWorkspace)
-	if 'Greenspace Proximity' in processesToRun:
-		arcpy.AddMessage('*** Start Greenspace Proximity ***')
-		EAGreenProx(inReportingUnitFeature, inLandCoverGrid, outWorkspace)
-	if 'Impervious Proximity' in processesToRun:
-		arcpy.AddMessage('*** Start Impervious Proximity ***')
-		EAImpProx(inReportingUnitFeature, inLandCoverGrid, outWorkspace)
-	if 'Water Views' in processesToRun:
-		arcpy.AddMessage('*** Start Water Views ***')
-		EAWaterView(inReportingUnitFeature, reportingUnitIdField, inLandCoverGrid, inCensusRaster, outWorkspace)
-	if 'Tree Views' in processesToRun:
-		arcpy.AddMessage('*** Start Tree Views ***')
-		EATreeView(inReportingUnitFeature, reportingUnitIdField, inLandCoverGrid, inCensusRaster, outWorkspace)
-	if 'Near School' in processesToRun:
-		arcpy.AddMessage('*** Start Near School ***')
-		EASchoolViews(inReportingUnitFeature, reportingUnitIdField, inLandCoverGrid, k12, scratchWorkspace, outWorkspace, 'K12')
-	if 'Near Daycare' in processesToRun:
-		arcpy.AddMessage('*** Start Near Daycare ***')
-		EASchoolViews(inReportingUnitFeature, reportingUnitIdField, inLandCoverGrid, daycares, scratchWorkspace, outWorkspace, 'DayCare')
-	
+	lcInputs = [inReportingUnitFeature, inLandCoverGrid]
+	greenProxName = 'GREEN_{0}{1}'.format(greenProxNeighborhoodSize, metricConstants.npConstants.proxRasterOutName)
+	impProxName = 'IMP_{0}{1}'.format(impProxNeighborhoodSize, metricConstants.npConstants.proxRasterOutName)
+	allSteps = [
+		('Land Cover Characteristics', 'EALandCoverPC', 
+		 [inReportingUnitFeature, reportingUnitIdField, inLandCoverGrid, inPopField, outWorkspace],
+		 lcInputs, ['{0}_LC'.format(output_prefix)]),
+		('Riparian Buffers', 'EARiparianBuffers', 
+		 [inReportingUnitFeature, reportingUnitIdField, inLandCoverGrid, inFlowLineFeatures, inAreaFeatures, 
+		  inWaterbodyFeatures, scratchWorkspace, outWorkspace],
+		 lcInputs + [inFlowLineFeatures, inAreaFeatures, inWaterbodyFeatures], ['{0}_RB'.format(output_prefix)]),
+		('Greenspace Proximity', 'EAGreenProx', [inReportingUnitFeature, inLandCoverGrid, outWorkspace],
+		 lcInputs, [greenProxName]),
+		('Impervious Proximity', 'EAImpProx', [inReportingUnitFeature, inLandCoverGrid, outWorkspace],
+		 lcInputs, [impProxName]),
+		('Water Views', 'EAWaterView', 
+		 [inReportingUnitFeature, reportingUnitIdField, inLandCoverGrid, inCensusRaster, outWorkspace],
+		 lcInputs + [inCensusRaster], ['{0}_WVs'.format(output_prefix)]),
+		('Tree Views', 'EATreeView', 
+		 [inReportingUnitFeature, reportingUnitIdField, inLandCoverGrid, inCensusRaster, outWorkspace],
+		 lcInputs + [inCensusRaster], ['{0}_TreeVs'.format(output_prefix)]),
+		('Near School', 'EASchoolViews', 
+		 [inReportingUnitFeature, reportingUnitIdField, inLandCoverGrid, k12, scratchWorkspace, outWorkspace, 'K12'],
+		 lcInputs + [k12], ['{0}_K12'.format(output_prefix)]),
+		('Near Daycare', 'EASchoolViews', 
+		 [inReportingUnitFeature, reportingUnitIdField, inLandCoverGrid, daycares, scratchWorkspace, outWorkspace, 
+		  'DayCare'],
+		 lcInputs + [daycares], ['{0}_DayCare'.format(output_prefix)]),
+		]
+	stepList = [batch.BatchStep(name, runWorkerStep, [functionName, arguments, scratchWorkspace, outWorkspace, outNames],
+							    inputs, [os.path.join(outWorkspace, outName) for outName in outNames])
+				for name, functionName, arguments, inputs, outNames in allSteps if name in processesToRun]
+	
+	manifestFolder = os.path.dirname(outWorkspace) if outWorkspace.lower().endswith('.gdb') else outWorkspace
+	manifestFile = os.path.join(manifestFolder, '{0}_batchManifest.json'.format(output_prefix))
+	workerCount = globalConstants.batchWorkerCount
+	workerFolder = None
+	if workerCount > 1 and len(stepList) > 1:
+		# each worker gets a geodatabase of its own in this folder, so that steps running side by side never create
+		# scratch datasets or outputs in the same workspace at once
+		workerFolder = os.path.join(manifestFolder, '{0}_batchWorkers'.format(output_prefix))
+		os.makedirs(workerFolder, exist_ok=True)
+	try:
+		batch.runBatch(stepList, manifestFile, workerCount, setGlobals, (output_prefix, lccPath, workerFolder))
+	finally:
+		if workerFolder:
+			shutil.rmtree(workerFolder, ignore_errors=True)
+	
+	
+def runWorkerStep(functionName, arguments, scratchWorkspace, outWorkspace, outNames):
+	""" Runs one of the step functions above. In a batch worker, the step's scratch and output workspace arguments are
+		replaced by the worker's own geodatabase, and the outputs named in *outNames* are copied from it to
+		*outWorkspace* when the step is done.
+	"""
+	# the function is passed by name so that the step's fingerprint in the manifest is the same from run to run
+	function = globals()[functionName]
+	if not _workerWorkspace:
+		function(*arguments)
+		return
+	
+	workerArguments = [_workerWorkspace if argument in (scratchWorkspace, outWorkspace) else argument 
+					   for argument in arguments]
+	function(*workerArguments)
+	for outName in outNames:
+		workerOutput = os.path.join(_workerWorkspace, outName)
+		if not arcpy.Exists(workerOutput):
+			# the step did not make this output; the batch reports the step as failed
+			continue
+		outDataset = os.path.join(outWorkspace, outName)
+		if arcpy.Exists(outDataset):
+			arcpy.Delete_management(outDataset)
+		arcpy.Copy_management(workerOutput, outDataset)
+	
+	
+def setGlobals(outputPrefix, lccFolder, workerFolder=None):
+	# worker processes start without the globals set in main
+	global output_prefix, lccPath, _workerWorkspace
+	output_prefix = outputPrefix
+	lccPath = lccFolder
+	if workerFolder:
+		# as raster._initParkWorker does, give the worker a file geodatabase of its own for its workspaces
+		gdbName = 'worker{0}.gdb'.format(parallel.getWorkerNumber())
+		_workerWorkspace = os.path.join(workerFolder, gdbName)
+		if not arcpy.Exists(_workerWorkspace):
+			arcpy.CreateFileGDB_management(workerFolder, gdbName)
+		arcpy.env.workspace = _workerWorkspace
+		arcpy.env.scratchWorkspace = _workerWorkspace
 	
 	
 if __name__ == "__main__":
@@ -0,0 +1,40 @@
+'''
+Helpers shared by the benchmark scripts.
+
+Importing this module makes ATtILA2 and arcpy (or the stand-in in tests/fakearcpy) importable, the same way 
+tests/UnitTests/linuxSupport.py does for the unit tests.
+
+'''
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'UnitTests'))
+import linuxSupport
+
+usingFakeArcpy = linuxSupport.usingFakeArcpy
+
+
+def timeCall(func, *args, **kwargs):
+    ''' Returns the wall clock seconds taken by func(*args, **kwargs) and its return value '''
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def reportScaling(title, sizes, seconds, unit="rows"):
+    ''' Prints the time and throughput measured for each problem size '''
+    print(title)
+    print(f"{unit:>12} {'seconds':>10} {unit + '/second':>16}")
+    for size, secs in zip(sizes, seconds):
+        print(f"{size:>12,} {secs:>10.3f} {size / max(secs, 1e-9):>16,.0f}")
+
+
+def checkLinearScaling(sizes, seconds, tolerance=3.0):
+    ''' Fails if the time per item at the largest size exceeds *tolerance* times the time per item at the smallest 
+        size that took a measurable amount of time '''
+    perItem = [secs / size for size, secs in zip(sizes, seconds)]
+    measured = [p for p, secs in zip(perItem, seconds) if secs >= 0.05] or perItem
+    ratio = perItem[-1] / measured[0]
+    assert ratio <= tolerance, f"time per item grew {ratio:.1f} times from {sizes[0]:,} to {sizes[-1]:,}"
+    return ratio
@@ -0,0 +1,65 @@
+'''
+Benchmark of the circular neighborhood focal sums of the Population Land Cover Views tool
+
+Builds a synthetic patch grid and counts the patch cells within circular neighborhoods of 5 to 200 cells radius with 
+raster.getCircleFocalSumGrid, which picks row-by-row sums or FFT convolution for each radius. Each result is checked 
+to the cell against the row-by-row sums, which are exact. The time must not grow with the square of the radius, as 
+a per-cell kernel would. Runs without ArcGIS Pro by way of the fake arcpy package in tests/fakearcpy.
+
+Run with: python circleFocalBenchmark.py [number of grid cells]
+'''
+
+import sys
+import numpy as np
+import benchmarkSupport
+import arcpy
+from ATtILA2.utils import focal
+from ATtILA2.utils import raster
+
+radii = [5, 25, 50, 100, 200]
+blockSize = 1024
+
+
+def buildPatchGrid(cellCount):
+    arcpy.resetCatalog()
+    side = max(int(cellCount ** 0.5), 256)
+    rng = np.random.RandomState(11)
+    patchGrid = (rng.rand(side, side) < 0.02).astype(np.int32)
+    arcpy.registerRaster("patchGrid", patchGrid, 1, 0, 0, -1)
+    return patchGrid
+
+
+def readGrid(sumGrid):
+    result = np.zeros((sumGrid.nRows, sumGrid.nCols))
+    for row0, col0, tile in sumGrid.iterTiles(blockSize):
+        result[row0:row0 + tile.shape[0], col0:col0 + tile.shape[1]] = tile
+    return result
+
+
+def runBenchmark(cellCount=1000000):
+    patchGrid = buildPatchGrid(cellCount)
+    seconds = []
+    methods = []
+    for radius in radii:
+        secs, sumGrid = benchmarkSupport.timeCall(raster.getCircleFocalSumGrid, "patchGrid", 1, radius, blockSize)
+        halo = radius
+        padded = np.pad(patchGrid, halo)
+        assert np.array_equal(readGrid(sumGrid), focal.getCircleSumsDirect(padded, radius, halo)), radius
+        sumGrid.close()
+        seconds.append(secs)
+        blockSide = min(blockSize, patchGrid.shape[0]) + 2 * halo
+        methods.append(focal.getCircleSumMethod(radius, (blockSide, blockSide)).__name__)
+
+    print(f"raster.getCircleFocalSumGrid on a {patchGrid.shape[0]:,} x {patchGrid.shape[1]:,} cell grid")
+    print(f"{'radius':>8} {'seconds':>10}  method")
+    for radius, secs, method in zip(radii, seconds, methods):
+        print(f"{radius:>8} {secs:>10.3f}  {method}")
+
+    # the kernel area grows 1,600 times from the smallest to the largest radius; the halo read grows much less
+    ratio = seconds[-1] / max(seconds[0], 0.05)
+    assert ratio <= 20.0, f"time grew {ratio:.1f} times from radius {radii[0]} to radius {radii[-1]}"
+    print("Benchmark was successful")
+
+
+if __name__ == '__main__':
+    runBenchmark(*[int(a) for a in sys.argv[1:]])
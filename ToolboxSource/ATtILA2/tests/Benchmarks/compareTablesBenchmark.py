@@ -0,0 +1,65 @@
+'''
+Benchmark of the table comparison engine in tests/compareTables.py
+
+Builds a reference table and a test table of metric values, with the test rows shuffled within blocks and a few values
+changed, compares them on the ID field with tolerances, checks the differences found, and reports the time taken for
+10 thousand to 1 million rows. The time per row must stay flat (linear scaling). Runs without ArcGIS Pro by way of the
+fake arcpy package in tests/fakearcpy.
+
+Run with: python compareTablesBenchmark.py [largest number of rows]
+'''
+
+import os
+import sys
+import numpy as np
+import benchmarkSupport
+import arcpy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import compareTables
+
+metricFields = ["pfor", "pagr", "pdev", "pwetl", "LC_Overlap"]
+
+# rows of the test table are shuffled within blocks of this many rows
+blockSize = 5000
+
+# every changedRowStep'th test row gets a pfor value beyond the tolerance
+changedRowStep = 1000
+
+
+def buildTables(rowCount):
+    arcpy.resetCatalog()
+    random = np.random.default_rng(0)
+    values = random.uniform(0.0, 100.0, (rowCount, len(metricFields)))
+    ids = [f"HU{i:08d}" for i in range(rowCount)]
+    fieldTypes = dict([("HUC_12", "String")] + [(f, "Double") for f in metricFields])
+    arcpy.registerTable("reference", ["HUC_12"] + metricFields,
+                        [(i,) + tuple(v) for i, v in zip(ids, values.tolist())], fieldTypes)
+
+    testValues = values + random.uniform(-1e-7, 1e-7, values.shape)
+    testValues[::changedRowStep, 0] += 1.0
+    order = np.concatenate([random.permutation(np.arange(start, min(start + blockSize, rowCount)))
+                            for start in range(0, rowCount, blockSize)])
+    arcpy.registerTable("test", ["HUC_12"] + metricFields,
+                        [(ids[i],) + tuple(testValues[i].tolist()) for i in order], fieldTypes)
+
+
+def runBenchmark(largest=1000000):
+    sizes = [size for size in (10000, 100000, 1000000) if size <= largest]
+    seconds = []
+    for size in sizes:
+        buildTables(size)
+        secs, differences = benchmarkSupport.timeCall(compareTables.getTableDifferences, "reference", "test",
+                                                      "HUC_12", {"*": (1e-6, 0.0)}, chunkSize=blockSize * 2)
+        assert differences.matchedRowCount == size and not differences.missingRowCount
+        assert differences.differentRowCount == len(range(0, size, changedRowStep))
+        assert list(differences.fieldDifferences) == ["pfor"]
+        seconds.append(secs)
+
+    benchmarkSupport.reportScaling("compareTables.getTableDifferences on an ID field", sizes, seconds, "rows")
+    benchmarkSupport.checkLinearScaling(sizes, seconds)
+    print("Benchmark was successful")
+
+
+if __name__ == '__main__':
+    runBenchmark(*[int(a) for a in sys.argv[1:]])
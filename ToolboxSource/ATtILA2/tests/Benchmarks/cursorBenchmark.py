@@ -0,0 +1,81 @@
+'''
+Benchmark of the bulk arcpy.da cursor functions in utils.cursors against the legacy cursors they replace
+
+Builds a table of reporting units with a text ID field and metric fields, reads an ID: value dictionary and updates two
+fields by ID, first with the legacy arcpy.SearchCursor and UpdateCursor and their getValue and setValue calls, then
+with cursors.iterRowBlocks and cursors.updateRowsByKey, checks that both give the same results, and reports the time
+taken by each for 10 thousand to 1 million rows. The time per row of the bulk functions must stay flat (linear
+scaling). Runs without ArcGIS Pro by way of the fake arcpy package in tests/fakearcpy, whose cursors stand in for the
+cost of the ArcGIS cursors row by row.
+
+Run with: python cursorBenchmark.py [largest number of rows]
+'''
+
+import sys
+import numpy as np
+import benchmarkSupport
+import arcpy
+from ATtILA2.utils import cursors
+
+metricFields = ["pfor", "pagr", "pdev", "pwetl"]
+
+
+def buildTable(rowCount):
+    arcpy.resetCatalog()
+    values = np.random.default_rng(0).uniform(0.0, 100.0, (rowCount, len(metricFields)))
+    fieldTypes = dict([("OBJECTID", "OID"), ("HUC_12", "String")] + [(f, "Double") for f in metricFields])
+    arcpy.registerTable("units", ["OBJECTID", "HUC_12"] + metricFields,
+                        [(i, f"HU{i:08d}") + tuple(v) for i, v in enumerate(values.tolist())], fieldTypes)
+
+
+def legacyReadAndUpdate(inTable):
+    valueDict = {}
+    for row in arcpy.SearchCursor(inTable):
+        valueDict[row.getValue("HUC_12")] = row.getValue("pfor")
+
+    rows = arcpy.UpdateCursor(inTable)
+    row = rows.next()
+    while row:
+        pfor = valueDict[row.getValue("HUC_12")]
+        row.setValue("pagr", pfor / 2)
+        row.setValue("pdev", 100 - pfor)
+        rows.updateRow(row)
+        row = rows.next()
+    return valueDict
+
+
+def bulkReadAndUpdate(inTable):
+    valueDict = {}
+    for rowBlock in cursors.iterRowBlocks(inTable, ["HUC_12", "pfor"]):
+        valueDict.update(zip(rowBlock["HUC_12"].tolist(), rowBlock["pfor"].tolist()))
+
+    updateValues = dict((key, (pfor / 2, 100 - pfor)) for key, pfor in valueDict.items())
+    cursors.updateRowsByKey(inTable, "HUC_12", ["pagr", "pdev"], updateValues)
+    return valueDict
+
+
+def runBenchmark(largest=1000000):
+    sizes = [size for size in (10000, 100000, 1000000) if size <= largest]
+    legacySeconds = []
+    bulkSeconds = []
+    for size in sizes:
+        buildTable(size)
+        secs, legacyDict = benchmarkSupport.timeCall(legacyReadAndUpdate, "units")
+        legacyRows = list(arcpy._catalog["units"].rows)
+        legacySeconds.append(secs)
+
+        buildTable(size)
+        secs, bulkDict = benchmarkSupport.timeCall(bulkReadAndUpdate, "units")
+        bulkSeconds.append(secs)
+        assert bulkDict == legacyDict and arcpy._catalog["units"].rows == legacyRows
+
+    benchmarkSupport.reportScaling("legacy arcpy.SearchCursor and UpdateCursor", sizes, legacySeconds, "rows")
+    benchmarkSupport.reportScaling("cursors.iterRowBlocks and cursors.updateRowsByKey", sizes, bulkSeconds, "rows")
+    for size, legacySecs, bulkSecs in zip(sizes, legacySeconds, bulkSeconds):
+        print(f"{size:>12,} rows: bulk cursors took {bulkSecs / max(legacySecs, 1e-9):.2f} of the legacy cursor time")
+    benchmarkSupport.checkLinearScaling(sizes, bulkSeconds)
+    print("Benchmark was successful")
+
+
+if __name__ == '__main__':
+    runBenchmark(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,82 @@
+'''
+Benchmark of the integral image focal engine of the Neighborhood Proportions tool
+
+Builds a synthetic land cover grid, calculates the proportion of a class within square neighborhoods from 3 x 3 to 
+101 x 101 cells with raster.getFocalProportionGrids, and checks each result against scipy's separable uniform filter,
+which stands in for the FocalStatistics SUM output. The time per window size must stay flat: the integral image makes 
+the cost of a window sum independent of its size. Runs without ArcGIS Pro by way of the fake arcpy package in 
+tests/fakearcpy (requires scipy for the check).
+
+Run with: python focalSumBenchmark.py [number of grid cells]
+'''
+
+import sys
+import numpy as np
+from scipy import ndimage
+import benchmarkSupport
+import arcpy
+from ATtILA2.utils import raster
+
+noDataValue = -9999
+windowSizes = [3, 11, 31, 51, 101]
+blockSize = 512
+
+
+def buildLandCover(cellCount):
+    arcpy.resetCatalog()
+    side = max(int(cellCount ** 0.5), 128)
+    rng = np.random.RandomState(7)
+    landCover = rng.choice([11, 21, 41, 42, 82], size=(side, side))
+    landCover[rng.rand(side, side) < 0.0005] = noDataValue
+    arcpy.registerRaster("landCover", landCover, 30, 0, 0, noDataValue)
+    return landCover
+
+
+def readGrid(sumGrid):
+    result = np.full((sumGrid.nRows, sumGrid.nCols), np.nan)
+    for row0, col0, tile in sumGrid.iterTiles(blockSize):
+        result[row0:row0 + tile.shape[0], col0:col0 + tile.shape[1]] = tile
+    return result
+
+
+def checkOutput(landCover, percentGrid, windowSize):
+    cells = windowSize * windowSize
+    counts = ndimage.uniform_filter(np.isin(landCover, [41, 42]).astype(np.float64), windowSize, mode='constant') * cells
+    noDataCounts = ndimage.uniform_filter((landCover == noDataValue).astype(np.float64), windowSize, mode='constant') * cells
+    expected = np.where(noDataCounts > 0.5, np.nan, np.round(counts) / cells * 100)
+    result = readGrid(percentGrid)
+    assert np.array_equal(np.isnan(result), np.isnan(expected)), windowSize
+    assert np.allclose(np.nan_to_num(result), np.nan_to_num(expected)), windowSize
+
+
+def runBenchmark(cellCount=1000000):
+    landCover = buildLandCover(cellCount)
+    seconds = []
+    for windowSize in windowSizes:
+        secs, focalGrids = benchmarkSupport.timeCall(raster.getFocalProportionGrids, "landCover", {"for": [41, 42]}, 
+                                                     [windowSize], blockSize)
+        percentGrid = focalGrids[("for", windowSize)][0]
+        checkOutput(landCover, percentGrid, windowSize)
+        percentGrid.close()
+        seconds.append(secs)
+
+    print(f"raster.getFocalProportionGrids on a {landCover.shape[0]:,} x {landCover.shape[1]:,} cell grid")
+    print(f"{'window':>12} {'seconds':>10}")
+    for windowSize, secs in zip(windowSizes, seconds):
+        print(f"{str(windowSize) + ' x ' + str(windowSize):>12} {secs:>10.3f}")
+
+    # the halo read around each block grows with the window, so allow some growth
+    ratio = seconds[-1] / max(seconds[0], 0.05)
+    assert ratio <= 3.0, f"time grew {ratio:.1f} times from {windowSizes[0]} x {windowSizes[0]} to {windowSizes[-1]} x {windowSizes[-1]} windows"
+
+    secs, focalGrids = benchmarkSupport.timeCall(raster.getFocalProportionGrids, "landCover", {"for": [41, 42]}, 
+                                                 windowSizes, blockSize)
+    print(f"{'all sizes':>12} {secs:>10.3f}")
+    for windowSize in windowSizes:
+        checkOutput(landCover, focalGrids[("for", windowSize)][0], windowSize)
+        focalGrids[("for", windowSize)][0].close()
+    print("Benchmark was successful")
+
+
+if __name__ == '__main__':
+    runBenchmark(*[int(a) for a in sys.argv[1:]])
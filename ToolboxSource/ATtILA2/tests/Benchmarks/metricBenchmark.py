@@ -0,0 +1,258 @@
+'''
+Benchmark of every metric.run* entry point on synthetic data
+
+Builds the synthetic datasets of syntheticData.py for a land cover grid of the given number of cells and times each
+ATtILA tool on them, taking the best of the requested number of runs. The results can be saved as JSON and compared
+with an earlier run, so that a change to, e.g., utils/tabarea.py or utils/calculate.py can be checked for speed.
+Without ArcGIS Pro, only the scenarios whose tools run on the stand-in in tests/fakearcpy are run; the others need
+geoprocessing it does not provide (e.g., Buffer or Intersect) and are listed as not run. A scenario that is run but
+is skipped, with the name of the first call the stand-in lacks, or fails, fails the benchmark.
+
+Run with: python metricBenchmark.py [number of grid cells] [--backend ARCPY|NUMPY] [--repeat N] [--only NAME ...]
+          [--save FILE] [--compare FILE] [--tolerance RATIO]
+'''
+
+import os
+import sys
+import json
+import shutil
+import argparse
+import platform
+import tempfile
+import datetime
+import benchmarkSupport
+import arcpy
+import syntheticData
+from ATtILA2 import metric
+from ATtILA2.constants import globalConstants
+from ATtILA2.utils import trace
+
+lccName = "NLCD LAND"
+lccFilePath = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "LandCoverClassifications",
+                           "NLCD LAND.xml")
+cellSizeStr = str(int(syntheticData.cellSize))
+qaFields = "'QAFIELDS  -  Add Quality Assurance Fields'"
+
+# globalConstants settings that choose between the ArcPy and NumPy implementations of a step
+backendSettings = ["tabulateAreaBackend", "patchMetricsBackend", "mdcpBackend", "focalBackend", "edgeCoreBackend",
+                   "parkMosaicBackend"]
+
+# metric entry points that are not tools and so have no scenario
+notScenarios = {"runMetricSuite": "runs other entry points",
+                "runLandCoverProportionsORIGINAL": "superseded by runLandCoverProportions"}
+
+# scenarios whose tools run on the stand-in in tests/fakearcpy; the others are only run with ArcGIS Pro, or when named
+# with --only
+fakeArcpyScenarios = {"runLandCoverProportions", "runLandCoverCoefficientCalculator", "runLandCoverDiversity"}
+
+
+def getScenarios(data, outFolder):
+    """ Returns a dictionary of entry point name: (list of arguments, output dataset) for the synthetic *data* """
+
+    ru, ruId, lc = data["reportingUnits"], "HUC_12", data["landCover"]
+    lcc = [lccName, lccFilePath]
+
+    def out(name):
+        return os.path.join(outFolder, name) if not benchmarkSupport.usingFakeArcpy else name
+
+    return {
+        "runLandCoverProportions": (
+            ["LCP", ru, ruId, lc] + lcc + ["'for  -  [pfor]  Forest';'agr  -  [pagr]  Agriculture';'dev  -  [pdev]  "
+             "Developed'", out("LCP"), "false", "", "", cellSizeStr, lc, qaFields], out("LCP")),
+        "runLandCoverOnSlopeProportions": (
+            ["LCOSP", ru, ruId, lc] + lcc + ["'agr  -  [agr_SL]  Agriculture';'for  -  [for_SL]  Forest'",
+             data["slope"], "10", out("LCOSP"), cellSizeStr, lc, qaFields, "false"], out("LCOSP")),
+        "runFloodplainLandCoverProportions": (
+            ["FLCP", ru, ruId, lc] + lcc + ["'wtl  -  [fwtl]  Wetland';'dev  -  [fdev]  Developed'",
+             data["floodplain"], out("FLCP"), cellSizeStr, lc, qaFields, "false"], out("FLCP")),
+        "runPatchMetrics": (
+            ["PM", ru, ruId, lc] + lcc + ["'for  -  [for_PLGP]  Forest';'agr  -  [agr_PLGP]  Agriculture'", "10",
+             "5", out("PM"), "true", cellSizeStr, lc, " ", "false"], out("PM")),
+        "runCoreAndEdgeMetrics": (
+            ["CAEM", ru, ruId, lc] + lcc + ["'for  -  [for_E2A]  Forest';'NI  -  [NI_E2A]  All Natural Land Use'",
+             "3", out("CAEM"), cellSizeStr, lc, " ", "false"], out("CAEM")),
+        "runRiparianLandCoverProportions": (
+            ["RLCP", ru, ruId, lc] + lcc + ["'for  -  [rfor]  Forest';'agr  -  [ragr]  Agriculture'",
+             data["streams"], "45 Meters", "true", out("RLCP"), cellSizeStr, lc, " "], out("RLCP")),
+        "runSamplePointLandCoverProportions": (
+            ["SPLCP", ru, ruId, lc] + lcc + ["'for  -  [sfor]  Forest';'dev  -  [sdev]  Developed'",
+             data["samplePoints"], ruId, "90 Meters", "true", out("SPLCP"), cellSizeStr, lc, " "], out("SPLCP")),
+        "runLandCoverCoefficientCalculator": (
+            ["LCCC", ru, ruId, lc] + lcc + ["'IMPERVIOUS  -  [PCTIA]  Percent Cover Total Impervious Area';"
+             "'NITROGEN  -  [N_Load]  Estimated Nitrogen Loading Based on Land Cover'", out("LCCC"), cellSizeStr,
+             lc, qaFields], out("LCCC")),
+        "runRoadDensityCalculator": (
+            ["RD", ru, ruId, data["roads"], out("RD"), "", "true", "true", data["streams"], "20 Meters", " "],
+            out("RD")),
+        "runStreamDensityCalculator": (
+            ["SD", ru, ruId, data["streams"], out("SD"), "StreamOrder", " "], out("SD")),
+        "runLandCoverDiversity": (
+            ["LCD", ru, ruId, lc, out("LCD"), cellSizeStr, lc, qaFields], out("LCD")),
+        "runPopulationDensityCalculator": (
+            ["PDM", ru, ruId, data["census"], "Pop", out("PDM"), "true", data["census"], "Pop2", " "], out("PDM")),
+        "runPopulationInFloodplainMetrics": (
+            ["PIFM", ru, ruId, data["census"], "Pop", data["floodplains"], out("PIFM"), " "], out("PIFM")),
+        "runPopulationLandCoverViews": (
+            ["PLCV", ru, ruId, lc] + lcc + ["'for  -  [for_PV_C]  Forest';'agr  -  [agr_PV_C]  Agriculture'", "60",
+             "5", data["population"], out("PLCV"), cellSizeStr, lc, " "], out("PLCV")),
+        "runFacilityLandCoverViews": (
+            ["FLCV", ru, ruId, lc] + lcc + ["'for  -  [for_Low]  Forest';'dev  -  [dev_Low]  Developed'",
+             data["samplePoints"], "60 Meters", "15", out("FLCV"), cellSizeStr, lc, " "], out("FLCV")),
+        "runNeighborhoodProportions": (
+            ["NP", lc] + lcc + ["'for  -  [for_Prox]  Forest';'agr  -  [agr_Prox]  Agriculture'", "5", "true",
+             "-99999", "5", "true", "10", "true", outFolder, " "], None),
+        "runIntersectionDensity": (
+            ["ID", data["roads"], "false", "", "10 Meters", "#", "30", "1500", "SQUARE KILOMETERS", out("ID"), " "],
+            out("ID")),
+        "runCreateWalkabilityCostRaster": (
+            ["CWCR", data["roads"], data["streams"], "300", "1", "2", out("CWCR"), cellSizeStr, lc, " "],
+            out("CWCR")),
+        "runPedestrianAccessAndAvailability": (
+            ["PAAA", data["parks"], "true", data["costSurface"], data["census"], "Pop", "500", "100", out("PAAA"), cellSizeStr,
+             lc, " "], out("PAAA")),
+        "runProcessRoadsForEnvioAtlasAnalyses": (
+            ["PRFEA", "NAVTEQ 2011", data["streetsWorkspace"], "true", "true", "true", "true", outFolder,
+             "bench", " "], None),
+        "runPopulationWithinZoneMetrics": (
+            ["PWZM", ru, ruId, data["census"], "Pop", data["parks"], "500 Meters", "false", "", out("PWZM"), " "],
+            out("PWZM")),
+        "runSelectZonalStatistics": (
+            ["SZS", ru, ruId, data["slope"], "MEAN;RANGE", out("SZS"), "bench", " "], out("SZS")),
+        "runNearRoadLandCoverProportions": (
+            ["NRLCP", data["roads"], lc] + lcc + ["'for  -  [for_Near]  Forest'", "Distance", "Meters", "#", "#", "#",
+             "30", "false", "#", "true", outFolder, cellSizeStr, lc, " "], None),
+    }
+
+
+def getRootException(exception):
+    """ Returns the first exception raised in the chain that ends with *exception* """
+
+    # the finally blocks of the metric entry points may raise again while cleaning up after the first exception
+    while (exception.__cause__ or exception.__context__) is not None:
+        exception = exception.__cause__ or exception.__context__
+    return exception
+
+
+def runScenario(name, arguments, outDataset, repeat):
+    """ Runs a scenario *repeat* times; returns a dictionary with its status, best time, the time of each run and the
+        number of rows written """
+
+    function = getattr(metric, name)
+    runs = []
+    for i in range(repeat):
+        if outDataset and arcpy.Exists(outDataset):
+            arcpy.management.Delete(outDataset)
+        if benchmarkSupport.usingFakeArcpy:
+            arcpy.getUnimplementedCalls(clear=True)
+        try:
+            secs, _ = benchmarkSupport.timeCall(function, *arguments)
+        except Exception as e:
+            # the tools catch some errors and go on, so the first missing call may not be the exception raised
+            if benchmarkSupport.usingFakeArcpy and arcpy.getUnimplementedCalls():
+                return {"status": "skipped",
+                        "reason": f"fake arcpy does not implement {arcpy.getUnimplementedCalls()[0]}"}
+            return {"status": "failed", "reason": repr(getRootException(e))}
+        if outDataset and not arcpy.Exists(outDataset):
+            return {"status": "failed", "reason": "the output was not created"}
+        runs.append(round(secs, 4))
+
+    # the row count of table outputs, so that a comparison can tell a faster run from one that writes fewer rows
+    return {"status": "ok", "seconds": min(runs), "runs": runs, "outputRows": trace.getRowCount(outDataset)}
+
+
+def compareResults(results, baseline, tolerance):
+    """ Prints the ratio of each scenario's time to its time in *baseline*; returns the scenarios that slowed down or
+        wrote a different number of rows """
+
+    changed = []
+    print(f"\n{'scenario':<40} {'baseline':>10} {'now':>10} {'ratio':>8}")
+    for name, result in sorted(results["scenarios"].items()):
+        before = baseline["scenarios"].get(name, {})
+        if result["status"] != "ok" or before.get("status") != "ok":
+            continue
+        if result["outputRows"] != before.get("outputRows"):
+            print(f"{name}: {result['outputRows']} output rows, {before.get('outputRows')} in the baseline")
+            changed.append(name)
+        ratio = result["seconds"] / max(before["seconds"], 1e-9)
+        print(f"{name:<40} {before['seconds']:>10.3f} {result['seconds']:>10.3f} {ratio:>8.2f}")
+        # times too short to measure reliably are not compared
+        if ratio > tolerance and max(result["seconds"], before["seconds"]) >= 0.05:
+            changed.append(name)
+    return changed
+
+
+def runBenchmark(cellCount=250000, backend=globalConstants.numpyBackendName, repeat=1, only=None, saveFile=None,
+                 compareFile=None, tolerance=1.25):
+    for setting in backendSettings:
+        setattr(globalConstants, setting, backend)
+    entryPoints = set(name for name in dir(metric) if name.startswith("run") and callable(getattr(metric, name)))
+    outFolder = tempfile.mkdtemp()
+    try:
+        scale = syntheticData.SyntheticScale(cellCount)
+        data = syntheticData.buildDatasets(scale, outFolder)
+        scenarios = getScenarios(data, outFolder)
+        missing = entryPoints - set(scenarios) - set(notScenarios)
+        assert not missing, f"metric entry points without a benchmark scenario: {sorted(missing)}"
+        unknown = set(only or []) - set(scenarios)
+        assert not unknown, f"no benchmark scenario named: {sorted(unknown)}"
+
+        results = {"cellCount": scale.side * scale.side, "reportingUnits": scale.unitsPerSide ** 2,
+                   "repeat": repeat, "usingFakeArcpy": benchmarkSupport.usingFakeArcpy,
+                   "backend": backend, "python": platform.python_version(),
+                   "created": datetime.datetime.now().isoformat(timespec="seconds"), "scenarios": {}}
+        notRun = []
+        for name in sorted(scenarios):
+            if only and name not in only:
+                continue
+            if benchmarkSupport.usingFakeArcpy and not only and name not in fakeArcpyScenarios:
+                notRun.append(name)
+                continue
+            arguments, outDataset = scenarios[name]
+            results["scenarios"][name] = runScenario(name, arguments, outDataset, repeat)
+    finally:
+        shutil.rmtree(outFolder, ignore_errors=True)
+
+    print(f"metric entry points on a {scale.side:,} x {scale.side:,} cell synthetic land cover grid with "
+          f"{scale.unitsPerSide ** 2} reporting units")
+    print(f"{'scenario':<40} {'status':>8} {'seconds':>10}")
+    for name, result in sorted(results["scenarios"].items()):
+        seconds = f"{result['seconds']:>10.3f}" if result["status"] == "ok" else f"{'':>10}  {result['reason']}"
+        print(f"{name:<40} {result['status']:>8} {seconds}")
+
+    if notRun:
+        print(f"\n*** {len(notRun)} of {len(scenarios)} scenarios need ArcGIS Pro and were not run: "
+              f"{', '.join(notRun)} ***")
+
+    notOk = sorted(name for name, result in results["scenarios"].items() if result["status"] != "ok")
+    assert not notOk, f"scenarios skipped or failed: {notOk}"
+
+    if saveFile:
+        with open(saveFile, "w") as outFile:
+            json.dump(results, outFile, indent=2)
+        print(f"Results saved to {saveFile}")
+
+    if compareFile:
+        with open(compareFile) as baselineFile:
+            baseline = json.load(baselineFile)
+        changed = compareResults(results, baseline, tolerance)
+        assert not changed, f"scenarios slower than {tolerance} times, or with other row counts, than in {compareFile}: " \
+                            f"{changed}"
+
+    print("Benchmark was successful" if not notRun else
+          f"Benchmark was successful for the {len(results['scenarios'])} scenarios run")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("cellCount", nargs="?", type=int, default=250000, help="number of land cover grid cells")
+    parser.add_argument("--backend", default=globalConstants.numpyBackendName,
+                        choices=[globalConstants.arcpyBackendName, globalConstants.numpyBackendName],
+                        help="implementation of the steps that have a NumPy backend")
+    parser.add_argument("--repeat", type=int, default=1, help="number of runs of each scenario; the best is kept")
+    parser.add_argument("--only", nargs="*", help="names of the entry points to run")
+    parser.add_argument("--save", help="JSON file to save the results in")
+    parser.add_argument("--compare", help="JSON file of earlier results to compare with")
+    parser.add_argument("--tolerance", type=float, default=1.25, help="largest allowed ratio to the earlier time")
+    args = parser.parse_args()
+    runBenchmark(args.cellCount, args.backend, args.repeat, args.only, args.save, args.compare, args.tolerance)
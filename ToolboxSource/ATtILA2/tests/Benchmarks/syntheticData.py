@@ -0,0 +1,300 @@
+'''
+Synthetic input datasets for the metric benchmarks
+
+Builds a land cover grid with patches of NLCD classes, slope, population and walking cost grids, reporting unit and
+census polygons, roads, streams, parks, floodplains, sample points and a street network in the NAVTEQ 2011 layout, all
+sized from the number of land cover cells. With
+ArcGIS Pro the datasets are written to a file geodatabase; with the stand-in in tests/fakearcpy they are registered
+in its in-memory catalog, where polygons carry the grid of their object IDs in place of geometry. The same seed and
+size always give the same datasets.
+
+'''
+import os
+import numpy as np
+import benchmarkSupport
+import arcpy
+
+# NLCD land cover codes and their share of the synthetic land cover grid
+landCoverCodes = [11, 21, 22, 23, 24, 31, 41, 42, 43, 52, 71, 81, 82, 90, 95]
+landCoverWeights = [6, 8, 5, 3, 2, 2, 14, 12, 6, 9, 7, 8, 10, 5, 3]
+
+landCoverNoData = 0
+cellSize = 30.0
+xOrigin = 500000.0
+yOrigin = 1500000.0
+spatialReferenceCode = 5070 # NAD 1983 Contiguous USA Albers
+
+# feature classes of the street network, read by Process Roads for EnviroAtlas Analyses from a NAVTEQ 2011 geodatabase
+streetsLayers = ["Streets", "LandUseA", "LandUseB"]
+streetsFields = ["FUNC_CLASS", "SPEED_CAT", "FERRY_TYPE", "AR_PEDEST", "RAMP", "CONTRACC", "TOLLWAY", "AR_AUTO", "AR_BUS",
+                 "AR_TAXIS", "AR_DELIV", "AR_TRUCKS", "AR_CARPOOL", "AR_EMERVEH", "AR_MOTOR", "DIR_TRAVEL", "ST_NAME",
+                 "FEAT_TYPE", "TO_LANES", "FROM_LANES"]
+fakeStreetsWorkspace = "syntheticStreets.gdb"
+
+
+class SyntheticScale(object):
+    """ Sizes of the synthetic datasets for a land cover grid of about *cellCount* cells """
+
+    def __init__(self, cellCount, seed=17):
+        self.cellCount = int(cellCount)
+        self.seed = seed
+        self.side = max(int(round(self.cellCount ** 0.5)), 64)
+        self.patchSize = max(self.side // 64, 2)
+        self.unitsPerSide = max(self.side // 128, 2)
+        self.censusPerSide = self.unitsPerSide * 2
+        self.roadSpacing = max(self.side // 24, 8)
+        self.streamCount = max(self.side // 96, 2)
+        self.parkCount = max(self.side // 48, 3)
+        self.pointCount = max(self.side // 16, 4)
+
+
+# named scales for comparing runs on the same problem sizes
+scales = {"small": SyntheticScale(250000), "medium": SyntheticScale(4000000), "large": SyntheticScale(25000000)}
+
+
+def makeLandCover(scale):
+    """ Returns a land cover grid of NLCD codes in patches of about *scale.patchSize* cells, with NoData corners """
+
+    rng = np.random.RandomState(scale.seed)
+    weights = np.asarray(landCoverWeights, dtype=float) / sum(landCoverWeights)
+    coarseSide = -(-scale.side // scale.patchSize)
+    coarse = rng.choice(landCoverCodes, size=(coarseSide, coarseSide), p=weights)
+    landCover = np.kron(coarse, np.ones((scale.patchSize, scale.patchSize), dtype=coarse.dtype))
+    landCover = landCover[:scale.side, :scale.side].astype(np.int32)
+
+    # scatter single cells of other classes through the patches, as classified imagery has
+    speckle = rng.rand(scale.side, scale.side) < 0.08
+    landCover[speckle] = rng.choice(landCoverCodes, size=int(speckle.sum()), p=weights)
+
+    corner = scale.side // 16
+    landCover[:corner, :corner] = landCoverNoData
+    landCover[-corner:, -corner:] = landCoverNoData
+    return landCover
+
+
+def makeSmoothField(scale, seed, low, high):
+    """ Returns a grid of smoothly varying values between *low* and *high* """
+
+    rng = np.random.RandomState(seed)
+    coarseSide = max(scale.side // 32, 2) + 1
+    coarse = rng.rand(coarseSide, coarseSide)
+    positions = np.linspace(0, coarseSide - 1, scale.side)
+    rows = np.array([np.interp(positions, np.arange(coarseSide), coarse[i]) for i in range(coarseSide)])
+    field = np.array([np.interp(positions, np.arange(coarseSide), rows[:, j]) for j in range(scale.side)]).T
+    return (low + (high - low) * field).astype(np.float32)
+
+
+def makeZoneGrid(side, zonesPerSide):
+    """ Returns a grid of the object IDs (from 1) of *zonesPerSide* by *zonesPerSide* rectangular zones """
+
+    edges = np.linspace(0, side, zonesPerSide + 1).astype(int)
+    zoneRow = np.searchsorted(edges, np.arange(side), side="right") - 1
+    return (zoneRow[:, None] * zonesPerSide + zoneRow[None, :] + 1).astype(np.int64)
+
+
+def getZoneBoxes(side, zonesPerSide):
+    """ Returns the (XMin, YMin, XMax, YMax) of each rectangular zone of makeZoneGrid, in object ID order """
+
+    edges = np.linspace(0, side, zonesPerSide + 1).astype(int)
+    boxes = []
+    for row in range(zonesPerSide):
+        for col in range(zonesPerSide):
+            yMax = yOrigin + (side - edges[row]) * cellSize
+            yMin = yOrigin + (side - edges[row + 1]) * cellSize
+            boxes.append((xOrigin + edges[col] * cellSize, yMin, xOrigin + edges[col + 1] * cellSize, yMax))
+    return boxes
+
+
+def makeRoads(scale):
+    """ Returns road lines as lists of (x, y) vertices: a jittered grid of streets plus a few diagonal highways """
+
+    rng = np.random.RandomState(scale.seed + 1)
+    extent = scale.side * cellSize
+    roads = []
+    for offset in np.arange(scale.roadSpacing, scale.side, scale.roadSpacing) * cellSize:
+        jitter = rng.uniform(-0.3, 0.3, 9) * scale.roadSpacing * cellSize
+        steps = np.linspace(0, extent, 9)
+        roads.append([(xOrigin + s, yOrigin + offset + j) for s, j in zip(steps, jitter)])
+        roads.append([(xOrigin + offset + j, yOrigin + s) for s, j in zip(steps, jitter[::-1])])
+    roads.append([(xOrigin, yOrigin), (xOrigin + extent, yOrigin + extent)])
+    roads.append([(xOrigin, yOrigin + extent), (xOrigin + extent, yOrigin)])
+    return roads
+
+
+def makeStreams(scale):
+    """ Returns stream lines as lists of (x, y) vertices, meandering from the top of the extent to the bottom """
+
+    rng = np.random.RandomState(scale.seed + 2)
+    extent = scale.side * cellSize
+    streams = []
+    for x in rng.uniform(0.1, 0.9, scale.streamCount) * extent:
+        steps = np.linspace(extent, 0, 33)
+        wander = np.cumsum(rng.normal(0, extent / 60, steps.size))
+        streams.append([(xOrigin + float(np.clip(x + w, 0, extent)), yOrigin + y) for w, y in zip(wander, steps)])
+    return streams
+
+
+def makeBoxes(scale, count, seed, minSize, maxSize):
+    """ Returns *count* rectangles as (XMin, YMin, XMax, YMax) with sides between *minSize* and *maxSize* cells """
+
+    rng = np.random.RandomState(seed)
+    boxes = []
+    for i in range(count):
+        width, height = rng.randint(minSize, maxSize + 1, 2) * cellSize
+        x0 = xOrigin + rng.uniform(0, scale.side * cellSize - width)
+        y0 = yOrigin + rng.uniform(0, scale.side * cellSize - height)
+        boxes.append((x0, y0, x0 + width, y0 + height))
+    return boxes
+
+
+def rasterizeBoxes(scale, boxes):
+    """ Returns a grid with the object ID (from 1) of the last box covering each cell center, or -1 """
+
+    grid = np.full((scale.side, scale.side), -1, dtype=np.int64)
+    centers = (np.arange(scale.side) + 0.5) * cellSize
+    for oid, (xMin, yMin, xMax, yMax) in enumerate(boxes, 1):
+        cols = np.nonzero((xOrigin + centers >= xMin) & (xOrigin + centers < xMax))[0]
+        rows = np.nonzero((yOrigin + scale.side * cellSize - centers >= yMin) &
+                          (yOrigin + scale.side * cellSize - centers < yMax))[0]
+        if rows.size and cols.size:
+            grid[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1] = oid
+    return grid
+
+
+def makeSamplePoints(scale, unitBoxes):
+    """ Returns sample points as (x, y, reporting unit ID) """
+
+    rng = np.random.RandomState(scale.seed + 3)
+    points = []
+    for i in range(scale.pointCount):
+        unit = rng.randint(len(unitBoxes))
+        xMin, yMin, xMax, yMax = unitBoxes[unit]
+        points.append((rng.uniform(xMin, xMax), rng.uniform(yMin, yMax), "HU%04d" % (unit + 1)))
+    return points
+
+
+def makeStreets(roads):
+    """ Returns rows of NAVTEQ 2011 street attributes for *roads*: mostly walkable local streets, with every fifth road
+        a highway and every seventh a ferry """
+
+    rows = []
+    for i, line in enumerate(roads):
+        highway, ferry = i % 5 == 0, i % 7 == 0
+        restricted = "N" if ferry else "Y"
+        rows.append((line, "2" if highway else "5", "3" if highway else "7", "B" if ferry else "H",
+                     "N" if highway else "Y", "N", "Y" if highway else "N", "N", restricted, restricted, restricted,
+                     restricted, restricted, restricted, restricted, restricted, "B", "" if i % 3 else "Street %d" % i,
+                     "", 2.0 if highway else 1.0, 2.0 if highway else 1.0))
+    return rows
+
+
+def _registerFakeDatasets(scale, grids, features):
+    # the in-memory catalog of tests/fakearcpy: polygons carry their zone grids, lines and points their vertices
+    arcpy.resetCatalog()
+    names = {"streetsWorkspace": fakeStreetsWorkspace}
+    for name, (array, noData) in grids.items():
+        names[name] = arcpy.registerRaster(name, array, cellSize, xOrigin, yOrigin, noData)
+
+    for name, (shapeType, fieldNames, rows, zoneGrid) in features.items():
+        shapes = [arcpy.Box(*row[0]) if shapeType == "POLYGON" else row[0] for row in rows]
+        fcRows = [(oid, shape) + tuple(row[1:]) for oid, (shape, row) in enumerate(zip(shapes, rows), 1)]
+        catalogName = fakeStreetsWorkspace + "\\" + name if name in streetsLayers else name
+        names[name] = arcpy.registerFeatureClass(catalogName, ["OBJECTID", "Shape"] + fieldNames, fcRows,
+                                                 zoneGrid=zoneGrid, rasterName="landCover",
+                                                 shapeType=shapeType.title())
+    return names
+
+
+def _writeArcGISDatasets(scale, grids, features, workspace):
+    # a file geodatabase in *workspace*, written with ArcPy
+    gdbPath = os.path.join(workspace, "synthetic_%d.gdb" % scale.cellCount)
+    if arcpy.Exists(gdbPath):
+        arcpy.management.Delete(gdbPath)
+    arcpy.management.CreateFileGDB(workspace, os.path.basename(gdbPath))
+    spatialReference = arcpy.SpatialReference(spatialReferenceCode)
+
+    names = {"streetsWorkspace": gdbPath}
+    for name, (array, noData) in grids.items():
+        outRaster = arcpy.NumPyArrayToRaster(array, arcpy.Point(xOrigin, yOrigin), cellSize, cellSize, noData)
+        names[name] = os.path.join(gdbPath, name)
+        outRaster.save(names[name])
+        arcpy.management.DefineProjection(names[name], spatialReference)
+
+    for name, (shapeType, fieldNames, rows, zoneGrid) in features.items():
+        names[name] = os.path.join(gdbPath, name)
+        arcpy.management.CreateFeatureclass(gdbPath, name, shapeType, spatial_reference=spatialReference)
+        for fieldName, value in zip(fieldNames, rows[0][1:]):
+            arcpy.management.AddField(names[name], fieldName, "TEXT" if isinstance(value, str) else "DOUBLE")
+        with arcpy.da.InsertCursor(names[name], ["SHAPE@"] + fieldNames) as cursor:
+            for row in rows:
+                if shapeType == "POLYGON":
+                    xMin, yMin, xMax, yMax = row[0]
+                    vertices = [(xMin, yMin), (xMin, yMax), (xMax, yMax), (xMax, yMin), (xMin, yMin)]
+                    shape = arcpy.Polygon(arcpy.Array([arcpy.Point(x, y) for x, y in vertices]), spatialReference)
+                elif shapeType == "POLYLINE":
+                    shape = arcpy.Polyline(arcpy.Array([arcpy.Point(x, y) for x, y in row[0]]), spatialReference)
+                else:
+                    shape = arcpy.PointGeometry(arcpy.Point(*row[0]), spatialReference)
+                cursor.insertRow([shape] + list(row[1:]))
+    return names
+
+
+def buildDatasets(scale, workspace=None):
+    """ Builds the synthetic datasets and returns a dictionary of their names
+
+    **Arguments:**
+
+        * *scale* - SyntheticScale, or the name of one of *scales*
+        * *workspace* - folder for the file geodatabase when running with ArcGIS Pro; not used with the stand-in
+
+    **Returns:**
+
+        * dictionary - dataset key (e.g., "landCover", "reportingUnits"): name or catalog path of the dataset, with
+          "streetsWorkspace" naming the workspace of the street network feature classes
+
+    """
+
+    if isinstance(scale, str):
+        scale = scales[scale]
+
+    landCover = makeLandCover(scale)
+    unitGrid = makeZoneGrid(scale.side, scale.unitsPerSide)
+    unitBoxes = getZoneBoxes(scale.side, scale.unitsPerSide)
+    censusGrid = makeZoneGrid(scale.side, scale.censusPerSide)
+    censusBoxes = getZoneBoxes(scale.side, scale.censusPerSide)
+    rng = np.random.RandomState(scale.seed + 4)
+    parkBoxes = makeBoxes(scale, scale.parkCount, scale.seed + 5, 4, 40)
+    floodplainBoxes = makeBoxes(scale, scale.streamCount * 3, scale.seed + 6, 20, 120)
+    roads = makeRoads(scale)
+    slope = makeSmoothField(scale, scale.seed + 7, 0, 60)
+
+    grids = {"landCover": (landCover, landCoverNoData),
+             "slope": (slope, -9999.0),
+             "costSurface": (1.0 + slope / 30.0, -9999.0),
+             "population": (makeSmoothField(scale, scale.seed + 8, 0, 12), -9999.0),
+             "floodplain": (np.where(rasterizeBoxes(scale, floodplainBoxes) > 0, 1, 0).astype(np.int32), -1)}
+
+    features = {
+        "reportingUnits": ("POLYGON", ["HUC_12"], [(box, "HU%04d" % oid) for oid, box in enumerate(unitBoxes, 1)],
+                           unitGrid),
+        "census": ("POLYGON", ["GEOID", "Pop", "Pop2"],
+                   [(box, "BG%05d" % oid, float(rng.randint(200, 3000)), float(rng.randint(200, 3000)))
+                    for oid, box in enumerate(censusBoxes, 1)], censusGrid),
+        "parks": ("POLYGON", ["ParkName"], [(box, "Park%d" % oid) for oid, box in enumerate(parkBoxes, 1)],
+                  rasterizeBoxes(scale, parkBoxes)),
+        "floodplains": ("POLYGON", ["Zone"], [(box, "AE") for box in floodplainBoxes],
+                        rasterizeBoxes(scale, floodplainBoxes)),
+        "roads": ("POLYLINE", ["RoadClass"], [(line, "S1400") for line in roads], None),
+        "streams": ("POLYLINE", ["StreamOrder"], [(line, float(i % 4 + 1)) for i, line in enumerate(makeStreams(scale))],
+                    None),
+        "samplePoints": ("POINT", ["HUC_12"], [((x, y), unit) for x, y, unit in makeSamplePoints(scale, unitBoxes)],
+                         None),
+        "Streets": ("POLYLINE", streetsFields, makeStreets(roads), None),
+        "LandUseA": ("POLYGON", ["FEAT_TYPE"], [(box, "900150") for box in parkBoxes], rasterizeBoxes(scale, parkBoxes)),
+        "LandUseB": ("POLYGON", ["FEAT_TYPE"], [(box, "509998") for box in floodplainBoxes],
+                     rasterizeBoxes(scale, floodplainBoxes))}
+
+    if benchmarkSupport.usingFakeArcpy:
+        return _registerFakeDatasets(scale, grids, features)
+
+    return _writeArcGISDatasets(scale, grids, features, workspace or arcpy.env.scratchFolder)
@@ -0,0 +1,55 @@
+'''
+Benchmark of the class pivot in table.transferField
+
+Builds a source table with one row per reporting unit and class, pivots it with table.transferField, checks the 
+output, and reports the time taken for 10 thousand to 1 million source rows. The time per source row must stay flat 
+(linear scaling). Runs without ArcGIS Pro by way of the fake arcpy package in tests/fakearcpy.
+
+Run with: python transferFieldBenchmark.py [largest number of source rows]
+'''
+
+import sys
+import benchmarkSupport
+import arcpy
+from ATtILA2.utils import table
+
+classValues = [1, 2, 3, 4]
+
+
+def buildTables(sourceRowCount):
+    arcpy.resetCatalog()
+    unitCount = sourceRowCount // len(classValues)
+    sourceRows = [(unitId, classValue, float(unitId * 10 + classValue), unitId % 7)
+                  for unitId in range(unitCount) for classValue in classValues]
+    arcpy.registerTable("source", ["UID", "CLASS", "LENGTH", "COUNT"], sourceRows,
+                        {"UID": "Integer", "CLASS": "Integer", "LENGTH": "Double", "COUNT": "Integer"})
+    arcpy.registerTable("output", ["UID"], [(unitId,) for unitId in range(unitCount)], {"UID": "Integer"})
+    return unitCount
+
+
+def checkOutput(unitCount):
+    with arcpy.da.SearchCursor("output", ["UID", "LENGTH1", "LENGTH4", "COUNT3"]) as cursor:
+        rowCount = 0
+        for unitId, length1, length4, count3 in cursor:
+            assert (length1, length4, count3) == (unitId * 10 + 1, unitId * 10 + 4, unitId % 7)
+            rowCount += 1
+    assert rowCount == unitCount
+
+
+def runBenchmark(largest=1000000):
+    sizes = [size for size in (10000, 100000, 1000000) if size <= largest]
+    seconds = []
+    for size in sizes:
+        unitCount = buildTables(size)
+        secs, result = benchmarkSupport.timeCall(table.transferField, "source", "output", ["LENGTH", "COUNT"], 
+                                                 ["LENGTH", "COUNT"], "UID", "CLASS", list(classValues))
+        checkOutput(unitCount)
+        seconds.append(secs)
+
+    benchmarkSupport.reportScaling("table.transferField class pivot", sizes, seconds, "rows")
+    benchmarkSupport.checkLinearScaling(sizes, seconds)
+    print("Benchmark was successful")
+
+
+if __name__ == '__main__':
+    runBenchmark(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,121 @@
+'''
+Test to evaluate the checkpointed batch runner in utils.batch
+
+Runs a small batch whose steps write files, breaks one step to mimic a crash, and checks that a second run skips the 
+completed steps and resumes at the broken one, that changed inputs or missing outputs make a step run again, and that 
+independent steps give the same manifest when run in worker processes. Runs without ArcGIS Pro by way of the fake 
+arcpy package in tests/fakearcpy.
+'''
+
+import linuxSupport
+import os
+import json
+import shutil
+import tempfile
+import ATtILA2
+from ATtILA2.utils import batch
+
+
+def writeStep(outFile, inFile=None, failFlag=None):
+    # a step that copies its input (or its own name) to its output, unless failFlag names an existing file
+    if failFlag and os.path.exists(failFlag):
+        raise RuntimeError("simulated crash")
+    text = open(inFile).read() if inFile else os.path.basename(outFile)
+    with open(outFile, "w") as out:
+        out.write(text + "+")
+    with open(outFile + ".runs", "a") as runs:
+        runs.write("run\n")
+
+
+def silentFailure(outFile):
+    # mimics a metric tool that reports an error as a message and returns without making its output
+    pass
+
+
+def runCount(outFile):
+    return len(open(outFile + ".runs").readlines()) if os.path.exists(outFile + ".runs") else 0
+
+
+def getSteps(folder):
+    source = os.path.join(folder, "source.txt")
+    failFlag = os.path.join(folder, "fail.flag")
+    a, b, c = [os.path.join(folder, name) for name in ("a.txt", "b.txt", "c.txt")]
+    return [batch.BatchStep("A", writeStep, [a, source], [source], [a]),
+            batch.BatchStep("B", writeStep, [b, a, failFlag], [a], [b], dependsOn=["A"]),
+            batch.BatchStep("C", writeStep, [c], [], [c])], (source, failFlag, a, b, c)
+
+
+def testResume(folder):
+    stepList, (source, failFlag, a, b, c) = getSteps(folder)
+    manifestFile = os.path.join(folder, "manifest.json")
+    with open(source, "w") as out:
+        out.write("x")
+
+    # B crashes: A and C are recorded, B is not
+    open(failFlag, "w").close()
+    try:
+        batch.runBatch(stepList, manifestFile)
+        raise AssertionError("the failed step was not reported")
+    except RuntimeError:
+        pass
+    assert sorted(json.load(open(manifestFile))) == ["A", "C"]
+
+    # the second run resumes at B
+    os.remove(failFlag)
+    assert batch.runBatch(stepList, manifestFile) == ["B"]
+    assert open(b).read() == "x++"
+    assert (runCount(a), runCount(b), runCount(c)) == (1, 1, 1)
+
+    # nothing runs when nothing changed
+    assert batch.runBatch(stepList, manifestFile) == []
+
+    # a changed input reruns its step and the steps that depend on it; a missing output reruns its step
+    with open(source, "w") as out:
+        out.write("yy")
+    os.remove(c)
+    assert batch.runBatch(stepList, manifestFile) == ["A", "C", "B"]
+    assert open(b).read() == "yy++"
+
+    # a step that returns without making its outputs is not recorded
+    silentStep = batch.BatchStep("D", silentFailure, [os.path.join(folder, "d.txt")], [], 
+                                 [os.path.join(folder, "d.txt")])
+    try:
+        batch.runBatch([silentStep], manifestFile)
+        raise AssertionError("the step without outputs was not reported")
+    except RuntimeError:
+        pass
+    assert "D" not in json.load(open(manifestFile))
+
+    # a step naming no outputs is refused before any step runs, as its completion could not be checked
+    os.remove(c)
+    try:
+        batch.runBatch(stepList + [batch.BatchStep("E", silentFailure, [os.path.join(folder, "e.txt")])], manifestFile)
+        raise AssertionError("the step naming no outputs was run")
+    except ValueError:
+        pass
+    assert not os.path.exists(c)
+
+
+def testWorkers(folder):
+    stepList, (source, failFlag, a, b, c) = getSteps(folder)
+    manifestFile = os.path.join(folder, "manifest.json")
+    with open(source, "w") as out:
+        out.write("x")
+
+    assert sorted(batch.runBatch(stepList, manifestFile, workerCount=2)) == ["A", "B", "C"]
+    assert open(b).read() == "x++"
+    assert batch.runBatch(stepList, manifestFile, workerCount=2) == []
+
+
+def runTest():
+    for test in (testResume, testWorkers):
+        folder = tempfile.mkdtemp()
+        try:
+            test(folder)
+        finally:
+            shutil.rmtree(folder, ignore_errors=True)
+    print("Validation was successful")
+
+
+if __name__ == '__main__':
+    runTest()
@@ -0,0 +1,154 @@
+'''
+Test to evaluate the columnar output table writer in utils.columnar
+
+Runs Land Cover Proportions, the Land Cover Coefficient Calculator and Land Cover Diversity on a small grid with the
+"ARCPY" and the "COLUMNAR" output table writers, and checks that both give the same geodatabase table, that the
+columnar table keeps the fields in table order with the minimum and maximum of each column for the log file, and that
+Parquet files are written with pyarrow, or refused with a clear message without it. Runs without ArcGIS Pro by way of
+the fake arcpy package in tests/fakearcpy.
+'''
+
+import linuxSupport
+import io
+import os
+import shutil
+import tempfile
+import numpy as np
+import arcpy
+import ATtILA2
+from ATtILA2 import errors
+from ATtILA2 import metric
+from ATtILA2.constants import globalConstants
+from ATtILA2.constants import metricConstants
+from ATtILA2.utils import columnar
+from ATtILA2.utils import log
+
+lccFilePath = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "LandCoverClassifications",
+                           "NLCD LAND.xml")
+
+
+def registerInputs():
+    # a 6 x 6 grid of NLCD values in three reporting units; the last unit holds only water and developed land
+    landCover = np.array([[41, 41, 42, 82, 82, 81],
+                          [41, 43, 42, 82, 81, 81],
+                          [21, 22, 41, 71, 81, 90],
+                          [21, 22, 23, 71, 52, 90],
+                          [11, 11, 21, 21, 24, 24],
+                          [11, 11, 21, 22, 24, 24]])
+    zones = np.array([[1, 1, 1, 2, 2, 2]] * 4 + [[3] * 6] * 2)
+    arcpy.resetCatalog()
+    arcpy.registerRaster("landCover", landCover, 30.0, noData=0)
+    arcpy.registerFeatureClass("units", ["OBJECTID", "Shape", "HUC_12"],
+                               [(1, arcpy.Box(0, 60, 90, 180), "HU01"), (2, arcpy.Box(90, 60, 180, 180), "HU02"),
+                                (3, arcpy.Box(0, 0, 180, 60), "HU03")], zoneGrid=zones, rasterName="landCover")
+
+
+def getTableRows(tableName):
+    with arcpy.da.SearchCursor(tableName, [f.name for f in arcpy.ListFields(tableName)]) as cursor:
+        return [row for row in cursor]
+
+
+def runTools():
+    # the output table of each tool, as (field names, rows)
+    outputs = {}
+    metric.runLandCoverProportions("LCP", "units", "HUC_12", "landCover", "NLCD LAND", lccFilePath,
+                                   "'for  -  [pfor]  Forest';'agr  -  [pagr]  Agriculture';'dev  -  [pdev]  Developed'",
+                                   "lcpOut", "false", "", "", "30", "landCover",
+                                   "'QAFIELDS  -  Add Quality Assurance Fields';'AREAFIELDS  -  Add Area Fields'")
+    metric.runLandCoverCoefficientCalculator("LCCC", "units", "HUC_12", "landCover", "NLCD LAND", lccFilePath,
+                                             "'IMPERVIOUS  -  [PCTIA]  Percent Cover Total Impervious Area'",
+                                             "lcccOut", "30", "landCover", "")
+    metric.runLandCoverDiversity("LCD", "units", "HUC_12", "landCover", "lcdOut", "30", "landCover", "")
+    for outTable in ["lcpOut", "lcccOut", "lcdOut"]:
+        outputs[outTable] = ([f.name for f in arcpy.ListFields(outTable)], getTableRows(outTable))
+    return outputs
+
+
+def assertSameRows(arcpyOutput, columnarOutput):
+    arcpyFields, arcpyRows = arcpyOutput
+    columnarFields, columnarRows = columnarOutput
+    arcpyFields = [f for f in arcpyFields if f != "OBJECTID"]
+    assert columnarFields == arcpyFields, (columnarFields, arcpyFields)
+    assert len(columnarRows) == len(arcpyRows)
+    for arcpyRow, columnarRow in zip(arcpyRows, columnarRows):
+        arcpyRow = arcpyRow[-len(columnarFields):]
+        assert columnarRow[0] == arcpyRow[0]
+        # FLOAT fields are written as single precision by the columnar writer
+        assert np.allclose(np.array(columnarRow[1:], dtype=float), np.array(arcpyRow[1:], dtype=float), rtol=1e-6,
+                           equal_nan=True), (columnarRow, arcpyRow)
+
+
+def runTest():
+    savedSettings = (globalConstants.tabulateAreaBackend, globalConstants.outputTableBackend,
+                     globalConstants.columnarFileFormat, globalConstants.columnarExportToGeodatabase)
+    folder = tempfile.mkdtemp()
+    try:
+        globalConstants.tabulateAreaBackend = globalConstants.numpyBackendName
+
+        registerInputs()
+        arcpyOutputs = runTools()
+
+        globalConstants.outputTableBackend = globalConstants.columnarBackendName
+        globalConstants.columnarFileFormat = None
+        registerInputs()
+        columnarOutputs = runTools()
+        for outTable in arcpyOutputs:
+            assertSameRows(arcpyOutputs[outTable], columnarOutputs[outTable])
+
+        # the fields are kept in table order, with the statistics of each column for the log file
+        newTable = columnar.ColumnarTable("lcpOut")
+        for fieldParameters in [("HUC_12", "TEXT"), ("pfor", "FLOAT", 6, 1), ("pagr", "FLOAT", 6, 1),
+                                ("LC_Overlap", "FLOAT", 6, 1), ("Count", "LONG")]:
+            newTable.addField(*fieldParameters)
+        columnar.writeColumns(newTable, [("huc_12", ["HU01", "HU02", "HU03"]), ("pagr", np.array([0.0, 62.5, 0.0])),
+                                         ("pfor", np.array([50.0, 0.0, 12.5])), ("Count", [4, None, 6])])
+        assert [f.name for f in newTable.fields] == ["HUC_12", "pfor", "pagr", "LC_Overlap", "Count"]
+        assert newTable.rowCount == 3 and newTable.fileName is None
+        assert newTable.statistics["pagr"] == (0.0, 62.5)
+        assert newTable.statistics["LC_Overlap"] == (None, None)
+        assert newTable.statistics["Count"] == (4.0, 6.0)
+        rows = getTableRows("lcpOut")
+        assert [row[0] for row in rows] == ["HU01", "HU02", "HU03"]
+        assert np.isnan(rows[1][4]) and np.isnan(rows[0][3])
+
+        logFile = io.StringIO()
+        metricConst = metricConstants.lcpConstants()
+        metricConst.idFields = metricConst.idFields + ["HUC_12"]
+        log.logWriteOutputTableInfo(newTable, logFile, metricConst)
+        logText = logFile.getvalue()
+        assert "FIELD: HUC_12 ; HUC_12 ; TEXT ; None ; None ; None ; NA ; NA" in logText
+        assert "FIELD: pagr ; pagr ; FLOAT ; None ; 6 ; 1 ; 0.0 ; 62.5" in logText
+        assert "TABLE ROW COUNT: 3" in logText
+
+        # a Parquet file is written next to the geodatabase holding the output table
+        globalConstants.columnarFileFormat = globalConstants.parquetFormatName
+        globalConstants.columnarExportToGeodatabase = False
+        outTable = os.path.join(folder, "outputs.gdb", "lcpOut")
+        newTable = columnar.ColumnarTable(outTable)
+        newTable.addField("HUC_12", "TEXT")
+        newTable.addField("pfor", "FLOAT", 6, 1)
+        try:
+            import pyarrow.parquet
+        except ImportError:
+            pyarrow = None
+        if pyarrow:
+            columnar.writeColumns(newTable, [("HUC_12", ["HU01", "HU02"]), ("pfor", [50.0, 12.5])])
+            assert newTable.fileName == os.path.join(folder, "lcpOut.parquet")
+            assert pyarrow.parquet.read_table(newTable.fileName).to_pydict() == {"HUC_12": ["HU01", "HU02"],
+                                                                                 "pfor": [50.0, 12.5]}
+        else:
+            try:
+                columnar.writeColumns(newTable, [("HUC_12", ["HU01", "HU02"]), ("pfor", [50.0, 12.5])])
+                raise AssertionError("writing Parquet without pyarrow must fail")
+            except errors.attilaException as e:
+                assert "pyarrow" in str(e)
+    finally:
+        (globalConstants.tabulateAreaBackend, globalConstants.outputTableBackend,
+         globalConstants.columnarFileFormat, globalConstants.columnarExportToGeodatabase) = savedSettings
+        shutil.rmtree(folder)
+
+    print("Validation was successful")
+
+
+if __name__ == '__main__':
+    runTest()
@@ -0,0 +1,99 @@
+'''
+Test to evaluate the table comparison engine in tests/compareTables.py
+
+Compares small tables that differ in row order, values within and beyond tolerance, nulls, missing, extra, and
+duplicated rows, and fields, reading them in chunks smaller than the tables, and checks the differences found and the
+summary returned. Runs without ArcGIS Pro by way of the fake arcpy package in tests/fakearcpy.
+'''
+
+import linuxSupport
+import os
+import sys
+import arcpy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import compareTables
+
+fieldNames = ["HUC_12", "pfor", "LC_Overlap", "Label"]
+fieldTypes = {"HUC_12": "String", "pfor": "Double", "LC_Overlap": "Integer", "Label": "String"}
+
+
+def registerTable(name, rows, names=fieldNames):
+    arcpy.registerTable(name, names, rows, dict((f, fieldTypes.get(f, "Double")) for f in names))
+
+
+def runTest():
+    refRows = [(f"HU{i:02d}", i * 1.5, 100, "unit") for i in range(20)]
+    registerTable("ref", refRows)
+
+    # the same rows in another order match on the ID field, in chunks smaller than the table
+    registerTable("reordered", refRows[5:] + refRows[:5])
+    for chunkSize in [3, 7, 100]:
+        assert compareTables.compare("ref", "reordered", "HUC_12", chunkSize=chunkSize) == \
+            compareTables.successMessage
+    # but not in table order
+    differences = compareTables.getTableDifferences("ref", "reordered", chunkSize=4)
+    assert differences.fieldDifferences["HUC_12"].count == 20 and differences.differentRowCount == 20
+
+    # values within tolerance match; the others are counted, with the largest difference and examples
+    testRows = list(refRows)
+    testRows[2] = ("HU02", 3.0 + 1e-9, 100, "unit")
+    testRows[4] = ("HU04", 6.5, 100, "unit")
+    testRows[8] = ("HU08", None, 100, "unit")
+    testRows[9] = ("HU09", 13.5, None, "other")
+    registerTable("changed", list(reversed(testRows)))
+    differences = compareTables.getTableDifferences("ref", "changed", "HUC_12", {"*": (1e-6, 0.0)}, chunkSize=6)
+    assert not differences.isEqual()
+    assert (differences.refRowCount, differences.testRowCount, differences.matchedRowCount) == (20, 20, 20)
+    assert differences.differentRowCount == 3
+    pfor = differences.fieldDifferences["pfor"]
+    assert pfor.count == 2 and pfor.largestDifference == 0.5
+    assert sorted(pfor.examples) == [("HU04", 6.0, 6.5), ("HU08", 12.0, None)]
+    assert differences.fieldDifferences["LC_Overlap"].examples == [("HU09", 100.0, None)]
+    assert differences.fieldDifferences["Label"].examples == [("HU09", "unit", "other")]
+    summary = str(differences)
+    assert summary.startswith("Validation failed, 3 of 20 matched rows differ"), summary
+    assert "pfor: 2 rows differ, largest difference 0.5" in summary, summary
+
+    # relative tolerances are taken per field, and a wide enough tolerance accepts the change
+    tolerances = compareTables.parseTolerances("pfor 0 0.1;LC_OVERLAP 0 0;1e-6")
+    assert tolerances == {"PFOR": (0.0, 0.1), "LC_OVERLAP": (0.0, 0.0), "*": (1e-6, 0.0)}
+    differences = compareTables.getTableDifferences("ref", "changed", "HUC_12", tolerances, chunkSize=6)
+    assert differences.fieldDifferences["pfor"].count == 1
+
+    # missing, extra, and duplicated rows
+    registerTable("rowsChanged", refRows[:4] + [refRows[3]] + refRows[4:15] + [("HU99", 1.0, 100, "unit")])
+    differences = compareTables.getTableDifferences("ref", "rowsChanged", "HUC_12", chunkSize=5)
+    assert (differences.missingRowCount, differences.extraRowCount, differences.duplicateRowCount) == (5, 1, 1)
+    assert differences.missingRows == ["HU15", "HU16", "HU17", "HU18", "HU19"]
+    assert differences.extraRows == ["HU99"] and differences.duplicateRows == ["HU03"]
+    assert differences.differentRowCount == 0
+    assert "5 rows missing from the test table" in str(differences)
+
+    # a duplicate read after its ID was matched, in either table, is found as well
+    registerTable("lateDuplicate", refRows[:4] + [refRows[3]] + refRows[4:])
+    differences = compareTables.getTableDifferences("ref", "lateDuplicate", "HUC_12", chunkSize=4)
+    assert (differences.duplicateRowCount, differences.duplicateRows) == (1, ["HU03"])
+    assert (differences.missingRowCount, differences.extraRowCount, differences.differentRowCount) == (0, 0, 0)
+    differences = compareTables.getTableDifferences("lateDuplicate", "ref", "HUC_12", chunkSize=4)
+    assert (differences.duplicateRowCount, differences.duplicateRows) == (1, ["HU03"])
+    assert (differences.missingRowCount, differences.extraRowCount, differences.matchedRowCount) == (0, 0, 20)
+
+    # field names are matched without regard to case, and missing or extra fields stop the comparison
+    registerTable("renamed", refRows, ["huc_12", "PFOR", "LC_Overlap", "Label"])
+    assert compareTables.compare("ref", "renamed", "HUC_12") == compareTables.successMessage
+    registerTable("fieldsChanged", [row[:3] + (0.0,) for row in refRows], fieldNames[:3] + ["pagr"])
+    summary = compareTables.compare("ref", "fieldsChanged", "HUC_12")
+    assert "missing these fields (Label)" in summary and "extra fields (pagr)" in summary, summary
+
+    # without an ID field, rows are matched in table order, as before
+    assert compareTables.compare("ref", "ref") == compareTables.successMessage
+    registerTable("shorter", refRows[:-1])
+    differences = compareTables.getTableDifferences("ref", "shorter", chunkSize=8)
+    assert differences.missingRowCount == 1 and differences.missingRows == [20]
+
+    print("Validation was successful")
+
+
+if __name__ == '__main__':
+    runTest()
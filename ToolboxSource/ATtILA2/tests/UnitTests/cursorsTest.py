@@ -0,0 +1,127 @@
+'''
+Test to evaluate the bulk arcpy.da cursor functions in utils.cursors and their callers
+
+Reads small tables in blocks smaller than the tables, with nulls and text fields, inserts and updates rows by key, and
+checks that table.getIdValueDict, table.getZoneSumValueDict, the tabulate area table read from a geodatabase table
+(including one whose ID field is also a value field), and calculate.getCoreEdgeRatio give the same values as the legacy
+cursors they replace. Runs without ArcGIS Pro by way of the fake arcpy package in tests/fakearcpy.
+'''
+
+import linuxSupport
+import types
+import numpy as np
+import arcpy
+import ATtILA2
+from ATtILA2.constants import globalConstants
+from ATtILA2.constants import metricConstants
+from ATtILA2.utils import calculate
+from ATtILA2.utils import cursors
+from ATtILA2.utils import table
+from ATtILA2.utils import tabarea
+
+
+class registeredTabAreaTable(tabarea.TabulateAreaTable):
+    # a tabulate area table read from a registered table instead of one made by TabulateArea
+    def _createTabulation(self):
+        self._tableName = self._inLandCoverGrid
+        self._destroyTable = False
+        self._openTable()
+
+
+class doubleIdTabAreaTable(tabarea.TabulateAreaTable):
+    # a core and edge tabulation, whose value fields are all its DOUBLE fields, with a DOUBLE reporting unit ID field
+    def _createTabulation(self):
+        self._tableName = self._inLandCoverGrid
+        self._destroyTable = False
+        self._tabAreaValueFields = arcpy.ListFields(self._tableName, "", "DOUBLE")
+        self._tabAreaValues = [aFld.name for aFld in self._tabAreaValueFields]
+        self._tabAreaTableRows = self._readTableRows()
+        self._tabAreaDict = dict(zip(self._tabAreaValues, []))
+
+
+def runTest():
+    savedBlockSize = globalConstants.cursorBlockSize
+    try:
+        globalConstants.cursorBlockSize = 2
+        arcpy.resetCatalog()
+
+        # blocks follow the field list, with integer fields holding nulls read as float64 in their block
+        arcpy.registerTable("units", ["HUC_12", "POP", "AREA"],
+                            [("HU01", 10, 1.5), ("HU02", None, 2.5), ("HU03", 30, None), ("HU04", 40, 4.0),
+                             ("HU05", 50, 5.0)], {"HUC_12": "String", "POP": "Integer", "AREA": "Double"})
+        blocks = list(cursors.iterRowBlocks("units", ["AREA", "HUC_12", "POP"]))
+        assert [len(block) for block in blocks] == [2, 2, 1]
+        assert blocks[0].dtype.names == ("AREA", "HUC_12", "POP")
+        assert blocks[0]["POP"].dtype == np.float64 and np.isnan(blocks[0]["POP"][1])
+        assert blocks[1]["POP"].dtype == np.int32 and np.isnan(blocks[1]["AREA"][0])
+        assert blocks[2]["HUC_12"].tolist() == ["HU05"]
+        rows = cursors.readRows("units", ["HUC_12", "POP"])
+        assert rows["HUC_12"].tolist() == ["HU01", "HU02", "HU03", "HU04", "HU05"]
+        assert rows["POP"].dtype == np.float64 and rows["POP"][4] == 50
+        assert len(cursors.iterRowBlocks("units", ["POP"]).__next__()) == 2
+        assert table.getIdValueDict("units", "HUC_12", "AREA")["HU02"] == 2.5
+
+        # rows are inserted in field list order, and updated by key with values for missing keys
+        arcpy.registerTable("out", ["OBJECTID", "HUC_12", "pfor", "pagr"], [],
+                            {"OBJECTID": "OID", "HUC_12": "String", "pfor": "Double", "pagr": "Double"})
+        assert cursors.insertRows("out", ["pfor", "HUC_12"], [(1.0, "HU01"), (2.0, "HU02"), (3.0, "HU03")]) == 3
+        updated = cursors.updateRowsByKey("out", "HUC_12", ["pagr", "pfor"], {"HU01": (10.0, 11.0), "HU03": [30.0, 31.0]})
+        assert updated == 2
+        with arcpy.da.SearchCursor("out", ["HUC_12", "pfor", "pagr"]) as cursor:
+            assert [row for row in cursor] == [("HU01", 11.0, 10.0), ("HU02", 2.0, None), ("HU03", 31.0, 30.0)]
+        cursors.updateRowsByKey("out", "HUC_12", ["pagr"], {}, [0.0])
+        assert [row[3] for row in arcpy._catalog["out"].rows] == [0.0, 0.0, 0.0]
+
+        # the tabulate area table rows and sums match those of a legacy cursor
+        valueFields = ["VALUE_11", "VALUE_21", "VALUE_41"]
+        tabAreaRows = [(i, f"HU{i:02d}", 900.0 * i, 1800.0, 2700.0 + i) for i in range(1, 6)]
+        arcpy.registerTable("tabArea", ["OBJECTID", "HUC_12"] + valueFields, tabAreaRows,
+                            dict([("OBJECTID", "OID"), ("HUC_12", "String")] + [(f, "Double") for f in valueFields]))
+        legacySums = {}
+        for row in arcpy.SearchCursor("tabArea"):
+            legacySums[row.getValue("HUC_12")] = sum(row.getValue(f) for f in valueFields if f != "VALUE_11")
+        assert table.getZoneSumValueDict("tabArea", "HUC_12", ["VALUE_11"]) == legacySums
+
+        lccObj = types.SimpleNamespace(values=types.SimpleNamespace(getExcludedValueIds=lambda: [11]))
+        tabAreaTable = registeredTabAreaTable("units", "HUC_12", "tabArea", None, lccObj=lccObj)
+        tabAreaTableRows = [(row.zoneIdValue, dict(row.tabAreaDict), row.effectiveArea, row.excludedArea)
+                            for row in tabAreaTable]
+        assert [row[0] for row in tabAreaTableRows] == [f"HU{i:02d}" for i in range(1, 6)]
+        assert tabAreaTableRows[1][1] == {11: 1800.0, 21: 1800.0, 41: 2702.0}
+        assert tabAreaTableRows[1][2:] == (1800.0 + 2702.0, 1800.0)
+        zoneIds, classValues, areaMatrix = registeredTabAreaTable("units", "HUC_12", "tabArea", None).getAreaMatrix()
+        assert zoneIds == [f"HU{i:02d}" for i in range(1, 6)] and classValues == [11, 21, 41]
+        assert areaMatrix.shape == (5, 3) and areaMatrix[4, 0] == 4500.0
+
+        # a DOUBLE ID field among the value fields is read once
+        arcpy.registerTable("caemTabArea", ["OBJECTID", "ZONE", "EDGE", "CORE"],
+                            [(1, 101.0, 300.0, 100.0), (2, 102.0, 0.0, 900.0), (3, 103.0, 50.0, 50.0)],
+                            {"OBJECTID": "OID", "ZONE": "Double", "EDGE": "Double", "CORE": "Double"})
+        caemTableRows = [(row.zoneIdValue, row.tabAreaDict["EDGE"], row.tabAreaDict["CORE"])
+                         for row in doubleIdTabAreaTable("units", "ZONE", "caemTabArea", None)]
+        assert caemTableRows == [(101.0, 300.0, 100.0), (102.0, 0.0, 900.0), (103.0, 50.0, 50.0)], caemTableRows
+
+        # core and edge metrics are inserted and updated by reporting unit
+        metricConst = metricConstants.caemConstants()
+        outIdField = types.SimpleNamespace(name="HUC_12")
+        coreField = metricConst.coreField[0] + "for" + metricConst.coreField[1]
+        edgeField = metricConst.edgeField[0] + "for" + metricConst.edgeField[1]
+        qaFields = [qaFld[0] for qaFld in metricConst.qaCheckFieldParameters]
+        arcpy.registerTable("caemOut", ["OBJECTID", "HUC_12", "for_E2A", coreField, edgeField] + qaFields, [],
+                            dict([("OBJECTID", "OID"), ("HUC_12", "String")] +
+                                 [(f, "Double") for f in ["for_E2A", coreField, edgeField] + qaFields]))
+        caemRows = [types.SimpleNamespace(zoneIdValue="HU01", tabAreaDict={"EDGE": 300.0, "CORE": 100.0, "OTHER": 600.0}),
+                    types.SimpleNamespace(zoneIdValue="HU02", tabAreaDict={"EXCLUDED": 500.0})]
+        calculate.getCoreEdgeRatio(outIdField, "caemOut", caemRows, {"for": ("for_E2A", "for")},
+                                   {"HU01": 2000.0, "HU02": 500.0}, metricConst, "for")
+        outRows = dict((row[1], row[2:]) for row in arcpy._catalog["caemOut"].rows)
+        assert outRows["HU01"] == (75.0, 10.0, 30.0, 50.0, 1000.0, 1000.0, 0.0), outRows["HU01"]
+        assert outRows["HU02"] == (0, 0, 0, 100.0, 500.0, 0.0, 500.0), outRows["HU02"]
+    finally:
+        globalConstants.cursorBlockSize = savedBlockSize
+
+    print("Validation was successful")
+
+
+if __name__ == '__main__':
+    runTest()
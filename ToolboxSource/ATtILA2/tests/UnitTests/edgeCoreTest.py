@@ -0,0 +1,78 @@
+'''
+Test to evaluate the distance transform engine used by the Core and Edge Metrics tool
+
+Compares the exact squared distances of utils.distance with a brute force search, and the block by block edge/core 
+classification of raster.getEdgeCoreSumGrids with the result of the Reclassify, SetNull, EucDistance, and Con steps 
+of raster.getEdgeCoreGrid, worked out cell by cell. Runs without ArcGIS Pro by way of the fake arcpy package in 
+tests/fakearcpy.
+'''
+
+import linuxSupport
+import numpy as np
+import arcpy
+import ATtILA2
+from ATtILA2.utils import distance
+from ATtILA2.utils import raster
+
+noDataValue = -9999
+classValues = [41, 42]
+excludedValues = [11]
+
+
+def bruteForceSquaredDistances(sourceMask):
+    sourceRows, sourceCols = np.nonzero(sourceMask)
+    rows, cols = np.indices(sourceMask.shape)
+    if len(sourceRows) == 0:
+        return np.full(sourceMask.shape, np.inf)
+    squared = (rows[..., np.newaxis] - sourceRows) ** 2 + (cols[..., np.newaxis] - sourceCols) ** 2
+    return squared.min(axis=-1).astype(np.float64)
+
+
+def bruteForceEdgeCore(landCover, edgeWidth):
+    valid = landCover != noDataValue
+    classMask = np.isin(landCover, classValues)
+    reclass = np.where(classMask, 3, np.where(np.isin(landCover, excludedValues), 1, 2))
+    # EucDistance from the cells that are not class cells (SetNull removes class cells and NoData is not a source)
+    distances = np.sqrt(bruteForceSquaredDistances(valid & ~classMask))
+    codes = np.where((distances >= edgeWidth + 0.5) & classMask, 4, reclass)
+    return np.where(valid, codes, np.nan)
+
+
+def testSquaredDistances():
+    rng = np.random.RandomState(2)
+    for shape, share in (((17, 23), 0.1), ((31, 9), 0.02), ((1, 15), 0.2), ((12, 12), 0.0), ((20, 20), 0.9)):
+        sourceMask = rng.rand(*shape) < share
+        assert np.array_equal(distance.getSquaredDistances(sourceMask), bruteForceSquaredDistances(sourceMask)), shape
+
+
+def testEdgeCoreGrids():
+    arcpy.resetCatalog()
+    rng = np.random.RandomState(6)
+    landCover = rng.choice([41, 42, 41, 42, 41, 21, 11], size=(33, 41))
+    landCover[10:25, 12:30] = 41
+    landCover[rng.rand(33, 41) < 0.01] = noDataValue
+    arcpy.registerRaster("landCover", landCover, 30, 0, 0, noDataValue)
+
+    edgeWidths = [1, 2, 4]
+    for blockSize in (6, 13, 4096):
+        edgeCoreGrids = raster.getEdgeCoreSumGrids("landCover", classValues, excludedValues, edgeWidths, blockSize)
+        for edgeWidth in edgeWidths:
+            expected = bruteForceEdgeCore(landCover, edgeWidth)
+            result = np.full(landCover.shape, np.nan)
+            for row0, col0, tile in edgeCoreGrids[edgeWidth].iterTiles(100):
+                result[row0:row0 + tile.shape[0], col0:col0 + tile.shape[1]] = tile
+            assert np.array_equal(np.isnan(result), np.isnan(expected)), (edgeWidth, blockSize)
+            assert np.array_equal(np.nan_to_num(result), np.nan_to_num(expected)), (edgeWidth, blockSize)
+            edgeCoreGrids[edgeWidth].close()
+    # the large patch keeps core cells at the widest edge
+    assert (expected == 4).sum() > 0
+
+
+def runTest():
+    testSquaredDistances()
+    testEdgeCoreGrids()
+    print("Validation was successful")
+
+
+if __name__ == '__main__':
+    runTest()
@@ -0,0 +1,166 @@
+'''
+Test to evaluate the focal sum engines used by the Neighborhood Proportions and Population Land Cover Views tools
+
+Compares the class proportions calculated block by block from integral images with a brute force rectangular focal 
+sum that follows the FocalStatistics SUM / NODATA rules: a window holding a NoData cell is NoData, and the part of a 
+window beyond the raster extent is left out. Compares the circular neighborhood sums, direct and FFT, with a brute
+force NbrCircle focal sum. Runs without ArcGIS Pro by way of the fake arcpy package in tests/fakearcpy.
+'''
+
+import linuxSupport
+import os
+import tempfile
+import numpy as np
+import arcpy
+import ATtILA2
+from ATtILA2.utils import focal
+from ATtILA2.utils import raster
+
+noDataValue = -9999
+classValuesDict = {"for": [41, 42, 43], "wetl": [90, 95], "none": [7]}
+
+
+def bruteForceProportions(landCover, classValues, windowSize):
+    nRows, nCols = landCover.shape
+    before, after = focal.getWindowOffsets(windowSize)
+    result = np.full((nRows, nCols), np.nan)
+    for row in range(nRows):
+        for col in range(nCols):
+            window = landCover[max(row - before, 0):row + after + 1, max(col - before, 0):col + after + 1]
+            if (window == noDataValue).any():
+                continue
+            result[row, col] = np.isin(window, classValues).sum() / (windowSize * windowSize) * 100
+    return result
+
+
+def readGrid(sumGrid):
+    result = np.full((sumGrid.nRows, sumGrid.nCols), np.nan)
+    for row0, col0, tile in sumGrid.iterTiles(1000):
+        result[row0:row0 + tile.shape[0], col0:col0 + tile.shape[1]] = tile
+    return result
+
+
+def testFocalProportions():
+    arcpy.resetCatalog()
+    rng = np.random.RandomState(12)
+    landCover = rng.choice([11, 21, 41, 42, 43, 90, 95], size=(37, 29))
+    landCover[rng.rand(37, 29) < 0.01] = noDataValue
+    arcpy.registerRaster("landCover", landCover, 30, 1000, 2000, noDataValue)
+
+    windowSizes = [1, 3, 4, 7]
+    for blockSize in (5, 11, 4096):
+        focalGrids = raster.getFocalProportionGrids("landCover", classValuesDict, windowSizes, blockSize, True)
+        for (key, windowSize), (percentGrid, countGrid) in focalGrids.items():
+            expected = bruteForceProportions(landCover, classValuesDict[key], windowSize)
+            result = readGrid(percentGrid)
+            assert np.array_equal(np.isnan(result), np.isnan(expected)), (key, windowSize, blockSize)
+            assert np.allclose(np.nan_to_num(result), np.nan_to_num(expected))
+            assert np.allclose(np.nan_to_num(readGrid(countGrid)), np.nan_to_num(expected) * windowSize ** 2 / 100)
+            percentGrid.close()
+            countGrid.close()
+
+
+def testNoNoDataValue():
+    arcpy.resetCatalog()
+    rng = np.random.RandomState(3)
+    landCover = rng.choice([41, 42, 11], size=(16, 20))
+    arcpy.registerRaster("landCover", landCover, 10, 0, 0)
+    focalGrids = raster.getFocalProportionGrids("landCover", {"for": [41, 42]}, [5], 6)
+    percentGrid, countGrid = focalGrids[("for", 5)]
+    assert countGrid is None
+    assert np.allclose(readGrid(percentGrid), bruteForceProportions(landCover, [41, 42], 5))
+    percentGrid.close()
+
+
+def bruteForceCircleSums(patchGrid, classValue, radius):
+    nRows, nCols = patchGrid.shape
+    sums = np.zeros((nRows, nCols), dtype=np.int64)
+    for row in range(nRows):
+        for col in range(nCols):
+            for dy in range(-radius, radius + 1):
+                for dx in range(-radius, radius + 1):
+                    r, c = row + dy, col + dx
+                    if dx * dx + dy * dy <= radius * radius and 0 <= r < nRows and 0 <= c < nCols:
+                        sums[row, col] += patchGrid[r, c] == classValue
+    return sums
+
+
+def testCircleKernel():
+    # cell counts of NbrCircle neighborhoods from the lookup table in raster.lookupCircleCellCount
+    for radius, cellCount in ((1, 5), (2, 13), (3, 29), (10, 317), (33, 3409), (100, 31417)):
+        assert focal.getCircleKernel(radius).sum() == cellCount
+        assert focal.getCircleHalfWidths(radius).sum() * 2 + 2 * radius + 1 == cellCount
+    assert [focal.getFFTLength(n) for n in (1, 7, 11, 97, 1000)] == [1, 8, 12, 100, 1000]
+
+
+def testCircleCellCount():
+    # every radius of the lookup table is reproduced by lattice point counting
+    for radius in list(range(1, 34)) + [40, 45, 50, 55, 60, 66, 70, 75, 80, 90, 100, 125, 150, 200, 250, 300, 333, 350,
+                                        400, 450, 500, 750, 1000]:
+        assert focal.countCircleCells(radius) == raster.lookupCircleCellCount(radius), radius
+    # a radius in map units, and a radius that is not a whole number of cells
+    assert focal.countCircleCells(90, 30) == 29
+    assert focal.countCircleCells(2.5) == 21
+
+    memoFile = os.path.join(tempfile.mkdtemp(), "circleCounts.json")
+    memo = focal.CircleCellCountMemo(memoFile)
+    assert memo.get(1234) == focal.countCircleCells(1234)
+    assert memo.get(60, 30) == 13
+    # a new memo on the same file finds the counts without counting again
+    rereadMemo = focal.CircleCellCountMemo(memoFile)
+    assert len(rereadMemo._counts) == 2
+    assert rereadMemo.get(1234) == memo.get(1234)
+    assert raster.getCircleCellCount(None, 34) == focal.countCircleCells(34)
+
+
+def testCircleSums():
+    rng = np.random.RandomState(5)
+    for radius in (1, 3, 8):
+        halo = radius + 2
+        indicator = (rng.rand(23 + 2 * halo, 31 + 2 * halo) < 0.4).astype(np.uint8)
+        expected = bruteForceCircleSums(indicator, 1, radius)[halo:-halo, halo:-halo]
+        assert np.array_equal(focal.getCircleSumsDirect(indicator, radius, halo), expected)
+        assert np.array_equal(focal.getCircleSumsFFT(indicator, radius, halo), expected)
+    assert focal.getCircleSumMethod(2, (4096, 4096)) == focal.getCircleSumsDirect
+    assert focal.getCircleSumMethod(200, (4096, 4096)) == focal.getCircleSumsFFT
+
+
+def testCircleFocalSumGrid():
+    arcpy.resetCatalog()
+    rng = np.random.RandomState(8)
+    patchGrid = (rng.rand(30, 26) < 0.05).astype(np.int32)
+    patchGrid[rng.rand(30, 26) < 0.02] = noDataValue
+    arcpy.registerRaster("patchGrid", patchGrid, 10, 500, 500, noDataValue)
+
+    for radius in (2, 6):
+        expected = bruteForceCircleSums(patchGrid, 1, radius)
+        for blockSize in (7, 4096):
+            sumGrid = raster.getCircleFocalSumGrid("patchGrid", 1, radius, blockSize)
+            assert np.array_equal(readGrid(sumGrid), expected)
+            sumGrid.close()
+
+        # as Con(FocalStatistics(...) > 0, 1)
+        viewGrid = raster.getCircleFocalSumGrid("patchGrid", 1, radius, 9, 0, 1)
+        raster.saveSumGrid(viewGrid, f"view{radius}", 8, ["KeepIntermediates"], asInteger=True)
+        viewGrid.close()
+        result = arcpy.RasterToNumPyArray(f"view{radius}")
+        assert result.dtype.kind == 'i'
+        extent = arcpy.Raster(f"view{radius}").extent
+        row0, col0 = int(round((800 - extent.YMax) / 10)), int(round((extent.XMin - 500) / 10))
+        view = np.zeros((30, 26), dtype=bool)
+        view[row0:row0 + result.shape[0], col0:col0 + result.shape[1]] = result == 1
+        assert np.array_equal(view, expected > 0)
+
+
+def runTest():
+    testFocalProportions()
+    testNoNoDataValue()
+    testCircleKernel()
+    testCircleCellCount()
+    testCircleSums()
+    testCircleFocalSumGrid()
+    print("Validation was successful")
+
+
+if __name__ == '__main__':
+    runTest()
@@ -0,0 +1,142 @@
+'''
+Test to evaluate the zone by class area matrix form of calculate.landCoverProportions
+
+Fills land cover proportions output tables from a small tabulate area table, with an excluded class, zero and missing
+population, a reporting unit whose land cover is all excluded, and reporting units of zero area, and checks every
+output field against the per row calculation that landCoverProportions used to make for each tabulate area row. Runs
+without ArcGIS Pro by way of the fake arcpy package in tests/fakearcpy.
+'''
+
+import linuxSupport
+import math
+import types
+import arcpy
+import ATtILA2
+from ATtILA2.constants import globalConstants
+from ATtILA2.constants import metricConstants
+from ATtILA2.utils import calculate
+from ATtILA2.utils import tabarea
+
+excludedValues = frozenset([11])
+lccClassesDict = {"for": types.SimpleNamespace(uniqueValueIds=frozenset([41, 42])),
+                  "agt": types.SimpleNamespace(uniqueValueIds=frozenset([81, 82, 11])),
+                  "wetl": types.SimpleNamespace(uniqueValueIds=frozenset([90, 95]))}
+metricsBaseNameList = ["for", "agt", "wetl"]
+metricsFieldnameDict = dict((mBaseName, ("p" + mBaseName, mBaseName)) for mBaseName in metricsBaseNameList)
+lccObj = types.SimpleNamespace(values=types.SimpleNamespace(getExcludedValueIds=lambda: excludedValues))
+valueFields = ["VALUE_11", "VALUE_41", "VALUE_42", "VALUE_81"]
+tabAreaRows = [("HU01", 900.0, 1800.0, 900.0, 2700.0),
+               ("HU02", 0.0, 3600.0, 0.0, 0.0),
+               ("HU03", 4500.0, 0.0, 0.0, 0.0),       # all of its land cover is excluded
+               ("HU04", 900.0, 900.0, 900.0, 900.0),
+               ("HU05", 0.0, 0.0, 1800.0, 900.0),
+               ("HU06", 0.0, 900.0, 0.0, 0.0)]        # its reporting unit area is zero
+zoneAreaDict = {"HU01": 7200.0, "HU02": 4000.0, "HU03": 4500.0, "HU04": 3600.0, "HU05": 3000.0, "HU06": 0.0}
+reportingUnitAreaDict = {"HU01": [9000.0, 8000.0], "HU02": [4000.0, 4000.0], "HU03": [9000.0, 0.0],
+                         "HU04": [3600.0, 2700.0], "HU05": [6000.0, 5000.0], "HU06": [0.0, 0.0]}
+# zero population, population below 1, and no population (HU05 is missing)
+zoneValueDict = {"HU01": 12.0, "HU02": 0.0, "HU03": 3.0, "HU04": 0.4, "HU06": 1.0}
+conversionFactor = 0.5
+
+
+class registeredTabAreaTable(tabarea.TabulateAreaTable):
+    # a tabulate area table read from a registered table instead of one made by TabulateArea
+    def _createTabulation(self):
+        self._tableName = self._inLandCoverGrid
+        self._destroyTable = False
+        self._openTable()
+
+
+def getPercentage(numerator, denominator):
+    # the per row calculation divided by a zero reporting unit area; those percentages are now 0
+    return (numerator / denominator) * 100 if denominator > 0 else 0
+
+
+def getPerRowValues(metricConst, optionalGroupsList, withZoneValues, withReportingUnitAreas):
+    ''' Returns the output values of each reporting unit as landCoverProportions calculated them row by row '''
+    qaCheckFlds = metricConst.qaCheckFieldParameters
+    expected = {}
+    for row in registeredTabAreaTable("units", "HUC_12", "tabArea", None, lccObj=lccObj):
+        values = {}
+        for mBaseName in metricsBaseNameList:
+            percentArea, areaSum = calculate.getMetricPercentAreaAndSum(lccClassesDict[mBaseName].uniqueValueIds,
+                                                                        row.tabAreaDict, row.effectiveArea,
+                                                                        row._excludedValues)
+            values[metricsFieldnameDict[mBaseName][0]] = percentArea
+            if globalConstants.metricAddName in optionalGroupsList:
+                values[metricsFieldnameDict[mBaseName][0] + globalConstants.areaFieldParameters[0]] = areaSum
+            if withZoneValues:
+                classSqM = areaSum * conversionFactor
+                if row.zoneIdValue not in zoneValueDict:
+                    perValueCalc = -55555
+                elif zoneValueDict[row.zoneIdValue] >= 1:
+                    perValueCalc = classSqM / zoneValueDict[row.zoneIdValue]
+                else:
+                    perValueCalc = -99999
+                values[metricsFieldnameDict[mBaseName][1] + metricConst.perCapitaSuffix] = perValueCalc
+                values[metricsFieldnameDict[mBaseName][1] + metricConst.meterSquaredSuffix] = classSqM
+
+        values[qaCheckFlds[0][0]] = getPercentage(row.totalArea, zoneAreaDict[row.zoneIdValue])
+        values[qaCheckFlds[1][0]] = row.totalArea
+        values[qaCheckFlds[2][0]] = row.effectiveArea
+        values[qaCheckFlds[3][0]] = row.excludedArea
+        if metricConst.pctBufferName:
+            if withReportingUnitAreas:
+                ruTotalArea, ruEffectiveArea = reportingUnitAreaDict[row.zoneIdValue]
+            else:
+                ruTotalArea = ruEffectiveArea = zoneAreaDict[row.zoneIdValue]
+            values[metricConst.pctBufferName] = getPercentage(row.effectiveArea, ruEffectiveArea)
+            values[metricConst.totaPctName] = getPercentage(row.totalArea, ruTotalArea)
+        expected[row.zoneIdValue] = values
+    return expected
+
+
+def checkOutputTable(metricConst, optionalGroupsList, withZoneValues, withReportingUnitAreas):
+    expected = getPerRowValues(metricConst, optionalGroupsList, withZoneValues, withReportingUnitAreas)
+    outFields = sorted(next(iter(expected.values())))
+    arcpy.registerTable("out", ["OBJECTID", "HUC_12"] + outFields, [],
+                        dict([("OBJECTID", "OID"), ("HUC_12", "String")] + [(f, "Double") for f in outFields]))
+
+    calculate.landCoverProportions(lccClassesDict, metricsBaseNameList, optionalGroupsList, metricConst,
+                                   types.SimpleNamespace(name="HUC_12"), "out",
+                                   registeredTabAreaTable("units", "HUC_12", "tabArea", None, lccObj=lccObj),
+                                   metricsFieldnameDict, zoneAreaDict,
+                                   reportingUnitAreaDict if withReportingUnitAreas else None,
+                                   zoneValueDict if withZoneValues else False, conversionFactor)
+
+    with arcpy.da.SearchCursor("out", ["HUC_12"] + outFields) as cursor:
+        outRows = dict((row[0], dict(zip(outFields, row[1:]))) for row in cursor)
+    assert sorted(outRows) == sorted(expected), sorted(outRows)
+    for zoneId, values in expected.items():
+        for fieldName, value in values.items():
+            outValue = outRows[zoneId][fieldName]
+            assert math.isfinite(outValue), (zoneId, fieldName, outValue)
+            assert math.isclose(outValue, value, rel_tol=1e-12, abs_tol=1e-9), (zoneId, fieldName, outValue, value)
+    return outRows
+
+
+def runTest():
+    arcpy.resetCatalog()
+    arcpy.registerTable("units", ["HUC_12"], [(row[0],) for row in tabAreaRows])
+    arcpy.registerTable("tabArea", ["OBJECTID", "HUC_12"] + valueFields,
+                        [(i + 1,) + row for i, row in enumerate(tabAreaRows)],
+                        dict([("OBJECTID", "OID"), ("HUC_12", "String")] + [(f, "Double") for f in valueFields]))
+
+    # class percentages, areas, per capita and standard QA fields
+    lcpConst = metricConstants.lcpConstants()
+    outRows = checkOutputTable(lcpConst, [globalConstants.metricAddName, globalConstants.qaCheckName], True, False)
+    assert outRows["HU03"]["pfor"] == 0 and outRows["HU03"]["LCP_EXCA"] == 4500.0
+    assert outRows["HU02"]["for_PC"] == -99999 and outRows["HU04"]["for_PC"] == -99999
+    assert outRows["HU05"]["for_PC"] == -55555 and outRows["HU06"]["LCP_OVER"] == 0
+
+    # buffer percentages of the reporting unit areas, with and without a separate reporting unit area
+    rlcpConst = metricConstants.rlcpConstants()
+    outRows = checkOutputTable(rlcpConst, [globalConstants.qaCheckName], False, True)
+    assert outRows["HU03"]["rEFFA"] == 0 and outRows["HU06"]["rTOTA"] == 0
+    checkOutputTable(rlcpConst, [globalConstants.qaCheckName], False, False)
+
+    print("Validation was successful")
+
+
+if __name__ == '__main__':
+    runTest()
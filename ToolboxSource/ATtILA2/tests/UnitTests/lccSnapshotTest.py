@@ -0,0 +1,128 @@
+'''
+Test to evaluate the compiled snapshot cache of utils.lcc.LandCoverClassification
+
+Loads each LCC XML file shipped with ATtILA2 twice, once by parsing and once from its snapshot, and compares the two. 
+Then edits a copy of a file and checks that its stale snapshot is not used, that a damaged snapshot is ignored, and 
+that a snapshot not signed with the user's key is never unpickled.
+'''
+
+import linuxSupport
+import glob
+import os
+import pickle
+import shutil
+import tempfile
+from ATtILA2.utils import lcc
+
+lccFolder = os.path.join(os.path.dirname(linuxSupport.__file__), "..", "..", "..", "LandCoverClassifications")
+
+
+def describe(lccObj):
+    classes = dict((classId, (landCoverClass.name, sorted(landCoverClass.uniqueValueIds), landCoverClass.attributes))
+                   for classId, landCoverClass in lccObj.classes.items())
+    values = dict((valueId, (value.name, value.excluded, 
+                             dict((coefId, coef.value) for coefId, coef in value._coefficients.items())))
+                  for valueId, value in lccObj.values.items())
+    coefficients = dict((coefId, (coef.name, coef.fieldName, coef.calcMethod)) 
+                        for coefId, coef in (lccObj.coefficients or {}).items())
+    return (classes, values, coefficients, lccObj.metadata.name, lccObj.metadata.description, 
+            sorted(lccObj.getUniqueValueIds()), lccObj.overwriteFieldDataList)
+
+
+def testSnapshotMatchesParse(folder):
+    lcc.constants.SnapshotCacheFolder = folder
+    lccFilePaths = glob.glob(os.path.join(lccFolder, "*.xml"))
+    assert lccFilePaths
+    for lccFilePath in lccFilePaths:
+        for excludeEmptyClasses in (True, False):
+            parsed = lcc.LandCoverClassification(lccFilePath, excludeEmptyClasses)
+            snapshotFileName = lcc._getSnapshotFileName(lccFilePath, excludeEmptyClasses)
+            assert os.path.exists(snapshotFileName), lccFilePath
+            loaded = lcc.LandCoverClassification(lccFilePath, excludeEmptyClasses)
+            assert loaded.lccFilePath == lccFilePath
+            assert describe(loaded) == describe(parsed), lccFilePath
+
+
+def testSnapshotInvalidation(folder):
+    lcc.constants.SnapshotCacheFolder = folder
+    lccFilePath = os.path.join(folder, "edited.xml")
+    shutil.copy(os.path.join(lccFolder, "NLCD LAND.xml"), lccFilePath)
+    original = lcc.LandCoverClassification(lccFilePath)
+    
+    # rename a class, keeping the modification time of the file
+    fileStat = os.stat(lccFilePath)
+    with open(lccFilePath) as lccFile:
+        text = lccFile.read()
+    name = original.classes["for"].name
+    with open(lccFilePath, "w") as lccFile:
+        lccFile.write(text.replace('Name="%s"' % name, 'Name="%s"' % name[::-1], 1))
+    os.utime(lccFilePath, ns=(fileStat.st_atime_ns, fileStat.st_mtime_ns))
+    edited = lcc.LandCoverClassification(lccFilePath)
+    assert edited.classes["for"].name == name[::-1]
+    
+    # a damaged snapshot is reparsed
+    snapshotFileName = lcc._getSnapshotFileName(lccFilePath, True)
+    with open(snapshotFileName, "r+b") as snapshotFile:
+        snapshotFile.seek(-8, os.SEEK_END)
+        snapshotFile.write(b"damaged!")
+    reloaded = lcc.LandCoverClassification(lccFilePath)
+    assert describe(reloaded) == describe(edited)
+
+
+class forgedPayload(object):
+    # a payload that creates a marker folder when unpickled
+    def __init__(self, markerFolder):
+        self.markerFolder = markerFolder
+    
+    def __reduce__(self):
+        return (os.mkdir, (self.markerFolder,))
+
+
+def testForgedSnapshot(folder):
+    lcc.constants.SnapshotCacheFolder = folder
+    lccFilePath = os.path.join(folder, "forged.xml")
+    shutil.copy(os.path.join(lccFolder, "NLCD LAND.xml"), lccFilePath)
+    original = lcc.LandCoverClassification(lccFilePath)
+    snapshotFileName = lcc._getSnapshotFileName(lccFilePath, True)
+    snapshotKey = lcc._getSnapshotKey(lccFilePath, True, open(lccFilePath, "rb").read())
+    
+    # the signing key and the snapshot folder are private to the user
+    if os.name == "posix":
+        assert os.stat(lcc.constants.SnapshotKeyFile).st_mode & 0o777 == 0o600
+        assert os.stat(lcc._getUserCacheFolder()).st_mode & 0o077 == 0
+    
+    # snapshots in the old unsigned layout, or signed with another key, are never unpickled
+    markerFolder = os.path.join(folder, "unpickled")
+    payload = pickle.dumps(forgedPayload(markerFolder))
+    forgedSnapshots = [pickle.dumps((snapshotKey, payload)), lcc._snapshotMagic + bytes(32) + payload]
+    for forgedSnapshot in forgedSnapshots:
+        with open(snapshotFileName, "wb") as snapshotFile:
+            snapshotFile.write(forgedSnapshot)
+        assert lcc._readSnapshot(snapshotFileName, snapshotKey) is None
+        reloaded = lcc.LandCoverClassification(lccFilePath)
+        assert not os.path.exists(markerFolder)
+        assert describe(reloaded) == describe(original)
+    
+    # a snapshot signed for another file does not stand in for this one
+    otherKey = (snapshotKey[0], snapshotKey[1] + ".other") + snapshotKey[2:]
+    assert lcc._readSnapshot(snapshotFileName, otherKey) is None
+    assert lcc._readSnapshot(snapshotFileName, snapshotKey) is not None
+
+
+def runTest():
+    folder = tempfile.mkdtemp()
+    savedKeyFile = lcc.constants.SnapshotKeyFile
+    try:
+        lcc.constants.SnapshotKeyFile = os.path.join(folder, "lccSnapshot.key")
+        testSnapshotMatchesParse(folder)
+        testSnapshotInvalidation(folder)
+        testForgedSnapshot(folder)
+    finally:
+        lcc.constants.SnapshotCacheFolder = None
+        lcc.constants.SnapshotKeyFile = savedKeyFile
+        shutil.rmtree(folder, ignore_errors=True)
+    print("Validation was successful")
+
+
+if __name__ == '__main__':
+    runTest()
@@ -0,0 +1,23 @@
+'''
+Helper that lets the NumPy engine tests run without ArcGIS Pro.
+
+Importing this module puts the ToolboxSource folder on the path so that ATtILA2 can be imported, and, when the real 
+arcpy site package is not available, puts the in-memory stand-in found in tests/fakearcpy on the path as well.
+
+'''
+import os
+import sys
+
+_testsDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_toolboxSourceDir = os.path.dirname(os.path.dirname(_testsDir))
+
+if _toolboxSourceDir not in sys.path:
+    sys.path.insert(0, _toolboxSourceDir)
+
+try:
+    import arcpy
+    usingFakeArcpy = hasattr(arcpy, 'registerRaster')
+except ImportError:
+    sys.path.insert(0, os.path.join(_testsDir, 'fakearcpy'))
+    import arcpy
+    usingFakeArcpy = True
@@ -0,0 +1,139 @@
+'''
+Test to evaluate the envelope sweep in polygons.findOverlaps against the pairwise comparison it replaced, the bounds on
+the envelopes and geometries it holds when streamed in chunks, and the groups of non overlapping polygons built by
+polygons.findNonOverlapGroups
+
+Runs without ArcGIS Pro by way of the fake arcpy package in tests/fakearcpy.
+'''
+
+import linuxSupport
+import numpy as np
+import arcpy
+import ATtILA2
+from ATtILA2.utils import polygons
+
+
+def pairwiseOverlaps(polyFc):
+    # the nested cursor comparison previously used by polygons.findOverlaps
+    overlapSet = set()
+    overlapDict = {}
+    rows = list(arcpy.SearchCursor(polyFc, '', '', 'Shape; OBJECTID'))
+    for row in rows:
+        for row2 in rows:
+            if (row2.Shape.overlaps(row.Shape) or row2.Shape.contains(row.Shape) and not row2.Shape.equals(row.Shape) or
+                row2.Shape.within(row.Shape) and not row2.Shape.equals(row.Shape)):
+                overlapSet.add(row.OBJECTID)
+                overlapSet.add(row2.OBJECTID)
+                overlapDict.setdefault(row.OBJECTID, []).append(row2.OBJECTID)
+    return overlapSet, overlapDict
+
+
+def testEnvelopePairs():
+    rng = np.random.RandomState(1)
+    mins = rng.rand(300, 2) * 100
+    envelopes = np.hstack([mins, mins + rng.rand(300, 2) * 8])
+    expected = set()
+    for i in range(len(envelopes)):
+        for j in range(i + 1, len(envelopes)):
+            a, b = envelopes[i], envelopes[j]
+            if a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]:
+                expected.add((i, j))
+
+    for chunkSize in (None, 1, 17, 1000):
+        firsts, seconds = polygons.findEnvelopePairs(envelopes, chunkSize)
+        assert set(zip(firsts.tolist(), seconds.tolist())) == expected
+        assert len(firsts) == len(expected)
+
+
+def testFindOverlaps():
+    arcpy.resetCatalog()
+    rng = np.random.RandomState(2)
+    boxes = []
+    for k in range(150):
+        x, y = rng.rand(2) * 200
+        w, h = rng.rand(2) * 15 + 1
+        boxes.append(arcpy.Box(x, y, x + w, y + h))
+    boxes.append(arcpy.Box(10, 10, 20, 20))
+    boxes.append(arcpy.Box(12, 12, 15, 15)) # nested
+    boxes.append(arcpy.Box(10, 10, 20, 20)) # duplicate geometry is not an overlap
+    boxes.append(arcpy.Box(20, 10, 30, 20)) # touching is not an overlap
+    arcpy.registerFeatureClass("samplePoints", ["OBJECTID", "Shape"], [(oid + 1, box) for oid, box in enumerate(boxes)])
+
+    expectedSet, expectedDict = pairwiseOverlaps("samplePoints")
+    assert expectedSet
+    for chunkSize in (None, 10):
+        overlapSet, oidFieldName, overlapDict = polygons.findOverlaps("samplePoints", chunkSize)
+        assert oidFieldName == "OBJECTID"
+        assert overlapSet == expectedSet
+        assert overlapDict == expectedDict
+        assert list(overlapDict.keys()) == list(expectedDict.keys())
+
+
+def testStreamedIndex():
+    # with a chunk size, the sweep and the geometry reads hold no more than a chunk of envelopes and pairs at a time
+    arcpy.resetCatalog()
+    rng = np.random.RandomState(4)
+    mins = rng.rand(500, 2) * 500
+    arcpy.registerFeatureClass("parcels", ["OBJECTID", "Shape"],
+                               [(oid + 1, arcpy.Box(x, y, x + w, y + h)) 
+                                for oid, ((x, y), (w, h)) in enumerate(zip(mins, rng.rand(500, 2) * 10 + 1))])
+    expected = polygons.findOverlaps("parcels", None)
+
+    sweptCounts = []
+    shapeCounts = []
+    findEnvelopePairs = polygons.findEnvelopePairs
+    readShapes = polygons._readShapes
+    def countEnvelopes(envelopes, chunkSize=None):
+        sweptCounts.append(len(envelopes))
+        return findEnvelopePairs(envelopes, chunkSize)
+    def countShapes(polyFc, oids):
+        shapeCounts.append(len(oids))
+        return readShapes(polyFc, oids)
+    polygons.findEnvelopePairs = countEnvelopes
+    polygons._readShapes = countShapes
+    try:
+        assert polygons.findOverlaps("parcels", 40) == expected
+    finally:
+        polygons.findEnvelopePairs = findEnvelopePairs
+        polygons._readShapes = readShapes
+
+    assert max(sweptCounts) <= 40 and sum(sweptCounts) >= 500
+    assert len(shapeCounts) > 1 and max(shapeCounts) <= 2 * 40
+
+
+def testNonOverlapGroups():
+    arcpy.resetCatalog()
+    rng = np.random.RandomState(3)
+    centers = rng.rand(400, 2) * 300
+    arcpy.registerFeatureClass("buffers", ["OBJECTID", "Shape"], 
+                               [(oid + 1, arcpy.Box(x - 12, y - 12, x + 12, y + 12)) for oid, (x, y) in enumerate(centers)])
+    overlapSet, oidFieldName, overlapDict = polygons.findOverlaps("buffers")
+    nonoverlapGroupDict = polygons.findNonOverlapGroups(overlapDict)
+
+    # every overlapping polygon is placed in exactly one group and no group holds two overlapping polygons
+    groupedOids = [oid for alist in nonoverlapGroupDict.values() for oid in alist]
+    assert sorted(groupedOids) == sorted(overlapSet)
+    for alist in nonoverlapGroupDict.values():
+        assert not any(set(alist) & set(overlapDict[oid]) for oid in alist)
+
+    # groups are numbered from 1 by decreasing size, and no more groups are used than a plain greedy coloring needs
+    sizes = [len(nonoverlapGroupDict[group]) for group in sorted(nonoverlapGroupDict)]
+    assert sorted(nonoverlapGroupDict) == list(range(1, len(sizes) + 1))
+    assert sizes == sorted(sizes, reverse=True)
+    assert len(sizes) <= max(len(neighbors) for neighbors in overlapDict.values()) + 1
+
+    # a triangle needs three groups, and a bipartite graph two
+    assert len(polygons.findNonOverlapGroups({1: [2, 3], 2: [1, 3], 3: [1, 2]})) == 3
+    assert len(polygons.findNonOverlapGroups({1: [4, 5], 2: [4, 5], 3: [5], 4: [1, 2], 5: [1, 2, 3]})) == 2
+
+
+def runTest():
+    testEnvelopePairs()
+    testFindOverlaps()
+    testStreamedIndex()
+    testNonOverlapGroups()
+    print("Validation was successful")
+
+
+if __name__ == '__main__':
+    runTest()
@@ -0,0 +1,148 @@
+'''
+Test to evaluate the worker pool used for the park loop of the Pedestrian Access and Availability tool, and the 
+batched SUM mosaic of the park rasters, and the running sum grid that can replace the mosaic
+
+Runs without ArcGIS Pro by way of the fake arcpy package in tests/fakearcpy.
+'''
+
+import linuxSupport
+import os
+import time
+import numpy as np
+import arcpy
+import ATtILA2
+from ATtILA2.utils import parallel
+from ATtILA2.utils import raster
+from ATtILA2.utils import sumgrid
+
+
+class countingProgress(object):
+    count = 0
+    def update(self):
+        self.count += 1
+
+
+def sleepyTask(task):
+    # tasks of very different sizes; returns the task and the worker that ran it
+    position, seconds = task
+    time.sleep(seconds)
+    return position, parallel.getWorkerNumber()
+
+
+def testRunTasks():
+    taskList = [(position, seconds) for position, seconds in enumerate([0.3, 0.01, 0.01, 0.2, 0.01, 0.01, 0.01, 0.01])]
+    for workerCount in (1, 3):
+        progress = countingProgress()
+        results = parallel.runTasks(sleepyTask, taskList, workerCount, progress=progress)
+        # results come back in task order whatever the completion order
+        assert [position for position, workerNumber in results] == list(range(len(taskList)))
+        assert progress.count == len(taskList)
+        workerNumbers = set(workerNumber for position, workerNumber in results)
+        if workerCount == 1:
+            assert workerNumbers == set([0])
+        else:
+            # the short tasks are taken by the workers not busy with the long ones
+            assert len(workerNumbers) > 1 and 0 not in workerNumbers
+
+    assert parallel.getWorkerCount(1) == 1
+    assert parallel.getWorkerCount(4) == 4
+    assert parallel.getWorkerCount(None) >= 1
+
+
+def testMosaicSumRasters():
+    arcpy.resetCatalog()
+    rng = np.random.RandomState(4)
+    parkRasters = []
+    expected = np.zeros((40, 40))
+    for parkID in range(1, 12):
+        row0, col0 = rng.randint(0, 30, size=2)
+        values = rng.rand(10, 10)
+        expected[row0:row0 + 10, col0:col0 + 10] += values
+        # rows count down from the top of the 40 x 40 cell extent
+        parkRasters.append(arcpy.registerRaster(f"paaa_Access_Id{parkID}", values, 10, col0 * 10, (30 - row0) * 10))
+    arcpy.registerRaster("corner", np.zeros((1, 1)), 10, 0, 0)
+    arcpy.registerRaster("farCorner", np.zeros((1, 1)), 10, 390, 390)
+    parkRasters += ["corner", "farCorner"]
+
+    for batchSize in (2, 5, 500):
+        raster.mosaicSumRasters(parkRasters, "", f"access{batchSize}", 10, batchSize, ["KeepIntermediates"])
+        assert np.allclose(arcpy.RasterToNumPyArray(f"access{batchSize}", nodata_to_value=0), expected)
+
+
+def testRunningSumGrid():
+    rng = np.random.RandomState(9)
+    grid = sumgrid.RunningSumGrid(100, 500, 10, 30, 25)
+    expected = np.full((30, 25), np.nan)
+    for i in range(40):
+        # arrays may hang over any edge of the grid and carry NoData cells
+        nr, nc = rng.randint(1, 12, size=2)
+        row0, col0 = rng.randint(-8, 35), rng.randint(-8, 30)
+        values = rng.rand(nr, nc)
+        values[rng.rand(nr, nc) < 0.2] = np.nan
+        onGrid = grid.add(values, 100 + col0 * 10, 500 - row0 * 10)
+
+        r0, r1, c0, c1 = max(row0, 0), min(row0 + nr, 30), max(col0, 0), min(col0 + nc, 25)
+        assert onGrid == (r0 < r1 and c0 < c1)
+        if onGrid:
+            part = values[r0 - row0:r1 - row0, c0 - col0:c1 - col0]
+            window = expected[r0:r1, c0:c1]
+            expected[r0:r1, c0:c1] = np.where(np.isnan(part), window, np.nan_to_num(window) + np.nan_to_num(part))
+
+    for tileSize in (7, 100):
+        result = np.full((30, 25), np.nan)
+        for row0, col0, tile in grid.iterTiles(tileSize):
+            assert not np.isnan(tile).all()
+            result[row0:row0 + tile.shape[0], col0:col0 + tile.shape[1]] = tile
+        assert np.array_equal(np.isnan(result), np.isnan(expected))
+        assert np.allclose(np.nan_to_num(result), np.nan_to_num(expected))
+
+    fileName = grid.fileName
+    grid.close()
+    assert not os.path.exists(fileName)
+
+
+def testSaveSumGrid():
+    arcpy.resetCatalog()
+    rng = np.random.RandomState(4)
+    expected = np.full((40, 40), np.nan)
+    arcpy.env.extent = arcpy.Extent(0, 0, 400, 400)
+    arcpy.env.cellSize = 10
+    sumGrid = raster.createSumGrid()
+    assert (sumGrid.nRows, sumGrid.nCols) == (40, 40)
+    for parkID in range(1, 12):
+        row0, col0 = rng.randint(0, 30, size=2)
+        values = rng.rand(10, 10)
+        window = expected[row0:row0 + 10, col0:col0 + 10]
+        expected[row0:row0 + 10, col0:col0 + 10] = np.nan_to_num(window) + values
+        raster.addRasterToSumGrid(arcpy.registerRaster(f"park{parkID}", values, 10, col0 * 10, (30 - row0) * 10), 
+                                  sumGrid)
+
+    for tileSize in (16, 8192):
+        outName = f"access{tileSize}"
+        tileCount = raster.saveSumGrid(sumGrid, outName, tileSize, ["KeepIntermediates"])
+        assert tileCount >= 1 and (tileSize < 40 or tileCount == 1)
+        # the tiles mosaicked into the output are deleted, even when the caller keeps its intermediates
+        assert not [name for name in arcpy._catalog if name.startswith(("xtile_", "xsum_"))]
+        result = arcpy.RasterToNumPyArray(outName, nodata_to_value=np.nan)
+        # the saved raster covers the tiles that hold data; place it on the 40 x 40 grid by its extent
+        extent = arcpy.Raster(outName).extent
+        row0, col0 = int(round((400 - extent.YMax) / 10)), int(round(extent.XMin / 10))
+        full = np.full((40, 40), np.nan)
+        full[row0:row0 + result.shape[0], col0:col0 + result.shape[1]] = result
+        assert np.array_equal(np.isnan(full), np.isnan(expected))
+        assert np.allclose(np.nan_to_num(full), np.nan_to_num(expected))
+
+    sumGrid.close()
+    arcpy.env.reset()
+
+
+def runTest():
+    testRunTasks()
+    testMosaicSumRasters()
+    testRunningSumGrid()
+    testSaveSumGrid()
+    print("Validation was successful")
+
+
+if __name__ == '__main__':
+    runTest()
@@ -0,0 +1,172 @@
+'''
+Test to evaluate the single pass NumPy patch metric engine against a per reporting unit calculation
+
+Runs without ArcGIS Pro by way of the fake arcpy package in tests/fakearcpy.
+'''
+
+import linuxSupport
+import numpy as np
+import arcpy
+import ATtILA2
+from ATtILA2.constants import globalConstants
+from ATtILA2.constants import pmConstants
+from ATtILA2.utils import calculate
+from ATtILA2.utils import vector
+from ATtILA2.datetimeutil import DateTimer
+
+
+def perUnitResults(oidGrid, zoneOids, patchGrid, cellArea, conversionFactor):
+    # the calculation getPatchNumbers performs on each reporting unit's TabulateArea table
+    inZone = np.isin(oidGrid, zoneOids) & (patchGrid != -1)
+    values, counts = np.unique(patchGrid[inZone], return_counts=True)
+    areas = dict(zip(values.tolist(), (counts * cellArea).tolist()))
+    otherArea = areas.pop(0, 0)
+    excludedArea = areas.pop(-9999, 0)
+    patchAreaList = list(areas.values())
+    if not patchAreaList:
+        return (0, 0, 0, 0, 0, 0, 0, otherArea, excludedArea)
+
+    numPatch = len(patchAreaList)
+    patchArea = sum(patchAreaList)
+    lrgPatch = max(patchAreaList)
+    patchDensity = numPatch / ((otherArea + patchArea) * (conversionFactor / 1000000))
+    return ((lrgPatch / patchArea) * 100, numPatch, patchArea / numPatch, np.median(patchAreaList), patchDensity,
+            lrgPatch, patchArea, otherArea, excludedArea)
+
+
+def testPatchResults():
+    arcpy.resetCatalog()
+    rng = np.random.RandomState(3)
+    patchGrid = rng.choice([0, 0, 0, -9999, 1, 2, 3, 4, 5, 6, 7], size=(150, 110))
+    patchGrid[:3, :] = -1 # NoData strip
+    oidGrid = np.full(patchGrid.shape, -1)
+    oidGrid[:70, :50] = 1
+    oidGrid[:70, 50:] = 2
+    oidGrid[70:, :] = 3
+    oidGrid[140:, :] = 4
+    patchGrid[140:, :] = rng.choice([0, -9999], size=(10, 110)) # unit D has data but no patches
+
+    arcpy.registerRaster("patch", patchGrid, cellSize=30, xMin=500, yMin=800, noData=-1)
+    # polygons 1 and 3 share the same reporting unit ID; unit E does not overlap the grid
+    arcpy.registerFeatureClass("ru", ["OBJECTID", "HUC"], [(1, "A"), (2, "B"), (3, "A"), (4, "D"), (5, "E")],
+                               zoneGrid=oidGrid, rasterName="patch")
+
+    zoneAreaDict = {"A": 1.0, "B": 2.0, "D": 3.0, "E": 4.0}
+    resultsDict = calculate.getPatchResultsFromGrid(zoneAreaDict, pmConstants, "ru", "HUC", "patch", 1.0)
+
+    expected = {"A": perUnitResults(oidGrid, [1, 3], patchGrid, 900.0, 1.0),
+                "B": perUnitResults(oidGrid, [2], patchGrid, 900.0, 1.0),
+                "D": perUnitResults(oidGrid, [4], patchGrid, 900.0, 1.0),
+                "E": (0, 0, 0, 0, 0, 0, 0, 0, 0)}
+    for aZone, areaValue in zoneAreaDict.items():
+        assert np.allclose(resultsDict[aZone][:9], expected[aZone]), aZone
+        assert resultsDict[aZone][9] == areaValue
+
+    assert expected["D"][1] == 0 and expected["D"][7] > 0
+    assert any("No patches found in D" in m for m in arcpy.GetMessages().splitlines())
+    assert any("No land cover grid data found in E" in m for m in arcpy.GetMessages().splitlines())
+
+
+def bruteForceMDCP(oidGrid, zoneOids, patchGrid, cellSize):
+    # mean over the patches in the reporting unit of the edge to edge distance to the closest other patch
+    inZone = np.isin(oidGrid, zoneOids) & (patchGrid > 0)
+    patchIds = np.unique(patchGrid[inZone])
+    if len(patchIds) == 0:
+        return "-9999,-9999,-9999"
+    if len(patchIds) == 1:
+        return "0,1,0"
+
+    cells = dict((i, np.argwhere(inZone & (patchGrid == i))) for i in patchIds)
+    distList = []
+    for i in patchIds:
+        others = np.vstack([cells[j] for j in patchIds if j != i])
+        dRow = np.abs(cells[i][:, 0][:, np.newaxis] - others[:, 0][np.newaxis, :])
+        dCol = np.abs(cells[i][:, 1][:, np.newaxis] - others[:, 1][np.newaxis, :])
+        distList.append(cellSize * np.hypot(np.maximum(dRow - 1, 0), np.maximum(dCol - 1, 0)).min())
+    return f"{len(patchIds)},0,{sum(distList) / len(distList)}"
+
+
+def testMDCP():
+    arcpy.resetCatalog()
+    rng = np.random.RandomState(11)
+    patchGrid = np.where(rng.rand(80, 60) < 0.2, rng.randint(1, 40, size=(80, 60)), 0)
+    patchGrid[rng.rand(80, 60) < 0.05] = -9999
+    patchGrid[70:, :] = 0
+    patchGrid[72:75, 20:30] = 41 # unit D holds a single patch
+    oidGrid = np.full(patchGrid.shape, -1)
+    oidGrid[:40, :] = 1
+    oidGrid[40:70, :30] = 2
+    oidGrid[40:70, 30:] = 3
+    oidGrid[70:, :] = 4
+
+    arcpy.registerRaster("patch", patchGrid, cellSize=30, xMin=0, yMin=0, noData=-1)
+    arcpy.registerFeatureClass("ru", ["OBJECTID", "HUC"], [(1, "A"), (2, "B"), (3, "A"), (4, "D"), (5, "E")],
+                               zoneGrid=oidGrid, rasterName="patch")
+
+    zoneAreaDict = {"A": 1.0, "B": 1.0, "D": 1.0, "E": 1.0}
+    mdcpBackend = globalConstants.mdcpBackend
+    globalConstants.mdcpBackend = globalConstants.numpyBackendName
+    try:
+        mdcpDict = vector.tabulateMDCP("patch", "ru", "HUC", None, None, None, None, zoneAreaDict, DateTimer(), None,
+                                       None)
+    finally:
+        globalConstants.mdcpBackend = mdcpBackend
+
+    expected = {"A": bruteForceMDCP(oidGrid, [1, 3], patchGrid, 30),
+                "B": bruteForceMDCP(oidGrid, [2], patchGrid, 30),
+                "D": "0,1,0",
+                "E": "-9999,-9999,-9999"}
+    for aZone in zoneAreaDict:
+        pwn, pwon, meanDist = mdcpDict[aZone].split(",")
+        expectedPwn, expectedPwon, expectedMean = expected[aZone].split(",")
+        assert (pwn, pwon) == (expectedPwn, expectedPwon), aZone
+        assert np.isclose(float(meanDist), float(expectedMean)), aZone
+
+
+def testMDCPSmallZones():
+    # zones with fewer edge cells than the first round of the search, whose closest cells lie in other zones
+    from ATtILA2.utils import patches
+    pwn, pwon, meanDist = patches.getMeanNearestPatchDistances([0, 0, 1, 1], [1, 2, 3, 4], [0.5, 10.5, 1.5, 1.5],
+                                                               [0.5, 0.5, 0.5, 5.5], 2, 1.0, 1.0)
+    assert pwn.tolist() == [2, 2] and pwon.tolist() == [0, 0]
+    assert meanDist.tolist() == [9.0, 4.0], meanDist
+
+    arcpy.resetCatalog()
+    rng = np.random.RandomState(5)
+    patchGrid = np.zeros((12, 40), dtype=int)
+    oidGrid = np.zeros(patchGrid.shape, dtype=int)
+    for zone in range(10):
+        oidGrid[:, zone * 4:zone * 4 + 4] = zone + 1
+        cells = rng.choice(48, size=rng.randint(2, 4), replace=False)
+        for patchValue, cell in enumerate(cells, 1):
+            patchGrid[cell // 4, zone * 4 + cell % 4] = patchValue
+
+    arcpy.registerRaster("patch", patchGrid, cellSize=30, xMin=0, yMin=0, noData=-1)
+    arcpy.registerFeatureClass("ru", ["OBJECTID", "HUC"], [(i, f"Z{i}") for i in range(1, 11)],
+                               zoneGrid=oidGrid, rasterName="patch")
+
+    zoneAreaDict = dict((f"Z{i}", 1.0) for i in range(1, 11))
+    mdcpBackend = globalConstants.mdcpBackend
+    globalConstants.mdcpBackend = globalConstants.numpyBackendName
+    try:
+        mdcpDict = vector.tabulateMDCP("patch", "ru", "HUC", None, None, None, None, zoneAreaDict, DateTimer(), None,
+                                       None)
+    finally:
+        globalConstants.mdcpBackend = mdcpBackend
+
+    for i in range(1, 11):
+        pwn, pwon, meanDist = mdcpDict[f"Z{i}"].split(",")
+        expectedPwn, expectedPwon, expectedMean = bruteForceMDCP(oidGrid, [i], patchGrid, 30).split(",")
+        assert (pwn, pwon) == (expectedPwn, expectedPwon), i
+        assert np.isclose(float(meanDist), float(expectedMean)), i
+
+
+def runTest():
+    testPatchResults()
+    testMDCP()
+    testMDCPSmallZones()
+    print("Validation was successful")
+
+
+if __name__ == '__main__':
+    runTest()
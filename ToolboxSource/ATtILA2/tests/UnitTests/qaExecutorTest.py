@@ -0,0 +1,94 @@
+'''
+Test to evaluate the QA parameter matrix executor in QA_Scripts/qaExecutor.py
+
+Runs a small parameter matrix with a stand-in for a QA script's runATtILA function, serially and in worker processes,
+and checks that duplicate combinations run once, that combinations differing only in cheap parameters run together in
+one worker, that each worker has its own scratch and output geodatabases, that the outputs of every worker reach the
+QA script's output geodatabase, and that failures are reported. Runs without ArcGIS Pro by way of the fake arcpy package
+in tests/fakearcpy.
+'''
+
+import linuxSupport
+import os
+import sys
+import csv
+import shutil
+import tempfile
+import arcpy
+import ATtILA2
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "QA_Scripts"))
+import qaExecutor
+
+
+testInputs = [{"inReportingUnitFeature": ["Blockgroups", "Watersheds"],
+               "inLandCoverGrid": ["NLCD_2016", "Broken"],
+               "optionalFieldGroups": ["", "QAFIELDS"]},
+              {"inReportingUnitFeature": ["Blockgroups"],
+               "inLandCoverGrid": ["NLCD_2016"],
+               "optionalFieldGroups": ["QAFIELDS"]}]
+
+
+def runATtILA(paramDict, iteration):
+    # records which scratch workspace ran each combination and writes an output file standing in for the output
+    # table; a "Broken" grid fails like a tool that raises
+    if paramDict["inLandCoverGrid"] == "Broken":
+        raise ValueError("no such land cover grid")
+    assert os.path.isdir(arcpy.env.scratchWorkspace)
+    outWorkspace = qaExecutor.getOutputWorkspace(paramDict["outGDB"])
+    assert outWorkspace != paramDict["outGDB"]
+    assert os.path.dirname(outWorkspace) == os.path.dirname(arcpy.env.scratchWorkspace)
+    with open(os.path.join(outWorkspace, f"LCP{iteration + 1}"), "w") as outTable:
+        outTable.write(str(iteration))
+    with open(paramDict["runsFile"], "a") as runs:
+        runs.write(f"{iteration} {arcpy.env.scratchWorkspace}\n")
+
+
+def runTest():
+    paramCombosList = qaExecutor.getParameterCombinations(testInputs)
+    assert len(paramCombosList) == 9
+
+    groups, duplicates = qaExecutor.getCombinationGroups(paramCombosList)
+    assert duplicates == {8: 1}, duplicates
+    assert sorted(len(group) for group in groups) == [2, 2, 2, 2]
+    for group in groups:
+        assert len(set(paramDict["inLandCoverGrid"] for iteration, paramDict in group)) == 1
+
+    for workerCount in [1, 2]:
+        outFolder = tempfile.mkdtemp()
+        try:
+            runsFile = os.path.join(outFolder, "runs.txt")
+            outGDB = arcpy.management.CreateFileGDB(outFolder, "LCP.gdb").getOutput(0)
+            for paramDict in paramCombosList:
+                paramDict["runsFile"] = runsFile
+                paramDict["outGDB"] = outGDB
+            failedList = qaExecutor.runParameterMatrix("QA", paramCombosList, runATtILA, outFolder, workerCount,
+                                                       outWorkspace=outGDB)
+
+            assert len(failedList) == 4
+            assert all(paramDict["inLandCoverGrid"] == "Broken" for paramDict in failedList)
+
+            ranBy = dict(line.split() for line in open(runsFile))
+            assert sorted(ranBy) == ["0", "1", "4", "5"], ranBy
+            assert ranBy["0"] == ranBy["1"] and ranBy["4"] == ranBy["5"]
+            if workerCount == 1:
+                assert len(set(ranBy.values())) == 1
+            assert not os.path.exists(os.path.join(outFolder, "QA_scratch"))
+            assert sorted(os.listdir(outGDB)) == ["LCP1", "LCP2", "LCP5", "LCP6"]
+            assert qaExecutor.getOutputWorkspace(outGDB) == outGDB
+
+            with open(os.path.join(outFolder, "QA_QA_report.csv")) as reportFile:
+                rows = list(csv.DictReader(reportFile))
+            assert [row["Status"] for row in rows] == ["Passed", "Passed", "Failed", "Failed", "Passed", "Passed",
+                                                       "Failed", "Failed", "Duplicate"]
+            assert rows[8]["DuplicateOf"] == "2"
+            assert "no such land cover grid" in rows[2]["Error"]
+            assert arcpy.env.scratchWorkspace is None
+        finally:
+            shutil.rmtree(outFolder)
+
+    print("Validation was successful")
+
+
+if __name__ == '__main__':
+    runTest()
@@ -0,0 +1,69 @@
+'''
+Test to evaluate the raster metadata service behind raster.getRasterValues
+
+Checks that the values and counts read from a raster attribute table match those counted block by block for a raster
+without one, and that repeated calls are served from memory. Runs without ArcGIS Pro by way of the fake arcpy package 
+in tests/fakearcpy.
+'''
+
+import linuxSupport
+import numpy as np
+import arcpy
+import ATtILA2
+from ATtILA2.constants import globalConstants
+from ATtILA2.utils import raster
+from ATtILA2.utils import zonalhist
+
+noDataValue = -9999
+
+
+def testValueCounts():
+    rng = np.random.RandomState(7)
+    landCover = rng.choice([11, 21, 41, 42, 82, noDataValue], size=(53, 71))
+    expected = dict((int(v), int((landCover == v).sum())) for v in np.unique(landCover) if v != noDataValue)
+
+    valueCounts = {}
+    for row0, col0, nr, nc in zonalhist.iterBlockWindows(53, 71, 16):
+        zonalhist.addValueCounts(valueCounts, landCover[row0:row0 + nr, col0:col0 + nc], noDataValue)
+    assert valueCounts == expected
+
+
+def testRasterMetadata():
+    rng = np.random.RandomState(11)
+    landCover = rng.choice([11, 21, 41, 42, 82, noDataValue], size=(53, 71))
+    arcpy.registerRaster("withRAT", landCover, 30.0, 1000.0, 2000.0, noDataValue)
+    arcpy.registerRaster("withoutRAT", landCover, 30.0, 1000.0, 2000.0, noDataValue, hasRAT=False)
+    raster.clearRasterMetadata()
+
+    originalBlockSize = globalConstants.numpyBlockSize
+    globalConstants.numpyBlockSize = 16
+    try:
+        fromRAT = raster.getRasterMetadata("withRAT")
+        fromBlocks = raster.getRasterMetadata("withoutRAT")
+    finally:
+        globalConstants.numpyBlockSize = originalBlockSize
+
+    assert fromRAT.values == fromBlocks.values == [11, 21, 41, 42, 82]
+    assert fromRAT.valueCounts == fromBlocks.valueCounts
+    assert (fromBlocks.nRows, fromBlocks.nCols, fromBlocks.cellSize) == (53, 71, 30.0)
+
+    # later callers share the first read and get lists of their own
+    assert raster.getRasterMetadata("withoutRAT") is fromBlocks
+    valuesList = raster.getRasterValues("withoutRAT")
+    valuesList.pop()
+    assert raster.getRasterValues("withoutRAT") == [11, 21, 41, 42, 82]
+
+    # a replaced raster with a different extent is read again
+    arcpy.registerRaster("withoutRAT", landCover[:20], 30.0, 1000.0, 2000.0, noDataValue, hasRAT=False)
+    assert raster.getRasterMetadata("withoutRAT") is not fromBlocks
+    raster.clearRasterMetadata()
+
+
+def runTest():
+    testValueCounts()
+    testRasterMetadata()
+    print("Validation was successful")
+
+
+if __name__ == '__main__':
+    runTest()
@@ -0,0 +1,94 @@
+'''
+Test of the import time of the ATtILA2 tool entry points
+
+Imports each tool script in ATtILA2/scripts, and the tool validators the way a tool dialog does, in a new Python process,
+and checks that the import takes no longer than its budget and does not import the packages that ATtILA2 imports on
+first use. The time of importing arcpy itself is not counted. Runs without ArcGIS Pro by way of the fake arcpy package
+in tests/fakearcpy.
+
+The budgets were set from imports measured with the fake arcpy; run with a factor to scale them, e.g., with ArcGIS Pro:
+
+python startupTest.py 3
+'''
+
+import linuxSupport
+import os
+import sys
+import json
+import subprocess
+
+# seconds allowed for importing a tool script (measured at about 0.03) and for the tool validators of a tool dialog
+# (measured at about 0.01); importing pandas with the utility modules alone took 0.2
+toolImportBudget = 0.1
+dialogImportBudget = 0.05
+
+# packages that ATtILA2 imports only when a tool needs them
+deferredPackages = ["pandas", "scipy", "pyarrow"]
+
+# scripts that are not tool entry points, that import packages of their own, or that read the tool parameters when
+# imported
+skippedScripts = ["CommScriptProcessing.py", "LaunchLccEditor.py", "RENAME-TO--ATtILA2.py--ON-DEPLOY.py",
+                  "IdentifyOverlappingPolygons_ArcGIS.py", "ProcessNHDforEnviroAtlasAnalyses.py"]
+
+# each import is timed this many times, in a new process each time, and the fastest is kept
+importRepeats = 2
+
+_unitTestsDir = os.path.dirname(os.path.abspath(__file__))
+_scriptsDir = os.path.join(os.path.dirname(os.path.dirname(_unitTestsDir)), "scripts")
+
+# code run in each new process; importing linuxSupport imports arcpy before the timing starts
+_timingCode = '''
+import sys, time, json, importlib.util
+sys.path.insert(0, {unitTestsDir!r})
+import linuxSupport
+start = time.perf_counter()
+{importCode}
+seconds = time.perf_counter() - start
+print(json.dumps([seconds, [name for name in {deferredPackages!r} if name in sys.modules]]))
+'''
+
+_scriptImportCode = '''
+spec = importlib.util.spec_from_file_location("toolScript", {scriptPath!r})
+spec.loader.exec_module(importlib.util.module_from_spec(spec))
+'''
+
+# the validator code pasted into each tool dialog imports ATtILA2 and subclasses one of its tool validators
+_dialogImportCode = '''
+import ATtILA2
+validators = [getattr(ATtILA2.ToolValidator, name) for name in dir(ATtILA2.ToolValidator) if name.endswith("ToolValidator")]
+'''
+
+
+def timeImport(importCode):
+    ''' Returns the fastest time of running *importCode* in a new process, and the deferred packages it imported '''
+    results = []
+    for i in range(importRepeats):
+        code = _timingCode.format(unitTestsDir=_unitTestsDir, importCode=importCode, deferredPackages=deferredPackages)
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    return min(results)
+
+
+def runTest(budgetFactor=1.0):
+    entryPoints = [("tool dialog validators", _dialogImportCode, dialogImportBudget)]
+    for scriptName in sorted(os.listdir(_scriptsDir)):
+        if scriptName.endswith(".py") and scriptName not in skippedScripts:
+            scriptCode = _scriptImportCode.format(scriptPath=os.path.join(_scriptsDir, scriptName))
+            entryPoints.append((scriptName, scriptCode, toolImportBudget))
+
+    failures = []
+    for name, importCode, budget in entryPoints:
+        seconds, importedPackages = timeImport(importCode)
+        print(f"{name:<50} {seconds:8.3f} seconds (budget {budget * budgetFactor:.3f})")
+        if seconds > budget * budgetFactor:
+            failures.append(f"{name} took {seconds:.3f} seconds to import, over its budget of "
+                            f"{budget * budgetFactor:.3f}")
+        if importedPackages:
+            failures.append(f"{name} imported {', '.join(importedPackages)}, which are to be imported on first use")
+    assert not failures, "\n".join(failures)
+
+    print("Validation was successful")
+
+
+if __name__ == '__main__':
+    runTest(*[float(a) for a in sys.argv[1:]])
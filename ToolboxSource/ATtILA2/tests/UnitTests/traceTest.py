@@ -0,0 +1,119 @@
+'''
+Test to evaluate the structured timing trace in utils.trace
+
+Runs the steps of a metricCalc and a few logged ArcPy calls with a trace file set, and checks that each step and each
+call run through log.arcpyLog or wrapped in a log.logArcpy block adds one Chrome trace complete event with its
+timing, processor time, peak memory and row counts, that nothing is recorded without a trace file or for calls only
+logged with log.logArcpy, and that the lines convert to a Chrome trace document. Runs without ArcGIS Pro by way of the fake arcpy package in tests/fakearcpy.
+'''
+
+import linuxSupport
+import os
+import json
+import time
+import shutil
+import tempfile
+import arcpy
+import ATtILA2
+from ATtILA2 import metric
+from ATtILA2.constants import metricConstants
+from ATtILA2.utils import log
+from ATtILA2.utils import trace
+
+
+class stepsCalc(metric.metricCalc):
+    # a metric calculation whose steps only touch the fake catalog
+    def __init__(self, inReportingUnitFeature, outTable):
+        self.inReportingUnitFeature = inReportingUnitFeature
+        self.outTable = outTable
+        self.metricConst = metricConstants.lcpConstants()
+        self.logFile = None
+
+    def _housekeeping(self):
+        time.sleep(0.02)
+
+    def _makeAttilaOutTable(self):
+        arcpy.registerTable(self.outTable, ["ID", "VALUE"], [(1, 0.0), (2, 0.0), (3, 0.0)])
+
+    def _makeTabAreaTable(self):
+        log.logArcpy("arcpy.sa.TabulateArea", (self.inReportingUnitFeature, "ID"), None)
+        with log.logArcpy("arcpy.management.Copy", (self.inReportingUnitFeature, self.outTable + "_copy"), None):
+            arcpy.management.Copy(self.inReportingUnitFeature, self.outTable + "_copy")
+
+    def _calculateMetrics(self):
+        sum(i * i for i in range(200000))
+        log.arcpyLog(arcpy.management.GetCount, (self.outTable,), "arcpy.management.GetCount", None)
+
+    def _summarizeOutTable(self):
+        raise RuntimeError("summary failed")
+
+
+def readEvents(traceFileName):
+    with open(traceFileName) as traceFile:
+        return [json.loads(line) for line in traceFile]
+
+
+def runTest():
+    folder = tempfile.mkdtemp()
+    traceFileName = os.path.join(folder, "trace.jsonl")
+    arcpy.registerFeatureClass("ReportingUnits", ["OBJECTID", "ID"], [(1, 1), (2, 2), (3, 3), (4, 4)])
+
+    try:
+        stepsCalc("ReportingUnits", "OutTable").run()
+    except RuntimeError:
+        pass
+    assert not os.path.exists(traceFileName), "nothing is recorded without a trace file"
+
+    trace.startTrace(traceFileName)
+    try:
+        try:
+            stepsCalc("ReportingUnits", "OutTable2").run()
+            raise AssertionError("the step's exception must be raised again")
+        except RuntimeError:
+            pass
+    finally:
+        trace.stopTrace()
+
+    events = readEvents(traceFileName)
+    names = [event["name"] for event in events]
+    assert names == ["_replaceLCGrid", "_replaceRUFeatures", "_housekeeping", "_makeAttilaOutTable",
+                     "arcpy.management.Copy", "_makeTabAreaTable", "arcpy.management.GetCount", "_calculateMetrics",
+                     "_summarizeOutTable"], names
+
+    for event in events:
+        assert event["ph"] == "X" and event["pid"] == os.getpid()
+        assert event["dur"] >= 0 and event["args"]["peakMemory"] > 0
+
+    steps = dict((event["name"], event) for event in events if event["cat"] == "metricCalc")
+    assert steps["_housekeeping"]["args"]["wallSeconds"] >= 0.02
+    assert steps["_calculateMetrics"]["args"]["cpuSeconds"] > 0
+    assert steps["_housekeeping"]["args"]["inputRows"] == [4]
+    assert steps["_housekeeping"]["args"]["outputRows"] == []
+    assert steps["_makeAttilaOutTable"]["args"]["outputRows"] == [3]
+    assert steps["_makeAttilaOutTable"]["args"]["tool"] == "lcp"
+    assert "summary failed" in steps["_summarizeOutTable"]["args"]["error"]
+
+    # calls run through arcpyLog are timed around the call itself, within their step
+    getCount = events[names.index("arcpy.management.GetCount")]
+    assert getCount["cat"] == "arcpy" and getCount["args"]["inputRows"] == [3]
+    step = steps["_calculateMetrics"]
+    # allow for the rounding of times to whole microseconds
+    assert step["ts"] <= getCount["ts"] + 1
+    assert getCount["ts"] + getCount["dur"] <= step["ts"] + step["dur"] + 2
+
+    # calls wrapped in logArcpy count the datasets that exist before the call as inputs and the others as outputs
+    copy = events[names.index("arcpy.management.Copy")]
+    assert copy["cat"] == "arcpy" and copy["args"]["inputRows"] == [4] and copy["args"]["outputRows"] == [4]
+    assert steps["_makeTabAreaTable"]["ts"] <= copy["ts"] + 1
+
+    chromeFileName = os.path.join(folder, "trace.json")
+    trace.convertToChromeTrace(traceFileName, chromeFileName)
+    with open(chromeFileName) as chromeFile:
+        assert json.load(chromeFile)["traceEvents"] == events
+    shutil.rmtree(folder)
+
+    print("Validation was successful")
+
+
+if __name__ == '__main__':
+    runTest()
@@ -0,0 +1,254 @@
+'''
+Test to evaluate the NumPy tabulate area backend against a brute force cell count
+
+Runs without ArcGIS Pro by way of the fake arcpy package in tests/fakearcpy.
+'''
+
+import linuxSupport
+import os
+import tempfile
+import types
+import numpy as np
+import arcpy
+import ATtILA2
+from ATtILA2.constants import globalConstants
+from ATtILA2.utils import raster
+from ATtILA2.utils import zonalhist
+from ATtILA2.utils import tabarea
+from ATtILA2.utils.tabarea import TabulateAreaTable
+
+
+def bruteForceAreas(zoneArray, valueArray, cellArea, noData):
+    areas = {}
+    for zone, value in zip(zoneArray.ravel(), valueArray.ravel()):
+        if zone < 0 or value == noData:
+            continue
+        areas[(int(zone), int(value))] = areas.get((int(zone), int(value)), 0) + cellArea
+    return areas
+
+
+def testHistogramKernel():
+    rng = np.random.RandomState(42)
+    zones = rng.randint(-1, 25, size=(301, 257))
+    values = rng.choice([0, 11, 21, 41, 42, 43, 81, 82, 255], size=zones.shape)
+
+    # page the land cover grid in from a memory-mapped file to mimic GeoTIFF tiles
+    mapPath = os.path.join(tempfile.mkdtemp(), 'landcover.npy')
+    np.save(mapPath, values)
+    mappedValues = np.load(mapPath, mmap_mode='r')
+
+    classValues, areaMatrix = zonalhist.tabulateArrays(zones, mappedValues, 25, 900.0, valueNoData=255, blockSize=64)
+    expected = bruteForceAreas(zones, values, 900.0, 255)
+
+    assert classValues == [0, 11, 21, 41, 42, 43, 81, 82]
+    for (zone, value), area in expected.items():
+        assert areaMatrix[zone, classValues.index(value)] == area
+    assert areaMatrix.sum() == sum(expected.values())
+
+
+def testTabulateAreaTable():
+    arcpy.resetCatalog()
+    rng = np.random.RandomState(7)
+    landCover = rng.choice([11, 21, 41, 42, 82], size=(120, 90))
+    landCover[:5, :] = 0 # NoData strip
+    oidGrid = np.full(landCover.shape, -1)
+    oidGrid[:60, :45] = 1
+    oidGrid[:60, 45:] = 2
+    oidGrid[60:, :] = 3
+
+    arcpy.registerRaster("lc", landCover, cellSize=30, xMin=1000, yMin=2000, noData=0)
+    # polygons 1 and 3 share the same reporting unit ID
+    arcpy.registerFeatureClass("ru", ["OBJECTID", "HUC"], [(1, "A"), (2, "B"), (3, "A")], zoneGrid=oidGrid,
+                               rasterName="lc")
+
+    class lccStub(object):
+        class values(object):
+            @staticmethod
+            def getExcludedValueIds():
+                return frozenset([11])
+
+    tabAreaTable = TabulateAreaTable("ru", "HUC", "lc", None, None, lccStub, globalConstants.numpyBackendName)
+    # rows share one tabAreaDict, so copy it as each row is read
+    rows = dict((row.zoneIdValue, dict(row.tabAreaDict)) for row in tabAreaTable)
+
+    zoneIndex = np.where(oidGrid == 2, 1, np.where(oidGrid >= 0, 0, -1))
+    expected = bruteForceAreas(zoneIndex, landCover, 900.0, 0)
+    for (zone, value), area in expected.items():
+        assert rows["AB"[zone]][value] == area
+
+    del tabAreaTable
+
+
+def testZoneRasterCache():
+    arcpy.resetCatalog()
+    oidGrid = np.repeat([[1, 2, 3]], 4, axis=0)
+    arcpy.registerRaster("lc", np.ones(oidGrid.shape), cellSize=30, xMin=1000, yMin=2000, noData=0)
+    arcpy.registerFeatureClass("ru", ["OBJECTID", "HUC"], [(1, "A"), (2, "B"), (3, "A")], zoneGrid=oidGrid,
+                               rasterName="lc")
+
+    rasterizeCalls = []
+    polygonToRaster = arcpy.conversion.PolygonToRaster
+    def countingPolygonToRaster(*args, **kwargs):
+        rasterizeCalls.append(args[2])
+        return polygonToRaster(*args, **kwargs)
+    arcpy.conversion.PolygonToRaster = countingPolygonToRaster
+
+    try:
+        zoneRaster, zoneIdList, oidZoneLookup = raster.getZoneRaster("ru", "HUC", 30)
+        assert zoneIdList == ["A", "B"] and oidZoneLookup.tolist() == [-1, 0, 1, 0]
+        assert raster.getZoneRaster("ru", "HUC", 30)[0] == zoneRaster
+        assert len(rasterizeCalls) == 1
+
+        # a new zone ID field reuses the raster; a new alignment or an edited feature class does not
+        assert raster.getZoneRaster("ru", "OBJECTID", 30)[1] == [1, 2, 3]
+        assert raster.getZoneRaster("ru", "HUC", 60)[0] != zoneRaster
+        arcpy.registerFeatureClass("ru", ["OBJECTID", "HUC"], [(1, "A"), (2, "B")], zoneGrid=np.minimum(oidGrid, 2),
+                                   rasterName="lc")
+        assert raster.getZoneRaster("ru", "HUC", 30)[0] != zoneRaster
+        assert len(rasterizeCalls) == 3
+
+        # layers of the same feature class with the same feature count but a different selection or definition 
+        # query get their own rasters
+        firstLayerKey = raster.getZoneRasterKey(arcpy.registerFeatureLayer("ruLayer1", "ru", [1]), 30)
+        secondLayerKey = raster.getZoneRasterKey(arcpy.registerFeatureLayer("ruLayer2", "ru", [2]), 30)
+        queryLayerKey = raster.getZoneRasterKey(arcpy.registerFeatureLayer("ruLayer3", "ru", [1], "HUC = 'A'"), 30)
+        assert len(set([firstLayerKey, secondLayerKey, queryLayerKey, raster.getZoneRasterKey("ru", 30)])) == 4
+        assert raster.getZoneRasterKey(arcpy.registerFeatureLayer("ruLayer4", "ru", [1]), 30) == firstLayerKey
+    finally:
+        arcpy.conversion.PolygonToRaster = polygonToRaster
+
+    def cachedRasters():
+        return sorted(name for name in arcpy._catalog if os.path.basename(name).startswith("xzone"))
+
+    # a rasterization that fails leaves neither a cached raster nor a partial one
+    def failingPolygonToRaster(*args, **kwargs):
+        polygonToRaster(*args, **kwargs)
+        raise arcpy.ExecuteError("cancelled")
+    arcpy.conversion.PolygonToRaster = failingPolygonToRaster
+    savedCache = cachedRasters()
+    try:
+        raster.getZoneRaster("ru", "HUC", 90)
+        assert False, "the failed rasterization was not reported"
+    except arcpy.ExecuteError:
+        pass
+    finally:
+        arcpy.conversion.PolygonToRaster = polygonToRaster
+    assert cachedRasters() == savedCache
+    zoneRaster = raster.getZoneRaster("ru", "HUC", 90)[0]
+    assert cachedRasters() == sorted(savedCache + [zoneRaster])
+
+    # a process that caches the same zone raster first wins, and the raster made here is deleted
+    def racingPolygonToRaster(inFeatures, valueField, outRaster, *args, **kwargs):
+        polygonToRaster(inFeatures, valueField, outRaster, *args, **kwargs)
+        cachedName = f"xzone_{raster.getZoneRasterKey(inFeatures, 120)}.tif"
+        arcpy.Copy_management(outRaster, os.path.join(os.path.dirname(outRaster), cachedName))
+    arcpy.conversion.PolygonToRaster = racingPolygonToRaster
+    try:
+        zoneRaster = raster.getZoneRaster("ru", "HUC", 120)[0]
+    finally:
+        arcpy.conversion.PolygonToRaster = polygonToRaster
+    assert arcpy.Exists(zoneRaster)
+    assert not [name for name in cachedRasters() if os.path.basename(name).startswith("xzonepart_")]
+
+    # the cache folder is emptied on request
+    cachedCount = len(cachedRasters())
+    assert cachedCount > 0 and raster.clearZoneRasterCache() == cachedCount
+    assert not cachedRasters()
+
+
+def testGridAlignment():
+    arcpy.resetCatalog()
+    oidGrid = np.repeat([[1, 2, 3]], 4, axis=0)
+    arcpy.registerRaster("lc", np.ones(oidGrid.shape), cellSize=30, xMin=1000, yMin=2000, noData=0)
+    arcpy.registerRaster("alignedSnap", np.ones((2, 2)), cellSize=30, xMin=1090, yMin=1940, noData=0)
+    arcpy.registerRaster("shiftedSnap", np.ones((2, 2)), cellSize=30, xMin=1015, yMin=2000, noData=0)
+    arcpy.registerRaster("coarseSnap", np.ones((2, 2)), cellSize=60, xMin=1000, yMin=2000, noData=0)
+    arcpy.registerFeatureClass("ru", ["OBJECTID", "HUC"], [(1, "A"), (2, "B"), (3, "A")], zoneGrid=oidGrid,
+                               rasterName="lc")
+    assert raster.isGridAligned("lc", "alignedSnap")
+    assert not raster.isGridAligned("lc", "shiftedSnap") and not raster.isGridAligned("lc", "coarseSnap")
+
+    # zones are rasterized on the cells of the raster they are read against, whatever the snap raster environment
+    snapRasters = []
+    polygonToRaster = arcpy.conversion.PolygonToRaster
+    def recordingPolygonToRaster(*args, **kwargs):
+        snapRasters.append(arcpy.env.snapRaster)
+        return polygonToRaster(*args, **kwargs)
+    arcpy.conversion.PolygonToRaster = recordingPolygonToRaster
+    try:
+        arcpy.env.snapRaster = "shiftedSnap"
+        zoneRaster = raster.getZoneRaster("ru", "HUC", 30, None, "lc")[0]
+        assert snapRasters == ["lc"] and arcpy.env.snapRaster == "shiftedSnap"
+        assert zoneRaster != raster.getZoneRaster("ru", "HUC", 30, None, "alignedSnap")[0]
+    finally:
+        arcpy.conversion.PolygonToRaster = polygonToRaster
+        arcpy.env.reset()
+
+    # TabulateArea is used where the NumPy backend would not match it: a mask, or a snap raster whose cells do not 
+    # line up with the land cover cells
+    tabAreaTable = types.SimpleNamespace(_inLandCoverGrid="lc", _logFile=None)
+    try:
+        for snapRaster, mask, supported in [(None, None, True), ("alignedSnap", None, True), 
+                                            ("shiftedSnap", None, False), ("coarseSnap", None, False), 
+                                            (None, "lc", False)]:
+            arcpy.env.snapRaster = snapRaster
+            arcpy.env.mask = mask
+            assert TabulateAreaTable._numpyBackendSupported(tabAreaTable) == supported, (snapRaster, mask)
+    finally:
+        arcpy.env.reset()
+
+
+def testSharedTabulations():
+    arcpy.resetCatalog()
+    rng = np.random.RandomState(3)
+    landCover = rng.choice([11, 21, 41], size=(40, 30))
+    oidGrid = np.where(np.arange(30) < 10, 1, 2)[np.newaxis, :].repeat(40, axis=0)
+    arcpy.registerRaster("lc", landCover, cellSize=30, xMin=1000, yMin=2000, noData=0)
+    arcpy.registerFeatureClass("ru", ["OBJECTID", "HUC"], [(1, "A"), (2, "B")], zoneGrid=oidGrid, rasterName="lc")
+
+    tabulations = []
+    createTabulation = TabulateAreaTable._createTabulation
+    def countingCreateTabulation(self):
+        tabulations.append(self._inReportingUnitFeature)
+        createTabulation(self)
+    TabulateAreaTable._createTabulation = countingCreateTabulation
+
+    def readRows(tabAreaTable):
+        return dict((row.zoneIdValue, dict(row.tabAreaDict)) for row in tabAreaTable)
+
+    try:
+        tabarea.startSharedTabulations()
+        try:
+            first = readRows(TabulateAreaTable("ru", "HUC", "lc", None, None, None, globalConstants.numpyBackendName))
+            second = readRows(TabulateAreaTable("ru", "HUC", "lc", None, None, None, globalConstants.numpyBackendName))
+            assert first == second and len(tabulations) == 1
+
+            # another zone ID field, or reporting units replaced under the same name, are tabulated again
+            readRows(TabulateAreaTable("ru", "OBJECTID", "lc", None, None, None, globalConstants.numpyBackendName))
+            arcpy.registerFeatureClass("ru", ["OBJECTID", "HUC"], [(1, "A")], zoneGrid=np.minimum(oidGrid, 1), 
+                                       rasterName="lc")
+            replaced = readRows(TabulateAreaTable("ru", "HUC", "lc", None, None, None, 
+                                                  globalConstants.numpyBackendName))
+            assert list(replaced) == ["A"] and len(tabulations) == 3
+        finally:
+            tabarea.stopSharedTabulations()
+
+        # outside of a suite every table is tabulated
+        readRows(TabulateAreaTable("ru", "HUC", "lc", None, None, None, globalConstants.numpyBackendName))
+        readRows(TabulateAreaTable("ru", "HUC", "lc", None, None, None, globalConstants.numpyBackendName))
+        assert len(tabulations) == 5
+    finally:
+        TabulateAreaTable._createTabulation = createTabulation
+
+
+def runTest():
+    testHistogramKernel()
+    testTabulateAreaTable()
+    testZoneRasterCache()
+    testGridAlignment()
+    testSharedTabulations()
+    print("Validation was successful")
+
+
+if __name__ == '__main__':
+    runTest()
@@ -3,68 +3,379 @@ Standalone ArcToolbox Script for comparing tables
 
 begins by comparing fields, then all table values, if no differences, then validation is successful.
 
+Both tables are read a chunk of rows at a time with arcpy.da search cursors and compared a column at a time with
+NumPy. Given an ID field, the rows of the two tables are matched on its values with a hash join; rows that find no match
+in the current chunk are carried over to the next one, so tables in the same or nearly the same order are compared in
+memory bounded by the chunk size. Without an ID field, rows are matched in table order, as before. Numeric values may
+differ by an absolute and a relative tolerance, set for all fields or field by field. Rather than stopping at the first
+difference, the comparison reports the number of differing rows in each field, the largest difference, and a few
+examples, along with any missing, extra, or duplicated rows. Duplicated IDs are found among the rows read but not yet
+matched, and against the IDs already matched. Since the tables are read sorted on the ID field, as geodatabase tables
+are read here, an ID already matched is only kept until a greater ID is read from the same table.
+
+Script tool parameters: reference table, test table, and optionally the ID field and the tolerances (see
+parseTolerances).
+
 Created September 2013
 
 @author: thultgren
 '''
 
+import itertools
+import numpy as np
 import arcpy
 
-def compare(refFile, testFile):
+# field types compared as numbers, with tolerances
+numericFieldTypes = ["OID", "SmallInteger", "Integer", "BigInteger", "Single", "Double"]
+
+# field types that are not compared
+skippedFieldTypes = ["Geometry", "Blob", "Raster"]
+
+# number of rows read from each table at a time
+defaultChunkSize = 100000
+
+# number of example differences reported for each field and for missing or extra rows
+defaultExampleCount = 5
+
+# message returned when the tables match
+successMessage = "Table validation was successful"
+
+
+def parseTolerances(toleranceText):
+    ''' Returns a dictionary of upper case field name: (absolute tolerance, relative tolerance) from text such as
+        "0.001" or "pfor 0.05 0;H 0 1e-6;* 1e-9 0", where "*" or a lone pair of numbers applies to all other fields and
+        a single number is an absolute tolerance '''
+    tolerances = {}
+    for item in toleranceText.replace(",", ";").split(";"):
+        parts = item.split()
+        if not parts:
+            continue
+        try:
+            float(parts[0])
+            parts = ["*"] + parts
+        except ValueError:
+            pass
+        absoluteTolerance = float(parts[1]) if len(parts) > 1 else 0.0
+        relativeTolerance = float(parts[2]) if len(parts) > 2 else 0.0
+        tolerances[parts[0].upper()] = (absoluteTolerance, relativeTolerance)
+    return tolerances
+
+
+class FieldDifferences(object):
+    ''' Differences found in one field: the number of differing rows, the largest numeric difference, and examples of
+        (row, expected, actual) '''
+
+    def __init__(self, fieldName):
+        self.fieldName = fieldName
+        self.count = 0
+        self.largestDifference = None
+        self.examples = []
+
+
+class TableDifferences(object):
+    ''' Result of getTableDifferences; str() gives the summary returned by compare '''
+
+    def __init__(self, rowLabel):
+        self.rowLabel = rowLabel
+        self.missingFields = []
+        self.extraFields = []
+        self.refRowCount = 0
+        self.testRowCount = 0
+        self.matchedRowCount = 0
+        self.differentRowCount = 0
+        self.fieldDifferences = {}
+        self.missingRowCount = 0
+        self.missingRows = []
+        self.extraRowCount = 0
+        self.extraRows = []
+        self.duplicateRowCount = 0
+        self.duplicateRows = []
+
+    def isEqual(self):
+        return not (self.missingFields or self.extraFields or self.differentRowCount or self.missingRowCount or
+                    self.extraRowCount or self.duplicateRowCount)
+
+    def __str__(self):
+        if self.missingFields or self.extraFields:
+            message = "Validation failed, "
+            if self.missingFields:
+                message += "The test table was missing these fields (" + ", ".join(self.missingFields) + ")\n"
+            if self.extraFields:
+                message += "The test table had these extra fields (" +  ", ".join(self.extraFields) + ")"
+            return message
+        if self.isEqual():
+            return successMessage
+
+        lines = [f"Validation failed, {self.differentRowCount:,} of {self.matchedRowCount:,} matched rows differ "
+                 f"({self.refRowCount:,} reference rows, {self.testRowCount:,} test rows)"]
+        for fieldDifferences in self.fieldDifferences.values():
+            line = f"  {fieldDifferences.fieldName}: {fieldDifferences.count:,} rows differ"
+            if fieldDifferences.largestDifference is not None:
+                line += f", largest difference {fieldDifferences.largestDifference:g}"
+            examples = [f"{self.rowLabel} {label}: expected {expected!r}, actual {actual!r}"
+                        for label, expected, actual in fieldDifferences.examples]
+            lines.append(line + "; e.g. " + "; ".join(examples))
+        for description, count, labels in [("missing from the test table", self.missingRowCount, self.missingRows),
+                                           ("extra in the test table", self.extraRowCount, self.extraRows),
+                                           ("duplicated", self.duplicateRowCount, self.duplicateRows)]:
+            if count:
+                lines.append(f"  {count:,} rows {description}; e.g. {self.rowLabel} " +
+                             ", ".join(repr(label) for label in labels))
+        return "\n".join(lines)
+
+
+class _Chunk(object):
+    ''' Rows held as columns: the join keys, the labels used to report each row, and the values of each field '''
+
+    def __init__(self, keys, labels, columns):
+        self.keys = keys
+        self.labels = labels
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.keys)
+
+    def take(self, indexes):
+        return _Chunk(self.keys[indexes], self.labels[indexes], [column[indexes] for column in self.columns])
+
+    def extend(self, chunk):
+        if chunk is None or not len(chunk):
+            return self
+        if not len(self):
+            return chunk
+        return _Chunk(np.concatenate([self.keys, chunk.keys]), np.concatenate([self.labels, chunk.labels]),
+                      [np.concatenate(columns) for columns in zip(self.columns, chunk.columns)])
+
+
+def _readChunks(table, fieldNames, numericFields, keyField, labelField, chunkSize):
+    ''' Yields the rows of *table* as _Chunks of up to *chunkSize* rows; without a *keyField*, rows are keyed by their
+        position in the table '''
+    readFields = list(fieldNames) + [f for f in (keyField, labelField) if f and f not in fieldNames]
+    sqlClause = (None, f"ORDER BY {keyField}") if keyField else (None, None)
+    position = 0
+    with arcpy.da.SearchCursor(table, readFields, sql_clause=sqlClause) as cursor:
+        while True:
+            rows = list(itertools.islice(cursor, chunkSize))
+            if not rows:
+                return
+            rowColumns = list(zip(*rows))
+            # None becomes NaN in floating point arrays
+            columns = [np.array(rowColumns[i], dtype=np.float64 if fieldName in numericFields else object)
+                       for i, fieldName in enumerate(fieldNames)]
+            if keyField:
+                keys = np.array(rowColumns[readFields.index(keyField)], dtype=object)
+            else:
+                keys = np.arange(position, position + len(rows))
+            # rows are reported by *labelField*, or by row number in tables without an object ID
+            if labelField:
+                labels = np.array(rowColumns[readFields.index(labelField)], dtype=object)
+            else:
+                labels = np.arange(position + 1, position + len(rows) + 1).astype(object)
+            position += len(rows)
+            yield _Chunk(keys, labels, columns)
+
+
+def _dropDuplicates(chunk, matchedKeys, differences, exampleCount):
+    ''' Returns *chunk* without the rows whose key was seen earlier in it or is in *matchedKeys*, the keys of rows
+        already matched; those rows are added to the duplicated rows '''
+    seen = set()
+    duplicates = np.zeros(len(chunk), dtype=bool)
+    for i, key in enumerate(chunk.keys.tolist()):
+        duplicates[i] = key in seen or key in matchedKeys
+        seen.add(key)
+    if not duplicates.any():
+        return chunk
+    _addRows("duplicateRowCount", "duplicateRows", differences, chunk.labels[duplicates], exampleCount)
+    return chunk.take(np.flatnonzero(~duplicates))
+
+
+def _pruneMatchedKeys(matchedKeys, lastKey):
+    ''' Returns the matched keys a table read in key order can still repeat after reading *lastKey*: those not less
+        than it, along with any that cannot be ordered against it '''
+    keptKeys = set()
+    for key in matchedKeys:
+        try:
+            if key < lastKey:
+                continue
+        except TypeError:
+            pass
+        keptKeys.add(key)
+    return keptKeys
+
+
+def _joinOnKeys(refKeys, testKeys):
+    ''' Hash join of two key arrays without duplicates; returns the indexes of the matching reference and test rows '''
+    testPositions = dict(zip(testKeys.tolist(), range(len(testKeys))))
+    testIndexes = np.fromiter((testPositions.get(key, -1) for key in refKeys.tolist()), dtype=np.int64,
+                              count=len(refKeys))
+    refIndexes = np.flatnonzero(testIndexes >= 0)
+    return refIndexes, testIndexes[refIndexes]
+
+
+def _compareColumns(differences, fieldNames, numericFields, tolerances, refChunk, testChunk, exampleCount):
+    ''' Adds the differences between the values of matched rows, given as two _Chunks in matching order '''
+    defaultTolerance = tolerances.get("*", (0.0, 0.0))
+    rowDiffers = np.zeros(len(refChunk), dtype=bool)
+    for fieldName, refValues, testValues in zip(fieldNames, refChunk.columns, testChunk.columns):
+        largestDifference = None
+        if fieldName in numericFields:
+            absoluteTolerance, relativeTolerance = tolerances.get(fieldName.upper(), defaultTolerance)
+            # nulls (NaN) match only nulls; other values match within absoluteTolerance + relativeTolerance * |expected|
+            differs = ~np.isclose(testValues, refValues, rtol=relativeTolerance, atol=absoluteTolerance,
+                                  equal_nan=True)
+            if differs.any():
+                valueDifferences = np.abs(testValues[differs] - refValues[differs])
+                valueDifferences = valueDifferences[np.isfinite(valueDifferences)]
+                if len(valueDifferences):
+                    largestDifference = valueDifferences.max().item()
+        else:
+            differs = np.asarray(refValues != testValues, dtype=bool)
+        if not differs.any():
+            continue
+
+        rowDiffers |= differs
+        fieldDifferences = differences.fieldDifferences.setdefault(fieldName, FieldDifferences(fieldName))
+        fieldDifferences.count += int(differs.sum())
+        if largestDifference is not None:
+            fieldDifferences.largestDifference = max(largestDifference, fieldDifferences.largestDifference or 0.0)
+        for i in np.flatnonzero(differs)[:exampleCount - len(fieldDifferences.examples)]:
+            expected, actual = refValues[i], testValues[i]
+            if fieldName in numericFields:
+                expected = None if np.isnan(expected) else expected.item()
+                actual = None if np.isnan(actual) else actual.item()
+            fieldDifferences.examples.append((refChunk.labels[i], expected, actual))
+    differences.differentRowCount += int(rowDiffers.sum())
+
+
+def _addRows(countName, examplesName, differences, labels, exampleCount):
+    setattr(differences, countName, getattr(differences, countName) + len(labels))
+    examples = getattr(differences, examplesName)
+    examples.extend(labels[:exampleCount - len(examples)].tolist())
+
+
+def getTableDifferences(refFile, testFile, idField=None, tolerances=None, chunkSize=defaultChunkSize,
+                        exampleCount=defaultExampleCount):
+    ''' Returns the TableDifferences between a reference table and a test table
+
+    **Arguments:**
+
+        * *refFile* - reference table
+        * *testFile* - table to check against the reference table
+        * *idField* - field whose values match the rows of the two tables, or None to match rows in table order
+        * *tolerances* - dictionary of upper case field name: (absolute tolerance, relative tolerance) for numeric
+                        fields, with "*" for all other fields (see parseTolerances); by default values must be equal
+        * *chunkSize* - number of rows read from each table at a time
+        * *exampleCount* - number of examples kept for each kind of difference
+
+    **Returns:**
+
+        * TableDifferences
+
+    '''
+    tolerances = tolerances or {}
     refDesc = arcpy.Describe(refFile)
+    refFields = [f for f in arcpy.ListFields(refFile) if f.type not in skippedFieldTypes]
+    testFields = dict((f.name.upper(), f) for f in arcpy.ListFields(testFile) if f.type not in skippedFieldTypes)
+    refFieldNames = [f.name for f in refFields]
+
+    differences = TableDifferences(idField or refDesc.OIDFieldName or "row")
+    differences.missingFields = [f.name for f in refFields if f.name.upper() not in testFields]
+    differences.extraFields = [f.name for f in testFields.values()
+                               if f.name.upper() not in [name.upper() for name in refFieldNames]]
+    if differences.missingFields or differences.extraFields:
+        return differences
+
+    # when rows are matched on an ID field, neither it nor the object ID is compared
+    skipFields = [idField.upper()] if idField else []
+    if idField and refDesc.OIDFieldName:
+        skipFields.append(refDesc.OIDFieldName.upper())
+    compareFields = [f for f in refFields if f.name.upper() not in skipFields]
+    numericFields = set(f.name for f in compareFields if f.type in numericFieldTypes and
+                        testFields[f.name.upper()].type in numericFieldTypes)
+    refFieldNames = [f.name for f in compareFields]
+    testFieldNames = [testFields[name.upper()].name for name in refFieldNames]
+    testNumericFields = set(testFields[name.upper()].name for name in numericFields)
+
+    refLabelField = idField or refDesc.OIDFieldName
     testDesc = arcpy.Describe(testFile)
-    refFieldNames = [x.name for x in refDesc.fields]
-    testFieldNames = [x.name for x in testDesc.fields]
-    extraFields = [x for x in testFieldNames if x not in refFieldNames]
-    missingFields = [y for y in refFieldNames if y not in testFieldNames]
-    # Test to see if all the fields match
-    if missingFields or extraFields:
-        message = "Validation failed, "
-        if missingFields: 
-            message += "The test table was missing these fields (" + ", ".join(missingFields) + ")\n"
-        if extraFields:
-            message += "The test table had these extra fields (" +  ", ".join(extraFields) + ")"
-        return message
-    else:
-        refCur = arcpy.SearchCursor(refFile)
-        testCur = arcpy.SearchCursor(testFile)
-        # Start testing table values, break on first difference
-        for refRow in refCur:
-            testRow = testCur.next()
-            for field in refDesc.fields:
-                if not refRow.getValue(field.name) == testRow.getValue(field.name):
-                    return "Validation failed, an error was found in row: " + \
-                        str(refRow.getValue(refDesc.OIDFieldName)) + ", column: " + field.name + \
-                        "Expected: " + str(refRow.getValue(field.name)) + ", actual: " + \
-                        str(testRow.getValue(field.name))
-     
-    return "Table validation was successful"    
+    testKeyField = testFields[idField.upper()].name if idField else None
+    refChunks = _readChunks(refFile, refFieldNames, numericFields, idField, refLabelField, chunkSize)
+    testChunks = _readChunks(testFile, testFieldNames, testNumericFields, testKeyField,
+                             testKeyField or testDesc.OIDFieldName, chunkSize)
+
+    refPending = testPending = _Chunk(np.array([]), np.array([]), [])
+    refMatchedKeys = set()
+    testMatchedKeys = set()
+    for refChunk, testChunk in itertools.zip_longest(refChunks, testChunks):
+        differences.refRowCount += len(refChunk) if refChunk is not None else 0
+        differences.testRowCount += len(testChunk) if testChunk is not None else 0
+        refPending = refPending.extend(refChunk)
+        testPending = testPending.extend(testChunk)
+
+        refPending = _dropDuplicates(refPending, refMatchedKeys, differences, exampleCount)
+        testPending = _dropDuplicates(testPending, testMatchedKeys, differences, exampleCount)
+
+        refIndexes, testIndexes = _joinOnKeys(refPending.keys, testPending.keys)
+        if len(refIndexes):
+            differences.matchedRowCount += len(refIndexes)
+            _compareColumns(differences, refFieldNames, numericFields, tolerances, refPending.take(refIndexes),
+                            testPending.take(testIndexes), exampleCount)
+
+        # a later row with a matched key is a duplicate; in key order, only keys not yet passed can still repeat
+        matchedKeys = refPending.keys[refIndexes].tolist()
+        refMatchedKeys.update(matchedKeys)
+        testMatchedKeys.update(matchedKeys)
+        if refChunk is not None and len(refChunk):
+            refMatchedKeys = _pruneMatchedKeys(refMatchedKeys, refChunk.keys[-1])
+        if testChunk is not None and len(testChunk):
+            testMatchedKeys = _pruneMatchedKeys(testMatchedKeys, testChunk.keys[-1])
+
+        # rows without a match so far wait for the next chunk
+        refUnmatched = np.ones(len(refPending), dtype=bool)
+        refUnmatched[refIndexes] = False
+        testUnmatched = np.ones(len(testPending), dtype=bool)
+        testUnmatched[testIndexes] = False
+        refPending = refPending.take(np.flatnonzero(refUnmatched))
+        testPending = testPending.take(np.flatnonzero(testUnmatched))
+
+    _addRows("missingRowCount", "missingRows", differences, refPending.labels, exampleCount)
+    _addRows("extraRowCount", "extraRows", differences, testPending.labels, exampleCount)
+    return differences
+
+
+def compare(refFile, testFile, idField=None, tolerances=None, chunkSize=defaultChunkSize):
+    ''' Returns a summary of the differences between two tables, or "Table validation was successful" (see
+        getTableDifferences) '''
+    return str(getTableDifferences(refFile, testFile, idField, tolerances, chunkSize))
+
 
 if __name__ == '__main__':
-    
+
     refFile = arcpy.GetParameterAsText(0)
-    testFile = arcpy.GetParameterAsText(1)  
-    
+    testFile = arcpy.GetParameterAsText(1)
+    idField = arcpy.GetParameterAsText(2) if arcpy.GetArgumentCount() > 2 else ""
+    toleranceText = arcpy.GetParameterAsText(3) if arcpy.GetArgumentCount() > 3 else ""
+
     try:
-      
-        arcpy.AddMessage(compare(refFile, testFile))
+
+        arcpy.AddMessage(compare(refFile, testFile, idField or None, parseTolerances(toleranceText)))
 
     except arcpy.ExecuteError:
         arcpy.AddError(arcpy.GetMessages(2))
-        
-    except Exception, e:
+
+    except Exception as e:
         # get the traceback object
         import sys
         import traceback
         tb = sys.exc_info()[2]
         tbinfo = traceback.format_tb(tb)[0]
-        
+
         # Concatenate information together concerning the error into a message string
-        
+
         pymsg = "PYTHON ERRORS:\nTraceback info:\n" + tbinfo + "\nError Info:\n" + str(sys.exc_info()[1])
         msgs = "ArcPy ERRORS:\n" + arcpy.GetMessages(2) + "\n"
-    
+
         # Return python error messages for use in script tool
-        
+
         arcpy.AddError(pymsg)
-        arcpy.AddError(msgs)               
\ No newline at end of file
+        arcpy.AddError(msgs)
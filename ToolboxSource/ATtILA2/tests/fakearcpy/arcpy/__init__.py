@@ -0,0 +1,898 @@
+''' In-memory stand-in for the arcpy site package
+
+    Only the calls exercised by the ATtILA2 NumPy engines are implemented. Datasets are kept in the module level
+    *_catalog* dictionary keyed by name; use registerRaster, registerFeatureClass and registerTable to populate it.
+    Every other arcpy name resolves to a placeholder that raises NotImplementedError when it is called.
+
+'''
+import os
+import copy
+import sys
+import glob
+import types
+import shutil
+import itertools
+import tempfile
+
+import numpy as np
+
+
+_catalog = {}
+_messages = []
+_unimplementedCalls = []
+_scratchCounter = itertools.count()
+
+
+class _Placeholder(object):
+    """ Stand-in for an arcpy object or function that is not implemented in the fake package """
+
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return _Placeholder(self._name + '.' + name)
+
+    def __call__(self, *args, **kwargs):
+        # kept, since callers may catch the error and go on (e.g., to report an empty result)
+        _unimplementedCalls.append(self._name)
+        raise NotImplementedError("fake arcpy does not implement %s" % self._name)
+
+
+def __getattr__(name):
+    if name.startswith('__'):
+        raise AttributeError(name)
+    return _Placeholder('arcpy.' + name)
+
+
+class _FakeModule(types.ModuleType):
+    """ Submodule that falls back to placeholders for names it does not define """
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return _Placeholder(self.__name__ + '.' + name)
+
+
+def _submodule(name):
+    module = _FakeModule('arcpy.' + name)
+    sys.modules['arcpy.' + name] = module
+    return module
+
+
+class ExecuteError(Exception):
+    """ Raised by the fake geoprocessing functions for invalid inputs """
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# geometry helpers
+# ---------------------------------------------------------------------------------------------------------------------
+
+class Point(object):
+    def __init__(self, X=0.0, Y=0.0):
+        self.X = X
+        self.Y = Y
+
+
+class Extent(object):
+    def __init__(self, XMin=0.0, YMin=0.0, XMax=0.0, YMax=0.0):
+        self.XMin = XMin
+        self.YMin = YMin
+        self.XMax = XMax
+        self.YMax = YMax
+
+    @property
+    def width(self):
+        return self.XMax - self.XMin
+
+    @property
+    def height(self):
+        return self.YMax - self.YMin
+
+
+class Box(object):
+    """ Axis aligned rectangle standing in for a polygon geometry (e.g., in the Shape field of a feature class) """
+
+    def __init__(self, XMin, YMin, XMax, YMax):
+        self.extent = Extent(XMin, YMin, XMax, YMax)
+        self.area = (XMax - XMin) * (YMax - YMin)
+
+    def _bounds(self):
+        e = self.extent
+        return e.XMin, e.YMin, e.XMax, e.YMax
+
+    def equals(self, other):
+        return self._bounds() == other._bounds()
+
+    def contains(self, other):
+        a, b = self._bounds(), other._bounds()
+        return a[0] <= b[0] and a[1] <= b[1] and b[2] <= a[2] and b[3] <= a[3]
+
+    def within(self, other):
+        return other.contains(self)
+
+    def overlaps(self, other):
+        a, b = self._bounds(), other._bounds()
+        interiorsMeet = a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+        return interiorsMeet and not self.contains(other) and not other.contains(self)
+
+
+class SpatialReference(object):
+    def __init__(self, code=None, name="Fake_Projected", linearUnitName="Meter", text=None):
+        self.factoryCode = code
+        self.name = name
+        self.linearUnitName = linearUnitName
+        self.type = "Projected"
+
+    def exportToString(self):
+        return self.name
+
+
+class _Env(object):
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.workspace = None
+        self.scratchWorkspace = None
+        self.scratchFolder = tempfile.gettempdir()
+        self.snapRaster = None
+        self.cellSize = None
+        self.extent = None
+        self.mask = None
+        self.overwriteOutput = True
+        self.outputCoordinateSystem = None
+        self.outputMFlag = None
+        self.outputZFlag = None
+        self.parallelProcessingFactor = None
+
+
+env = _Env()
+
+
+class EnvManager(object):
+    """ Sets environments for the duration of a with block """
+
+    def __init__(self, **environments):
+        self._environments = environments
+        self._saved = {}
+
+    def __enter__(self):
+        for name, value in self._environments.items():
+            self._saved[name] = getattr(env, name)
+            setattr(env, name, value)
+        return self
+
+    def __exit__(self, *args):
+        for name, value in self._saved.items():
+            setattr(env, name, value)
+        return False
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# catalog
+# ---------------------------------------------------------------------------------------------------------------------
+
+class Field(object):
+    def __init__(self, name="", type="Double", length=8, precision=0, scale=0, aliasName=None):
+        self.name = name
+        self.type = type
+        self.length = length
+        self.precision = precision
+        self.scale = scale
+        self.aliasName = aliasName or name
+        self.isNullable = True
+        self.required = False
+        self.domain = ""
+
+
+class _FakeRaster(object):
+    """ Raster dataset backed by a 2D NumPy array with the first row at the top of the extent """
+
+    def __init__(self, name, array, cellSize, xMin, yMin, noData=None, hasRAT=True):
+        self.name = name
+        self.hasRAT = hasRAT
+        self.catalogPath = name
+        self.array = np.asarray(array)
+        self.cellSize = float(cellSize)
+        self.xMin = float(xMin)
+        self.yMin = float(yMin)
+        self.noData = noData
+
+    @property
+    def extent(self):
+        nRows, nCols = self.array.shape
+        return Extent(self.xMin, self.yMin, self.xMin + nCols * self.cellSize, self.yMin + nRows * self.cellSize)
+
+    def values(self):
+        data = self.array if self.noData is None else self.array[self.array != self.noData]
+        return [int(v) for v in np.unique(data)]
+
+    def valueCounts(self):
+        data = self.array if self.noData is None else self.array[self.array != self.noData]
+        values, counts = np.unique(data, return_counts=True)
+        return [(int(v), int(c)) for v, c in zip(values, counts)]
+
+
+class _FakeTable(object):
+    """ Table or feature class held as a list of tuples in *fieldNames* order """
+
+    def __init__(self, name, fieldNames, rows, fieldTypes=None, oidField=None):
+        self.name = name
+        self.catalogPath = name
+        self.fieldNames = list(fieldNames)
+        self.rows = [tuple(r) for r in rows]
+        self.fieldTypes = fieldTypes or {}
+        self.oidField = oidField
+        self.zoneGrid = None
+        self.rasterName = None
+        self.isTable = oidField is None
+        self.shapeType = "Polygon"
+        self.spatialReference = SpatialReference()
+
+    def fields(self):
+        fieldList = []
+        for name in self.fieldNames:
+            if name == self.oidField:
+                fieldType = "OID"
+            else:
+                fieldType = self.fieldTypes.get(name) or self._guessType(name)
+            fieldList.append(Field(name, fieldType))
+        return fieldList
+
+    def _guessType(self, name):
+        idx = self.fieldNames.index(name)
+        for r in self.rows:
+            if r[idx] is None:
+                continue
+            if isinstance(r[idx], str):
+                return "String"
+            if isinstance(r[idx], (int, np.integer)):
+                return "Integer"
+            return "Double"
+        return "Double"
+
+    def columnIndex(self, fieldName):
+        if fieldName == "OID@":
+            fieldName = self.oidField
+        elif fieldName == "SHAPE@":
+            fieldName = "Shape"
+        for i, name in enumerate(self.fieldNames):
+            if name.upper() == fieldName.upper():
+                return i
+        raise ExecuteError("Field %s does not exist in %s" % (fieldName, self.name))
+
+
+def registerRaster(name, array, cellSize=1.0, xMin=0.0, yMin=0.0, noData=None, hasRAT=True):
+    """ Adds a raster dataset to the in-memory catalog and returns its name """
+    _catalog[name] = _FakeRaster(name, array, cellSize, xMin, yMin, noData, hasRAT)
+    return name
+
+
+def registerTable(name, fieldNames, rows, fieldTypes=None):
+    """ Adds a table to the in-memory catalog and returns its name """
+    _catalog[name] = _FakeTable(name, fieldNames, rows, fieldTypes)
+    return name
+
+
+def registerFeatureClass(name, fieldNames, rows, oidField="OBJECTID", zoneGrid=None, rasterName=None,
+                         fieldTypes=None, shapeType="Polygon"):
+    """ Adds a feature class of *shapeType* features to the in-memory catalog and returns its name
+
+        Polygons carry no geometry. Instead, *zoneGrid* holds the object ID of the polygon covering each cell of the
+        registered raster *rasterName* (-1 where no polygon falls), which is what PolygonToRaster returns.
+    """
+    table = _FakeTable(name, fieldNames, rows, fieldTypes, oidField)
+    table.shapeType = shapeType
+    if zoneGrid is not None:
+        table.zoneGrid = np.asarray(zoneGrid)
+        table.rasterName = rasterName
+    _catalog[name] = table
+    return name
+
+
+def registerFeatureLayer(name, featureClass, oids, whereClause=""):
+    """ Adds a layer of a registered feature class holding the features with object IDs in *oids*, and returns its name
+
+        The layer shares the catalog path of the feature class, and *whereClause* stands in for its definition query.
+        The object IDs stand for the features left by the definition query and the selection together.
+    """
+    source = _lookup(featureClass)
+    layer = copy.copy(source)
+    oidIndex = source.columnIndex("OID@")
+    layer.name = name
+    layer.rows = [r for r in source.rows if r[oidIndex] in set(oids)]
+    layer.isLayer = True
+    layer.whereClause = whereClause
+    _catalog[name] = layer
+    return name
+
+
+def _lookup(dataset):
+    if isinstance(dataset, _FakeRaster):
+        return dataset
+    name = str(dataset)
+    if name not in _catalog:
+        raise ExecuteError("Dataset %s does not exist" % name)
+    return _catalog[name]
+
+
+def resetCatalog():
+    """ Removes all registered datasets, messages and unimplemented calls, and restores the default environment """
+    _catalog.clear()
+    del _messages[:]
+    del _unimplementedCalls[:]
+    env.reset()
+
+
+def getUnimplementedCalls(clear=False):
+    """ Returns the names of the functions called that the fake package does not implement, in the order called """
+    calls = list(_unimplementedCalls)
+    if clear:
+        del _unimplementedCalls[:]
+    return calls
+
+
+def Exists(dataset):
+    return str(dataset) in _catalog or os.path.exists(str(dataset))
+
+
+def Delete_management(dataset, data_type=None):
+    _catalog.pop(str(dataset), None)
+    if os.path.isfile(str(dataset)):
+        os.remove(str(dataset))
+
+
+def Rename_management(in_data, out_data, data_type=None):
+    if Exists(out_data):
+        raise ExecuteError("ERROR 000725: Output Data Element: Dataset %s already exists." % out_data)
+    dataset = _catalog.pop(str(_lookup(in_data).name))
+    dataset.name = dataset.catalogPath = str(out_data)
+    _catalog[str(out_data)] = dataset
+    return _Result(out_data)
+
+
+def Copy_management(in_data, out_data, data_type=None):
+    # files in a geodatabase folder on disk stand in for datasets written by other processes
+    if str(in_data) in _catalog:
+        dataset = copy.deepcopy(_catalog[str(in_data)])
+        dataset.name = dataset.catalogPath = str(out_data)
+        _catalog[str(out_data)] = dataset
+    else:
+        shutil.copyfile(str(in_data), str(out_data))
+    return _Result(str(out_data))
+
+
+def _listWorkspace(kind):
+    """ Names of the datasets of *kind* in env.workspace; files in a geodatabase folder on disk count as tables """
+    workspace = str(env.workspace or "")
+    names = []
+    for name, dataset in _catalog.items():
+        if isinstance(dataset, _FakeRaster):
+            datasetKind = "raster"
+        else:
+            datasetKind = "table" if dataset.isTable else "featureClass"
+        if os.path.dirname(name) == workspace and datasetKind == kind:
+            names.append(os.path.basename(name))
+    if kind == "table" and os.path.isdir(workspace):
+        names.extend(sorted(f for f in os.listdir(workspace) if os.path.isfile(os.path.join(workspace, f))))
+    return names
+
+
+def ListTables(wild_card=None, table_type=None):
+    return _listWorkspace("table")
+
+
+def ListFeatureClasses(wild_card=None, feature_type=None, feature_dataset=None):
+    return _listWorkspace("featureClass")
+
+
+def ListRasters(wild_card=None, raster_type=None):
+    return _listWorkspace("raster")
+
+
+def CreateFileGDB_management(out_folder_path, out_name, out_version=None):
+    # a file geodatabase is a folder on disk
+    gdbPath = os.path.join(str(out_folder_path), out_name if out_name.endswith(".gdb") else out_name + ".gdb")
+    os.makedirs(gdbPath, exist_ok=True)
+    return _Result(gdbPath)
+
+
+def CreateTable_management(out_path, out_name, template=None, config_keyword=None):
+    name = os.path.join(str(out_path), out_name) if out_path else out_name
+    table = _FakeTable(name, ["OBJECTID"], [], {"OBJECTID": "OID"})
+    table.isTable = True
+    _catalog[name] = table
+    return _Result(name)
+
+
+def CreateScratchName(prefix="xx", suffix="", data_type="", workspace=None):
+    while True:
+        name = "%s%s%s" % (prefix, next(_scratchCounter), suffix)
+        if name not in _catalog:
+            return name
+
+
+def GetRasterProperties_management(in_raster, property_type="", band_index=None):
+    source = _lookup(in_raster)
+    properties = {"CELLSIZEX": source.cellSize, "CELLSIZEY": source.cellSize, "ROWCOUNT": source.array.shape[0],
+                  "COLUMNCOUNT": source.array.shape[1], "LEFT": source.extent.XMin, "BOTTOM": source.extent.YMin,
+                  "RIGHT": source.extent.XMax, "TOP": source.extent.YMax}
+    return _Result(properties[property_type.upper()])
+
+
+def GetCount_management(table):
+    return _Result(len(_lookup(table).rows))
+
+
+class _Result(object):
+    def __init__(self, *outputs):
+        self._outputs = outputs
+
+    def getOutput(self, index):
+        return str(self._outputs[index])
+
+    def __str__(self):
+        return self.getOutput(0)
+
+
+class _Describe(object):
+    def __init__(self, dataset):
+        self._dataset = dataset
+        self.name = dataset.name
+        self.baseName = dataset.name
+        self.catalogPath = dataset.catalogPath
+        self.path = ""
+        self.extent = getattr(dataset, 'extent', Extent())
+        self.spatialReference = getattr(dataset, 'spatialReference', SpatialReference())
+        if isinstance(dataset, _FakeTable):
+            self.OIDFieldName = dataset.oidField
+            self.fields = dataset.fields()
+            self.dataType = "Table" if dataset.isTable else "FeatureClass"
+            if getattr(dataset, "isLayer", False):
+                self.dataType = "FeatureLayer"
+                self.whereClause = dataset.whereClause
+            self.DataType = self.dataType
+            self.datasetType = self.dataType
+            self.shapeType = dataset.shapeType
+            self.hasOID = dataset.oidField is not None
+            self.HasM = False
+            self.HasZ = False
+        else:
+            self.meanCellWidth = dataset.cellSize
+            self.meanCellHeight = dataset.cellSize
+            self.dataType = "RasterDataset"
+            self.DataType = self.dataType
+            self.datasetType = self.dataType
+
+
+def Describe(dataset):
+    return _Describe(_lookup(dataset))
+
+
+def ListFields(dataset, wild_card=None, field_type=None):
+    import fnmatch
+    fieldList = _lookup(dataset).fields()
+    if wild_card:
+        fieldList = [f for f in fieldList if fnmatch.fnmatch(f.name.upper(), wild_card.upper())]
+    if field_type and field_type.upper() != "ALL":
+        fieldList = [f for f in fieldList if f.type.upper() == field_type.upper()]
+    return fieldList
+
+
+def AddField_management(in_table, field_name, field_type, field_precision=None, field_scale=None, field_length=None,
+                        field_alias=None, field_is_nullable=None, field_is_required=None, field_domain=None):
+    table = _lookup(in_table)
+    if isinstance(table, _FakeRaster):
+        # rasters have no attribute table to edit
+        return _Placeholder('arcpy.AddField_management on a raster')(in_table, field_name, field_type)
+    if field_name.upper() not in [n.upper() for n in table.fieldNames]:
+        table.fieldNames.append(field_name)
+        table.rows = [r + (None,) for r in table.rows]
+    table.fieldTypes[field_name] = field_type
+    return _Result(in_table)
+
+
+def ListIndexes(dataset, wild_card=None):
+    _lookup(dataset)
+    return []
+
+
+def AddIndex_management(in_table, fields, index_name=None, unique=None, ascending=None):
+    _lookup(in_table)
+    return _Result(str(in_table))
+
+
+def BuildRasterAttributeTable_management(in_raster, overwrite=None):
+    _lookup(in_raster)
+    return _Result(str(in_raster))
+
+
+def DeleteField_management(in_table, drop_field):
+    table = _lookup(in_table)
+    dropNames = [drop_field] if isinstance(drop_field, str) else list(drop_field)
+    dropNames = set(n.upper() for n in dropNames)
+    keep = [i for i, name in enumerate(table.fieldNames) if name.upper() not in dropNames]
+    table.fieldNames = [table.fieldNames[i] for i in keep]
+    table.rows = [tuple(r[i] for i in keep) for r in table.rows]
+    return _Result(in_table)
+
+
+def ValidateFieldName(name, workspace=None):
+    return name
+
+
+def AddFieldDelimiters(datasource, field):
+    return '"%s"' % field
+
+
+def AddMessage(message):
+    _messages.append((0, message))
+
+
+def AddWarning(message):
+    _messages.append((1, message))
+
+
+def AddError(message):
+    _messages.append((2, message))
+
+
+def GetMessages(severity=0):
+    return "\n".join(message for level, message in _messages if level >= severity)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# rasters
+# ---------------------------------------------------------------------------------------------------------------------
+
+class Raster(object):
+    """ Read only view of a registered raster """
+
+    def __init__(self, inRaster):
+        self._raster = _lookup(inRaster)
+        self.name = self._raster.name
+        self.catalogPath = self._raster.catalogPath
+
+    extent = property(lambda self: self._raster.extent)
+    meanCellWidth = property(lambda self: self._raster.cellSize)
+    meanCellHeight = property(lambda self: self._raster.cellSize)
+    height = property(lambda self: self._raster.array.shape[0])
+    width = property(lambda self: self._raster.array.shape[1])
+    noDataValue = property(lambda self: self._raster.noData)
+    hasRAT = property(lambda self: self._raster.hasRAT)
+    pixelType = property(lambda self: "S32")
+    minimum = property(lambda self: float(min(self._raster.values() or [0])))
+    maximum = property(lambda self: float(max(self._raster.values() or [0])))
+
+    def getStatistics(self):
+        return [{}]
+
+    def save(self, name):
+        _catalog[name] = _FakeRaster(name, self._raster.array, self._raster.cellSize, self._raster.xMin,
+                                     self._raster.yMin, self._raster.noData)
+
+    def __str__(self):
+        return self.catalogPath
+
+
+def RasterToNumPyArray(in_raster, lower_left_corner=None, ncols=None, nrows=None, nodata_to_value=None):
+    source = _lookup(in_raster)
+    data = source.array
+    fill = source.noData if nodata_to_value is None else nodata_to_value
+    if lower_left_corner is None:
+        block = data.copy()
+        if nodata_to_value is not None and source.noData is not None:
+            block[data == source.noData] = nodata_to_value
+        return block
+
+    nRows, nCols = data.shape
+    ncols = ncols or nCols
+    nrows = nrows or nRows
+    col0 = int(round((lower_left_corner.X - source.xMin) / source.cellSize))
+    rowBottom = nRows - int(round((lower_left_corner.Y - source.yMin) / source.cellSize))
+    row0 = rowBottom - nrows
+
+    dtype = np.result_type(data.dtype, np.min_scalar_type(fill)) if fill is not None else data.dtype
+    block = np.full((nrows, ncols), 0 if fill is None else fill, dtype=dtype)
+    r0, r1 = max(row0, 0), min(row0 + nrows, nRows)
+    c0, c1 = max(col0, 0), min(col0 + ncols, nCols)
+    if r0 < r1 and c0 < c1:
+        window = data[r0:r1, c0:c1]
+        if nodata_to_value is not None and source.noData is not None:
+            window = np.where(window == source.noData, nodata_to_value, window)
+        block[r0 - row0:r1 - row0, c0 - col0:c1 - col0] = window
+    return block
+
+
+def NumPyArrayToRaster(in_array, lower_left_corner=None, x_cell_size=1.0, y_cell_size=None, value_to_nodata=None):
+    ll = lower_left_corner or Point(0, 0)
+    name = CreateScratchName("xnp", "", "RasterDataset")
+    registerRaster(name, np.asarray(in_array), x_cell_size, ll.X, ll.Y, value_to_nodata)
+    return Raster(name)
+
+
+def _polygonToRaster(in_features, value_field, out_rasterdataset, cell_assignment="CELL_CENTER",
+                     priority_field="NONE", cellsize=None, build_rat=None):
+    features = _lookup(in_features)
+    if features.zoneGrid is None:
+        raise ExecuteError("Feature class %s was registered without a zone grid" % features.name)
+    template = _lookup(features.rasterName)
+
+    oidIdx = features.columnIndex(features.oidField)
+    valueIdx = features.columnIndex(value_field)
+    lut = dict((r[oidIdx], r[valueIdx]) for r in features.rows)
+    grid = features.zoneGrid
+    out = np.full(grid.shape, -1, dtype=np.int64)
+    for oid, value in lut.items():
+        out[grid == oid] = value
+    registerRaster(str(out_rasterdataset), out, template.cellSize, template.xMin, template.yMin, -1)
+    return _Result(out_rasterdataset)
+
+
+def _mosaicToNewRaster(input_rasters, output_location, raster_dataset_name_with_extension, coordinate_system=None,
+                       pixel_type=None, cellsize=None, number_of_bands=1, mosaic_method="LAST", mosaic_colormap_mode=None):
+    """ Supports the SUM mosaic method for rasters that share a cell size and alignment, with 64_BIT or 32_BIT_SIGNED
+        output """
+    if str(mosaic_method).upper() != "SUM":
+        raise NotImplementedError("the fake MosaicToNewRaster only supports the SUM method")
+    sources = [_lookup(r) for r in input_rasters]
+    size = sources[0].cellSize
+    xMin = min(r.xMin for r in sources)
+    yMin = min(r.yMin for r in sources)
+    xMax = max(r.extent.XMax for r in sources)
+    yMax = max(r.extent.YMax for r in sources)
+    nRows, nCols = int(round((yMax - yMin) / size)), int(round((xMax - xMin) / size))
+    total = np.zeros((nRows, nCols), dtype=np.float64)
+    hasData = np.zeros((nRows, nCols), dtype=bool)
+    for r in sources:
+        row0 = int(round((yMax - r.extent.YMax) / size))
+        col0 = int(round((r.xMin - xMin) / size))
+        valid = np.ones(r.array.shape, dtype=bool) if r.noData is None else r.array != r.noData
+        window = (slice(row0, row0 + r.array.shape[0]), slice(col0, col0 + r.array.shape[1]))
+        total[window] += np.where(valid, r.array, 0)
+        hasData[window] |= valid
+    name = os.path.join(output_location, raster_dataset_name_with_extension) if output_location else \
+        raster_dataset_name_with_extension
+    if str(pixel_type).upper() == "32_BIT_SIGNED":
+        noData = np.iinfo(np.int32).min
+        registerRaster(name, np.where(hasData, np.rint(total), noData).astype(np.int32), size, xMin, yMin, noData)
+    else:
+        noData = -3.4e38
+        registerRaster(name, np.where(hasData, total, noData), size, xMin, yMin, noData)
+    return _Result(name)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# cursors
+# ---------------------------------------------------------------------------------------------------------------------
+
+class _Row(object):
+    """ Legacy cursor row """
+
+    def __init__(self, fieldNames, values):
+        self._fieldNames = [f.upper() for f in fieldNames]
+        self._values = list(values)
+
+    def getValue(self, name):
+        return self._values[self._fieldNames.index(name.upper())]
+
+    def setValue(self, name, value):
+        self._values[self._fieldNames.index(name.upper())] = value
+
+    def __getattr__(self, name):
+        if name.startswith('_') or name.upper() not in self._fieldNames:
+            raise AttributeError(name)
+        return self.getValue(name)
+
+    def __setattr__(self, name, value):
+        if name.startswith('_'):
+            object.__setattr__(self, name, value)
+        else:
+            self.setValue(name, value)
+
+
+class SearchCursor(object):
+    """ Legacy search cursor """
+
+    def __init__(self, dataset, where_clause=None, spatial_reference=None, fields=None, sort_fields=None):
+        table = _lookup(dataset)
+        if isinstance(table, _FakeRaster):
+            values = table.values()
+            self._rows = iter([_Row(["Value"], [v]) for v in values])
+        else:
+            self._rows = iter([_Row(table.fieldNames, r) for r in table.rows])
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._rows)
+
+    next = __next__
+
+
+class InsertCursor(object):
+    """ Legacy insert cursor """
+
+    def __init__(self, dataset, spatial_reference=None):
+        self._table = _lookup(dataset)
+
+    def newRow(self):
+        return _Row(self._table.fieldNames, [None] * len(self._table.fieldNames))
+
+    def insertRow(self, row):
+        self._table.rows.append(tuple(row._values))
+
+
+class UpdateCursor(object):
+    """ Legacy update cursor; next returns None after the last row, as the ArcGIS cursor does """
+
+    def __init__(self, dataset, where_clause=None, spatial_reference=None, fields=None, sort_fields=None):
+        if where_clause:
+            _Placeholder('arcpy.UpdateCursor with a where clause')()
+        self._table = _lookup(dataset)
+        self._position = -1
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        row = self.next()
+        if row is None:
+            raise StopIteration
+        return row
+
+    def next(self):
+        self._position += 1
+        if self._position >= len(self._table.rows):
+            return None
+        return _Row(self._table.fieldNames, self._table.rows[self._position])
+
+    def updateRow(self, row):
+        self._table.rows[self._position] = tuple(row._values)
+
+
+class _DaSearchCursor(object):
+
+    def __init__(self, in_table, field_names, where_clause=None, *args, **kwargs):
+        table = _lookup(in_table)
+        if isinstance(field_names, str):
+            field_names = [field_names]
+        if isinstance(table, _FakeRaster):
+            if not table.hasRAT:
+                raise RuntimeError("cannot open '%s'" % table.name)
+            columns = {"VALUE": 0, "COUNT": 1}
+            self._rows = iter([tuple(row[columns[f.upper()]] for f in field_names) for row in table.valueCounts()])
+            return
+        indexes = [table.columnIndex(f) for f in field_names]
+        self._rows = iter([tuple(r[i] for i in indexes) for r in table.rows])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._rows)
+
+    def reset(self):
+        pass
+
+
+class _DaInsertCursor(object):
+
+    def __init__(self, in_table, field_names, *args, **kwargs):
+        self._table = _lookup(in_table)
+        if isinstance(field_names, str):
+            field_names = [field_names]
+        for f in field_names:
+            if f.upper() not in [n.upper() for n in self._table.fieldNames]:
+                self._table.fieldNames.append(f)
+                self._table.rows = [r + (None,) for r in self._table.rows]
+        self._indexes = [self._table.columnIndex(f) for f in field_names]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def insertRow(self, row):
+        newRow = [None] * len(self._table.fieldNames)
+        for i, value in zip(self._indexes, row):
+            newRow[i] = value
+        self._table.rows.append(tuple(newRow))
+
+
+class _DaUpdateCursor(object):
+
+    def __init__(self, in_table, field_names, where_clause=None, *args, **kwargs):
+        self._table = _lookup(in_table)
+        if isinstance(field_names, str):
+            field_names = [field_names]
+        self._indexes = [self._table.columnIndex(f) for f in field_names]
+        self._position = -1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        self._position += 1
+        if self._position >= len(self._table.rows):
+            raise StopIteration
+        row = self._table.rows[self._position]
+        return [row[i] for i in self._indexes]
+
+    def updateRow(self, row):
+        newRow = list(self._table.rows[self._position])
+        for i, value in zip(self._indexes, row):
+            newRow[i] = value
+        self._table.rows[self._position] = tuple(newRow)
+
+
+def _numPyArrayToTable(in_array, out_table):
+    in_array = np.asarray(in_array)
+    names = list(in_array.dtype.names)
+    rows = [tuple(r.item() if hasattr(r, 'item') else r for r in row) for row in in_array.tolist()]
+    registerTable(str(out_table), names, rows)
+
+
+def _tableToNumPyArray(in_table, field_names, *args, **kwargs):
+    table = _lookup(in_table)
+    if field_names == "*":
+        field_names = table.fieldNames
+    with _DaSearchCursor(in_table, field_names) as cursor:
+        rows = list(cursor)
+    columns = list(zip(*rows)) if rows else [[] for f in field_names]
+    arrays = [np.asarray(col) for col in columns]
+    dtype = [(f, a.dtype if a.size else np.float64) for f, a in zip(field_names, arrays)]
+    out = np.empty(len(rows), dtype=dtype)
+    for f, a in zip(field_names, arrays):
+        out[f] = a
+    return out
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# submodules
+# ---------------------------------------------------------------------------------------------------------------------
+
+da = _submodule('da')
+da.SearchCursor = _DaSearchCursor
+da.InsertCursor = _DaInsertCursor
+da.UpdateCursor = _DaUpdateCursor
+da.NumPyArrayToTable = _numPyArrayToTable
+da.TableToNumPyArray = _tableToNumPyArray
+
+conversion = _submodule('conversion')
+conversion.PolygonToRaster = _polygonToRaster
+PolygonToRaster_conversion = _polygonToRaster
+
+management = _submodule('management')
+management.Delete = Delete_management
+management.Copy = Copy_management
+management.Rename = Rename_management
+management.GetCount = GetCount_management
+management.CreateTable = CreateTable_management
+management.GetRasterProperties = GetRasterProperties_management
+management.AddField = AddField_management
+management.DeleteField = DeleteField_management
+management.MosaicToNewRaster = _mosaicToNewRaster
+management.CreateFileGDB = CreateFileGDB_management
+management.AddIndex = AddIndex_management
+management.BuildRasterAttributeTable = BuildRasterAttributeTable_management
+
+analysis = _submodule('analysis')
+
+from . import sa
@@ -0,0 +1,18 @@
+''' Spatial Analyst placeholders for the fake arcpy package
+
+    Map algebra is not implemented. Names resolve to placeholders so that modules which import them can be loaded.
+
+'''
+import sys
+
+from arcpy import Raster, _FakeModule, _Placeholder
+
+
+def __getattr__(name):
+    if name.startswith('__'):
+        raise AttributeError(name)
+    return _Placeholder('arcpy.sa.' + name)
+
+
+Functions = _FakeModule('arcpy.sa.Functions')
+sys.modules['arcpy.sa.Functions'] = Functions
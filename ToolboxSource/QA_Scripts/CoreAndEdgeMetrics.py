@@ -1,6 +1,5 @@
 import traceback, time, arcpy, os, sys, csv, subprocess
 import arcpy
-import itertools
 from arcpy.sa import *
 from parameters import *
 from inputDictionaries import *
@@ -9,8 +8,8 @@ from inputDictionaries import *
 arcpy.ImportToolbox(setup.ATtILA_pth) #Nov06 is the toolbox with the new arcpy.env.workspace error message related to the logfile
 from ATtILA2 import metric
 from ATtILA2.utils import parameters 
-from ATtILA2.utils.messages import loopProgress, AddMsg 
 from ATtILA2.datetimeutil import DateTimer 
+import qaExecutor
 arcpy.AddMessage(' ***Current working directory: {0} ***'.format(os.getcwd()))
 
 arcpy.env.overwriteOutput = 1 #Overwrite outputs
@@ -33,7 +32,7 @@ arcpy.env.workspace = Output_GDB_pth
 
 #Define ATtILA metric
 def runATtILA(paramDict, iteration):  
-  outTable = os.path.join(Output_GDB_pth, f"{fileName}{iteration+1}")
+  outTable = os.path.join(qaExecutor.getOutputWorkspace(Output_GDB_pth), f"{fileName}{iteration+1}")
   arcpy.AddMessage(f"***Starting {toolAbbv}: run {iteration+1} of {len(paramCombosList)}***")
   metric.runCoreAndEdgeMetrics(
                               toolPath,
@@ -51,28 +50,7 @@ def runATtILA(paramDict, iteration):
                               paramDict["ReduceLandGridToSmallSize"])
 
 #Build list of possible combinations
-paramCombosList = list(itertools.product(*CAEM_options.testInputs.values()))
+paramCombosList = qaExecutor.getParameterCombinations(CAEM_options.testInputs)
 
-failedList = [] #failed list to store failed parameter set dictionaries
-loopProgress = loopProgress(len(paramCombosList))
-print(f"Testing {len(paramCombosList)} parameter combinations\n")
-
-
-for iteration, params in enumerate(paramCombosList): 
-  paramDict = dict(zip(CAEM_options.testInputs.keys(), params))
-
-  try: 
-    runATtILA(paramDict, iteration)
-  except: 
-    AddMsg(f"exception occured using {paramDict}")
-    failedList.append(paramDict)
-    loopProgress.update()
-    continue
-  
-if failedList == []: 
-  print("No errors found")
-else: 
-  print('\n***Failed Parameter Sets***\n')
-  for dictionary in failedList:
-    print(dictionary)
-    print('')
\ No newline at end of file
+if __name__ == '__main__':
+  qaExecutor.runParameterMatrix(toolAbbv, paramCombosList, runATtILA, setup.outFolder, setup.workerCount, outWorkspace=Output_GDB_pth)
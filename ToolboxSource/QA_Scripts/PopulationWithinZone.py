@@ -11,7 +11,6 @@ PWZM_options1 tests for a polygon zone and PWZM_options2 tests a raster zone.
 
 import traceback, time, arcpy, os, sys, csv, subprocess
 import arcpy
-import itertools
 from arcpy.sa import *
 from parameters import *
 from inputDictionaries import *
@@ -20,8 +19,8 @@ from inputDictionaries import *
 arcpy.ImportToolbox(setup.ATtILA_pth) #Nov06 is the toolbox with the new arcpy.env.workspace error message related to the logfile
 from ATtILA2 import metric
 from ATtILA2.utils import parameters 
-from ATtILA2.utils.messages import loopProgress, AddMsg 
 from ATtILA2.datetimeutil import DateTimer 
+import qaExecutor
 arcpy.AddMessage(' ***Current working directory: {0} ***'.format(os.getcwd()))
 
 arcpy.env.overwriteOutput = 1 #Overwrite outputs
@@ -44,7 +43,7 @@ arcpy.env.workspace = Output_GDB_pth
 
 #Define ATtILA metric
 def runATtILA(paramDict, iteration):
-  outTable = os.path.join(Output_GDB_pth, f"{fileName}{iteration+1}")
+  outTable = os.path.join(qaExecutor.getOutputWorkspace(Output_GDB_pth), f"{fileName}{iteration+1}")
   arcpy.AddMessage(f"***Starting {toolAbbv}: run {iteration+1} of {len(paramCombosList)}***")
   metric.runPopulationWithinZoneMetrics(
                   toolPath,
@@ -60,31 +59,8 @@ def runATtILA(paramDict, iteration):
                   paramDict["optionalFieldGroups"]
                   )
 
-for Dict_iteration, dictionary in enumerate(PWZM_options.testInputs): 
-  paramCombosList = list(itertools.product(*dictionary.values()))
-  print(f"\nStarting parameter combination dictionary {Dict_iteration+1}\n")
-  print("*********************************************************")
-  print(f"Testing {len(paramCombosList)} parameter combinations\n")
-  failedList = [] #failed list to store failed parameter set dictionaries
-  Progress = loopProgress(len(paramCombosList)) #This should not be LoopProgress = loopProgress(len(paramCombosList)). Creates a reassignment error if it needs to be rewritten in this nested structure.  
-
-  for iteration, params in enumerate(paramCombosList): 
-    paramDict = dict(zip(dictionary.keys(), params))
-    try: 
-      runATtILA(paramDict, iteration)
-    except: 
-      AddMsg(f"exception occured using {paramDict}")
-      failedList.append(paramDict)
-      Progress.update()
-      continue
-  
-  if failedList == []: 
-    print("No errors found")
-  else: 
-    print('\n***Failed Parameter Sets***\n')
-    for dictionary in failedList:
-      print(dictionary)
-      print('')
-  
-  print(f"\n{len(failedList)} Errors found in parameter combination dictionary {Dict_iteration+1}. Continuing to the next parameter combination set\n")
+#Build list of possible combinations
+paramCombosList = qaExecutor.getParameterCombinations(PWZM_options.testInputs)
 
+if __name__ == '__main__':
+  qaExecutor.runParameterMatrix(toolAbbv, paramCombosList, runATtILA, setup.outFolder, setup.workerCount, outWorkspace=Output_GDB_pth)
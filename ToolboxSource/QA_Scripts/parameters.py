@@ -15,6 +15,7 @@ class setup:
     NHD_H_0509_HUC4 = None # Path to HUC 0509 NHD gdb
     NHD_plus = None # Path to NHD plus dataset for multiple shapefiles NHD test
     NHD_Shapefile_folder = None # Path to single shapefile NHD folder
+    workerCount = None # Number of worker processes running parameter combinations. None uses every core but one; 1 runs them one at a time
 class points:
     Daycares = os.path.join(inGDB, "Daycares")
     SampleSites = os.path.join(inGDB, "SampleSites")
@@ -0,0 +1,267 @@
+""" Runs the parameter combinations of a QA script in a pool of worker processes
+
+    The combinations are built from a tool's test dictionary (or list of test dictionaries) in inputDictionaries.py.
+    Combinations that repeat an earlier one are run only once. Combinations that differ only in parameters that do not
+    change the expensive intermediate datasets (e.g., optionalFieldGroups) are grouped and run one after another in the
+    same worker, so that the tabulations, zone rasters and raster metadata cached by ATtILA are reused within the group.
+    Each worker writes its outputs and intermediate datasets to its own scratch folder and geodatabases, so that workers
+    never create datasets in the same geodatabase at once; the outputs are copied to the tool's output geodatabase when
+    every combination has run. A consolidated report of the status and run time of every combination is printed and
+    written to a CSV file in the output folder.
+
+"""
+import os
+import csv
+import glob
+import time
+import shutil
+import tempfile
+import itertools
+import traceback
+import arcpy
+
+from ATtILA2.utils import parallel, tabarea
+from ATtILA2.utils.messages import loopProgress, AddMsg
+from ATtILA2.constants import globalConstants
+
+# parameters that can change from one combination to the next without changing the expensive intermediate datasets
+cheapParameters = ("optionalFieldGroups", "metricsToRun")
+
+# name of the geodatabase in each worker's scratch folder that receives the outputs of its combinations
+workerOutputGDB = "output.gdb"
+
+# output geodatabase of the current worker process; set by _initializeWorker
+_workerOutputWorkspace = None
+
+
+def getParameterCombinations(testInputs):
+    """ Returns every combination of parameter values of a test dictionary, or of each dictionary in a list, as dictionaries """
+
+    if isinstance(testInputs, dict):
+        testInputs = [testInputs]
+
+    combinations = []
+    for dictionary in testInputs:
+        for params in itertools.product(*dictionary.values()):
+            combinations.append(dict(zip(dictionary.keys(), params)))
+
+    return combinations
+
+
+def _getParameterKey(paramDict, ignoredKeys=()):
+    return tuple((key, repr(value)) for key, value in sorted(paramDict.items()) if key not in ignoredKeys)
+
+
+def getCombinationGroups(paramCombosList, sharedKeys=cheapParameters):
+    """ Groups the combinations that share expensive intermediates and sets aside exact duplicates
+
+    **Arguments:**
+
+        * *paramCombosList* - list of parameter dictionaries
+        * *sharedKeys* - parameters whose values do not change the expensive intermediate datasets
+
+    **Returns:**
+
+        * list - groups, largest first, each a list of (iteration, parameter dictionary) to run in one worker
+        * dictionary - iteration of a duplicate combination: iteration of the combination it repeats
+
+    """
+
+    firstIterations = {}
+    duplicates = {}
+    groups = {}
+    for iteration, paramDict in enumerate(paramCombosList):
+        fullKey = _getParameterKey(paramDict)
+        if fullKey in firstIterations:
+            duplicates[iteration] = firstIterations[fullKey]
+            continue
+        firstIterations[fullKey] = iteration
+        groups.setdefault(_getParameterKey(paramDict, sharedKeys), []).append((iteration, paramDict))
+
+    return sorted(groups.values(), key=len, reverse=True), duplicates
+
+
+def getOutputWorkspace(outWorkspace):
+    """ Returns the geodatabase that the combination running in this process writes its outputs to
+
+    **Description:**
+
+        QA scripts build the paths of their outputs in this workspace instead of *outWorkspace*, their own output
+        geodatabase. In a worker started by runParameterMatrix it is the worker's own output geodatabase, whose
+        datasets are copied to *outWorkspace* after the run. ATtILA puts intermediate datasets next to the output, so
+        they stay in the worker's geodatabase as well.
+
+    **Arguments:**
+
+        * *outWorkspace* - the QA script's output geodatabase
+
+    **Returns:**
+
+        * string - path of a geodatabase
+
+    """
+
+    return _workerOutputWorkspace or outWorkspace
+
+
+def _initializeWorker(scratchRoot):
+    """ Gives the current process its own scratch folder, scratch geodatabase and output geodatabase under *scratchRoot* """
+
+    global _workerOutputWorkspace
+    workerFolder = tempfile.mkdtemp(prefix="worker%s_" % parallel.getWorkerNumber(), dir=scratchRoot)
+    arcpy.env.scratchWorkspace = arcpy.management.CreateFileGDB(workerFolder, "scratch.gdb").getOutput(0)
+    _workerOutputWorkspace = arcpy.management.CreateFileGDB(workerFolder, workerOutputGDB).getOutput(0)
+    arcpy.env.workspace = _workerOutputWorkspace
+    globalConstants.zoneRasterCacheFolder = workerFolder
+
+
+def _copyWorkerOutputs(scratchRoot, outWorkspace):
+    """ Copies the datasets of every worker's output geodatabase under *scratchRoot* to *outWorkspace* """
+
+    mainWorkspace = arcpy.env.workspace
+    try:
+        for workerWorkspace in sorted(glob.glob(os.path.join(scratchRoot, "*", workerOutputGDB))):
+            arcpy.env.workspace = workerWorkspace
+            datasetNames = (arcpy.ListTables() or []) + (arcpy.ListFeatureClasses() or []) + (arcpy.ListRasters() or [])
+            for datasetName in datasetNames:
+                outDataset = os.path.join(outWorkspace, datasetName)
+                if arcpy.Exists(outDataset):
+                    arcpy.management.Delete(outDataset)
+                arcpy.management.Copy(os.path.join(workerWorkspace, datasetName), outDataset)
+    finally:
+        arcpy.env.workspace = mainWorkspace
+
+
+def _runGroup(task):
+    """ Runs the combinations of one group, sharing tabulations among them; returns a result for each combination """
+
+    runFunction, group = task
+    results = []
+    tabarea.startSharedTabulations()
+    try:
+        for iteration, paramDict in group:
+            startTime = time.perf_counter()
+            try:
+                runFunction(paramDict, iteration)
+                errorMessage = None
+            except Exception:
+                errorMessage = traceback.format_exc()
+            results.append((iteration, errorMessage, time.perf_counter() - startTime, parallel.getWorkerNumber()))
+    finally:
+        tabarea.stopSharedTabulations()
+
+    return results
+
+
+def writeReport(reportFile, reportRows):
+    """ Writes the report rows (see runParameterMatrix) to a CSV file """
+
+    fieldNames = ["Run", "Status", "Seconds", "Worker", "Group", "DuplicateOf", "Parameters", "Error"]
+    with open(reportFile, "w", newline="") as csvFile:
+        writer = csv.DictWriter(csvFile, fieldNames)
+        writer.writeheader()
+        writer.writerows(reportRows)
+
+
+def runParameterMatrix(toolAbbv, paramCombosList, runFunction, outFolder, workerCount=None,
+                       sharedKeys=cheapParameters, outWorkspace=None):
+    """ Runs *runFunction* on every parameter combination and reports the status and run time of each one
+
+    **Description:**
+
+        *runFunction* is the runATtILA function of a QA script. It must be defined at the top level of the script, and
+        the script must call this function under if __name__ == '__main__', because on Windows each worker imports the
+        script again. A combination fails when *runFunction* raises an exception. *runFunction* writes its outputs to
+        getOutputWorkspace(*outWorkspace*), the output geodatabase of the worker running it, and they are copied to
+        *outWorkspace* when every combination has run.
+
+    **Arguments:**
+
+        * *toolAbbv* - abbreviation of the tool, used to name the report and scratch folder
+        * *paramCombosList* - list of parameter dictionaries (see getParameterCombinations)
+        * *runFunction* - function taking a parameter dictionary and its iteration number
+        * *outFolder* - folder for the report and the workers' scratch folders
+        * *workerCount* - number of worker processes. None uses every core but one; 1 runs in the current process
+        * *sharedKeys* - parameters whose values do not change the expensive intermediate datasets
+        * *outWorkspace* - output geodatabase of the QA script, which receives the outputs of every worker
+
+    **Returns:**
+
+        * list - parameter dictionaries of the failed combinations
+
+    """
+
+    startTime = time.perf_counter()
+    groups, duplicates = getCombinationGroups(paramCombosList, sharedKeys)
+    workerCount = parallel.getWorkerCount(workerCount)
+    print(f"Testing {len(paramCombosList)} parameter combinations ({len(duplicates)} duplicates) in {len(groups)} "
+          f"groups on {min(workerCount, len(groups))} workers\n")
+
+    scratchRoot = os.path.join(outFolder, f"{toolAbbv}_scratch")
+    os.makedirs(scratchRoot, exist_ok=True)
+    groupNumbers = {}
+    for groupNumber, group in enumerate(groups):
+        for iteration, paramDict in group:
+            groupNumbers[iteration] = groupNumber + 1
+
+    taskList = [(runFunction, group) for group in groups]
+    global _workerOutputWorkspace
+    mainScratchWorkspace = arcpy.env.scratchWorkspace
+    mainWorkspace = arcpy.env.workspace
+    mainZoneRasterCacheFolder = globalConstants.zoneRasterCacheFolder
+    try:
+        if workerCount <= 1 or len(taskList) <= 1:
+            # runTasks runs the groups in this process without calling the initializer
+            _initializeWorker(scratchRoot)
+        groupResults = parallel.runTasks(_runGroup, taskList, workerCount, _initializeWorker, (scratchRoot,),
+                                         progress=loopProgress(len(taskList)))
+        if outWorkspace:
+            _copyWorkerOutputs(scratchRoot, outWorkspace)
+    finally:
+        _workerOutputWorkspace = None
+        arcpy.env.scratchWorkspace = mainScratchWorkspace
+        arcpy.env.workspace = mainWorkspace
+        globalConstants.zoneRasterCacheFolder = mainZoneRasterCacheFolder
+        shutil.rmtree(scratchRoot, ignore_errors=True)
+
+    results = {}
+    for groupResult in groupResults:
+        for iteration, errorMessage, seconds, workerNumber in groupResult:
+            results[iteration] = (errorMessage, seconds, workerNumber)
+
+    reportRows = []
+    failedList = []
+    for iteration, paramDict in enumerate(paramCombosList):
+        row = {"Run": iteration + 1, "Parameters": paramDict}
+        if iteration in duplicates:
+            row.update(Status="Duplicate", DuplicateOf=duplicates[iteration] + 1)
+        else:
+            errorMessage, seconds, workerNumber = results[iteration]
+            row.update(Status="Failed" if errorMessage else "Passed", Seconds=round(seconds, 3), Worker=workerNumber,
+                       Group=groupNumbers[iteration], Error=errorMessage or "")
+            if errorMessage:
+                AddMsg(f"exception occured using {paramDict}\n{errorMessage}")
+                failedList.append(paramDict)
+        reportRows.append(row)
+
+    reportFile = os.path.join(outFolder, f"{toolAbbv}_QA_report.csv")
+    writeReport(reportFile, reportRows)
+
+    elapsed = time.perf_counter() - startTime
+    runTime = sum(seconds for errorMessage, seconds, workerNumber in results.values())
+    print(f"\n{len(results) - len(failedList)} passed, {len(failedList)} failed, {len(duplicates)} duplicates skipped")
+    print(f"Run time {runTime:.1f} s across workers, {elapsed:.1f} s elapsed")
+    print("Slowest runs:")
+    for row in sorted((row for row in reportRows if "Seconds" in row), key=lambda row: -row["Seconds"])[:5]:
+        print(f"  run {row['Run']}: {row['Seconds']} s")
+    print(f"Report written to {reportFile}")
+
+    if failedList == []:
+        print("No errors found")
+    else:
+        print('\n***Failed Parameter Sets***\n')
+        for dictionary in failedList:
+            print(dictionary)
+            print('')
+
+    return failedList